@@ -0,0 +1,309 @@
+"""
+Command-line interface for ATS Resume Match Analyzer.
+
+Usage:
+    python -m app export --format csv --since 2024-01-01 --output analyses.csv
+    python -m app score --jd jds/ resumes/ "inbox/**/*.pdf" --format csv --output ranked.csv
+    python -m app watch inbox/backend=jds/backend.txt inbox/data=jds/data/ --output scored.jsonl --metrics-port 9108
+    python -m app distribute --jd jds/ resumes/ --listen 0.0.0.0:7350 --local-workers 4 --output ranked.csv
+    python -m app shard-worker --connect coordinator:7350 --workers 8
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import signal
+import sys
+import threading
+from typing import Optional, Tuple
+
+from app.batch import Progress, default_workers, iter_resume_paths, load_jds, run_batch
+from app.cluster import run_distributed, run_worker
+from app.config import settings
+from app.export import EXPORT_FORMATS, iter_export, parse_timestamp
+from app.ingest import Ingestor, serve_metrics
+from app.scoring_engine import DETAIL_LEVELS
+from app.store import SQLiteAnalysisStore, sqlite_path
+
+
+def _export(args: argparse.Namespace) -> int:
+    try:
+        path = sqlite_path(args.database_url)
+        # Opening a missing database would create an empty one and export nothing
+        if not os.path.isfile(path):
+            raise ValueError(f"no database at {path}")
+        since, until = parse_timestamp(args.since), parse_timestamp(args.until)
+        output = open(args.output, 'w', newline='', encoding='utf-8') if args.output else sys.stdout
+    except (OSError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    store = SQLiteAnalysisStore(path)
+    try:
+        for chunk in iter_export(store, export_format=args.format, since=since, until=until, jd_hash=args.jd_hash):
+            output.write(chunk)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        store.close()
+    return 0
+
+
+def _score(args: argparse.Namespace) -> int:
+    try:
+        weights = json.loads(args.weights) if args.weights else None
+        jds = load_jds(args.jd)
+    except (OSError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    show_progress = sys.stderr.isatty() if args.progress is None else args.progress
+    output = open(args.output, 'w', newline='', encoding='utf-8') if args.output else sys.stdout
+    try:
+        summary = run_batch(
+            iter_resume_paths(args.resumes),
+            jds,
+            output,
+            export_format=args.format,
+            top=args.top,
+            workers=args.workers,
+            weights=weights,
+            strict_mode=args.strict,
+            detail_level=args.detail_level,
+            chunk_size=args.chunk_size,
+            progress=Progress(sys.stderr if show_progress else None)
+        )
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    print(
+        f"Scored {summary['files']} files against {summary['jds']} JDs in {summary['elapsed_s']}s "
+        f"({summary['failed']} failed)",
+        file=sys.stderr
+    )
+    return 1 if summary['failed'] and summary['failed'] == summary['files'] else 0
+
+
+def _watch(args: argparse.Namespace) -> int:
+    try:
+        weights = json.loads(args.weights) if args.weights else None
+        default_jds = load_jds(args.jd) if args.jd else None
+        watches = []
+        for spec in args.directories:
+            directory, _, jd_spec = spec.partition('=')
+            jds = load_jds([jd_spec]) if jd_spec else default_jds
+            if jds is None:
+                raise ValueError(f"No job descriptions for {directory}; give DIR=JD or --jd")
+            if not os.path.isdir(directory):
+                raise ValueError(f"{directory} is not a directory")
+            watches.append((directory, jds))
+    except (OSError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    ingestor = Ingestor(
+        watches,
+        args.output,
+        args.checkpoint or args.output + '.checkpoint',
+        workers=args.workers,
+        settle=args.settle,
+        interval=args.interval,
+        weights=weights,
+        strict_mode=args.strict,
+        detail_level=args.detail_level,
+        chunk_size=args.chunk_size,
+        use_inotify=args.inotify
+    )
+    metrics_server = serve_metrics(args.metrics_port, args.metrics_host) if args.metrics_port else None
+    stop = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop.set())
+    try:
+        summary = ingestor.run(stop, once=args.once)
+    finally:
+        if metrics_server is not None:
+            metrics_server.shutdown()
+    print(f"Scored {summary['files']} files in {summary['elapsed_s']}s ({summary['failed']} failed)", file=sys.stderr)
+    return 0
+
+
+def _address(value: str) -> Tuple[str, int]:
+    host, _, port = value.rpartition(':')
+    if not port.isdigit():
+        raise argparse.ArgumentTypeError(f"expected HOST:PORT, got {value!r}")
+    return host or '0.0.0.0', int(port)
+
+
+def _authkey(args: argparse.Namespace, required: bool) -> Optional[bytes]:
+    key = args.authkey or os.getenv("ATS_SHARD_AUTHKEY")
+    if key is None and required:
+        raise ValueError("an authkey is required for remote workers; use --authkey or ATS_SHARD_AUTHKEY")
+    return key.encode('utf-8') if key else None
+
+
+def _distribute(args: argparse.Namespace) -> int:
+    try:
+        weights = json.loads(args.weights) if args.weights else None
+        jds = load_jds(args.jd)
+        authkey = _authkey(args, required=args.listen[0] not in ('127.0.0.1', 'localhost'))
+    except (OSError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    if not args.local_workers and args.listen[0] in ('127.0.0.1', 'localhost'):
+        print("error: no workers can connect; use --local-workers or --listen on a public address", file=sys.stderr)
+        return 2
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    show_progress = sys.stderr.isatty() if args.progress is None else args.progress
+    output = open(args.output, 'w', newline='', encoding='utf-8') if args.output else sys.stdout
+    try:
+        summary = run_distributed(
+            iter_resume_paths(args.resumes),
+            jds,
+            output,
+            export_format=args.format,
+            top=args.top,
+            shard_size=args.shard_size,
+            address=args.listen,
+            authkey=authkey,
+            local_workers=args.local_workers,
+            weights=weights,
+            strict_mode=args.strict,
+            detail_level=args.detail_level,
+            max_attempts=args.max_attempts,
+            lease_timeout=args.lease_timeout,
+            progress=Progress(sys.stderr if show_progress else None),
+            on_listening=lambda address: print(f"Serving shards on {address[0]}:{address[1]}", file=sys.stderr)
+        )
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    print(
+        f"Scored {summary['files']} files in {summary['shards']} shards against {summary['jds']} JDs "
+        f"in {summary['elapsed_s']}s ({summary['failed']} failed, {summary['retries']} retries, "
+        f"{summary['steals']} steals)",
+        file=sys.stderr
+    )
+    return 1 if summary['failed'] and summary['failed'] == summary['files'] else 0
+
+
+def _shard_worker(args: argparse.Namespace) -> int:
+    try:
+        authkey = _authkey(args, required=True)
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    if args.workers <= 1:
+        run_worker(args.connect, authkey, prefetch=args.prefetch)
+        return 0
+    processes = [
+        multiprocessing.Process(target=run_worker, args=(args.connect, authkey), kwargs={'prefetch': args.prefetch})
+        for _ in range(args.workers)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    return 0 if all(process.exitcode == 0 for process in processes) else 1
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app", description="ATS Resume Match Analyzer")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export = commands.add_parser("export", help="Export stored analyses as JSONL or CSV")
+    export.add_argument("--format", choices=EXPORT_FORMATS, default="jsonl")
+    export.add_argument("--since", help="ISO date/datetime, inclusive")
+    export.add_argument("--until", help="ISO date/datetime, exclusive")
+    export.add_argument("--jd-hash", help="Only analyses of this job description")
+    export.add_argument("--output", "-o", help="Output file (default: stdout)")
+    export.add_argument("--database-url", default=settings.database_url,
+                        help="SQLite database URL (default: DATABASE_URL)")
+    export.set_defaults(handler=_export)
+
+    score = commands.add_parser("score", help="Score resume files against job descriptions, ranked per JD")
+    score.add_argument("resumes", nargs="+", help="Resume files, directories (searched recursively) or globs")
+    score.add_argument("--jd", action="append", required=True,
+                       help="Job description file or directory of them (repeatable)")
+    score.add_argument("--format", choices=EXPORT_FORMATS, default="jsonl")
+    score.add_argument("--output", "-o", help="Output file (default: stdout)")
+    score.add_argument("--top", type=int, default=0, help="Keep only the best N resumes per JD (default: all)")
+    score.add_argument("--workers", "-j", type=int, default=default_workers(),
+                       help="Scoring processes (default: every available core)")
+    score.add_argument("--chunk-size", type=int, default=8, help="Files handed to a worker at a time")
+    score.add_argument("--weights", help="JSON object of category weights")
+    score.add_argument("--strict", action="store_true", help="Score in strict mode")
+    score.add_argument("--detail-level", choices=DETAIL_LEVELS, default="keywords",
+                       help="Result detail; CSV keyword columns need 'keywords' or 'full'")
+    score.add_argument("--progress", action=argparse.BooleanOptionalAction, default=None,
+                       help="Show progress on stderr (default: when stderr is a terminal)")
+    score.set_defaults(handler=_score)
+
+    watch = commands.add_parser("watch", help="Score resumes as they arrive in directories, until interrupted")
+    watch.add_argument("directories", nargs="+", metavar="DIR[=JD]",
+                       help="Directory to watch (recursively), with the JD file or directory to score against")
+    watch.add_argument("--jd", action="append", help="JDs for directories given without one (repeatable)")
+    watch.add_argument("--output", "-o", required=True, help="JSONL file results are appended to")
+    watch.add_argument("--checkpoint", help="Checkpoint database (default: OUTPUT.checkpoint)")
+    watch.add_argument("--workers", "-j", type=int, default=default_workers(),
+                       help="Scoring processes (default: every available core)")
+    watch.add_argument("--chunk-size", type=int, default=8, help="Files handed to a worker at a time")
+    watch.add_argument("--settle", type=float, default=2.0,
+                       help="Seconds a file must go unmodified before it is scored")
+    watch.add_argument("--interval", type=float, default=1.0, help="Seconds between directory rescans")
+    watch.add_argument("--inotify", action=argparse.BooleanOptionalAction, default=True,
+                       help="Rescan on inotify events where available (default: on)")
+    watch.add_argument("--weights", help="JSON object of category weights")
+    watch.add_argument("--strict", action="store_true", help="Score in strict mode")
+    watch.add_argument("--detail-level", choices=DETAIL_LEVELS, default="keywords")
+    watch.add_argument("--metrics-port", type=int, help="Serve Prometheus metrics on this port")
+    watch.add_argument("--metrics-host", default="127.0.0.1", help="Address for --metrics-port")
+    watch.add_argument("--once", action="store_true", help="Exit once the files present have been scored")
+    watch.set_defaults(handler=_watch)
+
+    distribute = commands.add_parser(
+        "distribute", help="Score resume files in shards across worker hosts, ranked per JD"
+    )
+    distribute.add_argument("resumes", nargs="+", help="Resume files, directories (searched recursively) or globs")
+    distribute.add_argument("--jd", action="append", required=True,
+                            help="Job description file or directory of them (repeatable)")
+    distribute.add_argument("--format", choices=EXPORT_FORMATS, default="jsonl")
+    distribute.add_argument("--output", "-o", help="Output file (default: stdout)")
+    distribute.add_argument("--top", type=int, default=0, help="Keep only the best N resumes per JD (default: all)")
+    distribute.add_argument("--listen", type=_address, default=('127.0.0.1', 0),
+                            help="HOST:PORT shard workers connect to (default: loopback, any port)")
+    distribute.add_argument("--authkey", help="Shared secret of the coordinator and its workers "
+                            "(default: ATS_SHARD_AUTHKEY; generated for local-only runs)")
+    distribute.add_argument("--local-workers", type=int, default=0, help="Shard workers to run on this machine")
+    distribute.add_argument("--shard-size", type=int, default=64, help="Resume files per shard")
+    distribute.add_argument("--max-attempts", type=int, default=3,
+                            help="Tries per shard before its files are reported as failed")
+    distribute.add_argument("--lease-timeout", type=float, default=60.0,
+                            help="Seconds without a heartbeat before a worker's shards are reassigned")
+    distribute.add_argument("--weights", help="JSON object of category weights")
+    distribute.add_argument("--strict", action="store_true", help="Score in strict mode")
+    distribute.add_argument("--detail-level", choices=DETAIL_LEVELS, default="keywords",
+                            help="Result detail; CSV keyword columns need 'keywords' or 'full'")
+    distribute.add_argument("--progress", action=argparse.BooleanOptionalAction, default=None,
+                            help="Show progress on stderr (default: when stderr is a terminal)")
+    distribute.set_defaults(handler=_distribute)
+
+    shard_worker = commands.add_parser("shard-worker", help="Score shards for a 'distribute' coordinator")
+    shard_worker.add_argument("--connect", type=_address, required=True, help="Coordinator HOST:PORT")
+    shard_worker.add_argument("--authkey", help="Shared secret of the coordinator (default: ATS_SHARD_AUTHKEY)")
+    shard_worker.add_argument("--workers", "-j", type=int, default=default_workers(),
+                              help="Scoring processes, each taking its own shards (default: every available core)")
+    shard_worker.add_argument("--prefetch", type=int, default=2, help="Shards each process leases ahead")
+    shard_worker.set_defaults(handler=_shard_worker)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,214 @@
+"""
+Admission control and load shedding for analysis endpoints.
+
+Each worker admits a bounded number of concurrent analyses and queues a
+bounded number more; anything beyond that, or anything that would wait
+longer than the queue budget, is rejected straight away with 503. Each
+client can also be limited by a token bucket and gets 429 when it runs dry.
+Rejections carry a Retry-After derived from the measured service time.
+
+State lives on the worker's event loop and is not shared across workers.
+"""
+
+import asyncio
+import json
+import math
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Iterable, Optional, Tuple
+
+from app.metrics import REGISTRY
+
+ADMISSION_REJECTED = REGISTRY.counter(
+    "ats_admission_rejected_total", "Requests shed by admission control", ["reason"]
+)
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is shed; maps to an HTTP error with Retry-After."""
+
+    def __init__(self, status_code: int, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.status_code = status_code
+        self.reason = reason
+        self.retry_after = max(1, math.ceil(retry_after))
+
+
+class TokenBucket:
+    """Refills ``rate`` tokens per second up to ``burst``."""
+
+    def __init__(self, rate: float, burst: float, now: Optional[float] = None):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic() if now is None else now
+
+    def take(self, now: Optional[float] = None) -> float:
+        """Take one token; returns 0 on success or the seconds until one is available."""
+        now = time.monotonic() if now is None else now
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class AdmissionController:
+    """
+    Concurrency, queue and per-client rate limits for one worker.
+
+    ``rate_per_client`` of 0 disables the per-client limit. Only the most
+    recently seen ``max_clients`` buckets are kept.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 8,
+        max_queued: int = 16,
+        max_queue_wait: float = 10.0,
+        rate_per_client: float = 0.0,
+        burst_per_client: float = 10.0,
+        max_clients: int = 10000,
+        initial_service_time: float = 1.0,
+        ewma_alpha: float = 0.2
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.max_queue_wait = max_queue_wait
+        self.rate_per_client = rate_per_client
+        self.burst_per_client = burst_per_client
+        self.max_clients = max_clients
+        self.ewma_alpha = ewma_alpha
+        self.service_time = initial_service_time
+        self.in_flight = 0
+        self.queued = 0
+        self.admitted = 0
+        self.rejected: Dict[str, int] = {'rate_limited': 0, 'queue_full': 0, 'queue_timeout': 0}
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+
+    def estimated_wait(self, ahead: int) -> float:
+        """Seconds until a request with ``ahead`` requests in front of it starts."""
+        return (ahead + 1) / self.max_concurrent * self.service_time
+
+    def _reject(self, status_code: int, reason: str, retry_after: float) -> AdmissionRejected:
+        self.rejected[reason] += 1
+        ADMISSION_REJECTED.inc(reason=reason)
+        return AdmissionRejected(status_code, reason, retry_after)
+
+    def check_rate(self, client: str) -> None:
+        """Take one of the client's tokens, or raise AdmissionRejected with 429."""
+        if self.rate_per_client <= 0:
+            return
+        bucket = self._buckets.get(client)
+        if bucket is None:
+            bucket = self._buckets[client] = TokenBucket(self.rate_per_client, self.burst_per_client)
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(client)
+        wait = bucket.take()
+        if wait:
+            raise self._reject(429, 'rate_limited', wait)
+
+    @asynccontextmanager
+    async def admit(self, client: str) -> AsyncIterator[None]:
+        """Charge the client's rate and hold an analysis slot for the block, or raise AdmissionRejected."""
+        self.check_rate(client)
+        async with self.slot():
+            yield
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one analysis slot for the duration of the block, queueing for it or raising AdmissionRejected."""
+        if self._slots.locked():
+            wait = self.estimated_wait(self.queued)
+            # A request that would wait past the queue budget is shed now rather than later
+            if self.queued >= self.max_queued or wait > self.max_queue_wait:
+                raise self._reject(503, 'queue_full', wait)
+            self.queued += 1
+            try:
+                await asyncio.wait_for(self._slots.acquire(), timeout=self.max_queue_wait)
+            except asyncio.TimeoutError:
+                raise self._reject(503, 'queue_timeout', self.service_time)
+            finally:
+                self.queued -= 1
+        else:
+            await self._slots.acquire()
+
+        self.in_flight += 1
+        self.admitted += 1
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - start
+            self.service_time += self.ewma_alpha * (elapsed - self.service_time)
+            self.in_flight -= 1
+            self._slots.release()
+
+    def stats(self) -> Dict:
+        return {
+            'in_flight': self.in_flight,
+            'queued': self.queued,
+            'max_concurrent': self.max_concurrent,
+            'max_queued': self.max_queued,
+            'admitted': self.admitted,
+            'rejected': dict(self.rejected),
+            'service_time_ewma_s': round(self.service_time, 4),
+            'tracked_clients': len(self._buckets),
+        }
+
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware applying an AdmissionController to selected routes.
+
+    Requests are admitted before their body is read and hold their slot
+    until the response, including any streamed body, has been sent.
+    Requests to ``item_routes`` are only charged against the client's rate
+    here; their handler takes one slot per item it scores.
+    """
+
+    def __init__(self, app, controller: AdmissionController, routes: Iterable[Tuple[str, str]],
+                 item_routes: Iterable[Tuple[str, str]] = ()):
+        self.app = app
+        self.controller = controller
+        self.routes = set(routes)
+        self.item_routes = set(item_routes)
+
+    async def __call__(self, scope, receive, send):
+        route = (scope.get('method'), scope.get('path'))
+        if scope['type'] != 'http' or (route not in self.routes and route not in self.item_routes):
+            await self.app(scope, receive, send)
+            return
+
+        client = scope.get('client')
+        client = client[0] if client else 'unknown'
+        try:
+            if route not in self.item_routes:
+                async with self.controller.admit(client):
+                    await self.app(scope, receive, send)
+                return
+            self.controller.check_rate(client)
+        except AdmissionRejected as e:
+            await _send_rejection(send, e)
+            return
+        await self.app(scope, receive, send)
+
+
+async def _send_rejection(send, error: AdmissionRejected) -> None:
+    body = json.dumps({'detail': 'Too many requests' if error.status_code == 429 else 'Server overloaded',
+                       'reason': error.reason}).encode('utf-8')
+    await send({
+        'type': 'http.response.start',
+        'status': error.status_code,
+        'headers': [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(body)).encode('ascii')),
+            (b'retry-after', str(error.retry_after).encode('ascii')),
+        ],
+    })
+    await send({'type': 'http.response.body', 'body': body})
@@ -0,0 +1,308 @@
+"""
+Offline batch scoring of resume files against job descriptions.
+
+Resume files are parsed and scored across a process pool, without the web
+server or a store. Each file is parsed once and scored against every JD,
+and each worker extracts JD features once for the whole run. Results are
+spilled to a temporary file as files complete, so memory holds only a sort
+key per analysis however many resumes are scored; when every file is done
+they are written out ranked per JD, best first.
+"""
+
+import csv
+import glob
+import io
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.export import EXPORT_FORMATS, RESULT_COLUMNS, result_row
+from app.file_parser import parse_resume_file
+from app.scoring_engine import JobFeatures, ResumeFeatures, ScoringEngine, to_dict
+
+RESUME_EXTENSIONS = ('pdf', 'docx', 'doc', 'txt')
+
+CSV_COLUMNS = ['jd', 'rank', 'file'] + RESULT_COLUMNS + ['error']
+
+# Outcome of one resume file: its path, one result per JD or None, and the error if it failed
+ScoredFile = Tuple[str, Optional[List[Dict]], Optional[str]]
+
+# Per-process state of pool workers, set by _init_worker
+_engine: Optional[ScoringEngine] = None
+_jobs: List[JobFeatures] = []
+
+
+def _extension(path: str) -> str:
+    return os.path.splitext(path)[1].lstrip('.').lower()
+
+
+def iter_resume_paths(inputs: Iterable[str]) -> Iterator[str]:
+    """
+    Yield resume files from directories (recursively), glob patterns or file paths.
+
+    Only supported file types are yielded, each path once. Paths are
+    produced lazily, so scoring starts before a large directory is walked.
+    """
+    seen = set()
+    for spec in inputs:
+        if os.path.isdir(spec):
+            candidates = _walk(spec)
+        elif any(char in spec for char in '*?['):
+            candidates = glob.iglob(spec, recursive=True)
+        else:
+            candidates = [spec]
+        for path in candidates:
+            if _extension(path) in RESUME_EXTENSIONS and path not in seen and os.path.isfile(path):
+                seen.add(path)
+                yield path
+
+
+def _walk(directory: str) -> Iterator[str]:
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            yield os.path.join(root, name)
+
+
+def load_jds(paths: Iterable[str]) -> List[Tuple[str, str]]:
+    """Read JD files, or every supported file in a directory, as (name, text) pairs."""
+    jds = []
+    for spec in paths:
+        files = _walk(spec) if os.path.isdir(spec) else [spec]
+        for path in files:
+            if os.path.isdir(spec) and _extension(path) not in RESUME_EXTENSIONS:
+                continue
+            with open(path, 'rb') as f:
+                text = parse_resume_file(f.read(), _extension(path))
+            if not text.strip():
+                raise ValueError(f"Job description {path} is empty")
+            jds.append((path, text))
+    if not jds:
+        raise ValueError("No job descriptions found")
+    return jds
+
+
+def _init_worker(jd_texts: List[str], weights: Optional[Dict[str, float]], strict_mode: bool, detail_level: str) -> None:
+    global _engine, _jobs
+    _engine = ScoringEngine(weights=weights, strict_mode=strict_mode, detail_level=detail_level)
+    _jobs = [JobFeatures(text) for text in jd_texts]
+
+
+def _score_file(path: str, data: bytes, jobs: List[JobFeatures]) -> ScoredFile:
+    """Parse one resume file's contents and score it against ``jobs``."""
+    try:
+        text = parse_resume_file(data, _extension(path))
+        if not text.strip():
+            raise ValueError("Could not extract text from resume file")
+        resume = ResumeFeatures(text)
+        return path, [to_dict(_engine.analyze(resume, job)) for job in jobs], None
+    except Exception as e:
+        return path, None, str(e) or type(e).__name__
+
+
+def _score_paths(paths: List[str], jd_indexes: Optional[List[int]] = None) -> List[ScoredFile]:
+    """Pool task: parse and score a chunk of resume files against every JD, or those in ``jd_indexes``."""
+    jobs = _jobs if jd_indexes is None else [_jobs[index] for index in jd_indexes]
+    scored = []
+    for path in paths:
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError as e:
+            scored.append((path, None, str(e) or type(e).__name__))
+            continue
+        scored.append(_score_file(path, data, jobs))
+    return scored
+
+
+def _chunks(paths: Iterator[str], size: int) -> Iterator[List[str]]:
+    chunk = []
+    for path in paths:
+        chunk.append(path)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def score_files(
+    paths: Iterable[str],
+    jds: List[Tuple[str, str]],
+    workers: int = 1,
+    weights: Optional[Dict[str, float]] = None,
+    strict_mode: bool = False,
+    detail_level: str = 'keywords',
+    chunk_size: int = 8
+) -> Iterator[ScoredFile]:
+    """
+    Yield each file's outcome as it completes.
+
+    With ``workers`` > 1 files are scored in a process pool, in chunks of
+    ``chunk_size``, with at most two chunks per worker outstanding; paths
+    are drawn from ``paths`` only as capacity frees up.
+    """
+    initargs = ([text for _, text in jds], weights, strict_mode, detail_level)
+    chunks = _chunks(iter(paths), chunk_size)
+    if workers <= 1:
+        _init_worker(*initargs)
+        for chunk in chunks:
+            yield from _score_paths(chunk)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs) as pool:
+        pending = set()
+        exhausted = False
+        while True:
+            while not exhausted and len(pending) < workers * 2:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    exhausted = True
+                else:
+                    pending.add(pool.submit(_score_paths, chunk))
+            if not pending:
+                return
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from future.result()
+
+
+class Progress:
+    """Rate-limited progress line on a terminal stream."""
+
+    def __init__(self, stream: Optional[IO] = None, interval: float = 0.5):
+        self.stream = stream
+        self.interval = interval
+        self.started = time.monotonic()
+        self._shown = 0.0
+
+    def update(self, files: int, failed: int, force: bool = False) -> None:
+        if self.stream is None:
+            return
+        now = time.monotonic()
+        if not force and now - self._shown < self.interval:
+            return
+        self._shown = now
+        rate = files / max(now - self.started, 1e-9)
+        self.stream.write(f"\rScored {files} files ({failed} failed), {rate:.1f} files/s")
+        self.stream.flush()
+
+    def finish(self, files: int, failed: int) -> None:
+        if self.stream is not None:
+            self.update(files, failed, force=True)
+            self.stream.write("\n")
+
+
+def run_batch(
+    paths: Iterable[str],
+    jds: List[Tuple[str, str]],
+    output: IO[str],
+    export_format: str = 'jsonl',
+    top: int = 0,
+    workers: int = 1,
+    weights: Optional[Dict[str, float]] = None,
+    strict_mode: bool = False,
+    detail_level: str = 'keywords',
+    chunk_size: int = 8,
+    progress: Optional[Progress] = None
+) -> Dict:
+    """
+    Score every resume in ``paths`` against ``jds`` and write ranked results to ``output``.
+
+    Records are grouped by JD in the order given and ranked by overall
+    score, ties by file path; ``top`` > 0 keeps only that many per JD.
+    Files that failed follow as records with an ``error``. Returns a
+    summary of the run.
+    """
+    scored = score_files(paths, jds, workers, weights, strict_mode, detail_level, chunk_size)
+    return rank_results(scored, jds, output, export_format, top, progress)
+
+
+def rank_results(
+    scored: Iterable[ScoredFile],
+    jds: List[Tuple[str, str]],
+    output: IO[str],
+    export_format: str = 'jsonl',
+    top: int = 0,
+    progress: Optional[Progress] = None
+) -> Dict:
+    """Write files' outcomes to ``output`` ranked per JD, as they are written by ``run_batch``."""
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported output format: {export_format}")
+    started = time.monotonic()
+    progress = progress or Progress()
+    files = failed = 0
+    keys: List[Tuple[int, float, str, int, int]] = []
+    errors: List[Tuple[str, str]] = []
+
+    with tempfile.TemporaryFile() as spill:
+        for path, results, error in scored:
+            files += 1
+            if results is None:
+                failed += 1
+                errors.append((path, error))
+            else:
+                for jd_index, result in enumerate(results):
+                    data = json.dumps(result).encode('utf-8')
+                    keys.append((jd_index, -result['overall_score'], path, spill.tell(), len(data)))
+                    spill.write(data)
+            progress.update(files, failed)
+        progress.finish(files, failed)
+
+        keys.sort()
+        _write_ranked(output, export_format, jds, keys, errors, spill, top)
+
+    return {
+        'files': files,
+        'failed': failed,
+        'jds': len(jds),
+        'analyses': len(keys),
+        'elapsed_s': round(time.monotonic() - started, 2),
+    }
+
+
+def _write_ranked(output: IO[str], export_format: str, jds: List[Tuple[str, str]],
+                  keys: List[Tuple], errors: List[Tuple[str, str]], spill: IO[bytes], top: int) -> None:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if export_format == 'csv':
+        writer.writerow(CSV_COLUMNS)
+
+    rank, previous = 0, None
+    for jd_index, _, path, offset, length in keys:
+        rank = rank + 1 if jd_index == previous else 1
+        previous = jd_index
+        if top and rank > top:
+            continue
+        spill.seek(offset)
+        result_json = spill.read(length).decode('utf-8')
+        name = jds[jd_index][0]
+        if export_format == 'jsonl':
+            # The spilled result JSON is spliced in as-is instead of being re-parsed
+            buffer.write('{"jd": ' + json.dumps(name) + ', "rank": ' + str(rank)
+                         + ', "file": ' + json.dumps(path) + ', "result": ' + result_json + '}\n')
+        else:
+            writer.writerow([name, rank, path] + result_row(json.loads(result_json)) + [''])
+        if buffer.tell() >= 64 * 1024:
+            output.write(buffer.getvalue())
+            buffer.seek(0)
+            buffer.truncate()
+
+    for path, error in errors:
+        if export_format == 'jsonl':
+            buffer.write(json.dumps({'file': path, 'error': error}) + '\n')
+        else:
+            writer.writerow(['', '', path] + [''] * len(RESULT_COLUMNS) + [error])
+    output.write(buffer.getvalue())
+
+
+def default_workers() -> int:
+    """Every core this process may run on."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
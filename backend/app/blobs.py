@@ -0,0 +1,169 @@
+"""
+Content-addressed, compressed storage for resume and JD texts.
+
+Stored analyses reference their texts by hash instead of holding copies,
+so a job description shared by thousands of applicants is stored once.
+Blobs are compressed with a configurable codec; the codec is recorded per
+blob so it can be changed without rewriting existing data.
+"""
+
+import hashlib
+import lzma
+import threading
+import zlib
+from typing import Callable, Container, Dict, List, Tuple
+
+# Entry fields moved into blobs, and the entry key holding their hashes
+TEXT_FIELDS = ('resume_text', 'jd_text')
+BLOB_REFS = '_blobs'
+
+CODECS = ('none', 'zlib', 'lzma', 'zstd')
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError:
+        raise ValueError("The zstd codec requires zstandard. Install with: pip install zstandard")
+    return zstandard
+
+
+def check_codec(codec: str) -> str:
+    """Return ``codec`` if it is known and usable, else raise ValueError."""
+    if codec not in CODECS:
+        raise ValueError(f"Unknown text codec {codec!r}; expected one of {', '.join(CODECS)}")
+    if codec == 'zstd':
+        _zstd()
+    return codec
+
+
+def blob_hash(text: str) -> str:
+    """Hash of the exact text; unlike ``content_hash`` nothing is normalized."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def compress(text: str, codec: str) -> bytes:
+    data = text.encode('utf-8')
+    if codec == 'zlib':
+        return zlib.compress(data, 6)
+    if codec == 'lzma':
+        return lzma.compress(data, preset=6)
+    if codec == 'zstd':
+        return _zstd().ZstdCompressor(level=6).compress(data)
+    return data
+
+
+def decompress(data: bytes, codec: str) -> str:
+    if codec == 'zlib':
+        data = zlib.decompress(data)
+    elif codec == 'lzma':
+        data = lzma.decompress(data)
+    elif codec == 'zstd':
+        data = _zstd().ZstdDecompressor().decompress(data)
+    return data.decode('utf-8')
+
+
+def split_entry(entry: Dict) -> Tuple[Dict, Dict[str, str]]:
+    """
+    Separate an entry's texts from the rest of it.
+
+    Returns the entry with texts replaced by hash references, and a map
+    from each hash to its text.
+    """
+    stored = {key: value for key, value in entry.items() if key not in TEXT_FIELDS}
+    refs, texts = {}, {}
+    for field in TEXT_FIELDS:
+        if field in entry:
+            refs[field] = blob_hash(entry[field])
+            texts[refs[field]] = entry[field]
+    stored[BLOB_REFS] = refs
+    return stored, texts
+
+
+def join_entry(stored: Dict, fetch: Callable[[str], str]) -> Dict:
+    """Restore an entry's texts from its references; entries without references are returned as is."""
+    refs = stored.get(BLOB_REFS)
+    if refs is None:
+        return stored
+    entry = {key: value for key, value in stored.items() if key != BLOB_REFS}
+    for field, ref in refs.items():
+        entry[field] = fetch(ref)
+    return entry
+
+
+class BlobStore:
+    """
+    In-memory reference-counted blob store.
+
+    ``put`` and ``release`` report how many stored bytes they added or
+    freed, so callers can account blobs against their own byte budget.
+    """
+
+    def __init__(self, codec: str = 'zlib'):
+        self.codec = check_codec(codec)
+        self._blobs: Dict[str, list] = {}  # hash -> [codec, data, refs, raw size]
+        self._lock = threading.Lock()
+        self._stored_bytes = 0
+        self._raw_bytes = 0
+
+    def put(self, ref: str, text: str) -> int:
+        """Add a reference to ``text`` stored under ``ref``; returns the bytes added."""
+        with self._lock:
+            blob = self._blobs.get(ref)
+            if blob is not None:
+                blob[2] += 1
+                return 0
+        data = compress(text, self.codec)
+        raw_size = len(text.encode('utf-8'))
+        with self._lock:
+            blob = self._blobs.get(ref)
+            if blob is not None:
+                blob[2] += 1
+                return 0
+            self._blobs[ref] = [self.codec, data, 1, raw_size]
+            self._stored_bytes += len(data)
+            self._raw_bytes += raw_size
+            return len(data)
+
+    def get(self, ref: str) -> str:
+        return decompress(*self.compressed(ref))
+
+    def compressed(self, ref: str) -> Tuple[bytes, str]:
+        """The stored bytes of a blob and their codec; they stay valid after the blob is released."""
+        with self._lock:
+            codec, data = self._blobs[ref][:2]
+        return data, codec
+
+    def release(self, ref: str) -> int:
+        """Drop a reference; returns the bytes freed if it was the last."""
+        with self._lock:
+            blob = self._blobs[ref]
+            blob[2] -= 1
+            if blob[2] > 0:
+                return 0
+            del self._blobs[ref]
+            self._stored_bytes -= len(blob[1])
+            self._raw_bytes -= blob[3]
+            return len(blob[1])
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'codec': self.codec,
+                'blobs': len(self._blobs),
+                'references': sum(blob[2] for blob in self._blobs.values()),
+                'raw_bytes': self._raw_bytes,
+                'stored_bytes': self._stored_bytes,
+            }
+
+    def __len__(self) -> int:
+        return len(self._blobs)
+
+
+def sqlite_blob_rows(texts: Dict[str, str], codec: str, known: Container[str] = ()) -> List[tuple]:
+    """Rows for the ``text_blobs`` table, skipping hashes in ``known``."""
+    return [
+        (ref, codec, len(text.encode('utf-8')), compress(text, codec))
+        for ref, text in texts.items()
+        if ref not in known
+    ]
@@ -0,0 +1,457 @@
+"""
+Sharded batch scoring across hosts.
+
+A coordinator splits the resume files into shards and hands them out from
+a broker. Shard workers on any number of hosts connect to it over TCP,
+score shards and send the results back, and the coordinator writes them
+out ranked per JD exactly as ``python -m app score`` does. Only the
+coordinator needs to read the resume files: their bytes travel with the
+shard.
+
+Each worker leases a few shards ahead so it does not wait on the network
+between shards. The broker tracks the leased shards each worker has not
+started yet. When the queue runs dry, an idle worker steals the most
+recently leased of them from the worker holding the most, so the tail of
+a run is spread over every worker instead of waiting behind one.
+Workers confirm each shard before scoring it, so a stolen shard is
+skipped by the worker that leased it first.
+
+Workers heartbeat while they score. A shard goes back to the head of the
+queue when its worker reports a failure or falls silent for
+``lease_timeout`` seconds. After ``max_attempts`` tries its files are
+reported as failed. A shard finished twice, by a slow worker and by its
+replacement, is counted once.
+
+Coordination uses ``multiprocessing.managers`` over TCP, authenticated
+with an HMAC authkey. Payloads are pickled and not encrypted, so run it
+on a trusted network only. With ``local_workers`` the broker and its
+workers all run on one machine.
+"""
+
+import os
+import queue
+import socket
+import threading
+import time
+from collections import deque
+from multiprocessing import Process
+from multiprocessing.managers import BaseManager
+from typing import IO, Deque, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+import logging
+
+from app import batch
+from app.batch import Progress, ScoredFile
+from app.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+SHARDS = REGISTRY.counter(
+    "ats_cluster_shards_total", "Shards finished by the broker, and retries", ["status"]
+)
+SHARD_STEALS = REGISTRY.counter(
+    "ats_cluster_shard_steals_total", "Leased shards taken over by an idle worker"
+)
+
+# Methods shard workers may call on the broker
+BROKER_METHODS = ('register', 'lease', 'start', 'complete', 'fail', 'heartbeat')
+
+# A leased shard: its id and each file's path with its bytes, or the error reading it
+Lease = Tuple[int, List[Tuple[str, Optional[bytes], Optional[str]]]]
+
+
+class _Shard:
+    __slots__ = ('id', 'paths', 'attempts', 'done')
+
+    def __init__(self, shard_id: int, paths: List[str]):
+        self.id = shard_id
+        self.paths = paths
+        self.attempts = 0
+        self.done = False
+
+
+class _Worker:
+    __slots__ = ('id', 'leased', 'running', 'last_seen', 'alive', 'completed', 'released')
+
+    def __init__(self, worker_id: str):
+        self.id = worker_id
+        self.leased: Deque[int] = deque()
+        self.running: Set[int] = set()
+        self.last_seen = time.monotonic()
+        self.alive = True
+        self.completed = 0
+        self.released = False
+
+
+class Broker:
+    """
+    Hands out shards of resume files to workers and collects their results.
+
+    Workers call the methods in BROKER_METHODS, locally or through a
+    proxy; the coordinator consumes ``results()``.
+    """
+
+    def __init__(
+        self,
+        shards: List[List[str]],
+        jds: List[Tuple[str, str]],
+        weights: Optional[Dict[str, float]] = None,
+        strict_mode: bool = False,
+        detail_level: str = 'keywords',
+        max_attempts: int = 3,
+        lease_timeout: float = 60.0
+    ):
+        self._shards = [_Shard(shard_id, paths) for shard_id, paths in enumerate(shards)]
+        self._queue: Deque[int] = deque(range(len(shards)))
+        self._workers: Dict[str, _Worker] = {}
+        self._lock = threading.Lock()
+        self._results: queue.Queue = queue.Queue()
+        self._remaining = len(shards)
+        self._config = {
+            'jd_texts': [text for _, text in jds],
+            'weights': weights,
+            'strict_mode': strict_mode,
+            'detail_level': detail_level,
+            'heartbeat_s': lease_timeout / 4,
+        }
+        self.max_attempts = max_attempts
+        self.lease_timeout = lease_timeout
+        self.retries = self.steals = 0
+        if not self._shards:
+            self._results.put(None)
+
+    def register(self, name: str) -> Dict:
+        """Add a worker; returns its id and the scoring settings of the run."""
+        with self._lock:
+            worker_id = f"{name}#{len(self._workers) + 1}"
+            self._workers[worker_id] = _Worker(worker_id)
+        logger.info(f"Shard worker {worker_id} joined")
+        return {'worker_id': worker_id, **self._config}
+
+    def lease(self, worker_id: str, count: int) -> Optional[List[Lease]]:
+        """
+        Up to ``count`` shards for a worker, with their files' contents.
+
+        An empty list means nothing is available right now; None means
+        every shard is finished and the worker can exit.
+        """
+        with self._lock:
+            worker = self._seen(worker_id)
+            if self._remaining == 0:
+                worker.released = True
+                return None
+            self._reap()
+            shard_ids = []
+            while self._queue and len(shard_ids) < count:
+                shard_ids.append(self._queue.popleft())
+            if not shard_ids and not worker.leased:
+                stolen = self._steal(worker)
+                if stolen is not None:
+                    shard_ids.append(stolen)
+            worker.leased.extend(shard_ids)
+            work = [(shard_id, list(self._shards[shard_id].paths)) for shard_id in shard_ids]
+        # Files are read outside the lock so other workers are not held up
+        return [(shard_id, [_read(path) for path in paths]) for shard_id, paths in work]
+
+    def _steal(self, thief: _Worker) -> Optional[int]:
+        victims = [worker for worker in self._workers.values() if worker is not thief and worker.leased]
+        if not victims:
+            return None
+        victim = max(victims, key=lambda worker: len(worker.leased))
+        self.steals += 1
+        SHARD_STEALS.inc()
+        logger.debug(f"{thief.id} stole a shard from {victim.id}")
+        return victim.leased.pop()
+
+    def start(self, worker_id: str, shard_id: int) -> bool:
+        """Confirm a worker may score a shard it leased; False if it was stolen or requeued since."""
+        with self._lock:
+            worker = self._seen(worker_id)
+            if shard_id not in worker.leased:
+                return False
+            worker.leased.remove(shard_id)
+            worker.running.add(shard_id)
+            return True
+
+    def complete(self, worker_id: str, shard_id: int, scored: List[ScoredFile]) -> bool:
+        """Accept a shard's results; False if it had already been finished."""
+        with self._lock:
+            worker = self._seen(worker_id)
+            worker.running.discard(shard_id)
+            shard = self._shards[shard_id]
+            if shard.done:
+                return False
+            worker.completed += 1
+            self._finish(shard, scored)
+            SHARDS.inc(status='completed')
+            return True
+
+    def fail(self, worker_id: str, shard_id: int, error: str) -> None:
+        """Report that a worker could not score a shard; it is retried or its files fail."""
+        with self._lock:
+            worker = self._seen(worker_id)
+            # A shard taken back from a worker presumed dead has been requeued already
+            if shard_id in worker.running:
+                worker.running.discard(shard_id)
+                self._retry(self._shards[shard_id], error)
+
+    def heartbeat(self, worker_id: str) -> bool:
+        """Keep a worker's shards leased; False once every shard is finished."""
+        with self._lock:
+            self._seen(worker_id)
+            return self._remaining > 0
+
+    def _seen(self, worker_id: str) -> _Worker:
+        worker = self._workers[worker_id]
+        worker.last_seen = time.monotonic()
+        worker.alive = True
+        return worker
+
+    def _finish(self, shard: _Shard, scored: List[ScoredFile]) -> None:
+        shard.done = True
+        if shard.id in self._queue:
+            self._queue.remove(shard.id)
+        for worker in self._workers.values():
+            if shard.id in worker.leased:
+                worker.leased.remove(shard.id)
+        self._results.put(scored)
+        self._remaining -= 1
+        if self._remaining == 0:
+            self._results.put(None)
+
+    def _retry(self, shard: _Shard, error: str) -> None:
+        shard.attempts += 1
+        if shard.attempts >= self.max_attempts:
+            logger.warning(f"Shard {shard.id} failed after {shard.attempts} attempts: {error}")
+            message = f"Shard failed after {shard.attempts} attempts: {error}"
+            self._finish(shard, [(path, None, message) for path in shard.paths])
+            SHARDS.inc(status='failed')
+        else:
+            logger.info(f"Retrying shard {shard.id} (attempt {shard.attempts + 1}): {error}")
+            self._queue.appendleft(shard.id)
+            self.retries += 1
+            SHARDS.inc(status='retried')
+
+    def _reap(self) -> None:
+        """Take shards back from workers that stopped heartbeating; call with the lock held."""
+        now = time.monotonic()
+        for worker in self._workers.values():
+            if not worker.alive or now - worker.last_seen < self.lease_timeout:
+                continue
+            logger.warning(f"Shard worker {worker.id} stopped responding; requeueing its shards")
+            worker.alive = False
+            # Shards it had not started cost no attempt
+            self._queue.extendleft(reversed(worker.leased))
+            worker.leased.clear()
+            for shard_id in sorted(worker.running):
+                self._retry(self._shards[shard_id], f"worker {worker.id} stopped responding")
+            worker.running.clear()
+
+    def wait_released(self, timeout: float) -> None:
+        """Give live workers up to ``timeout`` seconds to learn every shard is finished."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self._lock:
+                if all(worker.released or not worker.alive for worker in self._workers.values()):
+                    return
+            time.sleep(0.05)
+
+    def results(self, poll: float = 1.0) -> Iterator[ScoredFile]:
+        """Yield every file's outcome as shards finish, until all of them have."""
+        while True:
+            try:
+                scored = self._results.get(timeout=poll)
+            except queue.Empty:
+                with self._lock:
+                    self._reap()
+                continue
+            if scored is None:
+                return
+            yield from scored
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'shards': len(self._shards),
+                'remaining': self._remaining,
+                'retries': self.retries,
+                'steals': self.steals,
+                'workers': {worker.id: worker.completed for worker in self._workers.values()},
+            }
+
+
+def _read(path: str) -> Tuple[str, Optional[bytes], Optional[str]]:
+    try:
+        with open(path, 'rb') as f:
+            return path, f.read(), None
+    except OSError as e:
+        return path, None, str(e) or type(e).__name__
+
+
+class BrokerServer:
+    """Serves a broker to shard workers from background threads."""
+
+    def __init__(self, broker: Broker, address: Tuple[str, int], authkey: bytes):
+
+        class Manager(BaseManager):
+            pass
+
+        Manager.register('broker', callable=lambda: broker, exposed=BROKER_METHODS)
+        self._server = Manager(address=address, authkey=authkey).get_server()
+        # Checked by the connection threads between requests
+        self._server.stop_event = threading.Event()
+        self.address: Tuple[str, int] = self._server.address
+        # Server.serve_forever would also reset sys.stdout on exit, so connections are accepted here
+        self._thread = threading.Thread(target=self._accept, daemon=True)
+        self._thread.start()
+
+    def _accept(self) -> None:
+        while True:
+            try:
+                conn = self._server.listener.accept()
+            except OSError:
+                if self._server.stop_event.is_set():
+                    return
+                continue
+            if self._server.stop_event.is_set():
+                conn.close()
+                return
+            threading.Thread(target=self._server.handle_request, args=(conn,), daemon=True).start()
+
+    def close(self) -> None:
+        """Stop accepting workers; connected ones are dropped after their next call."""
+        self._server.stop_event.set()
+        host, port = self.address
+        try:
+            # Wake the blocked accept()
+            socket.create_connection(('127.0.0.1' if host in ('', '0.0.0.0') else host, port), timeout=1).close()
+        except OSError:
+            pass
+        self._thread.join(timeout=5)
+        self._server.listener.close()
+
+
+class _BrokerClient(BaseManager):
+    pass
+
+
+_BrokerClient.register('broker')
+
+
+def connect(address: Tuple[str, int], authkey: bytes):
+    """A proxy to the broker served at ``address``."""
+    client = _BrokerClient(address=address, authkey=authkey)
+    client.connect()
+    return client.broker()
+
+
+def run_worker(address: Tuple[str, int], authkey: bytes, name: Optional[str] = None,
+               prefetch: int = 2, poll: float = 0.2) -> int:
+    """
+    Score shards from the broker at ``address`` until every shard is finished.
+
+    Keeps ``prefetch`` shards leased ahead. Returns the number of shards
+    this worker completed.
+    """
+    broker = connect(address, authkey)
+    config = broker.register(name or f"{socket.gethostname()}:{os.getpid()}")
+    worker_id = config['worker_id']
+    batch._init_worker(config['jd_texts'], config['weights'], config['strict_mode'], config['detail_level'])
+
+    finished = threading.Event()
+
+    def heartbeat():
+        while not finished.wait(config['heartbeat_s']):
+            try:
+                if not broker.heartbeat(worker_id):
+                    return
+            except (EOFError, OSError):
+                return
+
+    threading.Thread(target=heartbeat, daemon=True).start()
+    local: Deque[Lease] = deque()
+    completed = 0
+    try:
+        while True:
+            if len(local) < prefetch:
+                leased = broker.lease(worker_id, prefetch - len(local))
+                if leased is None:
+                    break
+                local.extend(leased)
+            if not local:
+                time.sleep(poll)
+                continue
+            shard_id, documents = local.popleft()
+            if not broker.start(worker_id, shard_id):
+                continue
+            try:
+                scored = [
+                    batch._score_file(path, data, batch._jobs) if error is None else (path, None, error)
+                    for path, data, error in documents
+                ]
+            except Exception as e:
+                broker.fail(worker_id, shard_id, str(e) or type(e).__name__)
+                continue
+            completed += broker.complete(worker_id, shard_id, scored)
+    except (EOFError, OSError) as e:
+        # The coordinator is gone: either the run finished or it will be restarted
+        logger.info(f"Shard worker {worker_id} lost the broker: {e!r}")
+    finally:
+        finished.set()
+    return completed
+
+
+def run_distributed(
+    paths: Iterable[str],
+    jds: List[Tuple[str, str]],
+    output: IO[str],
+    export_format: str = 'jsonl',
+    top: int = 0,
+    shard_size: int = 64,
+    address: Tuple[str, int] = ('127.0.0.1', 0),
+    authkey: Optional[bytes] = None,
+    local_workers: int = 0,
+    weights: Optional[Dict[str, float]] = None,
+    strict_mode: bool = False,
+    detail_level: str = 'keywords',
+    max_attempts: int = 3,
+    lease_timeout: float = 60.0,
+    progress: Optional[Progress] = None,
+    on_listening=None
+) -> Dict:
+    """
+    Score ``paths`` against ``jds`` on shard workers and write ranked results to ``output``.
+
+    Serves a broker at ``address`` and starts ``local_workers`` worker
+    processes on this machine; remote workers connect with
+    ``python -m app shard-worker``. ``on_listening`` is called with the
+    bound address once workers can connect. Output is the same as
+    ``run_batch`` writes; the summary adds shard, retry and steal counts.
+    """
+    shards = list(batch._chunks(iter(paths), shard_size))
+    broker = Broker(shards, jds, weights, strict_mode, detail_level, max_attempts, lease_timeout)
+    authkey = authkey or os.urandom(32)
+    server = BrokerServer(broker, address, authkey)
+    if on_listening is not None:
+        on_listening(server.address)
+    processes = [
+        Process(target=run_worker, args=(server.address, authkey, f"local-{n + 1}"), daemon=True)
+        for n in range(local_workers)
+    ]
+    for process in processes:
+        process.start()
+    finished = False
+    try:
+        summary = batch.rank_results(broker.results(), jds, output, export_format, top, progress)
+        finished = True
+    finally:
+        if finished:
+            # Workers exit on their own once they hear every shard is finished
+            broker.wait_released(timeout=5)
+        for process in processes:
+            process.join(timeout=10 if finished else 0)
+            if process.is_alive():
+                process.terminate()
+        server.close()
+    stats = broker.stats()
+    summary.update(shards=stats['shards'], retries=stats['retries'], steals=stats['steals'], workers=stats['workers'])
+    return summary
@@ -0,0 +1,213 @@
+"""
+Negotiated response compression.
+
+JSON, NDJSON and text responses are compressed with brotli (when the
+``brotli`` package is installed) or gzip, whichever the client prefers
+per its Accept-Encoding. Whole responses smaller than ``minimum_size``
+are sent as is. Streamed responses are compressed chunk by chunk and
+flushed after each one, so NDJSON records still reach the client as soon
+as they are produced.
+"""
+
+import gzip
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+from app.metrics import REGISTRY
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = ('application/json', 'application/x-ndjson', 'text/')
+
+RESPONSE_BYTES = REGISTRY.counter(
+    "ats_compressed_response_bytes_total", "Bytes of compressed responses before and after encoding",
+    ["encoding", "stage"]
+)
+
+
+def supported_encodings() -> Tuple[str, ...]:
+    """Encodings this process can produce, most preferred first."""
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Choose a content coding from an Accept-Encoding header, or None for identity."""
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(','):
+        coding, _, params = item.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[coding] = q
+
+    best, best_q = None, 0.0
+    for coding in supported_encodings():
+        q = weights.get(coding, weights.get('*', 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+class _Encoder:
+    """Incremental encoder for one response body."""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == 'br':
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def chunk(self, data: bytes) -> bytes:
+        """Compress ``data`` and flush it so it can be decoded on arrival."""
+        if self.encoding == 'br':
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b'') -> bytes:
+        if self.encoding == 'br':
+            return self._brotli.process(data) + self._brotli.finish()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_FINISH)
+
+
+def compress_body(body: bytes, encoding: str, gzip_level: int = 6, brotli_quality: int = 4) -> bytes:
+    """Compress a whole body the way the middleware does."""
+    if encoding == 'br':
+        return brotli.compress(body, quality=brotli_quality)
+    return gzip.compress(body, compresslevel=gzip_level, mtime=0)
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing compressible responses for clients that accept it."""
+
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        accept = ''
+        if_none_match = ''
+        for name, value in scope['headers']:
+            if name == b'accept-encoding':
+                accept = value.decode('latin-1')
+            elif name == b'if-none-match':
+                if_none_match = value.decode('latin-1')
+        encoding = negotiate_encoding(accept) if accept else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        state = {'start': None, 'encoder': None, 'passthrough': False}
+
+        async def send_compressed(message):
+            if message['type'] == 'http.response.start':
+                if message['status'] == 304:
+                    # Revalidating the coded representation confirms its ETag
+                    message['headers'] = _revalidated_headers(message['headers'], encoding, if_none_match)
+                    state['passthrough'] = True
+                    await send(message)
+                    return
+                state['start'] = message
+                return
+            if message['type'] != 'http.response.body' or state['passthrough']:
+                await send(message)
+                return
+
+            body = message.get('body', b'')
+            more_body = message.get('more_body', False)
+            encoder = state['encoder']
+
+            if encoder is None:
+                start = state['start']
+                if not _compressible(start['headers']) or (not more_body and len(body) < max(self.minimum_size, 1)):
+                    state['passthrough'] = True
+                    await send(start)
+                    await send(message)
+                    return
+                encoder = state['encoder'] = _Encoder(encoding, self.gzip_level, self.brotli_quality)
+                if not more_body:
+                    data = compress_body(body, encoding, self.gzip_level, self.brotli_quality)
+                    start['headers'] = _encoded_headers(start['headers'], encoding, len(data))
+                    await send(start)
+                    await send({'type': 'http.response.body', 'body': data})
+                    _count(encoding, len(body), len(data))
+                    return
+                start['headers'] = _encoded_headers(start['headers'], encoding, None)
+                await send(start)
+
+            data = encoder.chunk(body) if more_body else encoder.finish(body)
+            _count(encoding, len(body), len(data))
+            await send({'type': 'http.response.body', 'body': data, 'more_body': more_body})
+
+        await self.app(scope, receive, send_compressed)
+
+
+def _compressible(headers: List[Tuple[bytes, bytes]]) -> bool:
+    content_type = b''
+    for name, value in headers:
+        if name == b'content-encoding':
+            return False
+        if name == b'content-type':
+            content_type = value
+    content_type = content_type.decode('latin-1').lower()
+    return any(content_type.startswith(prefix) for prefix in COMPRESSIBLE_TYPES)
+
+
+def coded_etag(etag: str, encoding: str) -> str:
+    """ETag of the ``encoding``-coded representation of a body tagged ``etag``."""
+    if not etag.endswith('"'):
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def _encoded_headers(headers: List[Tuple[bytes, bytes]], encoding: str, length: Optional[int]) -> List[Tuple[bytes, bytes]]:
+    """Replace length headers and add the coding; a streamed body has no length.
+
+    A coded body is a different representation than the identity body, so
+    its ETag gets the coding appended and the two never validate each other.
+    """
+    updated = [
+        (name, coded_etag(value.decode('latin-1'), encoding).encode('latin-1') if name == b'etag' else value)
+        for name, value in headers if name not in (b'content-length', b'vary')
+    ]
+    vary = [value for name, value in headers if name == b'vary']
+    if not any(b'accept-encoding' in value.lower() for value in vary):
+        vary.append(b'Accept-Encoding')
+    updated.append((b'vary', b', '.join(vary)))
+    updated.append((b'content-encoding', encoding.encode('ascii')))
+    if length is not None:
+        updated.append((b'content-length', str(length).encode('ascii')))
+    return updated
+
+
+def _revalidated_headers(headers: List[Tuple[bytes, bytes]], encoding: str, if_none_match: str) -> List[Tuple[bytes, bytes]]:
+    """Give a 304 the coded ETag when that is the one the client sent."""
+    updated = []
+    for name, value in headers:
+        if name == b'etag':
+            coded = coded_etag(value.decode('latin-1'), encoding)
+            if coded in if_none_match:
+                value = coded.encode('latin-1')
+        updated.append((name, value))
+    return updated
+
+
+def _count(encoding: str, raw: int, encoded: int) -> None:
+    RESPONSE_BYTES.inc(raw, encoding=encoding, stage='in')
+    RESPONSE_BYTES.inc(encoded, encoding=encoding, stage='out')
@@ -21,6 +21,75 @@ class Settings(BaseSettings):
     database_url: str = os.getenv("DATABASE_URL", "sqlite:///./ats_analyzer.db")
     enable_database: bool = os.getenv("ENABLE_DATABASE", "false").lower() == "true"
     
+    # Analysis store
+    store_max_entries: int = int(os.getenv("STORE_MAX_ENTRIES", "1000"))
+    store_max_bytes: int = int(os.getenv("STORE_MAX_BYTES", str(256 * 1024 * 1024)))
+    store_ttl_seconds: float = float(os.getenv("STORE_TTL_SECONDS", "86400"))
+    # Codec for deduplicated resume/JD texts: none, zlib, lzma or zstd
+    store_text_codec: str = os.getenv("STORE_TEXT_CODEC", "zlib")
+    
+    # Memoize results of identical resume/JD/settings inputs
+    enable_result_cache: bool = os.getenv("ENABLE_RESULT_CACHE", "true").lower() == "true"
+    
+    # Resumes scored concurrently per multi-resume request
+    batch_max_in_flight: int = int(os.getenv("BATCH_MAX_IN_FLIGHT", "4"))
+    
+    # Reports
+    report_cache_max_bytes: int = int(os.getenv("REPORT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    report_batch_max: int = int(os.getenv("REPORT_BATCH_MAX", "500"))
+    # Processes rendering batch PDF reports, per worker
+    pdf_render_workers: int = int(os.getenv("PDF_RENDER_WORKERS", "2"))
+    prerender_pdf_reports: bool = os.getenv("PRERENDER_PDF_REPORTS", "false").lower() == "true"
+    
+    # Job queue
+    job_queue_path: str = os.getenv("JOB_QUEUE_PATH", "./ats_jobs.db")
+    job_workers_min: int = int(os.getenv("JOB_WORKERS_MIN", "1"))
+    job_workers_max: int = int(os.getenv("JOB_WORKERS_MAX", "4"))
+    job_idle_timeout: float = float(os.getenv("JOB_IDLE_TIMEOUT", "30"))
+    # A job still running this long after it started is presumed orphaned and requeued
+    job_lease_seconds: float = float(os.getenv("JOB_LEASE_SECONDS", "600"))
+    # Finished jobs are deleted this long after they finish; 0 keeps them
+    job_retention_seconds: float = float(os.getenv("JOB_RETENTION_SECONDS", "604800"))
+    
+    # Open requisitions for reverse (candidate-to-jobs) matching
+    requisitions_path: str = os.getenv("REQUISITIONS_PATH", "./ats_requisitions.db")
+    match_max_candidates: int = int(os.getenv("MATCH_MAX_CANDIDATES", "200"))
+    
+    # Per-JD candidate leaderboards, updated in the background as analyses are
+    # stored; they rescore from stored resumes, so they also need enable_database
+    enable_leaderboards: bool = os.getenv("ENABLE_LEADERBOARDS", "false").lower() == "true"
+    leaderboards_path: str = os.getenv("LEADERBOARDS_PATH", "./ats_leaderboards.db")
+    
+    # Admission control for analysis endpoints, per worker
+    enable_admission_control: bool = os.getenv("ENABLE_ADMISSION_CONTROL", "true").lower() == "true"
+    admission_max_concurrent: int = int(os.getenv("ADMISSION_MAX_CONCURRENT", "8"))
+    admission_max_queued: int = int(os.getenv("ADMISSION_MAX_QUEUED", "16"))
+    admission_max_queue_wait: float = float(os.getenv("ADMISSION_MAX_QUEUE_WAIT", "10"))
+    # Per-client token bucket, off by default: clients are told apart by address, so
+    # behind a proxy enable it only once FORWARDED_ALLOW_IPS names that proxy
+    client_rate_per_second: float = float(os.getenv("CLIENT_RATE_PER_SECOND", "0"))
+    client_burst: float = float(os.getenv("CLIENT_BURST", "10"))
+    
+    # Compress JSON/text responses of at least this many bytes (gzip, or brotli if installed)
+    enable_response_compression: bool = os.getenv("ENABLE_RESPONSE_COMPRESSION", "true").lower() == "true"
+    compression_min_bytes: int = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+    
+    # Threads per analysis for independent category stages; 1 runs them in
+    # sequence, which is fastest unless stages release the GIL
+    scoring_stage_workers: int = int(os.getenv("SCORING_STAGE_WORKERS", "1"))
+    
+    # Binary scoring ingress for internal services (see app/rpc.py); 0 disables it
+    rpc_host: str = os.getenv("RPC_HOST", "127.0.0.1")
+    rpc_port: int = int(os.getenv("RPC_PORT", "0"))
+    rpc_max_in_flight: int = int(os.getenv("RPC_MAX_IN_FLIGHT", "16"))
+    rpc_max_frame_bytes: int = int(os.getenv("RPC_MAX_FRAME_BYTES", str(4 * 1024 * 1024)))
+    
+    # Warm parsers, regexes and report styles before reporting ready
+    warmup_on_startup: bool = os.getenv("WARMUP_ON_STARTUP", "true").lower() == "true"
+    
+    # Admin-only features such as request profiling; disabled when empty
+    admin_token: str = os.getenv("ADMIN_TOKEN", "")
+    
     # Scoring
     default_strict_mode: bool = False
     enable_rewrite_suggestions: bool = False
@@ -0,0 +1,121 @@
+"""
+Bulk export of stored analyses as JSONL or flattened CSV.
+
+Exports stream from a store cursor, so memory use does not depend on how
+many analyses are exported.
+"""
+
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Iterator, List, Optional
+
+from app.reports import CATEGORIES_DISPLAY
+from app.store import AnalysisStore
+
+EXPORT_FORMATS = ('jsonl', 'csv')
+
+# Columns flattened from an analysis result, shared with the offline scorer
+KEYWORD_COLUMNS = ['must_have_matched', 'must_have_missing', 'nice_to_have_matched', 'nice_to_have_missing']
+RESULT_COLUMNS = (
+    ['overall_score', 'label', 'detail_level']
+    + [f"{category}_score" for category in CATEGORIES_DISPLAY]
+    + KEYWORD_COLUMNS + ['red_flags']
+)
+
+CSV_COLUMNS = ['analysis_id', 'created_at', 'jd_hash'] + RESULT_COLUMNS
+
+# Rows are buffered into chunks of roughly this size before being yielded
+_CHUNK_SIZE = 64 * 1024
+
+
+def parse_timestamp(value: Optional[str]) -> Optional[float]:
+    """Parse an ISO date or datetime into epoch seconds."""
+    if not value:
+        return None
+    return datetime.fromisoformat(value).timestamp()
+
+
+def _chunked(lines: Iterator[str]) -> Iterator[str]:
+    buffer: List[str] = []
+    size = 0
+    for line in lines:
+        buffer.append(line)
+        size += len(line)
+        if size >= _CHUNK_SIZE:
+            yield ''.join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield ''.join(buffer)
+
+
+def _iter_jsonl(rows) -> Iterator[str]:
+    for analysis_id, created_at, jd_hash, result_json in rows:
+        # The stored result JSON is spliced in as-is instead of being re-parsed
+        yield (
+            '{"analysis_id": ' + json.dumps(analysis_id)
+            + ', "created_at": ' + json.dumps(datetime.fromtimestamp(created_at).isoformat())
+            + ', "jd_hash": ' + json.dumps(jd_hash)
+            + ', "result": ' + result_json + '}\n'
+        )
+
+
+def _csv_row(analysis_id: str, created_at: float, jd_hash: str, result: dict) -> list:
+    return [analysis_id, datetime.fromtimestamp(created_at).isoformat(), jd_hash] + result_row(result)
+
+
+def result_row(result: dict) -> list:
+    """
+    Values of RESULT_COLUMNS for one analysis result.
+
+    Results scored at the 'scores' detail level have no keyword matches,
+    so their keyword columns are None rather than empty lists of terms.
+    """
+    categories = result.get('categories', {})
+    detail_level = result.get('metadata', {}).get('detail_level', 'full')
+    if detail_level == 'scores':
+        keywords = [None] * len(KEYWORD_COLUMNS)
+    else:
+        must_have = result.get('must_have', [])
+        nice_to_have = result.get('nice_to_have', [])
+        keywords = [
+            ';'.join(kw['term'] for kw in must_have if kw['matched']),
+            ';'.join(kw['term'] for kw in must_have if not kw['matched']),
+            ';'.join(kw['term'] for kw in nice_to_have if kw['matched']),
+            ';'.join(kw['term'] for kw in nice_to_have if not kw['matched']),
+        ]
+    return (
+        [result.get('overall_score'), result.get('label'), detail_level]
+        + [categories.get(category, {}).get('score') for category in CATEGORIES_DISPLAY]
+        + keywords
+        + [' | '.join(result.get('red_flags', []))]
+    )
+
+
+def _iter_csv(rows) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_COLUMNS)
+    for analysis_id, created_at, jd_hash, result_json in rows:
+        writer.writerow(_csv_row(analysis_id, created_at, jd_hash, json.loads(result_json)))
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def iter_export(
+    store: AnalysisStore,
+    export_format: str = 'jsonl',
+    since: Optional[float] = None,
+    until: Optional[float] = None,
+    jd_hash: Optional[str] = None
+) -> Iterator[str]:
+    """Yield the export of every matching analysis as text chunks."""
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {export_format}")
+
+    rows = store.iter_results(since=since, until=until, jd_hash=jd_hash)
+    lines = _iter_jsonl(rows) if export_format == 'jsonl' else _iter_csv(rows)
+    return _chunked(lines)
@@ -4,8 +4,11 @@ File parser for resume extraction from PDF, DOCX, and plain text files.
 
 import io
 import logging
+import time
 from typing import Union
 
+from app.metrics import PARSE_SECONDS
+
 logger = logging.getLogger(__name__)
 
 
@@ -19,13 +22,19 @@ def parse_resume_file(file_content: bytes, file_extension: str) -> str:
     file_extension = file_extension.lower()
     
     if file_extension == 'pdf':
-        return parse_pdf(file_content)
+        parser = parse_pdf
     elif file_extension in ['docx', 'doc']:
-        return parse_docx(file_content)
+        parser = parse_docx
     elif file_extension == 'txt':
-        return parse_text(file_content)
+        parser = parse_text
     else:
         raise ValueError(f"Unsupported file type: {file_extension}")
+    
+    start = time.perf_counter()
+    try:
+        return parser(file_content)
+    finally:
+        PARSE_SECONDS.observe(time.perf_counter() - start, file_type=file_extension)
 
 
 def parse_pdf(file_content: bytes) -> str:
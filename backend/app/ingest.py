@@ -0,0 +1,437 @@
+"""
+Watch-folder ingestion: score resumes as they are dropped into directories.
+
+Each watched directory is scored against its own job descriptions. The
+directories are rescanned whenever inotify reports a change (on Linux) and
+at least every ``interval`` seconds, which is also the fallback when
+inotify is unavailable. A file is only picked up once its size and mtime
+have held still across two scans and its last write is ``settle`` seconds
+old, so files still being copied in are not parsed half-written.
+
+Settled files are parsed and scored in a process pool, and results are
+appended to a JSONL file. A SQLite checkpoint records every file scored,
+by path, size and mtime, together with the length of the output that
+accounts for them; output is flushed to disk before the checkpoint
+commits. On restart the output is truncated back to the checkpointed
+length and files not in the checkpoint are scored again, so files are
+neither lost nor written twice. A file that changes after it was scored
+is scored again.
+"""
+
+import ctypes
+import ctypes.util
+import json
+import os
+import select
+import sqlite3
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Deque, Dict, List, Optional, Tuple
+import logging
+
+from app import batch
+from app.batch import RESUME_EXTENSIONS, ScoredFile
+from app.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    error TEXT,
+    scored_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('output_offset', 0);
+"""
+
+INGEST_FILES = REGISTRY.counter(
+    "ats_ingest_files_total", "Watched files scored and checkpointed", ["status"]
+)
+INGEST_BACKLOG = REGISTRY.gauge(
+    "ats_ingest_backlog_files", "Watched files not yet checkpointed, by state", ["state"]
+)
+INGEST_LAG = REGISTRY.histogram(
+    "ats_ingest_lag_seconds", "Time from a file's last write to its results being checkpointed",
+    buckets=(0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 3600.0)
+)
+
+# A watched directory and the indexes of the JDs its resumes are scored against
+Watch = Tuple[str, Tuple[int, ...]]
+
+# A file picked up for scoring: path, size, mtime and its JD indexes
+Item = Tuple[str, int, int, Tuple[int, ...]]
+
+# Events that may mean a new or finished file; IN_MODIFY is left out so a
+# long copy does not trigger a rescan per write
+_IN_CLOSE_WRITE, _IN_MOVED_FROM, _IN_MOVED_TO, _IN_CREATE, _IN_DELETE = 0x8, 0x40, 0x80, 0x100, 0x200
+_INOTIFY_MASK = _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+
+
+class Checkpoint:
+    """Files already scored, and how much of the output file they account for."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def scored(self) -> Dict[str, Tuple[int, int]]:
+        """Size and mtime of every file as it was when scored."""
+        return {row['path']: (row['size'], row['mtime_ns'])
+                for row in self._conn.execute("SELECT path, size, mtime_ns FROM files")}
+
+    def output_offset(self) -> int:
+        return self._conn.execute("SELECT value FROM meta WHERE key = 'output_offset'").fetchone()['value']
+
+    def commit(self, files: List[Tuple[str, int, int, Optional[str]]], output_offset: int) -> None:
+        """Record scored files (path, size, mtime, error) and the output length that includes them."""
+        now = time.time()
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO files (path, size, mtime_ns, error, scored_at) VALUES (?, ?, ?, ?, ?)",
+                [(path, size, mtime_ns, error, now) for path, size, mtime_ns, error in files]
+            )
+            self._conn.execute("UPDATE meta SET value = ? WHERE key = 'output_offset'", (output_offset,))
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class _Inotify:
+    """Wake-ups from Linux inotify on the watched directory trees."""
+
+    def __init__(self, libc: ctypes.CDLL):
+        self._libc = libc
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._watched = set()
+
+    @classmethod
+    def create(cls) -> Optional['_Inotify']:
+        """An inotify instance, or None where inotify is unavailable."""
+        if not sys.platform.startswith('linux'):
+            return None
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+            return cls(libc)
+        except (OSError, AttributeError):
+            return None
+
+    def watch(self, directory: str) -> None:
+        if directory not in self._watched:
+            if self._libc.inotify_add_watch(self.fd, os.fsencode(directory), _INOTIFY_MASK) >= 0:
+                self._watched.add(directory)
+
+    def wait(self, timeout: float) -> bool:
+        """Block until an event or ``timeout``; True if there were events."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return False
+        try:
+            while os.read(self.fd, 65536):
+                pass
+        except BlockingIOError:
+            pass
+        return True
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class Ingestor:
+    """
+    Scores resumes dropped into watched directories, checkpointing as it goes.
+
+    ``watches`` pairs each directory with the (name, text) JDs its resumes
+    are scored against. Files in nested watched directories belong to the
+    innermost one.
+    """
+
+    def __init__(
+        self,
+        watches: List[Tuple[str, List[Tuple[str, str]]]],
+        output_path: str,
+        checkpoint_path: str,
+        workers: int = 1,
+        settle: float = 2.0,
+        interval: float = 1.0,
+        weights: Optional[Dict[str, float]] = None,
+        strict_mode: bool = False,
+        detail_level: str = 'keywords',
+        chunk_size: int = 8,
+        use_inotify: bool = True
+    ):
+        self.jds: List[Tuple[str, str]] = []
+        self.watches: List[Watch] = []
+        for directory, jds in watches:
+            indexes = []
+            for jd in jds:
+                if jd not in self.jds:
+                    self.jds.append(jd)
+                indexes.append(self.jds.index(jd))
+            self.watches.append((os.path.abspath(directory), tuple(indexes)))
+        # Innermost directories first, so they claim their files
+        self.watches.sort(key=lambda watch: watch[0].count(os.sep), reverse=True)
+
+        self.workers = workers
+        self.settle = settle
+        self.interval = interval
+        self.chunk_size = chunk_size
+        self._initargs = ([text for _, text in self.jds], weights, strict_mode, detail_level)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._inline_ready = False
+        self._stop = threading.Event()
+        self._inotify = _Inotify.create() if use_inotify else None
+
+        self.checkpoint = Checkpoint(checkpoint_path)
+        self._scored = self.checkpoint.scored()
+        self._output = self._open_output(output_path, self.checkpoint.output_offset())
+
+        self._settling: Dict[str, Tuple[int, int]] = {}
+        self._ready: Deque[Item] = deque()
+        self._queued = set()
+        self._in_flight: Dict = {}
+        self.files = self.failed = 0
+
+    @staticmethod
+    def _open_output(path: str, offset: int):
+        output = open(path, 'ab')
+        size = output.seek(0, os.SEEK_END)
+        if size > offset:
+            # Records written after the last checkpoint belong to files that will be scored again
+            logger.info(f"Discarding {size - offset} uncheckpointed bytes of {path}")
+            output.truncate(offset)
+        elif size < offset:
+            logger.warning(f"{path} is shorter than checkpointed ({size} < {offset} bytes); appending")
+        return output
+
+    @property
+    def backlog(self) -> Dict[str, int]:
+        scoring = sum(len(items) for items in self._in_flight.values())
+        return {'settling': len(self._settling), 'queued': len(self._ready), 'scoring': scoring}
+
+    def _scan(self) -> List[str]:
+        """Stat every resume file under the watched directories; returns the directories seen."""
+        now = time.time()
+        seen: Dict[str, Tuple[int, int, Tuple[int, ...]]] = {}
+        directories = []
+        for root, indexes in self.watches:
+            stack = [root]
+            while stack:
+                directory = stack.pop()
+                directories.append(directory)
+                try:
+                    entries = list(os.scandir(directory))
+                except OSError:
+                    continue
+                for entry in entries:
+                    # Hidden names are temporary files of copy tools and editors
+                    if entry.name.startswith(('.', '~')):
+                        continue
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif (entry.path not in seen and entry.is_file()
+                              and os.path.splitext(entry.name)[1].lstrip('.').lower() in RESUME_EXTENSIONS):
+                            stat = entry.stat()
+                            seen[entry.path] = (stat.st_size, stat.st_mtime_ns, indexes)
+                    except OSError:
+                        continue
+
+        for path in [path for path in self._settling if path not in seen]:
+            del self._settling[path]
+        for path, (size, mtime_ns, indexes) in seen.items():
+            if path in self._queued or self._scored.get(path) == (size, mtime_ns):
+                continue
+            if self._settling.get(path) == (size, mtime_ns) and now - mtime_ns / 1e9 >= self.settle:
+                del self._settling[path]
+                self._ready.append((path, size, mtime_ns, indexes))
+                self._queued.add(path)
+            else:
+                self._settling[path] = (size, mtime_ns)
+        return directories
+
+    def _next_chunk(self) -> List[Item]:
+        """Up to ``chunk_size`` queued files scored against the same JDs."""
+        chunk = [self._ready.popleft()]
+        while self._ready and len(chunk) < self.chunk_size and self._ready[0][3] == chunk[0][3]:
+            chunk.append(self._ready.popleft())
+        return chunk
+
+    def _dispatch(self) -> None:
+        if self.workers <= 1:
+            if not self._inline_ready and self._ready:
+                batch._init_worker(*self._initargs)
+                self._inline_ready = True
+            while self._ready and not self._stop.is_set():
+                chunk = self._next_chunk()
+                self._record(chunk, batch._score_paths([item[0] for item in chunk], list(chunk[0][3])))
+            return
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers, initializer=batch._init_worker, initargs=self._initargs
+            )
+        while self._ready and len(self._in_flight) < self.workers * 2:
+            chunk = self._next_chunk()
+            future = self._pool.submit(batch._score_paths, [item[0] for item in chunk], list(chunk[0][3]))
+            self._in_flight[future] = chunk
+
+    def _collect(self, timeout: float) -> None:
+        """Checkpoint chunks that finish within ``timeout``."""
+        if not self._in_flight:
+            return
+        done, _ = wait(self._in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+        for future in done:
+            chunk = self._in_flight.pop(future)
+            try:
+                scored = future.result()
+            except BrokenProcessPool:
+                # A worker died mid-chunk; its files go back on the queue for a fresh pool
+                logger.warning(f"Scoring pool broke; requeueing {len(chunk)} files")
+                self._ready.extendleft(reversed(chunk))
+                self._reset_pool()
+                return
+            except Exception as e:
+                scored = [(item[0], None, str(e) or type(e).__name__) for item in chunk]
+            self._record(chunk, scored)
+
+    def _reset_pool(self) -> None:
+        for future, chunk in self._in_flight.items():
+            self._ready.extendleft(reversed(chunk))
+        self._in_flight.clear()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._pool = None
+
+    def _record(self, chunk: List[Item], scored: List[ScoredFile]) -> None:
+        """Append a chunk's results to the output, then checkpoint it."""
+        lines = []
+        files = []
+        for (path, size, mtime_ns, indexes), (_, results, error) in zip(chunk, scored):
+            if results is None:
+                lines.append(json.dumps({'file': path, 'error': error}))
+            else:
+                for index, result in zip(indexes, results):
+                    lines.append(json.dumps({'jd': self.jds[index][0], 'file': path, 'result': result}))
+            files.append((path, size, mtime_ns, error))
+        self._output.write(('\n'.join(lines) + '\n').encode('utf-8'))
+        self._output.flush()
+        os.fsync(self._output.fileno())
+        self.checkpoint.commit(files, self._output.tell())
+
+        now = time.time()
+        for path, size, mtime_ns, error in files:
+            self._scored[path] = (size, mtime_ns)
+            self._queued.discard(path)
+            INGEST_FILES.inc(status='failed' if error else 'scored')
+            INGEST_LAG.observe(max(0.0, now - mtime_ns / 1e9))
+        self.files += len(files)
+        self.failed += sum(1 for file in files if file[3])
+        logger.info(f"Scored {len(files)} files; backlog {sum(self.backlog.values())}")
+
+    def _update_gauges(self) -> None:
+        for state, count in self.backlog.items():
+            INGEST_BACKLOG.set(count, state=state)
+
+    def _timeout(self) -> float:
+        """How long to wait before the next scan: sooner when a settling file may be ready."""
+        timeout = self.interval
+        if self._settling:
+            now = time.time()
+            earliest = min(mtime_ns / 1e9 + self.settle for _, mtime_ns in self._settling.values())
+            timeout = min(timeout, max(earliest - now, 0.05))
+        return timeout
+
+    def step(self) -> None:
+        """Scan once and dispatch the files that have settled."""
+        directories = self._scan()
+        if self._inotify is not None:
+            for directory in directories:
+                self._inotify.watch(directory)
+        self._dispatch()
+        self._update_gauges()
+
+    def _wait(self, timeout: float) -> None:
+        """Checkpoint chunks finishing within ``timeout``, or wait that long for a change."""
+        if self._in_flight:
+            self._collect(timeout)
+        elif self._inotify is not None:
+            self._inotify.wait(timeout)
+        else:
+            self._stop.wait(timeout)
+        self._update_gauges()
+
+    def run(self, stop: Optional[threading.Event] = None, once: bool = False) -> Dict:
+        """
+        Ingest until ``stop`` is set, then finish the files already being scored.
+
+        With ``once``, return as soon as every file present has been scored.
+        Returns a summary of the files scored by this run.
+        """
+        if stop is not None:
+            self._stop = stop
+        started = time.monotonic()
+        try:
+            while not self._stop.is_set():
+                self.step()
+                if once and not (self._settling or self._ready or self._in_flight):
+                    break
+                self._wait(self._timeout())
+            while self._in_flight:
+                self._collect(None)
+        finally:
+            self.close()
+        return {'files': self.files, 'failed': self.failed, 'elapsed_s': round(time.monotonic() - started, 2)}
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+        self._pool = None
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+        if not self._output.closed:
+            self._output.close()
+        self.checkpoint.close()
+
+
+def serve_metrics(port: int, host: str = '127.0.0.1') -> ThreadingHTTPServer:
+    """Serve REGISTRY at /metrics from a background thread."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?', 1)[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = REGISTRY.render().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
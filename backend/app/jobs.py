@@ -0,0 +1,307 @@
+"""
+Asynchronous analysis job queue.
+
+Jobs are persisted in a local SQLite database so queued work survives
+restarts, and drained by an in-process worker pool that grows and shrinks
+between configured bounds based on queue depth.
+
+A claimed job holds a lease: if it is still running ``lease_seconds``
+after it started, its worker is presumed dead and the job is queued
+again. Finished jobs are deleted ``retention_seconds`` after they finish.
+"""
+
+import json
+import math
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Callable, Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    resume_file BLOB,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status_created ON jobs (status, created_at);
+"""
+
+# How often claim() also reclaims expired leases and purges old jobs
+_SWEEP_INTERVAL = 60.0
+
+
+class JobQueue:
+    """Persistent FIFO queue of analysis jobs backed by SQLite."""
+
+    def __init__(self, path: str, lease_seconds: float = 600.0, retention_seconds: float = 7 * 24 * 3600):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.retention_seconds = retention_seconds
+        self._local = threading.local()
+        self._next_sweep = 0.0
+        self._conn().executescript(_SCHEMA)
+        self.sweep()
+
+    def _conn(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def submit(self, payload: Dict, resume_file: Optional[bytes] = None) -> str:
+        """Queue a job and return its id."""
+        job_id = uuid.uuid4().hex
+        self._conn().execute(
+            "INSERT INTO jobs (id, status, payload, resume_file, created_at) VALUES (?, ?, ?, ?, ?)",
+            (job_id, JOB_QUEUED, json.dumps(payload), resume_file, time.time())
+        )
+        return job_id
+
+    def sweep(self) -> Dict[str, int]:
+        """
+        Requeue running jobs whose lease expired and delete old finished jobs.
+
+        Jobs still running in another live worker keep their lease, so
+        opening the queue in a new process never steals them. A
+        ``retention_seconds`` of 0 keeps finished jobs forever.
+        """
+        now = time.time()
+        self._next_sweep = time.monotonic() + _SWEEP_INTERVAL
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            requeued = conn.execute(
+                "UPDATE jobs SET status = ?, started_at = NULL WHERE status = ? AND started_at < ?",
+                (JOB_QUEUED, JOB_RUNNING, now - self.lease_seconds)
+            ).rowcount
+            purged = 0
+            if self.retention_seconds > 0:
+                purged = conn.execute(
+                    "DELETE FROM jobs WHERE status IN (?, ?) AND finished_at < ?",
+                    (JOB_DONE, JOB_FAILED, now - self.retention_seconds)
+                ).rowcount
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        if requeued or purged:
+            logger.info(f"Job queue sweep: {requeued} expired jobs requeued, {purged} finished jobs deleted")
+        return {'requeued': requeued, 'purged': purged}
+
+    def claim(self) -> Optional[Dict]:
+        """Atomically take the oldest queued job and mark it running."""
+        if time.monotonic() >= self._next_sweep:
+            self.sweep()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT id, payload, resume_file FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1",
+                (JOB_QUEUED,)
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = ?, started_at = ? WHERE id = ?",
+                (JOB_RUNNING, time.time(), row['id'])
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        return {
+            'id': row['id'],
+            'payload': json.loads(row['payload']),
+            'resume_file': row['resume_file']
+        }
+
+    def complete(self, job_id: str, result: Dict) -> None:
+        """Mark a job done and record its result."""
+        self._conn().execute(
+            "UPDATE jobs SET status = ?, result = ?, resume_file = NULL, finished_at = ? WHERE id = ?",
+            (JOB_DONE, json.dumps(result), time.time(), job_id)
+        )
+
+    def fail(self, job_id: str, error: str) -> None:
+        """Mark a job failed and record the error."""
+        self._conn().execute(
+            "UPDATE jobs SET status = ?, error = ?, resume_file = NULL, finished_at = ? WHERE id = ?",
+            (JOB_FAILED, error, time.time(), job_id)
+        )
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """Return the public view of a job, or None if unknown."""
+        row = self._conn().execute(
+            "SELECT id, status, result, error, created_at, started_at, finished_at FROM jobs WHERE id = ?",
+            (job_id,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        job = {
+            'job_id': row['id'],
+            'status': row['status'],
+            'created_at': datetime.fromtimestamp(row['created_at']).isoformat(),
+        }
+        if row['started_at']:
+            job['started_at'] = datetime.fromtimestamp(row['started_at']).isoformat()
+        if row['finished_at']:
+            job['finished_at'] = datetime.fromtimestamp(row['finished_at']).isoformat()
+        if row['status'] == JOB_QUEUED:
+            job['queue_position'] = self._conn().execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = ? AND created_at < ?",
+                (JOB_QUEUED, row['created_at'])
+            ).fetchone()[0]
+        if row['result']:
+            job.update(json.loads(row['result']))
+        if row['error']:
+            job['error'] = row['error']
+        return job
+
+    def depth(self) -> int:
+        """Number of jobs waiting to be claimed."""
+        return self._conn().execute(
+            "SELECT COUNT(*) FROM jobs WHERE status = ?", (JOB_QUEUED,)
+        ).fetchone()[0]
+
+
+class WorkerPool:
+    """
+    Thread pool draining a JobQueue.
+
+    The pool keeps at least ``min_workers`` threads alive and adds threads,
+    up to ``max_workers``, when more than ``jobs_per_worker`` jobs are waiting
+    per running thread. Threads above the minimum exit after ``idle_timeout``
+    seconds without work.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        handler: Callable[[Dict], Dict],
+        min_workers: int = 1,
+        max_workers: int = 4,
+        jobs_per_worker: int = 2,
+        idle_timeout: float = 30.0,
+        poll_interval: float = 0.5
+    ):
+        self.queue = queue
+        self.handler = handler
+        self.min_workers = max(0, min_workers)
+        self.max_workers = max(self.min_workers, max_workers, 1)
+        self.jobs_per_worker = max(1, jobs_per_worker)
+        self.idle_timeout = idle_timeout
+        self.poll_interval = poll_interval
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._workers = 0
+        self._busy = 0
+        self._stopping = False
+
+    @property
+    def size(self) -> int:
+        return self._workers
+
+    def start(self) -> None:
+        """Start the minimum number of workers and drain any backlog."""
+        with self._lock:
+            self._stopping = False
+            for _ in range(self.min_workers):
+                self._spawn()
+        self.notify()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Ask workers to exit once their current job finishes."""
+        deadline = time.time() + timeout
+        with self._wakeup:
+            self._stopping = True
+            self._wakeup.notify_all()
+            while self._workers and time.time() < deadline:
+                self._wakeup.wait(0.1)
+
+    def notify(self) -> None:
+        """Wake an idle worker and scale up if the queue is deep."""
+        depth = self.queue.depth()
+        with self._wakeup:
+            if self._stopping:
+                return
+            desired = min(self.max_workers, max(self.min_workers, math.ceil(depth / self.jobs_per_worker)))
+            # Busy workers cannot take new jobs, so count only the idle ones
+            idle = self._workers - self._busy
+            while self._workers < desired or (depth > 0 and idle == 0 and self._workers < self.max_workers):
+                self._spawn()
+                idle += 1
+            self._wakeup.notify_all()
+
+    def stats(self) -> Dict:
+        return {
+            'workers': self._workers,
+            'busy': self._busy,
+            'min_workers': self.min_workers,
+            'max_workers': self.max_workers,
+            'queue_depth': self.queue.depth()
+        }
+
+    def _spawn(self) -> None:
+        # Caller holds self._lock
+        self._workers += 1
+        thread = threading.Thread(target=self._run, name=f"analysis-worker-{self._workers}", daemon=True)
+        thread.start()
+
+    def _run(self) -> None:
+        idle_since = time.time()
+        try:
+            while True:
+                with self._wakeup:
+                    if self._stopping:
+                        return
+
+                job = self.queue.claim()
+                if job is None:
+                    with self._wakeup:
+                        if self._stopping:
+                            return
+                        if self._workers > self.min_workers and time.time() - idle_since > self.idle_timeout:
+                            return
+                        self._wakeup.wait(self.poll_interval)
+                    continue
+
+                with self._wakeup:
+                    self._busy += 1
+                try:
+                    self.queue.complete(job['id'], self.handler(job))
+                except Exception as e:
+                    logger.error(f"Job {job['id']} failed: {str(e)}")
+                    self.queue.fail(job['id'], str(e))
+                finally:
+                    with self._wakeup:
+                        self._busy -= 1
+                idle_since = time.time()
+        finally:
+            with self._wakeup:
+                self._workers -= 1
+                self._wakeup.notify_all()
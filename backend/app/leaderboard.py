@@ -0,0 +1,380 @@
+"""
+Live candidate leaderboards, one per job description.
+
+Every stored analysis adds its resume to the leaderboard of its JD. A
+leaderboard ranks under its own scoring settings (default weights unless
+configured), so analyses run with other settings are rescored for it.
+A board holds one entry per distinct resume: re-analysing a resume
+replaces its entry with the latest analysis. Each worker keeps every
+leaderboard it has served as a sorted list of ``(-score, analysis_id)``
+keys, so rank lookups and score-range bounds are bisections and a top-N
+page is a slice. Entries are persisted in
+SQLite, and each worker applies only the rows added since it last looked.
+Resume texts are not copied: rescoring reads them back from the analysis
+store, and entries whose analysis is gone are dropped.
+
+Scores are recomputed only when a leaderboard's settings change, or when
+the engine or taxonomy version differs from the one it was scored with;
+reading a stale leaderboard recomputes it first.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import logging
+
+from app.blobs import blob_hash
+from app.metrics import REGISTRY, timed_stage
+from app.scoring_engine import ENGINE_VERSION, TAXONOMY_VERSION, JobFeatures, ScoringEngine
+from app.store import AnalysisStore, content_hash
+
+logger = logging.getLogger(__name__)
+
+# What a leaderboard's scores depend on besides its JD and settings
+SCORING_VERSION = f"{ENGINE_VERSION}+{TAXONOMY_VERSION}"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS boards (
+    jd_hash TEXT PRIMARY KEY,
+    jd_text TEXT NOT NULL,
+    weights TEXT NOT NULL,
+    strict_mode INTEGER NOT NULL,
+    version TEXT NOT NULL,
+    generation INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS entries (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    jd_hash TEXT NOT NULL,
+    analysis_id TEXT NOT NULL,
+    score REAL NOT NULL,
+    label TEXT NOT NULL,
+    resume_hash TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    UNIQUE (jd_hash, resume_hash)
+);
+CREATE INDEX IF NOT EXISTS idx_entries_board ON entries (jd_hash, seq);
+"""
+
+LEADERBOARD_RECOMPUTES = REGISTRY.counter(
+    "ats_leaderboard_recomputes_total", "Leaderboards rescored after a settings or version change", ["reason"]
+)
+
+
+class Leaderboard:
+    """
+    In-memory ranking of one JD's applicants, best first.
+
+    Inserting into the sorted key list shifts its tail, which is linear in
+    the board size, but only moves pointers and stays in the microseconds
+    for boards of tens of thousands of applicants; reads are bisections.
+    """
+
+    def __init__(self, jd_hash: str, generation: int):
+        self.jd_hash = jd_hash
+        self.generation = generation
+        self.last_seq = 0
+        self._keys: List[Tuple[float, str]] = []
+        self._entries: Dict[str, Tuple[float, str, float, str]] = {}  # analysis_id -> (score, label, created_at, resume_hash)
+        self._resumes: Dict[str, str] = {}  # resume_hash -> analysis_id
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, resume_hash: str, analysis_id: str, score: float, label: str, created_at: float) -> None:
+        """Insert or move a resume's entry, replacing its earlier analysis."""
+        previous_id = self._resumes.get(resume_hash)
+        if previous_id is not None:
+            previous = self._entries.pop(previous_id)
+            del self._keys[bisect_left(self._keys, (-previous[0], previous_id))]
+        self._resumes[resume_hash] = analysis_id
+        self._entries[analysis_id] = (score, label, created_at, resume_hash)
+        insort(self._keys, (-score, analysis_id))
+
+    def _entry(self, index: int) -> Dict:
+        analysis_id = self._keys[index][1]
+        score, label, created_at, _ = self._entries[analysis_id]
+        return {
+            'rank': index + 1,
+            'analysis_id': analysis_id,
+            'overall_score': score,
+            'label': label,
+            'created_at': datetime.fromtimestamp(created_at).isoformat(),
+        }
+
+    def page(self, offset: int = 0, limit: int = 50) -> List[Dict]:
+        """Entries ranked ``offset + 1`` to ``offset + limit``."""
+        return [self._entry(index) for index in range(offset, min(offset + limit, len(self._keys)))]
+
+    def rank(self, analysis_id: str) -> Optional[Dict]:
+        """The entry for ``analysis_id`` with its rank, or None if it is not on the board."""
+        entry = self._entries.get(analysis_id)
+        if entry is None:
+            return None
+        return self._entry(bisect_left(self._keys, (-entry[0], analysis_id)))
+
+    def score_range(self, min_score: Optional[float], max_score: Optional[float]) -> Tuple[int, int]:
+        """Index bounds of the entries scoring within ``[min_score, max_score]``."""
+        low = 0 if max_score is None else bisect_left(self._keys, (-max_score, ''))
+        high = len(self._keys) if min_score is None else bisect_right(self._keys, (-min_score, '\U0010ffff'))
+        return low, max(low, high)
+
+    def range_page(self, min_score: Optional[float], max_score: Optional[float],
+                   offset: int = 0, limit: int = 50) -> Tuple[List[Dict], int]:
+        """One page of the entries within a score range, and how many there are in total."""
+        low, high = self.score_range(min_score, max_score)
+        start = low + offset
+        return [self._entry(index) for index in range(start, min(start + limit, high))], high - low
+
+
+class LeaderboardStore:
+    """SQLite-backed leaderboards with per-worker in-memory rankings."""
+
+    def __init__(self, path: str, analyses: AnalysisStore):
+        self.path = path
+        self.analyses = analyses
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._boards: Dict[str, Leaderboard] = {}
+        self._conn().executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _board_row(self, jd_hash: str) -> Optional[sqlite3.Row]:
+        return self._conn().execute(
+            "SELECT jd_hash, jd_text, weights, strict_mode, version, generation FROM boards WHERE jd_hash = ?",
+            (jd_hash,)
+        ).fetchone()
+
+    def _ensure_board(self, conn: sqlite3.Connection, jd_hash: str, jd_text: str) -> sqlite3.Row:
+        conn.execute(
+            "INSERT OR IGNORE INTO boards (jd_hash, jd_text, weights, strict_mode, version) VALUES (?, ?, ?, 0, ?)",
+            (jd_hash, jd_text, json.dumps(ScoringEngine._default_weights()), SCORING_VERSION)
+        )
+        return self._board_row(jd_hash)
+
+    @staticmethod
+    def _engine(board: sqlite3.Row) -> ScoringEngine:
+        return ScoringEngine(json.loads(board['weights']), bool(board['strict_mode']), detail_level='scores')
+
+    def record(self, analysis_id: str, jd_text: str, resume_text: str, result: Dict,
+               weights: Dict[str, float], strict_mode: bool) -> Dict:
+        """
+        Add a stored analysis to its JD's leaderboard, replacing any earlier analysis of the same resume.
+
+        The analysis score is used as is when it was computed with the
+        board's settings; otherwise the resume is rescored for the board.
+        Returns the board's id and the score it was ranked with.
+        """
+        jd_hash = content_hash(jd_text)
+        conn = self._conn()
+        board = self._board_row(jd_hash)
+        if board is None:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                board = self._ensure_board(conn, jd_hash, jd_text)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+        board_weights = json.loads(board['weights'])
+        if board_weights == weights and bool(board['strict_mode']) == strict_mode:
+            score, label = result['overall_score'], result['label']
+        else:
+            with timed_stage('leaderboard_rescore'):
+                rescored = self._engine(board).analyze(resume_text, board['jd_text'])
+            score, label = rescored.overall_score, rescored.label
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (jd_hash, analysis_id, score, label, resume_hash, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (jd_hash, analysis_id, score, label, blob_hash(resume_text), time.time())
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return {'jd_hash': jd_hash, 'overall_score': score}
+
+    def configure(self, jd_hash: str, weights: Optional[Dict[str, float]] = None,
+                  strict_mode: bool = False) -> Optional[Dict]:
+        """Change a leaderboard's scoring settings and rescore it; None if there is no such board."""
+        weights = ScoringEngine(weights).weights
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            updated = conn.execute(
+                "UPDATE boards SET weights = ?, strict_mode = ? WHERE jd_hash = ?",
+                (json.dumps(weights), int(strict_mode), jd_hash)
+            ).rowcount
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        if not updated:
+            return None
+        self.recompute(jd_hash, reason='settings')
+        return self.info(jd_hash)
+
+    def rebase(self, old_jd_text: str, new_jd_text: str) -> Optional[Dict]:
+        """
+        Carry a leaderboard over to a revised JD, rescoring every entry against it.
+
+        The new board keeps the old board's settings. Returns the new
+        board's info, or None if the old JD had no leaderboard.
+        """
+        old_hash, new_hash = content_hash(old_jd_text), content_hash(new_jd_text)
+        old = self._board_row(old_hash)
+        if old is None or old_hash == new_hash:
+            return None
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO boards (jd_hash, jd_text, weights, strict_mode, version, generation) "
+                "VALUES (?, ?, ?, ?, '', COALESCE((SELECT generation FROM boards WHERE jd_hash = ?), 0) + 1)",
+                (new_hash, new_jd_text, old['weights'], old['strict_mode'], new_hash)
+            )
+            conn.execute(
+                "INSERT OR IGNORE INTO entries (jd_hash, analysis_id, score, label, resume_hash, created_at) "
+                "SELECT ?, analysis_id, score, label, resume_hash, created_at FROM entries WHERE jd_hash = ?",
+                (new_hash, old_hash)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        self.recompute(new_hash, reason='jd')
+        return self.info(new_hash)
+
+    def _resume_text(self, analysis_id: str) -> Optional[str]:
+        """The resume of a stored analysis, or None once the analysis is gone."""
+        try:
+            entry = self.analyses.get(analysis_id)
+        except KeyError:
+            return None
+        return entry.get('resume_text') if entry is not None else None
+
+    def recompute(self, jd_hash: str, reason: str = 'version') -> None:
+        """Rescore every entry of a leaderboard with its settings and the current engine."""
+        board = self._board_row(jd_hash)
+        if board is None:
+            return
+        conn = self._conn()
+        engine = self._engine(board)
+        job = JobFeatures(board['jd_text'])
+        rows = conn.execute("SELECT analysis_id FROM entries WHERE jd_hash = ?", (jd_hash,)).fetchall()
+        with timed_stage('leaderboard_recompute'):
+            scores, gone = [], []
+            for row in rows:
+                resume_text = self._resume_text(row['analysis_id'])
+                if resume_text is None:
+                    gone.append((jd_hash, row['analysis_id']))
+                    continue
+                result = engine.analyze(resume_text, job)
+                scores.append((result.overall_score, result.label, jd_hash, row['analysis_id']))
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany("UPDATE entries SET score = ?, label = ? WHERE jd_hash = ? AND analysis_id = ?", scores)
+            conn.executemany("DELETE FROM entries WHERE jd_hash = ? AND analysis_id = ?", gone)
+            conn.execute(
+                "UPDATE boards SET version = ?, generation = generation + 1 WHERE jd_hash = ?",
+                (SCORING_VERSION, jd_hash)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        LEADERBOARD_RECOMPUTES.inc(reason=reason)
+        logger.info(f"Leaderboard {jd_hash[:12]} rescored: {len(scores)} entries, {len(gone)} dropped ({reason})")
+
+    def _sync(self, jd_hash: str) -> Optional[Leaderboard]:
+        """
+        Bring this worker's ranking of a JD up to date; call with the lock held.
+
+        A board scored with another engine or taxonomy version is rescored
+        first; otherwise only entries added since the last sync are read.
+        """
+        row = self._board_row(jd_hash)
+        if row is None:
+            return None
+        if row['version'] != SCORING_VERSION:
+            self.recompute(jd_hash)
+            row = self._board_row(jd_hash)
+
+        board = self._boards.get(jd_hash)
+        if board is None or board.generation != row['generation']:
+            board = self._boards[jd_hash] = Leaderboard(jd_hash, row['generation'])
+        rows = self._conn().execute(
+            "SELECT seq, analysis_id, score, label, resume_hash, created_at FROM entries "
+            "WHERE jd_hash = ? AND seq > ? ORDER BY seq", (jd_hash, board.last_seq)
+        ).fetchall()
+        for entry in rows:
+            board.add(entry['resume_hash'], entry['analysis_id'], entry['score'], entry['label'], entry['created_at'])
+        if rows:
+            board.last_seq = rows[-1]['seq']
+        return board
+
+    def page(self, jd_hash: str, offset: int = 0, limit: int = 50,
+             min_score: Optional[float] = None, max_score: Optional[float] = None) -> Optional[Dict]:
+        """One page of a JD's ranking, optionally within a score range; None if it has no board."""
+        with self._lock:
+            board = self._sync(jd_hash)
+            if board is None:
+                return None
+            if min_score is None and max_score is None:
+                entries, total = board.page(offset, limit), len(board)
+            else:
+                entries, total = board.range_page(min_score, max_score, offset, limit)
+            size = len(board)
+        return {
+            'jd_hash': jd_hash,
+            'size': size,
+            'total': total,
+            'entries': entries,
+            'next_offset': offset + limit if offset + limit < total else None,
+        }
+
+    def rank(self, jd_hash: str, analysis_id: str) -> Optional[Dict]:
+        """An analysis's rank on a JD's board, or None if either is unknown."""
+        with self._lock:
+            board = self._sync(jd_hash)
+            if board is None:
+                return None
+            entry = board.rank(analysis_id)
+            if entry is not None:
+                entry['size'] = len(board)
+        return entry
+
+    def info(self, jd_hash: str) -> Optional[Dict]:
+        row = self._board_row(jd_hash)
+        if row is None:
+            return None
+        return {
+            'jd_hash': jd_hash,
+            'weights': json.loads(row['weights']),
+            'strict_mode': bool(row['strict_mode']),
+            'version': row['version'],
+        }
+
+    def close(self) -> None:
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
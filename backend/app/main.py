@@ -2,19 +2,42 @@
 FastAPI application for ATS Resume Match Analyzer
 """
 
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi import FastAPI, UploadFile, File, Form, Header, HTTPException, Request, BackgroundTasks
+from fastapi.responses import JSONResponse, StreamingResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import Optional, Dict, List
+from pydantic import BaseModel, ValidationError
+from typing import Optional, Dict, List, Literal, Tuple
+import asyncio
+import contextlib
+import hmac
+import time
+import uuid
 import tempfile
+import threading
 import os
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import logging
 
-from app.scoring_engine import ScoringEngine, to_dict
+from app.scoring_engine import EXPLAIN_PARTS, ScoringEngine, SectionIndex, SectionSegmenter, to_dict
 from app.file_parser import parse_resume_file, parse_text
+from app.config import settings as config
+from app.store import AnalysisEvictedError, content_hash, create_store
+from app.memo import ResultCache, analysis_key
+from app.report_cache import ReportCache, report_etag, report_last_modified, etag_matches, not_modified_since
+from app.reports import iter_html_report, iter_markdown_report, render_markdown_report
+from app.metrics import REGISTRY, STAGE_SECONDS, RequestMetricsMiddleware, timed_stage
+from app.export import EXPORT_FORMATS, iter_export, parse_timestamp
+from app.jobs import JobQueue, WorkerPool, JOB_DONE, JOB_FAILED
+from app.requisitions import RequisitionRegistry
+from app.leaderboard import LeaderboardStore
+from app.profiling import profile_call
+from app import warmup
+from app.admission import AdmissionController, AdmissionMiddleware, AdmissionRejected
+from app.compression import CompressionMiddleware, coded_etag, supported_encodings
+from app.projection import FieldTree, narrower_detail_level, parse_fields, project
+from app.rpc import RPCError, RPCServer
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -27,6 +50,23 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Shed excess analysis load; added before CORS so rejections still carry CORS headers
+admission = AdmissionController(
+    max_concurrent=config.admission_max_concurrent,
+    max_queued=config.admission_max_queued,
+    max_queue_wait=config.admission_max_queue_wait,
+    rate_per_client=config.client_rate_per_second,
+    burst_per_client=config.client_burst
+)
+if config.enable_admission_control:
+    app.add_middleware(
+        AdmissionMiddleware,
+        controller=admission,
+        routes=[("POST", "/api/analyze"), ("POST", "/api/match/jobs")],
+        # A batch takes one slot per resume as it is scored, see _analyze_batch_item
+        item_routes=[("POST", "/api/analyze/batch")]
+    )
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -36,9 +76,60 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Global state for storing analyses (in-memory, stateless by default)
-# Can be extended with SQLite for persistence
-analyses = {}
+# Compress large JSON and text responses for clients that accept gzip/brotli
+if config.enable_response_compression:
+    app.add_middleware(CompressionMiddleware, minimum_size=config.compression_min_bytes)
+
+# Request metrics; outermost, so the time includes every other middleware
+app.add_middleware(RequestMetricsMiddleware)
+
+# Global state for storing analyses (bounded in-memory store by default)
+analyses = create_store(config)
+result_cache = ResultCache(analyses, enabled=config.enable_result_cache)
+
+# Rendered report bytes, keyed by analysis id, format and version
+report_cache = ReportCache(max_bytes=config.report_cache_max_bytes)
+
+# Async job queue and its worker pool, created on the first submit (or on
+# startup when a queue database already exists)
+job_queue: Optional[JobQueue] = None
+worker_pool: Optional[WorkerPool] = None
+_jobs_lock = threading.RLock()
+JOB_EVENT_POLL_INTERVAL = 0.5
+
+# Open requisitions, opened on first use
+requisitions: Optional[RequisitionRegistry] = None
+
+# Per-JD candidate leaderboards, opened on first use
+leaderboards: Optional[LeaderboardStore] = None
+# One thread records analyses on leaderboards, in order, after the response is built
+leaderboard_updates = ThreadPoolExecutor(max_workers=1, thread_name_prefix='leaderboard')
+
+# Binary scoring ingress, started on startup when RPC_PORT is set
+rpc_server: Optional[RPCServer] = None
+
+
+def _store_gauges() -> Dict:
+    stats = analyses.stats()
+    gauges = {('entries',): stats['entries']}
+    if 'bytes' in stats:
+        gauges[('bytes',)] = stats['bytes']
+    return gauges
+
+
+REGISTRY.gauge("ats_store_size", "Analysis store size", ["unit"], callback=_store_gauges)
+REGISTRY.gauge(
+    "ats_report_cache_bytes", "Rendered report cache size in bytes",
+    callback=lambda: {(): report_cache.stats()['bytes']}
+)
+REGISTRY.gauge(
+    "ats_admission_requests", "Analysis requests admitted and running or queued", ["state"],
+    callback=lambda: {('in_flight',): admission.in_flight, ('queued',): admission.queued}
+)
+REGISTRY.gauge(
+    "ats_job_queue_depth", "Queued analysis jobs",
+    callback=lambda: {(): job_queue.depth()} if job_queue is not None else {}
+)
 
 
 class AnalysisSettings(BaseModel):
@@ -47,6 +138,13 @@ class AnalysisSettings(BaseModel):
     weights: Optional[Dict[str, float]] = None
     toggle_synonyms: bool = True
     toggle_rewrite_suggestions: bool = False
+    use_cache: bool = True
+    detail_level: Literal['scores', 'keywords', 'full'] = 'full'
+
+
+class ReportBatchRequest(BaseModel):
+    """Request body for batch report downloads."""
+    analysis_ids: List[str]
 
 
 class AnalysisRequest(BaseModel):
@@ -56,22 +154,44 @@ class AnalysisRequest(BaseModel):
     settings: Optional[AnalysisSettings] = None
 
 
+class LeaderboardSettingsRequest(BaseModel):
+    """Scoring settings a leaderboard ranks under."""
+    weights: Optional[Dict[str, float]] = None
+    strict_mode: bool = False
+
+
+class RequisitionRequest(BaseModel):
+    """Request body for creating or replacing a requisition."""
+    jd_text: str
+    title: Optional[str] = None
+    req_id: Optional[str] = None
+
+
 @app.get("/api/health")
 async def health_check():
-    """Health check endpoint."""
-    return {
-        "status": "healthy",
+    """Health check endpoint; returns 503 until the process has warmed up."""
+    ready = warmup.is_ready() or not config.warmup_on_startup
+    body = {
+        "status": "healthy" if ready else "starting",
+        "ready": ready,
         "timestamp": datetime.now().isoformat(),
         "version": "1.0.0"
     }
+    if warmup.is_ready():
+        body["warmup_ms"] = round(sum(warmup.timings().values()), 1)
+    return JSONResponse(body, status_code=200 if ready else 503)
 
 
 @app.post("/api/analyze")
 async def analyze(
+    background_tasks: BackgroundTasks,
     jd_text: str = Form(...),
     resume_text: Optional[str] = Form(None),
     resume_file: Optional[UploadFile] = File(None),
-    settings: Optional[str] = Form(None)
+    settings: Optional[str] = Form(None),
+    fields: Optional[str] = Form(None),
+    profile: bool = Form(False),
+    x_admin_token: Optional[str] = Header(None)
 ):
     """
     Analyze resume against job description.
@@ -85,68 +205,49 @@ async def analyze(
     
     Optional:
     - settings: JSON string with analysis settings
+    - fields: Comma-separated result fields to return, e.g.
+      ``overall_score,label,categories.*.score``; parts that are not
+      requested are not computed
+    - profile: Run under the profiler and include a ``profile`` breakdown
+      in the response (requires the X-Admin-Token header)
     """
     
     try:
+        if profile:
+            _require_admin(x_admin_token)
+        
         # Parse JD text
         if not jd_text or not jd_text.strip():
             raise HTTPException(status_code=400, detail="Job description is required")
         
+        projection = _parse_projection(fields)
+        analysis_settings = _project_settings(_parse_settings(settings), projection)
+        
         # Get resume text
         if resume_text:
-            parsed_resume = resume_text.strip()
+            run, args = _run_analysis, (resume_text.strip(), jd_text, analysis_settings)
         elif resume_file:
             # Parse uploaded file
-            file_content = await resume_file.read()
+            with timed_stage('upload_read'):
+                file_content = await resume_file.read()
             file_extension = resume_file.filename.split('.')[-1].lower()
-            parsed_resume = parse_resume_file(file_content, file_extension)
+            run, args = _parse_and_run, (file_content, file_extension, jd_text, analysis_settings)
         else:
             raise HTTPException(
                 status_code=400,
                 detail="Either resume_text or resume_file is required"
             )
         
-        if not parsed_resume or not parsed_resume.strip():
-            raise HTTPException(
-                status_code=400,
-                detail="Could not extract text from resume file"
-            )
-        
-        # Parse settings
-        analysis_settings = AnalysisSettings()
-        if settings:
-            try:
-                settings_dict = json.loads(settings)
-                analysis_settings = AnalysisSettings(**settings_dict)
-            except json.JSONDecodeError:
-                logger.warning("Invalid settings JSON, using defaults")
+        if profile:
+            run, args = _run_profiled, (run,) + args
+        # Scoring runs off the event loop so admission control keeps admitting and shedding meanwhile
+        response = await asyncio.get_running_loop().run_in_executor(None, run, *args)
+        if config.prerender_pdf_reports:
+            background_tasks.add_task(_prerender_pdf, response['analysis_id'])
         
-        # Create scoring engine
-        engine = ScoringEngine(
-            weights=analysis_settings.weights,
-            strict_mode=analysis_settings.strict_mode
-        )
-        
-        # Run analysis
-        result = engine.analyze(parsed_resume, jd_text)
-        
-        # Convert to dictionary for JSON response
-        result_dict = to_dict(result)
-        
-        # Store analysis (in-memory, can be extended to database)
-        analysis_id = datetime.now().isoformat().replace(":", "-")
-        analyses[analysis_id] = {
-            'result': result_dict,
-            'resume_text': parsed_resume,
-            'jd_text': jd_text,
-            'settings': analysis_settings.dict(),
-            'created_at': datetime.now().isoformat()
-        }
-        
-        return {
-            'analysis_id': analysis_id,
-            'result': result_dict
-        }
+        response['result'] = project(response['result'], projection)
+        # The result is plain JSON data; skip FastAPI's generic encoder
+        return JSONResponse(response)
     
     except HTTPException:
         raise
@@ -155,67 +256,537 @@ async def analyze(
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
 
+@app.post("/api/analyze/batch")
+async def analyze_batch(
+    jd_text: str = Form(...),
+    resume_files: List[UploadFile] = File([]),
+    resume_texts: List[str] = Form([]),
+    settings: Optional[str] = Form(None),
+    stream: bool = Form(False),
+    fields: Optional[str] = Form(None),
+    profile: bool = Form(False),
+    x_admin_token: Optional[str] = Header(None)
+):
+    """
+    Analyze several resumes against one job description.
+    
+    Resumes may be given as files, texts, or both. With ``stream=true`` the
+    response is newline-delimited JSON: one record per resume, emitted as
+    soon as it is scored (in completion order), then a summary record.
+    Otherwise all records are returned together once the batch finishes.
+    With ``profile=true`` (admin only) each record carries its own profile.
+    ``fields`` projects each record's result as for /api/analyze.
+    """
+    
+    if profile:
+        _require_admin(x_admin_token)
+    
+    if not jd_text or not jd_text.strip():
+        raise HTTPException(status_code=400, detail="Job description is required")
+    
+    items = [('file', upload) for upload in resume_files]
+    items += [('text', text) for text in resume_texts]
+    if not items:
+        raise HTTPException(
+            status_code=400,
+            detail="At least one of resume_files or resume_texts is required"
+        )
+    
+    projection = _parse_projection(fields)
+    analysis_settings = _project_settings(_parse_settings(settings), projection)
+    records = _iter_batch_records(items, jd_text, analysis_settings, profile, projection)
+    
+    if stream:
+        async def ndjson():
+            async for record in records:
+                yield json.dumps(record) + "\n"
+        
+        return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+    
+    results = [record async for record in records]
+    return JSONResponse({
+        'results': results[:-1],
+        'summary': results[-1]
+    })
+
+
+@app.post("/api/jobs", status_code=202)
+async def submit_job(
+    jd_text: str = Form(...),
+    resume_text: Optional[str] = Form(None),
+    resume_file: Optional[UploadFile] = File(None),
+    settings: Optional[str] = Form(None)
+):
+    """
+    Queue an analysis and return its job id immediately.
+    
+    Takes the same fields as /api/analyze. Poll /api/jobs/{job_id} or
+    subscribe to /api/jobs/{job_id}/events for the result.
+    """
+    
+    if not jd_text or not jd_text.strip():
+        raise HTTPException(status_code=400, detail="Job description is required")
+    
+    payload = {
+        'jd_text': jd_text,
+        'settings': _parse_settings(settings).dict()
+    }
+    file_content = None
+    
+    if resume_text:
+        payload['resume_text'] = resume_text.strip()
+    elif resume_file:
+        with timed_stage('upload_read'):
+            file_content = await resume_file.read()
+        payload['file_extension'] = resume_file.filename.split('.')[-1].lower()
+    else:
+        raise HTTPException(
+            status_code=400,
+            detail="Either resume_text or resume_file is required"
+        )
+    
+    # The queue write holds SQLite's write lock; keep it off the event loop
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, _submit_job, payload, file_content)
+
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Get the status of a queued analysis, including its result when done."""
+    
+    loop = asyncio.get_running_loop()
+    job = await loop.run_in_executor(None, _find_job, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return job
+
+
+@app.get("/api/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    """
+    Stream job status changes as server-sent events until the job finishes.
+    
+    A job deleted while subscribed (e.g. by the retention sweep) ends the
+    stream with a ``gone`` event.
+    """
+    
+    loop = asyncio.get_running_loop()
+    if await loop.run_in_executor(None, _find_job, job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    async def event_stream():
+        last_status = None
+        while True:
+            job = await loop.run_in_executor(None, _find_job, job_id)
+            if job is None:
+                yield f"event: gone\ndata: {json.dumps({'job_id': job_id})}\n\n"
+                return
+            if job['status'] != last_status:
+                last_status = job['status']
+                yield f"event: {last_status}\ndata: {json.dumps(job)}\n\n"
+            if last_status in (JOB_DONE, JOB_FAILED):
+                return
+            await asyncio.sleep(JOB_EVENT_POLL_INTERVAL)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={'Cache-Control': 'no-cache'}
+    )
+
+
+@app.post("/api/requisitions", status_code=201)
+async def put_requisition(request: RequisitionRequest):
+    """Register an open requisition, replacing any with the same ``req_id``."""
+    if not request.jd_text.strip():
+        raise HTTPException(status_code=400, detail="Job description is required")
+    
+    def put() -> Tuple[Optional[Dict], Dict]:
+        previous = _get_requisitions().get(request.req_id) if request.req_id else None
+        return previous, _get_requisitions().put(request.jd_text, request.title, request.req_id)
+    
+    # Registering compiles the JD's features and writes SQLite; keep both off the event loop
+    loop = asyncio.get_running_loop()
+    previous, requisition = await loop.run_in_executor(None, put)
+    if _leaderboards_enabled() and previous is not None and previous['jd_text'] != request.jd_text:
+        # Rescore the applicants ranked for the old JD against the revised one
+        leaderboard_updates.submit(_rebase_leaderboard, previous['jd_text'], request.jd_text)
+    return {key: requisition[key] for key in ('req_id', 'title', 'features', 'updated_at')}
+
+
+@app.get("/api/requisitions")
+async def list_requisitions():
+    """List open requisitions."""
+    loop = asyncio.get_running_loop()
+    return {'requisitions': await loop.run_in_executor(None, _get_requisitions().list)}
+
+
+@app.get("/api/requisitions/{req_id}")
+async def get_requisition(req_id: str):
+    loop = asyncio.get_running_loop()
+    requisition = await loop.run_in_executor(None, _get_requisitions().get, req_id)
+    if requisition is None:
+        raise HTTPException(status_code=404, detail="Requisition not found")
+    return requisition
+
+
+@app.get("/api/requisitions/{req_id}/leaderboard")
+async def get_requisition_leaderboard(
+    req_id: str,
+    offset: int = 0,
+    limit: int = 50,
+    min_score: Optional[float] = None,
+    max_score: Optional[float] = None
+):
+    """Ranked applicants for a requisition's job description; see /api/leaderboards/{jd_hash}."""
+    loop = asyncio.get_running_loop()
+    requisition = await loop.run_in_executor(None, _get_requisitions().get, req_id)
+    if requisition is None:
+        raise HTTPException(status_code=404, detail="Requisition not found")
+    page = await _leaderboard_page(content_hash(requisition['jd_text']), offset, limit, min_score, max_score)
+    return {'req_id': req_id, **page}
+
+
+@app.delete("/api/requisitions/{req_id}", status_code=204)
+async def delete_requisition(req_id: str):
+    loop = asyncio.get_running_loop()
+    if not await loop.run_in_executor(None, _get_requisitions().remove, req_id):
+        raise HTTPException(status_code=404, detail="Requisition not found")
+
+
+@app.post("/api/match/jobs")
+async def match_jobs(
+    resume_text: Optional[str] = Form(None),
+    resume_file: Optional[UploadFile] = File(None),
+    top_k: int = Form(10),
+    settings: Optional[str] = Form(None)
+):
+    """
+    Rank open requisitions for a resume.
+    
+    Only requisitions sharing skills with the resume are scored; returns
+    the ``top_k`` best matches with their category scores.
+    """
+    if top_k < 1:
+        raise HTTPException(status_code=400, detail="top_k must be at least 1")
+    analysis_settings = _parse_settings(settings)
+    
+    if resume_text:
+        file_content, file_extension = None, None
+    elif resume_file:
+        file_content = await resume_file.read()
+        file_extension = resume_file.filename.split('.')[-1].lower()
+    else:
+        raise HTTPException(status_code=400, detail="Either resume_text or resume_file is required")
+    
+    def run() -> Dict:
+        resume = resume_text.strip() if file_content is None else parse_resume_file(file_content, file_extension)
+        start = time.perf_counter()
+        result = _get_requisitions().match(
+            resume, top_k, config.match_max_candidates,
+            analysis_settings.weights, analysis_settings.strict_mode
+        )
+        result['elapsed_ms'] = round((time.perf_counter() - start) * 1000, 2)
+        return result
+    
+    try:
+        return await asyncio.get_running_loop().run_in_executor(None, run)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/api/leaderboards/{jd_hash}")
+async def get_leaderboard(
+    jd_hash: str,
+    offset: int = 0,
+    limit: int = 50,
+    min_score: Optional[float] = None,
+    max_score: Optional[float] = None
+):
+    """
+    Applicants for a job description, best first.
+    
+    ``jd_hash`` is the ``jd_hash`` of its analyses. Pages are given by
+    ``offset`` and ``limit``; ``min_score``/``max_score`` restrict the
+    page to a score range, and ``total`` counts the entries in it.
+    """
+    return await _leaderboard_page(jd_hash, offset, limit, min_score, max_score)
+
+
+@app.get("/api/leaderboards/{jd_hash}/rank/{analysis_id}")
+async def get_leaderboard_rank(jd_hash: str, analysis_id: str):
+    """Rank of one analysis on its job description's leaderboard."""
+    _require_leaderboards()
+    loop = asyncio.get_running_loop()
+    entry = await loop.run_in_executor(None, _get_leaderboards().rank, jd_hash, analysis_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Analysis not found on this leaderboard")
+    return entry
+
+
+@app.put("/api/leaderboards/{jd_hash}/settings")
+async def put_leaderboard_settings(jd_hash: str, request: LeaderboardSettingsRequest):
+    """Change the weights or strict mode a leaderboard ranks under; every entry is rescored."""
+    _require_leaderboards()
+    loop = asyncio.get_running_loop()
+    info = await loop.run_in_executor(
+        None, _get_leaderboards().configure, jd_hash, request.weights, request.strict_mode
+    )
+    if info is None:
+        raise HTTPException(status_code=404, detail="Leaderboard not found")
+    return info
+
+
 @app.get("/api/report/{analysis_id}/json")
-async def get_json_report(analysis_id: str):
+async def get_json_report(analysis_id: str, request: Request):
     """Download analysis result as JSON."""
     
-    if analysis_id not in analyses:
-        raise HTTPException(status_code=404, detail="Analysis not found")
+    analysis = _get_analysis(analysis_id)
+    headers = _report_headers(analysis_id, analysis, 'json')
+    if _not_modified(request, headers):
+        return Response(status_code=304, headers=headers)
     
-    analysis = analyses[analysis_id]
+    key = (analysis_id, 'json', headers['ETag'])
+    content = report_cache.get(key)
+    if content is None:
+        with timed_stage('render_json'):
+            content = json.dumps(analysis['result']).encode('utf-8')
+        report_cache.put(key, content)
     
-    return JSONResponse(
-        content=analysis['result'],
-        media_type="application/json"
-    )
+    return Response(content=content, media_type="application/json", headers=headers)
 
 
 @app.get("/api/report/{analysis_id}/markdown")
-async def get_markdown_report(analysis_id: str):
-    """Download analysis result as Markdown."""
+async def get_markdown_report(analysis_id: str, request: Request, raw: bool = False):
+    """
+    Download analysis result as Markdown.
     
-    if analysis_id not in analyses:
-        raise HTTPException(status_code=404, detail="Analysis not found")
+    By default the Markdown is wrapped in a JSON object; with ``raw=true``
+    it is streamed as text/markdown.
+    """
     
-    analysis = analyses[analysis_id]
-    result = analysis['result']
+    analysis = _get_analysis(analysis_id)
+    report_format = 'markdown' if raw else 'markdown-json'
+    headers = _report_headers(analysis_id, analysis, report_format)
+    if _not_modified(request, headers):
+        return Response(status_code=304, headers=headers)
     
-    # Generate markdown
-    markdown = _generate_markdown_report(result)
+    key = (analysis_id, report_format, headers['ETag'])
+    if raw:
+        return _stream_report(
+            key, iter_markdown_report(await _report_result(analysis_id, analysis)), "text/markdown", headers
+        )
     
-    return JSONResponse(
-        content={
-            'analysis_id': analysis_id,
-            'markdown': markdown
-        }
+    content = report_cache.get(key)
+    if content is None:
+        result = await _report_result(analysis_id, analysis)
+        with timed_stage('render_markdown'):
+            content = json.dumps({
+                'analysis_id': analysis_id,
+                'markdown': render_markdown_report(result)
+            }).encode('utf-8')
+        report_cache.put(key, content)
+    
+    return Response(content=content, media_type="application/json", headers=headers)
+
+
+@app.get("/api/report/{analysis_id}/html")
+async def get_html_report(analysis_id: str, request: Request):
+    """Download analysis result as a standalone HTML page."""
+    
+    analysis = _get_analysis(analysis_id)
+    headers = _report_headers(analysis_id, analysis, 'html')
+    if _not_modified(request, headers):
+        return Response(status_code=304, headers=headers)
+    
+    key = (analysis_id, 'html', headers['ETag'])
+    return _stream_report(
+        key, iter_html_report(await _report_result(analysis_id, analysis), analysis_id), "text/html", headers
     )
 
 
 @app.get("/api/report/{analysis_id}/pdf")
-async def get_pdf_report(analysis_id: str):
+async def get_pdf_report(analysis_id: str, request: Request):
     """Download analysis result as PDF."""
     
-    if analysis_id not in analyses:
-        raise HTTPException(status_code=404, detail="Analysis not found")
-    
-    analysis = analyses[analysis_id]
-    result = analysis['result']
+    analysis = _get_analysis(analysis_id)
+    headers = _report_headers(analysis_id, analysis, 'pdf')
+    if _not_modified(request, headers):
+        return Response(status_code=304, headers=headers)
     
     # Generate PDF
     try:
-        from app.pdf_generator import generate_pdf_report
-        pdf_content = generate_pdf_report(result, analysis_id)
-        
-        return FileResponse(
-            pdf_content,
-            media_type="application/pdf",
-            filename=f"ats_report_{analysis_id}.pdf"
+        pdf_content = await _render_pdf(analysis_id, analysis, headers['ETag'])
+    except ImportError:
+        raise HTTPException(
+            status_code=501,
+            detail="PDF generation not available. Install reportlab or weasyprint."
+        )
+    
+    return Response(
+        content=pdf_content,
+        media_type="application/pdf",
+        headers={
+            **headers,
+            'Content-Disposition': f'attachment; filename="ats_report_{analysis_id}.pdf"'
+        }
+    )
+
+
+@app.get("/api/report/{analysis_id}/evidence/{part}")
+async def get_evidence(analysis_id: str, part: str, request: Request):
+    """
+    Full explanation for one category, or for 'keywords' or 'actions'.
+    
+    Analyses run with a reduced ``detail_level`` are explained on demand
+    and the explanation is cached like a rendered report.
+    """
+    
+    if part not in EXPLAIN_PARTS:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Unknown part: {part}. Expected one of: {', '.join(EXPLAIN_PARTS)}"
+        )
+    
+    analysis = _get_analysis(analysis_id)
+    report_format = f"evidence/{part}"
+    headers = _report_headers(analysis_id, analysis, report_format)
+    if _not_modified(request, headers):
+        return Response(status_code=304, headers=headers)
+    
+    key = (analysis_id, report_format, headers['ETag'])
+    content = report_cache.get(key)
+    if content is None:
+        loop = asyncio.get_running_loop()
+        explanation = await loop.run_in_executor(None, _explain, analysis, part)
+        content = json.dumps({'analysis_id': analysis_id, 'part': part, **explanation}).encode('utf-8')
+        report_cache.put(key, content)
+    
+    return Response(content=content, media_type="application/json", headers=headers)
+
+
+@app.post("/api/report/pdf/batch")
+async def get_pdf_report_batch(request: ReportBatchRequest):
+    """Download the PDF reports of several analyses as one ZIP archive."""
+    
+    if not request.analysis_ids:
+        raise HTTPException(status_code=400, detail="analysis_ids is required")
+    if len(request.analysis_ids) > config.report_batch_max:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {config.report_batch_max} reports per batch"
+        )
+    
+    rendered, to_render, etags = {}, [], {}
+    for analysis_id in dict.fromkeys(request.analysis_ids):
+        analysis = _get_analysis(analysis_id)
+        etags[analysis_id] = report_etag(analysis_id, analysis, 'pdf')
+        cached = report_cache.get((analysis_id, 'pdf', etags[analysis_id]))
+        if cached is not None:
+            rendered[analysis_id] = cached
+        else:
+            to_render.append((analysis_id, await _report_result(analysis_id, analysis)))
+    
+    def cache_pdf(analysis_id: str, pdf_content: bytes) -> None:
+        report_cache.put((analysis_id, 'pdf', etags[analysis_id]), pdf_content)
+    
+    try:
+        from app.pdf_generator import render_pdf_zip
+        loop = asyncio.get_running_loop()
+        archive = await loop.run_in_executor(
+            None, render_pdf_zip, to_render, rendered, config.pdf_render_workers, cache_pdf
         )
     except ImportError:
         raise HTTPException(
             status_code=501,
             detail="PDF generation not available. Install reportlab or weasyprint."
         )
+    
+    return Response(
+        content=archive,
+        media_type="application/zip",
+        headers={'Content-Disposition': 'attachment; filename="ats_reports.zip"'}
+    )
+
+
+@app.get("/api/analyses")
+async def list_analyses(limit: int = 50, cursor: Optional[str] = None, jd_hash: Optional[str] = None):
+    """
+    List stored analyses, newest first.
+    
+    Pass the returned next_cursor back as ``cursor`` to fetch the next page,
+    and ``jd_hash`` to restrict the listing to one job description.
+    """
+    limit = max(1, min(limit, 500))
+    try:
+        return analyses.list(limit=limit, cursor=cursor, jd_hash=jd_hash)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+@app.get("/api/export")
+async def export_analyses(
+    format: str = 'jsonl',
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    jd_hash: Optional[str] = None
+):
+    """
+    Stream every stored analysis as JSONL or flattened CSV.
+    
+    ``since`` and ``until`` are ISO dates or datetimes; ``jd_hash`` restricts
+    the export to one job description.
+    """
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(EXPORT_FORMATS)}")
+    try:
+        chunks = iter_export(
+            analyses,
+            export_format=format,
+            since=parse_timestamp(since),
+            until=parse_timestamp(until),
+            jd_hash=jd_hash
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    media_type = "application/x-ndjson" if format == 'jsonl' else "text/csv"
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={'Content-Disposition': f'attachment; filename="ats_analyses.{format}"'}
+    )
+
+
+@app.get("/metrics")
+async def metrics():
+    """Expose process metrics in Prometheus text format."""
+    return Response(
+        content=REGISTRY.render(),
+        media_type="text/plain; version=0.0.4"
+    )
+
+
+@app.get("/api/admin/store")
+async def get_store_stats():
+    """Get analysis store size, eviction and hit-rate gauges."""
+    return analyses.stats()
+
+
+@app.get("/api/admin/cache")
+async def get_cache_stats():
+    """Get result memoization and rendered-report cache metrics."""
+    return {
+        **result_cache.stats(),
+        'reports': report_cache.stats()
+    }
+
+
+@app.get("/api/admin/admission")
+async def admission_stats():
+    """Admission control state for this worker."""
+    return {'enabled': config.enable_admission_control, **admission.stats()}
 
 
 @app.get("/api/admin/weights")
@@ -235,105 +806,565 @@ async def save_settings(settings: AnalysisSettings):
     }
 
 
-def _generate_markdown_report(result: Dict) -> str:
-    """Generate markdown report from analysis result."""
-    
-    md = f"""# ATS Resume Match Analysis Report
+def _parse_settings(settings: Optional[str]) -> AnalysisSettings:
+    """Parse the JSON settings form field, falling back to defaults."""
+    analysis_settings = AnalysisSettings()
+    if settings:
+        try:
+            settings_dict = json.loads(settings)
+            analysis_settings = AnalysisSettings(**settings_dict)
+        except json.JSONDecodeError:
+            logger.warning("Invalid settings JSON, using defaults")
+        except ValidationError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid settings: {e.errors()[0]['msg']}")
+    return analysis_settings
 
-## Overall Score: {result['overall_score']}/100 - {result['label'].replace('_', ' ')}
 
----
+def _parse_projection(fields: Optional[str]) -> Optional[FieldTree]:
+    """Parse the ``fields`` form field, rejecting unknown fields."""
+    try:
+        return parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-## Category Breakdown
 
-"""
+def _project_settings(analysis_settings: AnalysisSettings, projection: Optional[FieldTree]) -> AnalysisSettings:
+    """Lower the detail level to what the projected fields need."""
+    detail_level = narrower_detail_level(analysis_settings.detail_level, projection)
+    if detail_level == analysis_settings.detail_level:
+        return analysis_settings
+    return analysis_settings.copy(update={'detail_level': detail_level})
+
+
+def _require_admin(token: Optional[str]) -> None:
+    """Reject the request unless it carries the configured admin token."""
+    if not config.admin_token:
+        raise HTTPException(status_code=403, detail="Admin features are disabled")
+    if not token or not hmac.compare_digest(token, config.admin_token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+def _run_analysis(parsed_resume: str, jd_text: str, analysis_settings: AnalysisSettings) -> Dict:
+    """Score a parsed resume, store the analysis and return its id and result."""
+    
+    if not parsed_resume or not parsed_resume.strip():
+        raise HTTPException(
+            status_code=400,
+            detail="Could not extract text from resume file"
+        )
+    
+    # Create scoring engine
+    engine = ScoringEngine(
+        weights=analysis_settings.weights,
+        strict_mode=analysis_settings.strict_mode,
+        detail_level=analysis_settings.detail_level,
+        stage_workers=config.scoring_stage_workers
+    )
+    
+    # Identical inputs return the stored result under its original id
+    input_key = analysis_key(
+        parsed_resume, jd_text, engine.weights, engine.strict_mode, engine.detail_level
+    )
+    if analysis_settings.use_cache:
+        cached = result_cache.lookup(input_key)
+        if cached is not None:
+            analysis_id, entry = cached
+            return {
+                'analysis_id': analysis_id,
+                'result': entry['result'],
+                'cached': True
+            }
+    
+    # Segment the resume once; the index is reused by every scorer
+    with timed_stage('segment_resume'):
+        sections = SectionSegmenter.segment(parsed_resume)
+    
+    # Run analysis
+    result = engine.analyze(parsed_resume, jd_text, sections=sections)
+    
+    # Convert to dictionary for JSON response
+    result_dict = to_dict(result)
+    
+    # Store analysis; ids must be unique across worker processes
+    analysis_id = uuid.uuid4().hex
+    analyses.put(analysis_id, {
+        'result': result_dict,
+        'resume_text': parsed_resume,
+        'sections': sections.to_list(),
+        'jd_text': jd_text,
+        'settings': analysis_settings.dict(),
+        'input_key': input_key,
+        'created_at': datetime.now().isoformat()
+    })
     
-    categories_display = {
-        'keyword_skills': 'A) Keyword & Skills Match',
-        'experience_relevance': 'B) Experience Relevance Match',
-        'role_match': 'C) Role/Title Match',
-        'seniority_match': 'D) Seniority/Years Match',
-        'education_match': 'E) Education/Certs Match',
-        'tooling_stack_match': 'F) Tooling/Stack Match',
-        'recency_match': 'G) Recency Match',
-        'red_flags': 'H) Red Flag Detection'
+    if _leaderboards_enabled():
+        # Recording may rescore the resume under the board's settings; keep it off the request path
+        leaderboard_updates.submit(
+            _record_leaderboard, analysis_id, jd_text, parsed_resume, result_dict, engine.weights, engine.strict_mode
+        )
+    
+    return {
+        'analysis_id': analysis_id,
+        'result': result_dict
     }
+
+
+def _record_leaderboard(analysis_id: str, jd_text: str, resume_text: str, result: Dict,
+                        weights: Dict[str, float], strict_mode: bool) -> None:
+    """Rank a stored analysis on its JD's leaderboard; failures never fail the analysis."""
+    try:
+        _get_leaderboards().record(analysis_id, jd_text, resume_text, result, weights, strict_mode)
+    except Exception as e:
+        logger.warning(f"Leaderboard update failed for {analysis_id}: {str(e)}")
+
+
+def _rebase_leaderboard(old_jd_text: str, new_jd_text: str) -> None:
+    """Move a revised JD's leaderboard onto the new text; failures are only logged."""
+    try:
+        _get_leaderboards().rebase(old_jd_text, new_jd_text)
+    except Exception as e:
+        logger.warning(f"Leaderboard rebase failed for {content_hash(old_jd_text)}: {str(e)}")
+
+
+def _leaderboards_enabled() -> bool:
+    """Leaderboards rescore from stored resumes, so they need the persistent analysis store."""
+    return config.enable_leaderboards and config.enable_database
+
+
+def _require_leaderboards() -> None:
+    if not _leaderboards_enabled():
+        raise HTTPException(status_code=404, detail="Leaderboards are disabled")
+
+
+async def _leaderboard_page(jd_hash: str, offset: int, limit: int,
+                            min_score: Optional[float], max_score: Optional[float]) -> Dict:
+    _require_leaderboards()
+    offset, limit = max(0, offset), max(1, min(limit, 500))
+    # A stale leaderboard is rescored on read, which can take a while
+    page = await asyncio.get_running_loop().run_in_executor(
+        None, _get_leaderboards().page, jd_hash, offset, limit, min_score, max_score
+    )
+    if page is None:
+        raise HTTPException(status_code=404, detail="Leaderboard not found")
+    return page
+
+
+def _rpc_analyze(resume_text: str, jd_text: str, settings: Dict) -> Dict:
+    """Score one binary-ingress request the way POST /api/analyze scores resume_text."""
+    settings = dict(settings)
+    fields = settings.pop('fields', None)
+    try:
+        if not jd_text.strip():
+            raise HTTPException(status_code=400, detail="Job description is required")
+        if fields is not None and not isinstance(fields, str):
+            raise HTTPException(status_code=400, detail="fields must be a comma-separated string")
+        projection = _parse_projection(fields)
+        try:
+            analysis_settings = AnalysisSettings(**settings)
+        except ValidationError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid settings: {e.errors()[0]['msg']}")
+        response = _run_analysis(resume_text.strip(), jd_text, _project_settings(analysis_settings, projection))
+    except HTTPException as e:
+        raise RPCError(e.status_code, e.detail)
+    response['result'] = project(response['result'], projection)
+    return response
+
+
+def _parse_and_run(file_content: bytes, file_extension: str, jd_text: str, analysis_settings: AnalysisSettings) -> Dict:
+    """Parse an uploaded resume file and score it."""
+    return _run_analysis(parse_resume_file(file_content, file_extension), jd_text, analysis_settings)
+
+
+def _run_profiled(run, *args) -> Dict:
+    """
+    Run an analysis callable under the profiler and attach its profile.
     
-    for key, display_name in categories_display.items():
-        category = result['categories'][key]
-        md += f"""### {display_name}: {category['score']}/100
+    The callable's last argument is its AnalysisSettings; the result cache
+    is bypassed so the analysis is actually scored.
+    """
+    *args, analysis_settings = args
+    response, profile = profile_call(run, *args, analysis_settings.copy(update={'use_cache': False}))
+    response['profile'] = profile
+    return response
 
-"""
-        if category['evidence']:
-            for evidence in category['evidence']:
-                md += f"- {evidence}\n"
-        md += "\n"
+
+async def _analyze_batch_item(
+    index: int,
+    kind: str,
+    item,
+    jd_text: str,
+    analysis_settings: AnalysisSettings,
+    profile: bool = False
+) -> Dict:
+    """Parse and score one batch item off the event loop; errors become records."""
+    loop = asyncio.get_running_loop()
+    record = {'type': 'result', 'index': index}
     
-    # Must-haves and nice-to-haves
-    md += "## Keyword Matching\n\n"
+    try:
+        if kind == 'file':
+            record['filename'] = item.filename
+            with timed_stage('upload_read'):
+                file_content = await item.read()
+            file_extension = item.filename.split('.')[-1].lower()
+            run, args = _parse_and_run, (file_content, file_extension, jd_text, analysis_settings)
+        else:
+            run, args = _run_analysis, (item.strip(), jd_text, analysis_settings)
+        
+        if profile:
+            run, args = _run_profiled, (run,) + args
+        async with _batch_item_slot():
+            record.update(await loop.run_in_executor(None, run, *args))
+    except HTTPException as e:
+        record.update(type='error', error=e.detail)
+    except AdmissionRejected as e:
+        record.update(type='error', error='Server overloaded', reason=e.reason, retry_after=e.retry_after)
+    except Exception as e:
+        logger.error(f"Batch item {index} failed: {str(e)}")
+        record.update(type='error', error=str(e))
+    
+    return record
+
+
+def _batch_item_slot():
+    """An admission slot for one batch resume, so a batch weighs as much as its resumes."""
+    return admission.slot() if config.enable_admission_control else contextlib.nullcontext()
+
+
+async def _iter_batch_records(
+    items: List,
+    jd_text: str,
+    analysis_settings: AnalysisSettings,
+    profile: bool = False,
+    projection: Optional[FieldTree] = None
+):
+    """
+    Yield batch records as each resume finishes, then a summary record.
     
-    md += "### Must-Have Keywords\n"
-    matched = sum(1 for kw in result['must_have'] if kw['matched'])
-    total = len(result['must_have'])
-    md += f"**Matched: {matched}/{total}**\n\n"
+    At most ``config.batch_max_in_flight`` resumes are read and scored at
+    once, so memory does not grow with the batch size.
+    """
+    started = time.monotonic()
+    pending = set()
+    remaining = iter(enumerate(items))
+    succeeded = failed = 0
+    score_total = 0.0
+    best = None
     
-    for kw in result['must_have']:
-        status = "[+]" if kw['matched'] else "[-]"
-        md += f"- {status} {kw['term']}\n"
+    def launch():
+        while len(pending) < config.batch_max_in_flight:
+            try:
+                index, (kind, item) = next(remaining)
+            except StopIteration:
+                return
+            pending.add(asyncio.ensure_future(
+                _analyze_batch_item(index, kind, item, jd_text, analysis_settings, profile)
+            ))
     
-    md += "\n### Nice-to-Have Keywords\n"
-    matched_nice = sum(1 for kw in result['nice_to_have'] if kw['matched'])
-    total_nice = len(result['nice_to_have'])
-    md += f"**Matched: {matched_nice}/{total_nice}**\n\n"
+    launch()
+    while pending:
+        done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            pending.discard(task)
+            record = task.result()
+            if record['type'] == 'result':
+                succeeded += 1
+                score = record['result']['overall_score']
+                score_total += score
+                if best is None or score > best['overall_score']:
+                    best = {'index': record['index'], 'analysis_id': record['analysis_id'], 'overall_score': score}
+                record['result'] = project(record['result'], projection)
+            else:
+                failed += 1
+            yield record
+        launch()
     
-    for kw in result['nice_to_have']:
-        status = "[+]" if kw['matched'] else "[-]"
-        md += f"- {status} {kw['term']}\n"
+    yield {
+        'type': 'summary',
+        'count': len(items),
+        'succeeded': succeeded,
+        'failed': failed,
+        'mean_score': round(score_total / succeeded, 1) if succeeded else None,
+        'best': best,
+        'elapsed_ms': round((time.monotonic() - started) * 1000, 1)
+    }
+
+
+def _run_job(job: Dict) -> Dict:
+    """Worker-pool handler: parse and score one queued job."""
+    payload = job['payload']
     
-    # Red flags
-    if result['red_flags']:
-        md += "\n## Red Flags\n\n"
-        for flag in result['red_flags']:
-            md += f"- WARNING: {flag}\n"
+    if job['resume_file'] is not None:
+        parsed_resume = parse_resume_file(job['resume_file'], payload['file_extension'])
+    else:
+        parsed_resume = payload['resume_text']
     
-    # Actions
-    md += "\n## Recommendations\n\n"
+    try:
+        return _run_analysis(parsed_resume, payload['jd_text'], AnalysisSettings(**payload['settings']))
+    except HTTPException as e:
+        raise ValueError(e.detail)
+
+
+def _get_analysis(analysis_id: str) -> Dict:
+    """Look up a stored analysis, mapping missing and evicted ids to HTTP errors."""
+    try:
+        analysis = analyses.get(analysis_id)
+    except AnalysisEvictedError:
+        raise HTTPException(
+            status_code=410,
+            detail="Analysis has expired or was evicted from the store; please re-run it"
+        )
+    if analysis is None:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+    return analysis
+
+
+def _explain(analysis: Dict, part: str) -> Dict:
+    """Explanation for one part of a stored analysis, computed only if it was not stored."""
+    result = analysis['result']
+    if result['metadata'].get('detail_level', 'full') == 'full':
+        if part == 'keywords':
+            return {'must_have': result['must_have'], 'nice_to_have': result['nice_to_have']}
+        if part == 'actions':
+            return {'actions': result['actions']}
+        return result['categories'][part]
     
-    if result['actions']['good_fit_summary']:
-        md += "### Good Fit\n"
-        for item in result['actions']['good_fit_summary']:
-            md += f"- [+] {item}\n"
+    settings = analysis.get('settings') or {}
+    engine = ScoringEngine(weights=settings.get('weights'), strict_mode=settings.get('strict_mode', False))
+    sections = SectionIndex.from_list(analysis['sections']) if analysis.get('sections') is not None else None
+    with timed_stage('explain'):
+        return engine.explain(analysis['resume_text'], analysis['jd_text'], part, sections)
+
+
+async def _report_result(analysis_id: str, analysis: Dict) -> Dict:
+    """The result a report renders; reduced analyses are completed off the event loop."""
+    if analysis['result']['metadata'].get('detail_level', 'full') == 'full':
+        return analysis['result']
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, _complete_result, analysis_id, analysis)
+
+
+def _complete_result(analysis_id: str, analysis: Dict) -> Dict:
+    """
+    A stored result with every part a report shows.
     
-    if result['actions']['gaps']:
-        md += "\n### Gaps to Address\n"
-        for item in result['actions']['gaps']:
-            md += f"- {item}\n"
+    Analyses run at a reduced ``detail_level`` lack keyword matches,
+    evidence and recommendations; they are rebuilt at full detail with the
+    analysis's settings and cached like a rendered report. The stored
+    score, label and metadata are kept.
+    """
+    result = analysis['result']
+    if result['metadata'].get('detail_level', 'full') == 'full':
+        return result
     
-    if result['actions']['resume_tailoring_suggestions']:
-        md += "\n### Resume Tailoring Suggestions\n"
-        for item in result['actions']['resume_tailoring_suggestions']:
-            md += f"- {item}\n"
+    key = (analysis_id, 'result/full', report_etag(analysis_id, analysis, 'result/full'))
+    cached = report_cache.get(key)
+    if cached is not None:
+        return json.loads(cached)
     
-    if result['actions']['ats_keywords_to_add']:
-        md += "\n### ATS Keywords to Consider Adding\n"
-        md += f"{', '.join(result['actions']['ats_keywords_to_add'])}\n"
+    settings = analysis.get('settings') or {}
+    engine = ScoringEngine(
+        weights=settings.get('weights'),
+        strict_mode=settings.get('strict_mode', False),
+        stage_workers=config.scoring_stage_workers
+    )
+    sections = SectionIndex.from_list(analysis['sections']) if analysis.get('sections') is not None else None
+    with timed_stage('explain'):
+        full = to_dict(engine.analyze(analysis['resume_text'], analysis['jd_text'], sections=sections))
+    completed = {
+        **full,
+        'overall_score': result['overall_score'],
+        'label': result['label'],
+        'metadata': result['metadata'],
+    }
+    report_cache.put(key, json.dumps(completed).encode('utf-8'))
+    return completed
+
+
+def _report_headers(analysis_id: str, analysis: Dict, report_format: str) -> Dict[str, str]:
+    """Validator headers for a report; clients must revalidate before reuse."""
+    headers = {
+        'ETag': report_etag(analysis_id, analysis, report_format),
+        'Cache-Control': 'private, no-cache'
+    }
+    last_modified = report_last_modified(analysis)
+    if last_modified:
+        headers['Last-Modified'] = last_modified
+    return headers
+
+
+def _not_modified(request: Request, headers: Dict[str, str]) -> bool:
+    """Evaluate If-None-Match, falling back to If-Modified-Since."""
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match is not None:
+        # Compressed responses carry the ETag with their coding appended
+        etag = headers['ETag']
+        return any(
+            etag_matches(if_none_match, tag)
+            for tag in (etag, *(coded_etag(etag, encoding) for encoding in supported_encodings()))
+        )
+    return not_modified_since(request.headers.get('if-modified-since'), headers.get('Last-Modified'))
+
+
+def _stream_report(key, chunks, media_type: str, headers: Dict[str, str]):
+    """Serve a cached report, or stream it from a renderer and cache the result."""
+    content = report_cache.get(key)
+    if content is not None:
+        return Response(content=content, media_type=media_type, headers=headers)
     
-    # Metadata
-    md += f"\n---\n\nGenerated: {result['metadata']['timestamp']}\n"
-    md += f"Version: {result['metadata']['version']}\n"
+    def stream():
+        # Render time excludes time spent waiting on the client
+        rendered = []
+        elapsed = 0.0
+        iterator = iter(chunks)
+        while True:
+            start = time.perf_counter()
+            chunk = next(iterator, None)
+            data = chunk.encode('utf-8') if chunk is not None else None
+            elapsed += time.perf_counter() - start
+            if data is None:
+                break
+            rendered.append(data)
+            yield data
+        STAGE_SECONDS.observe(elapsed, stage=f"render_{key[1]}")
+        report_cache.put(key, b''.join(rendered))
     
-    return md
+    return StreamingResponse(stream(), media_type=media_type, headers=headers)
+
+
+async def _render_pdf(analysis_id: str, analysis: Dict, etag: str) -> bytes:
+    """Return cached PDF bytes, rendering off the event loop on a miss."""
+    key = (analysis_id, 'pdf', etag)
+    pdf_content = report_cache.get(key)
+    if pdf_content is None:
+        from app.pdf_generator import render_pdf_report
+        result = await _report_result(analysis_id, analysis)
+        loop = asyncio.get_running_loop()
+        pdf_content = await loop.run_in_executor(None, render_pdf_report, result, analysis_id)
+        report_cache.put(key, pdf_content)
+    return pdf_content
+
+
+def _prerender_pdf(analysis_id: str) -> None:
+    """Background task: render and cache a PDF right after analysis."""
+    try:
+        analysis = analyses.get(analysis_id)
+        if analysis is None:
+            return
+        key = (analysis_id, 'pdf', report_etag(analysis_id, analysis, 'pdf'))
+        if report_cache.get(key) is None:
+            from app.pdf_generator import render_pdf_report
+            report_cache.put(key, render_pdf_report(_complete_result(analysis_id, analysis), analysis_id))
+    except Exception as e:
+        logger.warning(f"PDF pre-render failed for {analysis_id}: {str(e)}")
+
+
+def _get_job_queue() -> JobQueue:
+    """Return the process-wide job queue, opening it on first use."""
+    global job_queue
+    with _jobs_lock:
+        if job_queue is None:
+            job_queue = JobQueue(
+                config.job_queue_path,
+                lease_seconds=config.job_lease_seconds,
+                retention_seconds=config.job_retention_seconds
+            )
+        return job_queue
+
+
+def _get_worker_pool() -> WorkerPool:
+    """Return this worker's job pool, starting it on first use."""
+    global worker_pool
+    with _jobs_lock:
+        if worker_pool is None:
+            worker_pool = WorkerPool(
+                _get_job_queue(),
+                _run_job,
+                min_workers=config.job_workers_min,
+                max_workers=config.job_workers_max,
+                idle_timeout=config.job_idle_timeout
+            )
+            worker_pool.start()
+        return worker_pool
+
+
+def _submit_job(payload: Dict, file_content: Optional[bytes]) -> Dict:
+    """Queue a job and wake this worker's pool; returns the job's public view."""
+    queue = _get_job_queue()
+    job_id = queue.submit(payload, file_content)
+    _get_worker_pool().notify()
+    return queue.get(job_id)
+
+
+def _find_job(job_id: str) -> Optional[Dict]:
+    """A job's public view, or None; never creates the queue database just to look."""
+    if job_queue is None and not os.path.exists(config.job_queue_path):
+        return None
+    return _get_job_queue().get(job_id)
+
+
+def _get_requisitions() -> RequisitionRegistry:
+    """Return the process-wide requisition registry, opening it on first use."""
+    global requisitions
+    if requisitions is None:
+        requisitions = RequisitionRegistry(config.requisitions_path)
+    return requisitions
+
+
+def _get_leaderboards() -> LeaderboardStore:
+    """Return the process-wide leaderboard store, opening it on first use."""
+    global leaderboards
+    if leaderboards is None:
+        leaderboards = LeaderboardStore(config.leaderboards_path, analyses)
+    return leaderboards
+
+
+def _generate_markdown_report(result: Dict) -> str:
+    """Generate markdown report from analysis result."""
+    return render_markdown_report(result)
 
 
 # Startup event
 @app.on_event("startup")
 async def startup_event():
+    global rpc_server
+    if os.path.exists(config.job_queue_path):
+        # Drain jobs queued before a restart; otherwise the pool starts on the first submit
+        await asyncio.get_running_loop().run_in_executor(None, _get_worker_pool)
+    if config.rpc_port:
+        rpc_server = RPCServer(
+            _rpc_analyze,
+            admission=admission if config.enable_admission_control else None,
+            max_in_flight=config.rpc_max_in_flight,
+            max_frame_bytes=config.rpc_max_frame_bytes
+        )
+        # Every worker listens on the port; the kernel spreads connections across them
+        await rpc_server.start(config.rpc_host, config.rpc_port, reuse_port=True)
+        logger.info(f"Binary scoring ingress listening on {config.rpc_host}:{config.rpc_port}")
+    if config.enable_leaderboards and not config.enable_database:
+        logger.warning("ENABLE_LEADERBOARDS needs ENABLE_DATABASE; leaderboards are disabled")
+    if config.warmup_on_startup and not warmup.is_ready():
+        # Serve health checks while warming; workers forked from a preloaded master skip this
+        asyncio.get_running_loop().run_in_executor(None, warmup.warm_up)
     logger.info("ATS Resume Match Analyzer API started")
 
 
 # Shutdown event
 @app.on_event("shutdown")
 async def shutdown_event():
+    global worker_pool
+    if rpc_server is not None:
+        await rpc_server.close()
+    if worker_pool is not None:
+        worker_pool.stop()
+        worker_pool = None
+    # The single leaderboard thread runs in order, so this waits for every queued update
+    await asyncio.get_running_loop().run_in_executor(None, leaderboard_updates.submit(lambda: None).result)
+    analyses.close()
+    try:
+        from app.pdf_generator import shutdown_process_pool
+        shutdown_process_pool()
+    except ImportError:
+        pass
     logger.info("ATS Resume Match Analyzer API shutting down")
 
 
@@ -0,0 +1,93 @@
+"""
+Memoization of analysis results.
+
+Identical (resume, JD, settings) inputs map to the same canonical key, so a
+retried or double-submitted analysis returns the stored result and its
+original analysis id instead of being scored again.
+"""
+
+import hashlib
+import json
+import threading
+from typing import Dict, Optional, Tuple
+
+from app.scoring_engine import ENGINE_VERSION
+from app.store import AnalysisEvictedError, AnalysisStore
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize text for keying without changing what the engine sees.
+
+    Line endings and trailing whitespace are normalized; case and line
+    breaks are kept because section detection depends on them.
+    """
+    lines = (text or "").replace('\r\n', '\n').replace('\r', '\n').split('\n')
+    return '\n'.join(line.rstrip() for line in lines).strip()
+
+
+def _text_hash(text: str) -> str:
+    return hashlib.sha256(normalize_text(text).encode('utf-8')).hexdigest()
+
+
+def analysis_key(
+    resume_text: str,
+    jd_text: str,
+    weights: Dict[str, float],
+    strict_mode: bool,
+    detail_level: str = 'full'
+) -> str:
+    """Canonical hash of everything that determines an analysis result."""
+    fields = {
+        'resume': _text_hash(resume_text),
+        'jd': _text_hash(jd_text),
+        'weights': {k: float(v) for k, v in sorted(weights.items())},
+        'strict_mode': bool(strict_mode),
+        'engine_version': ENGINE_VERSION,
+    }
+    # Only keyed when reduced, so keys of full analyses are unchanged
+    if detail_level != 'full':
+        fields['detail_level'] = detail_level
+    canonical = json.dumps(fields, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class ResultCache:
+    """Looks up previously stored analyses by input key and tracks the hit ratio."""
+
+    def __init__(self, store: AnalysisStore, enabled: bool = True):
+        self.store = store
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def lookup(self, input_key: str) -> Optional[Tuple[str, Dict]]:
+        """Return ``(analysis_id, entry)`` for a memoized result, or None."""
+        if not self.enabled:
+            return None
+
+        analysis_id = self.store.find_by_key(input_key)
+        entry = None
+        if analysis_id is not None:
+            try:
+                entry = self.store.get(analysis_id)
+            except AnalysisEvictedError:
+                entry = None
+
+        with self._lock:
+            if entry is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+        return analysis_id, entry
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'enabled': self.enabled,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_ratio': round(self._hits / lookups, 4) if lookups else 0.0,
+            }
@@ -0,0 +1,334 @@
+"""
+Lightweight in-process metrics exposed in Prometheus text format.
+
+Counters, gauges and histograms are plain Python objects guarded by a lock,
+cheap enough to leave on in production. Each worker process keeps its own
+registry, so a scrape reports the worker that served it.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Latency buckets in seconds, from 0.5 ms to 30 s
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _format_labels(labelnames: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, or be read from a callback at scrape time."""
+
+    type_name = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        callback: Optional[Callable[[], Dict[Tuple[str, ...], float]]] = None
+    ):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._callback = callback
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def _samples(self) -> List[str]:
+        if self._callback is not None:
+            try:
+                items = list(self._callback().items())
+            except Exception:
+                items = []
+        else:
+            with self._lock:
+                items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+
+class Histogram(_Metric):
+    """Distribution of observations in cumulative buckets."""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label key -> [per-bucket counts (+Inf last), sum, count]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> int:
+        state = self._values.get(self._key(labels))
+        return state[2] if state else 0
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = [(key, (list(state[0]), state[1], state[2])) for key, state in self._values.items()]
+
+        lines = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class Registry:
+    """Collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = (), callback=None) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames, callback))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry and the pipeline metrics shared across modules
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "ats_stage_duration_seconds",
+    "Latency of analysis pipeline stages",
+    ["stage"]
+)
+
+PARSE_SECONDS = REGISTRY.histogram(
+    "ats_parse_duration_seconds",
+    "Latency of resume file parsing by file type",
+    ["file_type"]
+)
+
+REQUESTS_TOTAL = REGISTRY.counter(
+    "ats_http_requests_total", "HTTP requests by route, method and status", ["route", "method", "status"]
+)
+REQUEST_SECONDS = REGISTRY.histogram(
+    "ats_http_request_duration_seconds", "HTTP request latency by route", ["route", "method"]
+)
+REQUESTS_IN_FLIGHT = REGISTRY.gauge(
+    "ats_http_requests_in_flight", "HTTP requests currently being served"
+)
+
+
+class RequestMetricsMiddleware:
+    """
+    ASGI middleware counting requests and timing them, labelled by route template.
+
+    A request is finished when its last body chunk is sent, so streamed
+    responses are timed to the end of the stream and stay in flight until then.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        REQUESTS_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        state = {'status': 500, 'finished': False}
+
+        def finish() -> None:
+            if state['finished']:
+                return
+            state['finished'] = True
+            REQUESTS_IN_FLIGHT.dec()
+            # The router records the matched route in the shared scope
+            route = scope.get('route')
+            route_path = route.path if route is not None else 'unmatched'
+            REQUEST_SECONDS.observe(time.perf_counter() - start, route=route_path, method=scope['method'])
+            REQUESTS_TOTAL.inc(route=route_path, method=scope['method'], status=str(state['status']))
+
+        async def send_timed(message):
+            if message['type'] == 'http.response.start':
+                state['status'] = message['status']
+            await send(message)
+            if message['type'] == 'http.response.body' and not message.get('more_body', False):
+                finish()
+
+        try:
+            await self.app(scope, receive, send_timed)
+        finally:
+            # Errors and disconnects end the request without a final body
+            finish()
+
+
+class StageTrace:
+    """Tree of stage timings collected for a single traced call."""
+
+    def __init__(self):
+        self.root = {'stage': 'total', 'ms': 0.0, 'children': []}
+        self._stack = [self.root]
+
+    def enter(self, stage: str) -> None:
+        node = {'stage': stage, 'ms': 0.0, 'children': []}
+        self._stack[-1]['children'].append(node)
+        self._stack.append(node)
+
+    def exit(self, seconds: float) -> None:
+        node = self._stack.pop()
+        node['ms'] = round(seconds * 1000, 3)
+
+    def to_dict(self) -> Dict:
+        self.root['ms'] = round(sum(child['ms'] for child in self.root['children']), 3)
+        return self.root
+
+
+# Set only while a call is being traced, so untraced stages pay one lookup
+_active_trace: ContextVar[Optional[StageTrace]] = ContextVar('ats_stage_trace', default=None)
+
+
+@contextmanager
+def trace_stages() -> Iterator[StageTrace]:
+    """Collect a stage timing tree for everything run in this context."""
+    trace = StageTrace()
+    token = _active_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _active_trace.reset(token)
+
+
+@contextmanager
+def timed_stage(stage: str) -> Iterator[None]:
+    """Record the duration of a pipeline stage."""
+    trace = _active_trace.get()
+    if trace is not None:
+        trace.enter(stage)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.observe(elapsed, stage=stage)
+        if trace is not None:
+            trace.exit(elapsed)
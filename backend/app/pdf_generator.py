@@ -3,40 +3,53 @@ PDF report generator for analysis results.
 """
 
 import io
-from typing import Dict, BinaryIO
+import multiprocessing
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Callable, Dict, BinaryIO, List, Optional, Tuple
 from datetime import datetime
 import logging
 
+from app.metrics import timed_stage
+
 logger = logging.getLogger(__name__)
 
+# Score thresholds and their colors, shared by the score and label styles
+SCORE_COLORS = {
+    'strong': '#28a745',  # Green
+    'medium': '#ffc107',  # Yellow
+    'weak': '#dc3545',  # Red
+}
 
-def generate_pdf_report(result: Dict, analysis_id: str) -> BinaryIO:
-    """
-    Generate PDF report from analysis result.
-    Uses reportlab for PDF generation.
+# Batch rendering pool, started on first use; never forked from a threaded server process
+_process_pool: Optional[ProcessPoolExecutor] = None
+_process_pool_lock = threading.Lock()
+_START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+
+@lru_cache(maxsize=1)
+def build_styles() -> Dict:
     """
+    Build every paragraph and table style used by the report.
     
+    Styles are immutable once built, so they are created once per process
+    and shared by all renders.
+    """
     try:
-        from reportlab.lib.pagesizes import letter, A4
         from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-        from reportlab.lib.units import inch
-        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
+        from reportlab.platypus import TableStyle
         from reportlab.lib import colors
-        from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
+        from reportlab.lib.enums import TA_CENTER, TA_LEFT
     except ImportError:
         logger.error("reportlab not installed")
         raise ImportError("PDF generation requires reportlab. Install with: pip install reportlab")
     
-    # Create PDF document in memory
-    pdf_buffer = io.BytesIO()
-    doc = SimpleDocTemplate(pdf_buffer, pagesize=letter)
-    
-    # Container for PDF elements
-    elements = []
-    
-    # Styles
     styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
+    built = {'normal': styles['Normal']}
+    
+    built['title'] = ParagraphStyle(
         'CustomTitle',
         parent=styles['Heading1'],
         fontSize=24,
@@ -45,7 +58,7 @@ def generate_pdf_report(result: Dict, analysis_id: str) -> BinaryIO:
         alignment=TA_CENTER
     )
     
-    heading_style = ParagraphStyle(
+    built['heading'] = ParagraphStyle(
         'CustomHeading',
         parent=styles['Heading2'],
         fontSize=14,
@@ -54,8 +67,95 @@ def generate_pdf_report(result: Dict, analysis_id: str) -> BinaryIO:
         spaceBefore=12
     )
     
+    for band, hex_color in SCORE_COLORS.items():
+        score_color = colors.HexColor(hex_color)
+        built[f'score_{band}'] = ParagraphStyle(
+            f'ScoreStyle_{band}',
+            parent=styles['Normal'],
+            fontSize=36,
+            textColor=score_color,
+            alignment=TA_CENTER,
+            spaceAfter=6
+        )
+        built[f'label_{band}'] = ParagraphStyle(
+            f'LabelStyle_{band}',
+            parent=styles['Normal'],
+            fontSize=16,
+            textColor=score_color,
+            alignment=TA_CENTER,
+            spaceAfter=24
+        )
+    
+    built['footer'] = ParagraphStyle(
+        'Footer',
+        parent=styles['Normal'],
+        fontSize=9,
+        textColor=colors.grey,
+        alignment=TA_LEFT,
+        spaceAfter=12
+    )
+    
+    built['category_table'] = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#333333')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('ALIGN', (1, 0), (1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f0f0f0')])
+    ])
+    
+    built['keyword_table'] = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#333333')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 11),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f0f0f0')])
+    ])
+    
+    return built
+
+
+def generate_pdf_report(result: Dict, analysis_id: str) -> BinaryIO:
+    """
+    Generate PDF report from analysis result.
+    Returns an in-memory file positioned at the start.
+    """
+    return io.BytesIO(render_pdf_report(result, analysis_id))
+
+
+def render_pdf_report(result: Dict, analysis_id: str) -> bytes:
+    """
+    Render PDF report bytes from analysis result.
+    Uses reportlab for PDF generation.
+    """
+    with timed_stage('render_pdf'):
+        return _render_pdf_report(result, analysis_id)
+
+
+def _render_pdf_report(result: Dict, analysis_id: str) -> bytes:
+    styles = build_styles()
+    
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.units import inch
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table
+    
+    # Create PDF document in memory
+    pdf_buffer = io.BytesIO()
+    doc = SimpleDocTemplate(pdf_buffer, pagesize=letter)
+    
+    # Container for PDF elements
+    elements = []
+    
     # Title
-    title = Paragraph("ATS Resume Match Analysis Report", title_style)
+    title = Paragraph("ATS Resume Match Analysis Report", styles['title'])
     elements.append(title)
     elements.append(Spacer(1, 0.3*inch))
     
@@ -65,39 +165,21 @@ def generate_pdf_report(result: Dict, analysis_id: str) -> BinaryIO:
     
     # Color code by label
     if score >= 75:
-        score_color = colors.HexColor('#28a745')  # Green
+        band = 'strong'
     elif score >= 50:
-        score_color = colors.HexColor('#ffc107')  # Yellow
+        band = 'medium'
     else:
-        score_color = colors.HexColor('#dc3545')  # Red
+        band = 'weak'
     
-    score_style = ParagraphStyle(
-        'ScoreStyle',
-        parent=styles['Normal'],
-        fontSize=36,
-        textColor=score_color,
-        alignment=TA_CENTER,
-        spaceAfter=6
-    )
-    
-    label_style = ParagraphStyle(
-        'LabelStyle',
-        parent=styles['Normal'],
-        fontSize=16,
-        textColor=score_color,
-        alignment=TA_CENTER,
-        spaceAfter=24
-    )
-    
-    score_paragraph = Paragraph(f"{score}/100", score_style)
-    label_paragraph = Paragraph(label, label_style)
+    score_paragraph = Paragraph(f"{score}/100", styles[f'score_{band}'])
+    label_paragraph = Paragraph(label, styles[f'label_{band}'])
     
     elements.append(score_paragraph)
     elements.append(label_paragraph)
     elements.append(Spacer(1, 0.2*inch))
     
     # Category Breakdown
-    elements.append(Paragraph("Category Breakdown", heading_style))
+    elements.append(Paragraph("Category Breakdown", styles['heading']))
     
     categories_display = {
         'keyword_skills': 'A) Keyword & Skills Match',
@@ -117,24 +199,13 @@ def generate_pdf_report(result: Dict, analysis_id: str) -> BinaryIO:
             category_data.append([display_name, f"{score_val:.1f}"])
     
     category_table = Table(category_data, colWidths=[4*inch, 1*inch])
-    category_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#333333')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('ALIGN', (1, 0), (1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 12),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f0f0f0')])
-    ]))
+    category_table.setStyle(styles['category_table'])
     
     elements.append(category_table)
     elements.append(Spacer(1, 0.3*inch))
     
     # Keyword Matching
-    elements.append(Paragraph("Keyword Matching", heading_style))
+    elements.append(Paragraph("Keyword Matching", styles['heading']))
     
     must_haves = result['must_have']
     matched_must = sum(1 for kw in must_haves if kw['matched'])
@@ -151,27 +222,17 @@ def generate_pdf_report(result: Dict, analysis_id: str) -> BinaryIO:
     ]
     
     keyword_table = Table(keyword_data, colWidths=[2*inch, 1.2*inch, 1*inch, 1*inch])
-    keyword_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#333333')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 11),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f0f0f0')])
-    ]))
+    keyword_table.setStyle(styles['keyword_table'])
     
     elements.append(keyword_table)
     elements.append(Spacer(1, 0.3*inch))
     
     # Red Flags
     if result['red_flags']:
-        elements.append(Paragraph("Red Flags", heading_style))
+        elements.append(Paragraph("Red Flags", styles['heading']))
         
         for flag in result['red_flags']:
-            flag_text = Paragraph(f"WARNING: {flag}", styles['Normal'])
+            flag_text = Paragraph(f"WARNING: {flag}", styles['normal'])
             elements.append(flag_text)
         
         elements.append(Spacer(1, 0.3*inch))
@@ -180,31 +241,31 @@ def generate_pdf_report(result: Dict, analysis_id: str) -> BinaryIO:
     actions = result['actions']
     
     if actions['good_fit_summary']:
-        elements.append(Paragraph("Strengths", heading_style))
+        elements.append(Paragraph("Strengths", styles['heading']))
         for item in actions['good_fit_summary']:
-            elements.append(Paragraph(f"[+] {item}", styles['Normal']))
+            elements.append(Paragraph(f"[+] {item}", styles['normal']))
         elements.append(Spacer(1, 0.2*inch))
     
     if actions['gaps']:
-        elements.append(Paragraph("Gaps to Address", heading_style))
+        elements.append(Paragraph("Gaps to Address", styles['heading']))
         for item in actions['gaps']:
-            elements.append(Paragraph(f"• {item}", styles['Normal']))
+            elements.append(Paragraph(f"• {item}", styles['normal']))
         elements.append(Spacer(1, 0.2*inch))
     
     if actions['resume_tailoring_suggestions']:
-        elements.append(Paragraph("Tailoring Suggestions", heading_style))
+        elements.append(Paragraph("Tailoring Suggestions", styles['heading']))
         for item in actions['resume_tailoring_suggestions']:
-            elements.append(Paragraph(f"• {item}", styles['Normal']))
+            elements.append(Paragraph(f"• {item}", styles['normal']))
         elements.append(Spacer(1, 0.2*inch))
     
     if actions['ats_keywords_to_add']:
-        elements.append(Paragraph("Keywords to Consider Adding", heading_style))
+        elements.append(Paragraph("Keywords to Consider Adding", styles['heading']))
         keywords_text = ", ".join(actions['ats_keywords_to_add'])
-        elements.append(Paragraph(keywords_text, styles['Normal']))
+        elements.append(Paragraph(keywords_text, styles['normal']))
     
     # Footer
     elements.append(Spacer(1, 0.5*inch))
-    elements.append(Paragraph("_" * 80, styles['Normal']))
+    elements.append(Paragraph("_" * 80, styles['normal']))
     
     footer_text = f"""
     <b>Analysis ID:</b> {analysis_id}<br/>
@@ -214,20 +275,69 @@ def generate_pdf_report(result: Dict, analysis_id: str) -> BinaryIO:
     It should be used as a tool to assist in hiring decisions, not as the sole criterion.
     """
     
-    footer_style = ParagraphStyle(
-        'Footer',
-        parent=styles['Normal'],
-        fontSize=9,
-        textColor=colors.grey,
-        alignment=TA_LEFT,
-        spaceAfter=12
-    )
-    
-    elements.append(Paragraph(footer_text, footer_style))
+    elements.append(Paragraph(footer_text, styles['footer']))
     
     # Build PDF
     doc.build(elements)
     
-    # Return buffer for file response
-    pdf_buffer.seek(0)
-    return pdf_buffer
+    return pdf_buffer.getvalue()
+
+
+def _render_task(item: Tuple[str, Dict]) -> Tuple[str, bytes]:
+    analysis_id, result = item
+    return analysis_id, render_pdf_report(result, analysis_id)
+
+
+def _get_process_pool(max_workers: int) -> ProcessPoolExecutor:
+    """
+    Return the batch rendering pool, starting it on first use.
+    
+    Workers come from a fresh interpreter (forkserver, or spawn where that
+    is unavailable) rather than a fork of this threaded process.
+    """
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(
+                max_workers=max(1, max_workers),
+                mp_context=multiprocessing.get_context(_START_METHOD)
+            )
+        return _process_pool
+
+
+def render_pdf_zip(
+    items: List[Tuple[str, Dict]],
+    rendered: Optional[Dict[str, bytes]] = None,
+    max_workers: int = 2,
+    on_rendered: Optional[Callable[[str, bytes], None]] = None
+) -> bytes:
+    """
+    Render many reports into one ZIP archive.
+    
+    ``items`` are ``(analysis_id, result)`` pairs still to be rendered, and
+    ``rendered`` maps ids to already rendered PDF bytes. Reports are rendered
+    in a process pool of at most ``max_workers`` processes, since reportlab
+    rendering is CPU bound; ``on_rendered`` is called with each new PDF.
+    """
+    pool = _get_process_pool(max_workers) if items else None
+    
+    zip_buffer = io.BytesIO()
+    with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for analysis_id, pdf_content in (rendered or {}).items():
+            archive.writestr(f"ats_report_{analysis_id}.pdf", pdf_content)
+        if pool is not None:
+            for analysis_id, pdf_content in pool.map(_render_task, items, chunksize=4):
+                archive.writestr(f"ats_report_{analysis_id}.pdf", pdf_content)
+                if on_rendered is not None:
+                    on_rendered(analysis_id, pdf_content)
+    
+    return zip_buffer.getvalue()
+
+
+def shutdown_process_pool() -> None:
+    """Stop the batch rendering process pool, if one was started."""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=False, cancel_futures=True)
+            _process_pool = None
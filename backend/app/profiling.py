@@ -0,0 +1,57 @@
+"""
+On-demand profiling of single analysis requests.
+
+A profiled call runs under cProfile with stage tracing enabled, and
+returns its result together with the slowest functions and a stage timing
+tree. Nothing here runs unless a request asks for it.
+"""
+
+import cProfile
+import pstats
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+from app.metrics import trace_stages
+
+TOP_FUNCTIONS = 25
+
+
+def _top_functions(profiler: cProfile.Profile, limit: int) -> List[Dict]:
+    stats = pstats.Stats(profiler)
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+    top = []
+    for (filename, line, name), (primitive_calls, calls, tottime, cumtime, _) in rows:
+        top.append({
+            'function': f"{filename}:{line}({name})",
+            'calls': calls,
+            'primitive_calls': primitive_calls,
+            'tottime_ms': round(tottime * 1000, 3),
+            'cumtime_ms': round(cumtime * 1000, 3),
+        })
+    return top
+
+
+def profile_call(func: Callable, *args, top: int = TOP_FUNCTIONS, **kwargs) -> Tuple[Any, Dict]:
+    """
+    Run ``func`` under cProfile and stage tracing.
+
+    Returns ``(result, profile)`` where ``profile`` has the wall time, the
+    stage timing tree and the top functions by cumulative time. Only the
+    calling thread is profiled.
+    """
+    profiler = cProfile.Profile()
+    start = time.perf_counter()
+    with trace_stages() as trace:
+        profiler.enable()
+        try:
+            result = func(*args, **kwargs)
+        finally:
+            profiler.disable()
+    wall_ms = round((time.perf_counter() - start) * 1000, 3)
+
+    return result, {
+        'profiler': 'cProfile',
+        'wall_ms': wall_ms,
+        'stages': trace.to_dict(),
+        'top_functions': _top_functions(profiler, top),
+    }
@@ -0,0 +1,101 @@
+"""
+Field projection for analysis results.
+
+Clients pass ``fields`` as a comma-separated list of dotted paths into the
+result, e.g. ``overall_score,label,categories.*.score``. ``*`` matches
+every key of an object; a path into a list applies to each element. The
+projection also decides the narrowest detail level that still produces
+every requested field, so the engine never builds evidence, keyword
+matches or actions that would be dropped from the response.
+"""
+
+from dataclasses import fields as dataclass_fields
+from typing import Dict, Optional
+
+from app.scoring_engine import DETAIL_LEVELS, AnalysisResult
+
+RESULT_FIELDS = tuple(f.name for f in dataclass_fields(AnalysisResult))
+
+# A parsed projection: each key maps to the projection of its value, and
+# an empty mapping selects the value whole
+FieldTree = Dict[str, 'FieldTree']
+
+WILDCARD = '*'
+
+
+def parse_fields(spec: Optional[str]) -> Optional[FieldTree]:
+    """Parse a ``fields`` parameter; None or blank means no projection."""
+    if not spec or not spec.strip():
+        return None
+    tree: FieldTree = {}
+    for path in spec.split(','):
+        parts = [part.strip() for part in path.strip().split('.')]
+        if not all(parts):
+            raise ValueError(f"Invalid field path: {path.strip()!r}")
+        if parts[0] not in RESULT_FIELDS:
+            raise ValueError(f"Unknown field: {parts[0]}. Expected one of: {', '.join(RESULT_FIELDS)}")
+        node = tree
+        for depth, part in enumerate(parts):
+            if part in node and not node[part]:
+                # A shorter path already selects this value whole
+                break
+            if depth == len(parts) - 1:
+                node[part] = {}
+            else:
+                node = node.setdefault(part, {})
+    return tree
+
+
+def project(value, tree: Optional[FieldTree]):
+    """Return the parts of ``value`` selected by ``tree``."""
+    if not tree:
+        return value
+    if isinstance(value, list):
+        return [project(item, tree) for item in value]
+    if not isinstance(value, dict):
+        return value
+    if WILDCARD in tree:
+        # Explicit keys refine the wildcard for those keys
+        return {
+            key: project(item, _merge(tree[WILDCARD], tree.get(key)))
+            for key, item in value.items()
+        }
+    return {key: project(value[key], sub) for key, sub in tree.items() if key in value}
+
+
+def _merge(wildcard: FieldTree, explicit: Optional[FieldTree]) -> FieldTree:
+    if explicit is None:
+        return wildcard
+    if not wildcard or not explicit:
+        return {}
+    merged = dict(wildcard)
+    for key, sub in explicit.items():
+        merged[key] = _merge(merged[key], sub) if key in merged else sub
+    return merged
+
+
+def _selects(tree: FieldTree, key: str, depth: int = 0) -> bool:
+    """Whether ``tree`` selects ``key`` at ``depth`` objects below where it applies."""
+    if not tree:
+        return True
+    if depth == 0:
+        return key in tree or WILDCARD in tree
+    return any(_selects(sub, key, depth - 1) for sub in tree.values())
+
+
+def required_detail_level(tree: Optional[FieldTree]) -> str:
+    """The narrowest detail level whose result contains every projected field."""
+    if tree is None or 'actions' in tree:
+        return 'full'
+    keywords = [tree[name] for name in ('must_have', 'nice_to_have') if name in tree]
+    if any(_selects(sub, 'evidence') for sub in keywords):
+        return 'full'
+    if 'categories' in tree and _selects(tree['categories'], 'evidence', depth=1):
+        return 'full'
+    return 'keywords' if keywords else 'scores'
+
+
+def narrower_detail_level(requested: str, tree: Optional[FieldTree]) -> str:
+    """The requested detail level, lowered to what the projection needs."""
+    needed = required_detail_level(tree)
+    return min(requested, needed, key=DETAIL_LEVELS.index)
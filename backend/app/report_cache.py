@@ -0,0 +1,97 @@
+"""
+Cache of rendered report bytes.
+
+Rendered reports are keyed by analysis id, format and result version, so a
+report is rendered at most once per analysis until it is evicted.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Optional, Tuple
+
+
+# Bump when report layouts change so cached renders and client ETags are invalidated
+REPORT_VERSION = '1'
+
+
+def report_etag(analysis_id: str, entry: Dict, report_format: str) -> str:
+    """Strong ETag for a report, derived from the analysis identity and version."""
+    basis = f"{analysis_id}:{entry.get('created_at', '')}:{report_format}:{REPORT_VERSION}"
+    return '"' + hashlib.sha1(basis.encode('utf-8')).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header value against an ETag."""
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(',')]
+    return '*' in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+def report_last_modified(entry: Dict) -> Optional[str]:
+    """HTTP-date of when the analysis was stored, for the Last-Modified header."""
+    try:
+        created_at = datetime.fromisoformat(entry['created_at'])
+    except (KeyError, TypeError, ValueError):
+        return None
+    return format_datetime(created_at.astimezone(timezone.utc).replace(microsecond=0), usegmt=True)
+
+
+def not_modified_since(if_modified_since: Optional[str], last_modified: Optional[str]) -> bool:
+    """Check an If-Modified-Since header value against a Last-Modified value."""
+    if not if_modified_since or not last_modified:
+        return False
+    try:
+        return parsedate_to_datetime(last_modified) <= parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+
+
+class ReportCache:
+    """Thread-safe LRU cache of rendered report bytes bounded by total size."""
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._items: "OrderedDict[Tuple[str, str, str], bytes]" = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[str, str, str]) -> Optional[bytes]:
+        with self._lock:
+            data = self._items.get(key)
+            if data is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+            self._items.move_to_end(key)
+            return data
+
+    def put(self, key: Tuple[str, str, str], data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old)
+            self._items[key] = data
+            self._bytes += len(data)
+            while self._bytes > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'entries': len(self._items),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': round(self._hits / lookups, 4) if lookups else 0.0,
+            }
@@ -0,0 +1,179 @@
+"""
+Text report renderers for analysis results.
+
+Renderers are generators that yield the report in chunks, so responses can
+stream them and callers that need the whole document can join them.
+"""
+
+from html import escape
+from typing import Dict, Iterator
+
+
+CATEGORIES_DISPLAY = {
+    'keyword_skills': 'A) Keyword & Skills Match',
+    'experience_relevance': 'B) Experience Relevance Match',
+    'role_match': 'C) Role/Title Match',
+    'seniority_match': 'D) Seniority/Years Match',
+    'education_match': 'E) Education/Certs Match',
+    'tooling_stack_match': 'F) Tooling/Stack Match',
+    'recency_match': 'G) Recency Match',
+    'red_flags': 'H) Red Flag Detection'
+}
+
+
+def iter_markdown_report(result: Dict) -> Iterator[str]:
+    """Yield a Markdown report for an analysis result, section by section."""
+
+    yield f"""# ATS Resume Match Analysis Report
+
+## Overall Score: {result['overall_score']}/100 - {result['label'].replace('_', ' ')}
+
+---
+
+## Category Breakdown
+
+"""
+
+    for key, display_name in CATEGORIES_DISPLAY.items():
+        category = result['categories'][key]
+        lines = [f"### {display_name}: {category['score']}/100\n\n"]
+        if category['evidence']:
+            for evidence in category['evidence']:
+                lines.append(f"- {evidence}\n")
+        lines.append("\n")
+        yield ''.join(lines)
+
+    # Must-haves and nice-to-haves
+    lines = ["## Keyword Matching\n\n", "### Must-Have Keywords\n"]
+    matched = sum(1 for kw in result['must_have'] if kw['matched'])
+    total = len(result['must_have'])
+    lines.append(f"**Matched: {matched}/{total}**\n\n")
+
+    for kw in result['must_have']:
+        status = "[+]" if kw['matched'] else "[-]"
+        lines.append(f"- {status} {kw['term']}\n")
+
+    lines.append("\n### Nice-to-Have Keywords\n")
+    matched_nice = sum(1 for kw in result['nice_to_have'] if kw['matched'])
+    total_nice = len(result['nice_to_have'])
+    lines.append(f"**Matched: {matched_nice}/{total_nice}**\n\n")
+
+    for kw in result['nice_to_have']:
+        status = "[+]" if kw['matched'] else "[-]"
+        lines.append(f"- {status} {kw['term']}\n")
+    yield ''.join(lines)
+
+    # Red flags
+    if result['red_flags']:
+        yield "\n## Red Flags\n\n" + ''.join(f"- WARNING: {flag}\n" for flag in result['red_flags'])
+
+    # Actions
+    actions = result['actions']
+    lines = ["\n## Recommendations\n\n"]
+
+    if actions['good_fit_summary']:
+        lines.append("### Good Fit\n")
+        for item in actions['good_fit_summary']:
+            lines.append(f"- [+] {item}\n")
+
+    if actions['gaps']:
+        lines.append("\n### Gaps to Address\n")
+        for item in actions['gaps']:
+            lines.append(f"- {item}\n")
+
+    if actions['resume_tailoring_suggestions']:
+        lines.append("\n### Resume Tailoring Suggestions\n")
+        for item in actions['resume_tailoring_suggestions']:
+            lines.append(f"- {item}\n")
+
+    if actions['ats_keywords_to_add']:
+        lines.append("\n### ATS Keywords to Consider Adding\n")
+        lines.append(f"{', '.join(actions['ats_keywords_to_add'])}\n")
+    yield ''.join(lines)
+
+    # Metadata
+    yield (
+        f"\n---\n\nGenerated: {result['metadata']['timestamp']}\n"
+        f"Version: {result['metadata']['version']}\n"
+    )
+
+
+def render_markdown_report(result: Dict) -> str:
+    """Render the complete Markdown report as one string."""
+    return ''.join(iter_markdown_report(result))
+
+
+def _html_list(items, prefix: str = "") -> str:
+    return "<ul>\n" + ''.join(f"<li>{escape(prefix)}{escape(str(item))}</li>\n" for item in items) + "</ul>\n"
+
+
+def iter_html_report(result: Dict, analysis_id: str) -> Iterator[str]:
+    """Yield a standalone HTML report for an analysis result, section by section."""
+
+    label = result['label'].replace('_', ' ')
+    yield f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>ATS Resume Match Analysis Report</title>
+<style>
+body {{ font-family: Helvetica, Arial, sans-serif; max-width: 52rem; margin: 2rem auto; color: #1a1a1a; }}
+table {{ border-collapse: collapse; }}
+th, td {{ border: 1px solid #333; padding: 0.3rem 0.8rem; text-align: left; }}
+th {{ background: #333; color: #fff; }}
+.matched {{ color: #28a745; }}
+.missing {{ color: #dc3545; }}
+footer {{ color: #777; font-size: 0.8rem; margin-top: 2rem; }}
+</style>
+</head>
+<body>
+<h1>ATS Resume Match Analysis Report</h1>
+<h2>Overall Score: {escape(str(result['overall_score']))}/100 - {escape(label)}</h2>
+"""
+
+    rows = []
+    for key, display_name in CATEGORIES_DISPLAY.items():
+        if key in result['categories']:
+            rows.append(f"<tr><td>{escape(display_name)}</td><td>{result['categories'][key]['score']:.1f}</td></tr>\n")
+    yield "<h2>Category Breakdown</h2>\n<table>\n<tr><th>Category</th><th>Score</th></tr>\n" + ''.join(rows) + "</table>\n"
+
+    for key, display_name in CATEGORIES_DISPLAY.items():
+        category = result['categories'].get(key)
+        if category and category['evidence']:
+            yield f"<h3>{escape(display_name)}</h3>\n" + _html_list(category['evidence'])
+
+    for title, keywords in (("Must-Have Keywords", result['must_have']), ("Nice-to-Have Keywords", result['nice_to_have'])):
+        matched = sum(1 for kw in keywords if kw['matched'])
+        items = ''.join(
+            f"<li class=\"{'matched' if kw['matched'] else 'missing'}\">"
+            f"{'[+]' if kw['matched'] else '[-]'} {escape(kw['term'])}</li>\n"
+            for kw in keywords
+        )
+        yield f"<h2>{title}</h2>\n<p><strong>Matched: {matched}/{len(keywords)}</strong></p>\n<ul>\n{items}</ul>\n"
+
+    if result['red_flags']:
+        yield "<h2>Red Flags</h2>\n" + _html_list(result['red_flags'], "WARNING: ")
+
+    actions = result['actions']
+    sections = [
+        ("Good Fit", actions['good_fit_summary'], "[+] "),
+        ("Gaps to Address", actions['gaps'], ""),
+        ("Resume Tailoring Suggestions", actions['resume_tailoring_suggestions'], ""),
+    ]
+    parts = ["<h2>Recommendations</h2>\n"]
+    for title, items, prefix in sections:
+        if items:
+            parts.append(f"<h3>{title}</h3>\n" + _html_list(items, prefix))
+    if actions['ats_keywords_to_add']:
+        parts.append(
+            "<h3>ATS Keywords to Consider Adding</h3>\n"
+            f"<p>{escape(', '.join(actions['ats_keywords_to_add']))}</p>\n"
+        )
+    yield ''.join(parts)
+
+    yield (
+        f"<footer>Analysis ID: {escape(analysis_id)}<br>\n"
+        f"Generated: {escape(str(result['metadata']['timestamp']))}<br>\n"
+        f"Version: {escape(str(result['metadata']['version']))}</footer>\n"
+        "</body>\n</html>\n"
+    )
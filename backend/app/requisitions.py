@@ -0,0 +1,246 @@
+"""
+Registry of open requisitions for reverse matching.
+
+Each requisition's job description is compiled once into JobFeatures and
+stored alongside it in SQLite. An inverted index from skill terms to
+requisitions lets a resume be scored only against the jobs it shares
+signal with, instead of against every open job.
+
+Several workers may share one database: writes bump a generation counter
+and each worker rebuilds its in-memory index when the counter changes.
+"""
+
+import heapq
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Union
+import logging
+
+from app.metrics import timed_stage
+from app.scoring_engine import JobFeatures, KeywordExtractor, ResumeFeatures, ScoringEngine
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS requisitions (
+    id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    jd_text TEXT NOT NULL,
+    features TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('generation', 0);
+"""
+
+# Shared terms weigh more when the requisition requires them
+_MUST_WEIGHT = 2
+
+
+def index_terms(job: JobFeatures) -> Set[str]:
+    """Skill terms a requisition is indexed under."""
+    return {term.lower() for term in job.must_haves + job.nice_to_haves + job.tools}
+
+
+class _Index:
+    """Immutable snapshot of the compiled requisitions and their inverted index."""
+
+    def __init__(self, generation: int, rows: List[sqlite3.Row]):
+        self.generation = generation
+        self.jobs: Dict[str, JobFeatures] = {}
+        self.titles: Dict[str, str] = {}
+        self.terms: Dict[str, Set[str]] = {}
+        # Taxonomy terms are looked up in the resume's term set; anything
+        # else (e.g. quoted phrases) is checked as a substring
+        self.postings: Dict[str, Set[str]] = defaultdict(set)
+        self.phrases: Dict[str, Set[str]] = defaultdict(set)
+        self.unindexed: Set[str] = set()
+        for row in rows:
+            req_id = row['id']
+            job = JobFeatures.from_dict(row['jd_text'], json.loads(row['features']))
+            self.jobs[req_id] = job
+            self.titles[req_id] = row['title']
+            self.terms[req_id] = index_terms(job)
+            for term in self.terms[req_id]:
+                (self.postings if term in KeywordExtractor.ALL_TECH else self.phrases)[term].add(req_id)
+            if not self.terms[req_id]:
+                self.unindexed.add(req_id)
+
+    def shared_terms(self, req_id: str, resume: ResumeFeatures) -> Set[str]:
+        resume_lower = resume.text.lower()
+        return {
+            term for term in self.terms[req_id]
+            if term in resume.terms or (term in self.phrases and term in resume_lower)
+        }
+
+    def candidates(self, resume: ResumeFeatures) -> Dict[str, float]:
+        """
+        Requisitions sharing at least one term with the resume, each with an
+        overlap score (required terms count double).
+
+        Requisitions with no indexable terms are always candidates.
+        """
+        overlap: Dict[str, float] = dict.fromkeys(self.unindexed, 0.0)
+        resume_lower = resume.text.lower()
+        hits = [(term, self.postings[term]) for term in resume.terms if term in self.postings]
+        hits += [(term, ids) for term, ids in self.phrases.items() if term in resume_lower]
+        for term, req_ids in hits:
+            for req_id in req_ids:
+                weight = _MUST_WEIGHT if term in self.jobs[req_id].must_haves else 1
+                overlap[req_id] = overlap.get(req_id, 0.0) + weight
+        return overlap
+
+
+class RequisitionRegistry:
+    """SQLite-backed requisitions with an in-memory inverted skill index."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._index = _Index(-1, [])
+        self._conn().executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _bump(self, conn: sqlite3.Connection) -> None:
+        conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'generation'")
+
+    def put(self, jd_text: str, title: Optional[str] = None, req_id: Optional[str] = None) -> Dict:
+        """Compile and store a requisition, replacing any with the same id."""
+        req_id = req_id or uuid.uuid4().hex
+        job = JobFeatures(jd_text)
+        title = title or job.text.strip().split('\n')[0][:200]
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO requisitions (id, title, jd_text, features, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (req_id, title, jd_text, json.dumps(job.to_dict()), time.time())
+            )
+            self._bump(conn)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return self.get(req_id)
+
+    def remove(self, req_id: str) -> bool:
+        """Delete a requisition; returns False if it did not exist."""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            deleted = conn.execute("DELETE FROM requisitions WHERE id = ?", (req_id,)).rowcount
+            if deleted:
+                self._bump(conn)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return bool(deleted)
+
+    def get(self, req_id: str) -> Optional[Dict]:
+        row = self._conn().execute(
+            "SELECT id, title, jd_text, features, updated_at FROM requisitions WHERE id = ?", (req_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {
+            'req_id': row['id'],
+            'title': row['title'],
+            'jd_text': row['jd_text'],
+            'features': json.loads(row['features']),
+            'updated_at': datetime.fromtimestamp(row['updated_at']).isoformat(),
+        }
+
+    def list(self) -> List[Dict]:
+        """Summaries of every requisition, most recently updated first."""
+        rows = self._conn().execute(
+            "SELECT id, title, updated_at FROM requisitions ORDER BY updated_at DESC"
+        ).fetchall()
+        return [
+            {'req_id': row['id'], 'title': row['title'],
+             'updated_at': datetime.fromtimestamp(row['updated_at']).isoformat()}
+            for row in rows
+        ]
+
+    def __len__(self) -> int:
+        return len(self._refresh().jobs)
+
+    def _refresh(self) -> _Index:
+        """Return the index, rebuilding it if the database changed since the last build."""
+        generation = self._conn().execute("SELECT value FROM meta WHERE key = 'generation'").fetchone()[0]
+        if generation != self._index.generation:
+            with self._lock:
+                if generation != self._index.generation:
+                    rows = self._conn().execute("SELECT id, title, jd_text, features FROM requisitions").fetchall()
+                    self._index = _Index(generation, rows)
+                    logger.info(
+                        f"Requisition index rebuilt: {len(self._index.jobs)} requisitions, "
+                        f"{len(self._index.postings)} terms"
+                    )
+        return self._index
+
+    def match(
+        self,
+        resume_text: Union[str, ResumeFeatures],
+        top_k: int = 10,
+        max_candidates: int = 200,
+        weights: Optional[Dict] = None,
+        strict_mode: bool = False
+    ) -> Dict:
+        """
+        Rank requisitions for a resume.
+
+        Candidates are ordered by term overlap and at most ``max_candidates``
+        of them are fully scored; the ``top_k`` best scores are returned.
+        """
+        resume = ResumeFeatures.of(resume_text)
+        index = self._refresh()
+        with timed_stage('match_candidates'):
+            overlap = index.candidates(resume)
+            ranked = heapq.nlargest(max_candidates, overlap, key=lambda req_id: (overlap[req_id], req_id))
+
+        engine = ScoringEngine(weights, strict_mode, detail_level='scores')
+        with timed_stage('match_score'):
+            scored = [(engine.analyze(resume, index.jobs[req_id]), req_id) for req_id in ranked]
+
+        best = heapq.nlargest(top_k, scored, key=lambda item: (item[0].overall_score, item[1]))
+        return {
+            'matches': [
+                {
+                    'req_id': req_id,
+                    'title': index.titles[req_id],
+                    'overall_score': result.overall_score,
+                    'label': result.label,
+                    'scores': {name: category.score for name, category in result.categories.items()},
+                    'shared_terms': sorted(index.shared_terms(req_id, resume)),
+                }
+                for result, req_id in best
+            ],
+            'candidates_scored': len(ranked),
+            'total_requisitions': len(index.jobs),
+        }
+
+    def close(self) -> None:
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
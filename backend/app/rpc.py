@@ -0,0 +1,297 @@
+"""
+Binary scoring ingress for internal services.
+
+Callers hold a TCP connection open and send length-prefixed frames, each
+one analysis request, without waiting for earlier replies. A frame is a
+4-byte big-endian payload length, one codec byte and the payload:
+
+    b'm'  MessagePack (requires the ``msgpack`` package)
+    b'j'  UTF-8 JSON, for callers without MessagePack
+
+A request payload is ``[id, resume_text, jd_text, settings]`` where
+``settings`` takes the /api/analyze settings plus ``fields``. Replies are
+``[id, status, body]`` in the request's codec, with HTTP status codes and
+the same body as /api/analyze (or ``{"detail": ...}`` on error). Replies
+are written as analyses finish, so they may arrive out of order; callers
+match them by id. At most ``max_in_flight`` requests per connection are
+processed at once, after which the server stops reading that connection.
+"""
+
+import asyncio
+import json
+import logging
+import socket
+import struct
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from app.admission import AdmissionController, AdmissionRejected
+from app.metrics import REGISTRY
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+HEADER = struct.Struct('>IB')
+MSGPACK = ord('m')
+JSON = ord('j')
+
+RPC_REQUESTS = REGISTRY.counter(
+    "ats_rpc_requests_total", "Requests served by the binary scoring ingress", ["status"]
+)
+
+
+class RPCError(Exception):
+    """An error reply; ``status`` follows HTTP status codes."""
+
+    def __init__(self, status: int, detail: str, retry_after: Optional[int] = None):
+        super().__init__(detail)
+        self.status = status
+        self.detail = detail
+        self.retry_after = retry_after
+
+    def body(self) -> Dict:
+        body = {'detail': self.detail}
+        if self.retry_after is not None:
+            body['retry_after'] = self.retry_after
+        return body
+
+
+class RPCResponse(NamedTuple):
+    status: int
+    body: Dict
+
+
+def default_codec() -> int:
+    """MessagePack when installed, JSON otherwise."""
+    return MSGPACK if msgpack is not None else JSON
+
+
+def encode_frame(message: Any, codec: int) -> bytes:
+    if codec == MSGPACK:
+        if msgpack is None:
+            raise RPCError(415, "MessagePack frames require msgpack. Install with: pip install msgpack")
+        payload = msgpack.packb(message, use_bin_type=True)
+    elif codec == JSON:
+        payload = json.dumps(message, separators=(',', ':')).encode('utf-8')
+    else:
+        raise RPCError(415, f"Unknown frame codec {codec!r}")
+    return HEADER.pack(len(payload), codec) + payload
+
+
+def decode_payload(payload: bytes, codec: int) -> Any:
+    if codec == MSGPACK:
+        if msgpack is None:
+            raise RPCError(415, "MessagePack frames require msgpack. Install with: pip install msgpack")
+        try:
+            return msgpack.unpackb(payload, raw=False)
+        except (ValueError, msgpack.UnpackException) as e:
+            raise RPCError(400, f"Invalid MessagePack payload: {e}")
+    if codec == JSON:
+        try:
+            return json.loads(payload)
+        except ValueError as e:
+            raise RPCError(400, f"Invalid JSON payload: {e}")
+    raise RPCError(415, f"Unknown frame codec {codec!r}")
+
+
+def parse_request(message: Any) -> Tuple[Any, str, str, Dict]:
+    """Split a request payload into id, resume, JD and settings."""
+    if not isinstance(message, (list, tuple)) or len(message) not in (3, 4):
+        raise RPCError(400, "Request must be [id, resume_text, jd_text, settings]")
+    request_id, resume, jd = message[:3]
+    settings = message[3] if len(message) == 4 and message[3] is not None else {}
+    if not isinstance(resume, str) or not isinstance(jd, str):
+        raise RPCError(400, "resume_text and jd_text must be strings")
+    if not isinstance(settings, dict):
+        raise RPCError(400, "settings must be a map")
+    return request_id, resume, jd, settings
+
+
+class RPCServer:
+    """
+    asyncio server answering scoring frames with ``handler``.
+
+    ``handler(resume, jd, settings)`` runs in the default executor and
+    returns the reply body or raises RPCError. Requests go through the
+    same admission controller as the REST endpoints, keyed by peer address.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[str, str, Dict], Dict],
+        admission: Optional[AdmissionController] = None,
+        max_in_flight: int = 16,
+        max_frame_bytes: int = 4 * 1024 * 1024
+    ):
+        self.handler = handler
+        self.admission = admission
+        self.max_in_flight = max_in_flight
+        self.max_frame_bytes = max_frame_bytes
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections: Dict[asyncio.Task, asyncio.StreamWriter] = {}
+
+    async def start(self, host: str, port: int, reuse_port: bool = False) -> int:
+        """Listen on ``host:port`` and return the bound port (useful with port 0)."""
+        self._server = await asyncio.start_server(self._serve, host, port, reuse_port=reuse_port)
+        return self._server.sockets[0].getsockname()[1]
+
+    @property
+    def connections(self) -> int:
+        return len(self._connections)
+
+    async def close(self) -> None:
+        """Stop listening and close open connections once their in-flight requests are answered."""
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+        for writer in list(self._connections.values()):
+            writer.close()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        peer = writer.get_extra_info('peername')
+        client = peer[0] if peer else 'unknown'
+        sock = writer.get_extra_info('socket')
+        if sock is not None and sock.family in (socket.AF_INET, socket.AF_INET6):
+            # Replies are small and written one at a time
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        slots = asyncio.Semaphore(self.max_in_flight)
+        write_lock = asyncio.Lock()
+        tasks = set()
+        connection = asyncio.current_task()
+        self._connections[connection] = writer
+        try:
+            while True:
+                try:
+                    length, codec = HEADER.unpack(await reader.readexactly(HEADER.size))
+                except asyncio.IncompleteReadError:
+                    break
+                if length > self.max_frame_bytes:
+                    # The stream cannot be resynchronized without reading the frame; drop the connection
+                    error = RPCError(413, f"Frame of {length} bytes exceeds {self.max_frame_bytes}")
+                    await self._reply(writer, write_lock, None, error.status, error.body(), JSON)
+                    break
+                payload = await reader.readexactly(length)
+                await slots.acquire()
+                task = asyncio.ensure_future(self._dispatch(payload, codec, client, writer, write_lock))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                task.add_done_callback(lambda _: slots.release())
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._connections.pop(connection, None)
+            for task in list(tasks):
+                task.cancel()
+            writer.close()
+
+    async def _dispatch(self, payload: bytes, codec: int, client: str, writer, write_lock) -> None:
+        request_id = None
+        # Reply in the caller's codec when this process can produce it
+        reply_codec = MSGPACK if codec == MSGPACK and msgpack is not None else JSON
+        try:
+            message = decode_payload(payload, codec)
+            if isinstance(message, list) and message:
+                request_id = message[0]
+            request_id, resume, jd, settings = parse_request(message)
+            status, body = 200, await self._handle(client, resume, jd, settings)
+        except RPCError as e:
+            status, body = e.status, e.body()
+        except Exception as e:
+            logger.error(f"RPC analysis error: {e}")
+            status, body = 500, {'detail': f"Analysis failed: {e}"}
+        RPC_REQUESTS.inc(status=str(status))
+        try:
+            await self._reply(writer, write_lock, request_id, status, body, reply_codec)
+        except ConnectionError:
+            # The caller went away; nobody is left to answer
+            pass
+
+    async def _handle(self, client: str, resume: str, jd: str, settings: Dict) -> Dict:
+        loop = asyncio.get_running_loop()
+        if self.admission is None:
+            return await loop.run_in_executor(None, self.handler, resume, jd, settings)
+        try:
+            async with self.admission.admit(client):
+                return await loop.run_in_executor(None, self.handler, resume, jd, settings)
+        except AdmissionRejected as e:
+            detail = 'Too many requests' if e.status_code == 429 else 'Server overloaded'
+            raise RPCError(e.status_code, detail, retry_after=e.retry_after)
+
+    @staticmethod
+    async def _reply(writer, write_lock, request_id, status: int, body: Dict, codec: int) -> None:
+        frame = encode_frame([request_id, status, body], codec)
+        async with write_lock:
+            writer.write(frame)
+            await writer.drain()
+
+
+class RPCClient:
+    """
+    Blocking client for the scoring ingress, one persistent connection.
+
+    ``call_many`` pipelines requests, keeping up to ``window`` unanswered
+    at a time, which is where the throughput comes from.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 9000, codec: Optional[int] = None, timeout: float = 60):
+        self.codec = default_codec() if codec is None else codec
+        self._sock = socket.create_connection((host, port), timeout=timeout)
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._file = self._sock.makefile('rb')
+        self._next_id = 0
+
+    def call(self, resume: str, jd: str, settings: Optional[Dict] = None) -> Dict:
+        """Score one resume; raises RPCError on an error reply."""
+        response = self.call_many([(resume, jd, settings)])[0]
+        if response.status != 200:
+            raise RPCError(response.status, response.body.get('detail', ''), response.body.get('retry_after'))
+        return response.body
+
+    def call_many(self, requests: Iterable[Tuple[str, str, Optional[Dict]]], window: int = 32) -> List[RPCResponse]:
+        """Score several (resume, jd, settings) requests; replies are returned in request order."""
+        ids: List[int] = []
+        replies: Dict[int, RPCResponse] = {}
+        pending = 0
+        for resume, jd, settings in requests:
+            if pending >= window:
+                self._receive(replies)
+                pending -= 1
+            request_id = self._next_id
+            self._next_id += 1
+            ids.append(request_id)
+            self._sock.sendall(encode_frame([request_id, resume, jd, settings or {}], self.codec))
+            pending += 1
+        while pending:
+            self._receive(replies)
+            pending -= 1
+        return [replies.pop(request_id) for request_id in ids]
+
+    def _receive(self, replies: Dict[int, RPCResponse]) -> None:
+        header = self._file.read(HEADER.size)
+        if len(header) < HEADER.size:
+            raise ConnectionError("Connection closed by server")
+        length, codec = HEADER.unpack(header)
+        payload = self._file.read(length)
+        if len(payload) < length:
+            raise ConnectionError("Connection closed by server")
+        request_id, status, body = decode_payload(payload, codec)
+        if request_id is None:
+            # A connection-level error, such as an oversized frame
+            raise RPCError(status, body.get('detail', ''))
+        replies[request_id] = RPCResponse(status, body)
+
+    def close(self) -> None:
+        self._file.close()
+        self._sock.close()
+
+    def __enter__(self) -> 'RPCClient':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
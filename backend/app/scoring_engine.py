@@ -5,14 +5,29 @@ Implements explainable scoring logic for resume matching against job description
 
 import re
 import json
-from typing import Dict, List, Tuple, Optional, Set
+import hashlib
+import threading
+import time
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
+from typing import Any, Callable, Dict, Iterable, List, Tuple, Optional, Set, Union
 from dataclasses import dataclass, asdict, field
 from datetime import datetime
 from collections import defaultdict
 import logging
 
+from app.metrics import timed_stage
+
 logger = logging.getLogger(__name__)
 
+# Bump whenever scoring logic changes, so memoized results are not reused
+ENGINE_VERSION = '1.1.0'
+
+# How much explanation analyze() builds: category scores only, keyword
+# hits without snippets, or everything including evidence and actions
+DETAIL_LEVELS = ('scores', 'keywords', 'full')
+
 
 @dataclass
 class CategoryScore:
@@ -221,20 +236,130 @@ class KeywordExtractor:
         return roles
 
 
+# Changes whenever the skill taxonomy does, so rankings built on it can be refreshed
+TAXONOMY_VERSION = hashlib.sha256(
+    json.dumps(KeywordExtractor.TECH_STACK, sort_keys=True).encode('utf-8')
+).hexdigest()[:12]
+
+
+@dataclass
+class Section:
+    """A resume section located by character offsets into the resume text."""
+    name: str
+    start: int
+    end: int
+
+
+class SectionIndex:
+    """Index of resume sections built once per parsed document."""
+    
+    def __init__(self, sections: Optional[List[Section]] = None):
+        self.sections = sections or []
+        self._starts = [s.start for s in self.sections]
+    
+    def __len__(self) -> int:
+        return len(self.sections)
+    
+    def find(self, name: str) -> List[Section]:
+        """Return all sections with the given canonical name."""
+        return [s for s in self.sections if s.name == name]
+    
+    def get(self, name: str) -> Optional[Section]:
+        """Return the first section with the given canonical name."""
+        for section in self.sections:
+            if section.name == name:
+                return section
+        return None
+    
+    def text(self, resume_text: str, name: str) -> str:
+        """Return the text of every section with the given name, joined."""
+        return '\n'.join(resume_text[s.start:s.end] for s in self.find(name))
+    
+    def containing(self, offset: int) -> Optional[Section]:
+        """Return the section containing a character offset."""
+        i = bisect_right(self._starts, offset) - 1
+        if i >= 0 and offset < self.sections[i].end:
+            return self.sections[i]
+        return None
+    
+    def section_at(self, offset: int) -> Optional[str]:
+        """Return the name of the section containing a character offset."""
+        section = self.containing(offset)
+        return section.name if section else None
+    
+    def to_list(self) -> List[Dict]:
+        """Serialize the index for storage alongside the parsed document."""
+        return [asdict(s) for s in self.sections]
+    
+    @classmethod
+    def from_list(cls, items: List[Dict]) -> 'SectionIndex':
+        """Rebuild an index previously produced by ``to_list``."""
+        return cls([Section(**item) for item in items])
+
+
+class SectionSegmenter:
+    """Split resume text into sections in a single pass over its lines."""
+    
+    # Header aliases mapped to canonical section names
+    SECTION_ALIASES = {
+        'experience': ['experience', 'work experience', 'professional experience',
+                       'work history', 'employment history', 'employment'],
+        'education': ['education', 'qualifications', 'academic background'],
+        'skills': ['skills', 'technical skills', 'core competencies', 'core skills'],
+        'summary': ['summary', 'professional summary', 'profile', 'objective'],
+        'certifications': ['certifications', 'certificates', 'licenses'],
+        'projects': ['projects', 'personal projects'],
+    }
+    
+    ALIAS_TO_NAME = {
+        alias: name for name, aliases in SECTION_ALIASES.items() for alias in aliases
+    }
+    
+    # A header is a short line of words, optionally followed by a colon
+    HEADER_PATTERN = re.compile(r'^[ \t]*([A-Za-z][A-Za-z &/]{1,40}?)[ \t]*:?[ \t]*$', re.MULTILINE)
+    
+    @staticmethod
+    def _section_name(header: str) -> Optional[str]:
+        """Return the canonical name for a header line, or None if it is not one."""
+        normalized = ' '.join(header.lower().replace('&', ' ').split())
+        if normalized in SectionSegmenter.ALIAS_TO_NAME:
+            return SectionSegmenter.ALIAS_TO_NAME[normalized]
+        # Unknown all-caps headers still delimit sections
+        if header.isupper() and len(header.split()) <= 4:
+            return normalized
+        return None
+    
+    @staticmethod
+    def segment(text: str) -> SectionIndex:
+        """Build the section index for a resume."""
+        sections = []
+        current = None
+        
+        for match in SectionSegmenter.HEADER_PATTERN.finditer(text):
+            name = SectionSegmenter._section_name(match.group(1).strip())
+            if name is None:
+                continue
+            if current is not None:
+                current.end = match.start()
+            current = Section(name=name, start=match.end(), end=len(text))
+            sections.append(current)
+        
+        return SectionIndex(sections)
+
+
 class ResumeParser:
     """Parse resume text to extract structured information."""
     
     @staticmethod
-    def extract_work_experience(text: str) -> List[Dict]:
+    def extract_work_experience(text: str, sections: Optional[SectionIndex] = None) -> List[Dict]:
         """Extract work experience section with dates and descriptions."""
         experiences = []
         
-        # Split by common section headers
-        section_pattern = r'(experience|work\s*history|professional\s*experience)([\s\S]*?)(?=\n[A-Z][A-Z\s]*\n|\Z)'
-        matches = re.finditer(section_pattern, text, re.IGNORECASE)
+        if sections is None:
+            sections = SectionSegmenter.segment(text)
         
-        for match in matches:
-            section_text = match.group(2)
+        for section in sections.find('experience'):
+            section_text = text[section.start:section.end]
             # Split into individual jobs
             job_pattern = r'([A-Za-z\s]+?)(?:\(|,)?(\d{4})[^0-9]*(\d{4})?[^\n]*\n((?:[^\n]*(?:(?!\n[A-Za-z]{2,})|$))*)'
             job_matches = re.finditer(job_pattern, section_text)
@@ -257,15 +382,15 @@ class ResumeParser:
         return experiences
     
     @staticmethod
-    def extract_education(text: str) -> List[Dict]:
+    def extract_education(text: str, sections: Optional[SectionIndex] = None) -> List[Dict]:
         """Extract education section."""
         education = []
         
-        section_pattern = r'(education|qualifications)([\s\S]*?)(?=\n[A-Z][A-Z\s]*\n|\Z)'
-        match = re.search(section_pattern, text, re.IGNORECASE)
+        if sections is None:
+            sections = SectionSegmenter.segment(text)
         
-        if match:
-            section_text = match.group(2)
+        section_text = sections.text(text, 'education')
+        if section_text:
             # Look for degree keywords
             for degree_type in ['bachelor', 'master', 'phd', 'certificate']:
                 if degree_type in section_text.lower():
@@ -283,13 +408,231 @@ class ResumeParser:
         return total
 
 
+class JobFeatures:
+    """
+    Features of a job description, each extracted on first use.
+    
+    Scorers accept either JD text or a JobFeatures, so features compiled
+    once (e.g. for a stored requisition) are reused across analyses.
+    """
+    
+    FIELDS = ('must_haves', 'nice_to_haves', 'role_keywords', 'required_years', 'degrees', 'tools', 'target_role')
+    
+    def __init__(self, text: str):
+        self.text = text
+    
+    @classmethod
+    def of(cls, jd: Union[str, 'JobFeatures']) -> 'JobFeatures':
+        return jd if isinstance(jd, JobFeatures) else cls(jd)
+    
+    @cached_property
+    def must_haves(self) -> List[str]:
+        return KeywordExtractor.extract_must_haves(self.text)
+    
+    @cached_property
+    def nice_to_haves(self) -> List[str]:
+        return KeywordExtractor.extract_nice_to_haves(self.text)
+    
+    @cached_property
+    def role_keywords(self) -> List[str]:
+        return KeywordExtractor.extract_role_keywords(self.text)
+    
+    @cached_property
+    def required_years(self) -> Optional[int]:
+        return KeywordExtractor.extract_years_required(self.text)
+    
+    @cached_property
+    def degrees(self) -> List[str]:
+        return KeywordExtractor.extract_degree_requirements(self.text)
+    
+    @cached_property
+    def tools(self) -> List[str]:
+        jd_lower = self.text.lower()
+        return [tool for tools in KeywordExtractor.TECH_STACK.values() for tool in tools if tool in jd_lower]
+    
+    @cached_property
+    def target_role(self) -> str:
+        # The first line of a JD is taken to be the role title
+        return self.text.split('\n')[0].lower()
+    
+    def to_dict(self) -> Dict:
+        """Every feature, extracting any not yet computed."""
+        return {name: getattr(self, name) for name in self.FIELDS}
+    
+    @classmethod
+    def from_dict(cls, text: str, features: Dict) -> 'JobFeatures':
+        job = cls(text)
+        for name in cls.FIELDS:
+            if name in features:
+                job.__dict__[name] = features[name]
+        return job
+
+
+class ResumeFeatures:
+    """Parsed structure of a resume, built on first use and reusable across JDs."""
+    
+    def __init__(self, text: str, sections: Optional[SectionIndex] = None):
+        self.text = text
+        if sections is not None:
+            self.__dict__['sections'] = sections
+    
+    @classmethod
+    def of(cls, resume: Union[str, 'ResumeFeatures'], sections: Optional[SectionIndex] = None) -> 'ResumeFeatures':
+        return resume if isinstance(resume, ResumeFeatures) else cls(resume, sections)
+    
+    @cached_property
+    def sections(self) -> SectionIndex:
+        return SectionSegmenter.segment(self.text)
+    
+    @cached_property
+    def experiences(self) -> List[Dict]:
+        return ResumeParser.extract_work_experience(self.text, self.sections)
+    
+    @cached_property
+    def education(self) -> List[Dict]:
+        return ResumeParser.extract_education(self.text, self.sections)
+    
+    @cached_property
+    def total_years(self) -> float:
+        return ResumeParser.calculate_total_years(self.experiences)
+    
+    @cached_property
+    def terms(self) -> Set[str]:
+        """Taxonomy terms, tools and acronyms mentioned in the resume."""
+        resume_lower = self.text.lower()
+        tools = {tool for tools in KeywordExtractor.TECH_STACK.values() for tool in tools if tool in resume_lower}
+        return set(KeywordExtractor._extract_tech_terms(self.text)) | tools
+
+
+@dataclass(frozen=True)
+class Artifact:
+    """A value derived from the resume or JD, built at most once per analysis and shared by stages."""
+    name: str
+    inputs: Tuple[str, ...]
+    build: Callable[['ScoringEngine', ResumeFeatures, JobFeatures, Dict[str, Any]], Any]
+    metric: Optional[str] = None  # timed_stage label; None for values that cost nothing
+
+
+@dataclass(frozen=True)
+class Stage:
+    """A scoring category: the artifacts it reads and how it scores from them."""
+    name: str
+    inputs: Tuple[str, ...]
+    score: Callable[['ScoringEngine', Dict[str, Any], bool], 'CategoryScore']
+
+
+# Registration order is build order for artifacts and result order for stages;
+# inputs must already be registered, so both always form a DAG
+ARTIFACTS: Dict[str, Artifact] = {}
+STAGES: Dict[str, Stage] = {}
+
+
+def register_artifact(name: str, inputs: Iterable[str], build: Callable, metric: Optional[str] = None) -> Artifact:
+    """Register a shared artifact built by ``build(engine, resume, job, inputs)``."""
+    artifact = Artifact(name, tuple(inputs), build, metric)
+    _check_registration(name, artifact.inputs)
+    ARTIFACTS[name] = artifact
+    return artifact
+
+
+def register_stage(name: str, inputs: Iterable[str], score: Callable) -> Stage:
+    """
+    Register a scoring category computed by ``score(engine, inputs, with_evidence)``.
+    
+    The category takes part in the overall score with the weight given
+    under its name; engines without a weight for it skip it.
+    """
+    stage = Stage(name, tuple(inputs), score)
+    _check_registration(name, stage.inputs)
+    STAGES[name] = stage
+    return stage
+
+
+def _check_registration(name: str, inputs: Tuple[str, ...]) -> None:
+    if name in ARTIFACTS or name in STAGES:
+        raise ValueError(f"Stage or artifact already registered: {name}")
+    unknown = [dep for dep in inputs if dep not in ARTIFACTS]
+    if unknown:
+        raise ValueError(f"{name} depends on unregistered artifacts: {', '.join(unknown)}")
+
+
+class StageContext:
+    """Artifacts of one analysis, built on demand with their timings."""
+    
+    def __init__(self, engine: 'ScoringEngine', resume: ResumeFeatures, job: JobFeatures):
+        self.engine = engine
+        self.resume = resume
+        self.job = job
+        self.values: Dict[str, Any] = {}
+        self.timings: Dict[str, float] = {}
+    
+    def resolve(self, names: Iterable[str]) -> Dict[str, Any]:
+        """Build ``names`` and everything they depend on, each once, in registration order."""
+        needed = set()
+        pending = [name for name in names if name not in self.values]
+        while pending:
+            name = pending.pop()
+            if name not in needed:
+                needed.add(name)
+                pending.extend(dep for dep in ARTIFACTS[name].inputs if dep not in self.values)
+        for name, artifact in ARTIFACTS.items():
+            if name not in needed:
+                continue
+            inputs = {dep: self.values[dep] for dep in artifact.inputs}
+            if artifact.metric is None:
+                self.values[name] = artifact.build(self.engine, self.resume, self.job, inputs)
+                continue
+            start = time.perf_counter()
+            with timed_stage(artifact.metric):
+                self.values[name] = artifact.build(self.engine, self.resume, self.job, inputs)
+            self.timings[name] = time.perf_counter() - start
+        return self.values
+    
+    def inputs(self, stage: Stage) -> Dict[str, Any]:
+        self.resolve(stage.inputs)
+        return {name: self.values[name] for name in stage.inputs}
+
+
+# Threads shared by engines that run stages concurrently, one pool per size, created on first use
+_stage_pools: Dict[int, ThreadPoolExecutor] = {}
+_stage_pools_lock = threading.Lock()
+
+
+def _get_stage_pool(workers: int) -> ThreadPoolExecutor:
+    # Pools are never shut down: another engine may be mapping stages on one right now
+    with _stage_pools_lock:
+        pool = _stage_pools.get(workers)
+        if pool is None:
+            pool = _stage_pools[workers] = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix=f'scoring-stage-{workers}'
+            )
+        return pool
+
+
 class ScoringEngine:
     """Main scoring engine for ATS resume analysis."""
     
-    def __init__(self, weights: Optional[Dict[str, float]] = None, strict_mode: bool = False):
-        """Initialize scoring engine with optional custom weights."""
+    def __init__(
+        self,
+        weights: Optional[Dict[str, float]] = None,
+        strict_mode: bool = False,
+        detail_level: str = 'full',
+        stage_workers: int = 1
+    ):
+        """
+        Initialize scoring engine with optional custom weights.
+        
+        With ``stage_workers`` > 1, independent category stages run on that
+        many threads. That only pays off when stages release the GIL (a
+        free-threaded build, or stages doing native work); pure-Python
+        stages are faster run in sequence, which is the default.
+        """
+        if detail_level not in DETAIL_LEVELS:
+            raise ValueError(f"Unknown detail level: {detail_level}")
         self.weights = weights or self._default_weights()
         self.strict_mode = strict_mode
+        self.detail_level = detail_level
+        self.stage_workers = stage_workers
     
     @staticmethod
     def _default_weights() -> Dict[str, float]:
@@ -307,53 +650,55 @@ class ScoringEngine:
     
     def analyze(
         self,
-        resume_text: str,
-        jd_text: str,
-        settings: Optional[Dict] = None
+        resume_text: Union[str, ResumeFeatures],
+        jd_text: Union[str, JobFeatures],
+        settings: Optional[Dict] = None,
+        sections: Optional[SectionIndex] = None
     ) -> AnalysisResult:
-        """Run complete analysis of resume against job description."""
-        
-        # Extract keywords from JD
-        must_haves = KeywordExtractor.extract_must_haves(jd_text)
-        nice_to_haves = KeywordExtractor.extract_nice_to_haves(jd_text)
-        
-        # Parse resume
-        experiences = ResumeParser.extract_work_experience(resume_text)
-        education = ResumeParser.extract_education(resume_text)
-        total_years = ResumeParser.calculate_total_years(experiences)
-        
-        # Score each category
-        scores = {}
-        
-        scores['keyword_skills'] = self._score_keyword_skills(
-            resume_text, must_haves, nice_to_haves
-        )
-        scores['experience_relevance'] = self._score_experience_relevance(
-            resume_text, experiences, jd_text
-        )
-        scores['role_match'] = self._score_role_match(
-            resume_text, experiences, jd_text
-        )
-        scores['seniority_match'] = self._score_seniority_match(
-            total_years, jd_text
-        )
-        scores['education_match'] = self._score_education_match(
-            education, jd_text
-        )
-        scores['tooling_stack_match'] = self._score_tooling_match(
-            resume_text, jd_text
-        )
-        scores['recency_match'] = self._score_recency_match(experiences)
-        
-        # Detect red flags
-        red_flags = self._detect_red_flags(
-            resume_text, experiences, must_haves
-        )
-        scores['red_flags'] = CategoryScore(
-            score=max(0, 100 - len(red_flags) * 15),
-            details={'flags_count': len(red_flags)},
-            evidence=red_flags
+        """
+        Run complete analysis of resume against job description.
+        
+        ``sections`` may be a previously built SectionIndex for the resume,
+        in which case the resume is not segmented again. The resume and JD
+        may also be given as ResumeFeatures/JobFeatures to reuse parsing
+        across analyses. Below the 'full' detail level, category evidence
+        and actions are left empty and are available per part from
+        ``explain()``.
+        """
+        with timed_stage('analyze'):
+            return self._analyze(resume_text, jd_text, settings, sections)
+    
+    def _analyze(
+        self,
+        resume_text: Union[str, ResumeFeatures],
+        jd_text: Union[str, JobFeatures],
+        settings: Optional[Dict],
+        sections: Optional[SectionIndex]
+    ) -> AnalysisResult:
+        job = JobFeatures.of(jd_text)
+        resume = ResumeFeatures.of(resume_text, sections)
+        resume_text = resume.text
+        full = self.detail_level == 'full'
+        
+        # Categories without weight cannot move the overall score; skip them
+        active = [stage for stage in STAGES.values() if self.weights.get(stage.name)]
+        
+        # Build every shared artifact up front, so stages only read them;
+        # red flags and keyword lists are part of the result either way
+        context = StageContext(self, resume, job)
+        context.resolve(
+            [name for stage in active for name in stage.inputs]
+            + ['detected_red_flags', 'must_haves', 'nice_to_haves']
         )
+        must_haves = context.values['must_haves']
+        nice_to_haves = context.values['nice_to_haves']
+        red_flags = context.values['detected_red_flags']
+        
+        computed = self._run_stages(active, context, full)
+        scores = {
+            name: computed.get(name) or CategoryScore(score=0.0, details={'skipped': True})
+            for name in STAGES
+        }
         
         # Calculate overall score
         overall_score = self._calculate_overall_score(scores)
@@ -366,17 +711,29 @@ class ScoringEngine:
         label = self._get_label(overall_score)
         
         # Generate actions
-        actions = self._generate_actions(
-            resume_text, jd_text, must_haves, nice_to_haves, scores
-        )
+        timings = context.timings
+        if full:
+            start = time.perf_counter()
+            with timed_stage('generate_actions'):
+                actions = self._generate_actions(
+                    resume_text, job.text, must_haves, nice_to_haves, scores
+                )
+            timings['actions'] = time.perf_counter() - start
+        else:
+            actions = self._empty_actions()
         
         # Create keyword matches
-        must_have_matches = self._create_keyword_matches(
-            resume_text, must_haves, 'must-have'
-        )
-        nice_to_have_matches = self._create_keyword_matches(
-            resume_text, nice_to_haves, 'nice-to-have'
-        )
+        must_have_matches, nice_to_have_matches = [], []
+        if self.detail_level != 'scores':
+            start = time.perf_counter()
+            with timed_stage('keyword_matches'):
+                must_have_matches = self._create_keyword_matches(
+                    resume_text, must_haves, 'must-have', with_evidence=full
+                )
+                nice_to_have_matches = self._create_keyword_matches(
+                    resume_text, nice_to_haves, 'nice-to-have', with_evidence=full
+                )
+            timings['keyword_matches'] = time.perf_counter() - start
         
         return AnalysisResult(
             overall_score=overall_score,
@@ -387,23 +744,87 @@ class ScoringEngine:
             red_flags=red_flags,
             actions=actions,
             metadata={
-                'version': '1.0.0',
+                'version': ENGINE_VERSION,
+                'detail_level': self.detail_level,
                 'timestamp': datetime.now().isoformat(),
                 'settings_used': {
                     'strict_mode': self.strict_mode,
                     'weights': self.weights
-                }
+                },
+                'skipped_categories': [name for name in STAGES if name not in computed],
+                'stage_timings_ms': {name: round(seconds * 1000, 3) for name, seconds in timings.items()}
             }
         )
     
+    def _run_stages(self, stages: List[Stage], context: StageContext, with_evidence: bool) -> Dict[str, CategoryScore]:
+        """Score ``stages`` from already built artifacts, recording each stage's time."""
+        def run(stage: Stage) -> Tuple[CategoryScore, float]:
+            start = time.perf_counter()
+            with timed_stage(f'score_{stage.name}'):
+                category = stage.score(self, inputs[stage.name], with_evidence)
+            return category, time.perf_counter() - start
+        
+        inputs = {stage.name: context.inputs(stage) for stage in stages}
+        if self.stage_workers > 1 and len(stages) > 1:
+            # Pool threads do not inherit the profiling trace; stage metrics are still recorded
+            outcomes = list(_get_stage_pool(self.stage_workers).map(run, stages))
+        else:
+            outcomes = [run(stage) for stage in stages]
+        
+        scores = {}
+        for stage, (category, seconds) in zip(stages, outcomes):
+            scores[stage.name] = category
+            context.timings[stage.name] = seconds
+        return scores
+    
+    def explain(
+        self,
+        resume_text: Union[str, ResumeFeatures],
+        jd_text: Union[str, JobFeatures],
+        part: str,
+        sections: Optional[SectionIndex] = None
+    ) -> Dict:
+        """
+        Build the full explanation for one part of a result.
+        
+        ``part`` is a category name, 'keywords' for the keyword matches with
+        snippets, or 'actions' for the recommendations. Only the artifacts
+        that part reads are built, except for 'actions', which needs every
+        score.
+        """
+        if part not in STAGES and part not in ('keywords', 'actions'):
+            raise ValueError(f"Unknown result part: {part}")
+        
+        if part == 'actions':
+            engine = ScoringEngine(self.weights, self.strict_mode, 'full')
+            return {'actions': engine.analyze(resume_text, jd_text, sections=sections).actions}
+        
+        job = JobFeatures.of(jd_text)
+        resume = ResumeFeatures.of(resume_text, sections)
+        resume_text = resume.text
+        if part == 'keywords':
+            return {
+                'must_have': [asdict(kw) for kw in self._create_keyword_matches(resume_text, job.must_haves, 'must-have')],
+                'nice_to_have': [asdict(kw) for kw in self._create_keyword_matches(resume_text, job.nice_to_haves, 'nice-to-have')],
+            }
+        
+        stage = STAGES[part]
+        category = stage.score(self, StageContext(self, resume, job).inputs(stage), True)
+        
+        return {'score': category.score, 'details': category.details, 'evidence': category.evidence}
+    
     def _score_keyword_skills(
         self,
         resume_text: str,
         must_haves: List[str],
-        nice_to_haves: List[str]
+        nice_to_haves: List[str],
+        sections: Optional[SectionIndex] = None,
+        with_evidence: bool = True
     ) -> CategoryScore:
         """Score A: Keyword & skills match."""
         resume_lower = resume_text.lower()
+        if sections is None:
+            sections = SectionSegmenter.segment(resume_text)
         
         matched_must = sum(1 for kw in must_haves if kw.lower() in resume_lower)
         matched_nice = sum(1 for kw in nice_to_haves if kw.lower() in resume_lower)
@@ -418,12 +839,15 @@ class ScoringEngine:
         
         score = min(100, max(0, score))
         
-        # Collect evidence
+        # Collect evidence and the section each must-have was first found in
         evidence = []
-        for kw in must_haves:
-            if kw.lower() in resume_lower:
+        keyword_sections = {}
+        for kw in (must_haves if with_evidence else []):
+            idx = resume_lower.find(kw.lower())
+            if idx != -1:
                 snippet = TextPreprocessor.find_snippet(resume_text, kw)
                 evidence.append(f"[+] {kw}: {snippet}")
+                keyword_sections[kw] = sections.section_at(idx)
 
         return CategoryScore(
             score=score,
@@ -431,7 +855,8 @@ class ScoringEngine:
                 'matched_must': matched_must,
                 'total_must': total_must,
                 'matched_nice': matched_nice,
-                'total_nice': total_nice
+                'total_nice': total_nice,
+                'keyword_sections': keyword_sections
             },
             evidence=evidence
         )
@@ -440,13 +865,14 @@ class ScoringEngine:
         self,
         resume_text: str,
         experiences: List[Dict],
-        jd_text: str
+        jd_text: Union[str, JobFeatures],
+        with_evidence: bool = True
     ) -> CategoryScore:
         """Score B: Experience relevance match."""
         if not experiences:
             return CategoryScore(score=0, details={'error': 'No experience found'})
         
-        role_keywords = KeywordExtractor.extract_role_keywords(jd_text)
+        role_keywords = JobFeatures.of(jd_text).role_keywords
         tech_terms = []
         for category, items in KeywordExtractor.TECH_STACK.items():
             tech_terms.extend(items)
@@ -474,7 +900,7 @@ class ScoringEngine:
             relevance = (matches / max(len(role_keywords) + len(tech_terms), 1)) * weight
             total_score += relevance
             
-            if matches > 0:
+            if matches > 0 and with_evidence:
                 evidence.append(f"[+] {exp['title']} ({exp['start_year']}-{exp['end_year']}): {matches} relevant keywords")
         
         score = min(100, (total_score / len(experiences)) * 100)
@@ -489,31 +915,37 @@ class ScoringEngine:
         self,
         resume_text: str,
         experiences: List[Dict],
-        jd_text: str
+        jd_text: Union[str, JobFeatures],
+        with_evidence: bool = True
     ) -> CategoryScore:
         """Score C: Role/title match."""
         resume_roles = [exp['title'].lower() for exp in experiences if experiences]
         
         # Extract target role from JD (first meaningful sentence)
-        jd_lines = jd_text.split('\n')
-        target_role = jd_lines[0].lower() if jd_lines else ""
+        target_role = JobFeatures.of(jd_text).target_role
         
         score = 0
         evidence = []
+        overlap = False
         
         for role in resume_roles:
             # Exact match
             if role in target_role or target_role in role:
                 score = 95
-                evidence.append(f"[+] Exact role match: {role}")
+                overlap = True
+                if with_evidence:
+                    evidence.append(f"[+] Exact role match: {role}")
             # Partial match
             elif any(keyword in role for keyword in ['engineer', 'developer', 'analyst', 'lead']):
                 score = max(score, 70)
-                evidence.append(f"[~] Adjacent role: {role}")
+                overlap = True
+                if with_evidence:
+                    evidence.append(f"[~] Adjacent role: {role}")
         
-        if not evidence:
+        if not overlap:
             score = 20
-            evidence.append(f"[-] Limited role overlap")
+            if with_evidence:
+                evidence.append(f"[-] Limited role overlap")
         
         return CategoryScore(
             score=score,
@@ -524,16 +956,17 @@ class ScoringEngine:
     def _score_seniority_match(
         self,
         total_years: float,
-        jd_text: str
+        jd_text: Union[str, JobFeatures],
+        with_evidence: bool = True
     ) -> CategoryScore:
         """Score D: Seniority/years match."""
-        required_years = KeywordExtractor.extract_years_required(jd_text)
+        required_years = JobFeatures.of(jd_text).required_years
         
         if required_years is None:
             return CategoryScore(
                 score=50,
                 details={'warning': 'Could not extract required years'},
-                evidence=['Unable to determine exact requirement']
+                evidence=['Unable to determine exact requirement'] if with_evidence else []
             )
         
         gap = total_years - required_years
@@ -545,7 +978,7 @@ class ScoringEngine:
         else:
             score = max(0, 60 + (gap * 20))
         
-        evidence = [f"Resume: {total_years:.1f} years, Required: {required_years} years"]
+        evidence = [f"Resume: {total_years:.1f} years, Required: {required_years} years"] if with_evidence else []
         
         return CategoryScore(
             score=max(0, min(100, score)),
@@ -560,23 +993,24 @@ class ScoringEngine:
     def _score_education_match(
         self,
         education: List[Dict],
-        jd_text: str
+        jd_text: Union[str, JobFeatures],
+        with_evidence: bool = True
     ) -> CategoryScore:
         """Score E: Education/certs match."""
-        required_degrees = KeywordExtractor.extract_degree_requirements(jd_text)
+        required_degrees = JobFeatures.of(jd_text).degrees
         
         if not required_degrees:
             return CategoryScore(
                 score=75,
                 details={'no_requirement': True},
-                evidence=['No specific degree requirement in JD']
+                evidence=['No specific degree requirement in JD'] if with_evidence else []
             )
         
         if not education:
             return CategoryScore(
                 score=30,
                 details={'missing_education': True},
-                evidence=['No education found in resume']
+                evidence=['No education found in resume'] if with_evidence else []
             )
         
         found_degrees = set(e['type'] for e in education)
@@ -584,7 +1018,7 @@ class ScoringEngine:
         
         score = (matched / len(required_degrees)) * 100 if required_degrees else 50
         
-        evidence = [f"Found: {', '.join(found_degrees)}"]
+        evidence = [f"Found: {', '.join(found_degrees)}"] if with_evidence else []
         
         return CategoryScore(
             score=score,
@@ -598,7 +1032,8 @@ class ScoringEngine:
     def _score_tooling_match(
         self,
         resume_text: str,
-        jd_text: str
+        jd_text: Union[str, JobFeatures],
+        with_evidence: bool = True
     ) -> CategoryScore:
         """Score F: Tooling/stack match."""
         resume_lower = resume_text.lower()
@@ -609,24 +1044,19 @@ class ScoringEngine:
                 if tool in resume_lower:
                     matched_tools.append(tool)
         
-        jd_lower = jd_text.lower()
-        jd_tools = []
-        for category, tools in KeywordExtractor.TECH_STACK.items():
-            for tool in tools:
-                if tool in jd_lower:
-                    jd_tools.append(tool)
+        jd_tools = JobFeatures.of(jd_text).tools
         
         if not jd_tools:
             return CategoryScore(
                 score=50,
                 details={'no_tools_in_jd': True},
-                evidence=['No specific tools mentioned in JD']
+                evidence=['No specific tools mentioned in JD'] if with_evidence else []
             )
         
         matched = sum(1 for tool in jd_tools if tool in matched_tools)
         score = (matched / len(jd_tools)) * 100
         
-        evidence = [f"Matched {matched}/{len(jd_tools)} required tools"]
+        evidence = [f"Matched {matched}/{len(jd_tools)} required tools"] if with_evidence else []
         
         return CategoryScore(
             score=score,
@@ -639,7 +1069,8 @@ class ScoringEngine:
     
     def _score_recency_match(
         self,
-        experiences: List[Dict]
+        experiences: List[Dict],
+        with_evidence: bool = True
     ) -> CategoryScore:
         """Score G: Recency match."""
         if not experiences:
@@ -649,7 +1080,7 @@ class ScoringEngine:
         recent_count = sum(1 for exp in experiences if exp['recency'] <= 3)
         score = (recent_count / len(experiences)) * 100
         
-        evidence = [f"{recent_count} roles within last 3 years"]
+        evidence = [f"{recent_count} roles within last 3 years"] if with_evidence else []
         
         return CategoryScore(
             score=score,
@@ -661,11 +1092,14 @@ class ScoringEngine:
         self,
         resume_text: str,
         experiences: List[Dict],
-        must_haves: List[str]
+        must_haves: List[str],
+        sections: Optional[SectionIndex] = None
     ) -> List[str]:
         """Score H: Detect red flags."""
         flags = []
         resume_lower = resume_text.lower()
+        if sections is None:
+            sections = SectionSegmenter.segment(resume_text)
         
         # Missing must-haves
         missing_must = [kw for kw in must_haves if kw.lower() not in resume_lower]
@@ -683,14 +1117,28 @@ class ScoringEngine:
             if gap > 1:
                 flags.append(f"Employment gap: {gap} years ({experiences[i + 1]['end_year']}-{experiences[i]['start_year']})")
         
-        # Over-claiming detection
+        # Over-claiming detection, scoped to the section the weak claim appears in
         weak_keywords = ['familiar with', 'knowledge of', 'basic', 'some experience']
         for keyword in weak_keywords:
-            if keyword in resume_lower and any(must in resume_lower for must in must_haves):
+            idx = resume_lower.find(keyword)
+            if idx == -1:
+                continue
+            section = sections.containing(idx)
+            scope = resume_lower[section.start:section.end] if section else resume_lower
+            if any(must in scope for must in must_haves):
                 flags.append(f"Weak claim detected: '{keyword}' used for required skills")
         
         return flags
     
+    @staticmethod
+    def _red_flags_score(red_flags: List[str], with_evidence: bool = True) -> CategoryScore:
+        """Score H from the detected red flags."""
+        return CategoryScore(
+            score=max(0, 100 - len(red_flags) * 15),
+            details={'flags_count': len(red_flags)},
+            evidence=list(red_flags) if with_evidence else []
+        )
+    
     def _calculate_overall_score(self, scores: Dict[str, CategoryScore]) -> float:
         """Calculate weighted overall score."""
         total = 0
@@ -753,11 +1201,22 @@ class ScoringEngine:
             'ats_keywords_to_add': ats_keywords
         }
     
+    @staticmethod
+    def _empty_actions() -> Dict:
+        """Actions placeholder for results analyzed below the 'full' detail level."""
+        return {
+            'good_fit_summary': [],
+            'gaps': [],
+            'resume_tailoring_suggestions': [],
+            'ats_keywords_to_add': []
+        }
+    
     def _create_keyword_matches(
         self,
         resume_text: str,
         keywords: List[str],
-        category: str
+        category: str,
+        with_evidence: bool = True
     ) -> List[KeywordMatch]:
         """Create keyword match objects."""
         matches = []
@@ -766,7 +1225,7 @@ class ScoringEngine:
         for keyword in keywords:
             matched = keyword.lower() in resume_lower
             evidence = ""
-            if matched:
+            if matched and with_evidence:
                 evidence = TextPreprocessor.find_snippet(resume_text, keyword)
             
             matches.append(KeywordMatch(
@@ -779,8 +1238,77 @@ class ScoringEngine:
         return matches
 
 
+# Shared artifacts; JobFeatures and ResumeFeatures cache the underlying parsing
+register_artifact('resume_text', (), lambda engine, resume, job, _: resume.text)
+register_artifact('job', (), lambda engine, resume, job, _: job)
+register_artifact('must_haves', (), lambda engine, resume, job, _: job.must_haves, metric='extract_jd_keywords')
+register_artifact('nice_to_haves', (), lambda engine, resume, job, _: job.nice_to_haves, metric='extract_jd_keywords')
+register_artifact('sections', (), lambda engine, resume, job, _: resume.sections, metric='parse_resume_sections')
+register_artifact('experiences', ('sections',), lambda engine, resume, job, _: resume.experiences,
+                  metric='parse_resume_sections')
+register_artifact('education', ('sections',), lambda engine, resume, job, _: resume.education,
+                  metric='parse_resume_sections')
+register_artifact('total_years', ('experiences',), lambda engine, resume, job, _: resume.total_years,
+                  metric='parse_resume_sections')
+register_artifact(
+    'detected_red_flags', ('resume_text', 'experiences', 'must_haves', 'sections'),
+    lambda engine, resume, job, a: engine._detect_red_flags(
+        a['resume_text'], a['experiences'], a['must_haves'], a['sections']
+    ),
+    metric='detect_red_flags'
+)
+
+# The eight built-in categories, in result order
+register_stage(
+    'keyword_skills', ('resume_text', 'must_haves', 'nice_to_haves', 'sections'),
+    lambda engine, a, evidence: engine._score_keyword_skills(
+        a['resume_text'], a['must_haves'], a['nice_to_haves'], a['sections'], with_evidence=evidence
+    )
+)
+register_stage(
+    'experience_relevance', ('resume_text', 'experiences', 'job'),
+    lambda engine, a, evidence: engine._score_experience_relevance(
+        a['resume_text'], a['experiences'], a['job'], with_evidence=evidence
+    )
+)
+register_stage(
+    'role_match', ('resume_text', 'experiences', 'job'),
+    lambda engine, a, evidence: engine._score_role_match(
+        a['resume_text'], a['experiences'], a['job'], with_evidence=evidence
+    )
+)
+register_stage(
+    'seniority_match', ('total_years', 'job'),
+    lambda engine, a, evidence: engine._score_seniority_match(a['total_years'], a['job'], with_evidence=evidence)
+)
+register_stage(
+    'education_match', ('education', 'job'),
+    lambda engine, a, evidence: engine._score_education_match(a['education'], a['job'], with_evidence=evidence)
+)
+register_stage(
+    'tooling_stack_match', ('resume_text', 'job'),
+    lambda engine, a, evidence: engine._score_tooling_match(a['resume_text'], a['job'], with_evidence=evidence)
+)
+register_stage(
+    'recency_match', ('experiences',),
+    lambda engine, a, evidence: engine._score_recency_match(a['experiences'], with_evidence=evidence)
+)
+register_stage(
+    'red_flags', ('detected_red_flags',),
+    lambda engine, a, evidence: engine._red_flags_score(a['detected_red_flags'], with_evidence=evidence)
+)
+
+# Parts of a result that ScoringEngine.explain() can build on demand
+EXPLAIN_PARTS = tuple(STAGES) + ('keywords', 'actions')
+
+
 def to_dict(result: AnalysisResult) -> Dict:
     """Convert AnalysisResult to dictionary."""
+    with timed_stage('to_dict'):
+        return _to_dict(result)
+
+
+def _to_dict(result: AnalysisResult) -> Dict:
     return {
         'overall_score': result.overall_score,
         'label': result.label,
@@ -0,0 +1,607 @@
+"""
+Analysis storage backends.
+
+The API keeps every analysis (result plus the texts it was computed from)
+so reports can be downloaded later. Stores are pluggable; the in-memory
+store is bounded by entry count, measured byte size and per-entry TTL.
+Texts can be kept in a shared, compressed blob store (see app.blobs) so
+each distinct text is held once however many analyses use it.
+"""
+
+import hashlib
+import json
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+import logging
+
+from app.blobs import BLOB_REFS, BlobStore, check_codec, decompress, join_entry, sqlite_blob_rows, split_entry
+from app.scoring_engine import TextPreprocessor
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisEvictedError(KeyError):
+    """Raised when an analysis existed but has been evicted from the store."""
+
+
+def content_hash(text: str) -> str:
+    """Hash text after normalization, so whitespace and case changes do not matter."""
+    return hashlib.sha256(TextPreprocessor.preprocess(text or "").encode('utf-8')).hexdigest()
+
+
+def encode_cursor(created_at: float, analysis_id: str) -> str:
+    """Build an opaque pagination cursor for history listings."""
+    return f"{created_at!r}:{analysis_id}"
+
+
+def decode_cursor(cursor: str) -> Tuple[float, str]:
+    """Parse a cursor produced by ``encode_cursor``."""
+    created_at, _, analysis_id = cursor.partition(':')
+    return float(created_at), analysis_id
+
+
+def _summary(analysis_id: str, created_at: float, jd_hash: str, score, label) -> Dict:
+    return {
+        'analysis_id': analysis_id,
+        'created_at': datetime.fromtimestamp(created_at).isoformat(),
+        'jd_hash': jd_hash,
+        'overall_score': score,
+        'label': label,
+    }
+
+
+def measure_size(obj, _seen: Optional[set] = None) -> int:
+    """Approximate the memory held by a JSON-like object, in bytes."""
+    if _seen is None:
+        _seen = set()
+    if id(obj) in _seen:
+        return 0
+    _seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            size += measure_size(key, _seen) + measure_size(value, _seen)
+    elif isinstance(obj, (list, tuple, set)):
+        for item in obj:
+            size += measure_size(item, _seen)
+    return size
+
+
+class AnalysisStore:
+    """Interface for analysis storage backends."""
+
+    def put(self, analysis_id: str, entry: Dict) -> None:
+        raise NotImplementedError
+
+    def get(self, analysis_id: str) -> Optional[Dict]:
+        """
+        Return the stored entry, or None if the id was never stored.
+
+        Raises AnalysisEvictedError if the entry existed but was evicted.
+        """
+        raise NotImplementedError
+
+    def find_by_key(self, input_key: str) -> Optional[str]:
+        """Return the id of a stored analysis with the given ``input_key``, if any."""
+        raise NotImplementedError
+
+    def list(self, limit: int = 50, cursor: Optional[str] = None, jd_hash: Optional[str] = None) -> Dict:
+        """
+        Return one page of analysis summaries, newest first.
+
+        The returned ``next_cursor`` is passed back to fetch the following page.
+        """
+        raise NotImplementedError
+
+    def iter_results(
+        self,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        jd_hash: Optional[str] = None,
+        batch_size: int = 1000
+    ) -> Iterator[Tuple[str, float, str, str]]:
+        """
+        Iterate ``(analysis_id, created_at, jd_hash, result_json)`` oldest first.
+
+        ``since``/``until`` are epoch seconds (inclusive/exclusive). Results are
+        returned as JSON text so exporters can pass them through unparsed.
+        """
+        raise NotImplementedError
+
+    def stats(self) -> Dict:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class MemoryAnalysisStore(AnalysisStore):
+    """
+    In-process store with LRU eviction.
+
+    Entries are evicted least-recently-used first whenever the store holds
+    more than ``max_entries`` entries or more than ``max_bytes`` bytes, and
+    expire ``ttl_seconds`` after they were stored. Ids of evicted entries are
+    remembered (up to ``max_tombstones``) so callers can tell "gone" from
+    "never existed".
+
+    With a ``text_codec``, texts are moved into a reference-counted blob
+    store compressed with that codec; shared blobs count against
+    ``max_bytes`` once. Without one, each entry holds its own texts.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        max_bytes: int = 256 * 1024 * 1024,
+        ttl_seconds: float = 24 * 3600,
+        max_tombstones: int = 100000,
+        text_codec: Optional[str] = None
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.max_tombstones = max_tombstones
+        self._blobs = BlobStore(text_codec) if text_codec else None
+
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # id -> (entry, size, expires_at, created_at, jd_hash)
+        self._tombstones: "OrderedDict[str, None]" = OrderedDict()
+        self._keys: Dict[str, str] = {}  # input_key -> id
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = {'lru': 0, 'bytes': 0, 'ttl': 0}
+        self._next_sweep = time.monotonic() + self._sweep_interval()
+
+    def put(self, analysis_id: str, entry: Dict) -> None:
+        jd_hash = content_hash(entry.get('jd_text', ''))
+        added = 0
+        if self._blobs is not None:
+            stored, _ = split_entry(entry)
+            # Compress outside the store lock; a shared text adds no bytes
+            for field, ref in stored[BLOB_REFS].items():
+                added += self._blobs.put(ref, entry[field])
+        else:
+            stored = entry
+        size = measure_size(stored)
+        now = time.monotonic()
+        with self._lock:
+            if analysis_id in self._entries:
+                self._remove(analysis_id)
+            self._tombstones.pop(analysis_id, None)
+            self._entries[analysis_id] = (stored, size, now + self.ttl_seconds, time.time(), jd_hash)
+            self._bytes += size + added
+            if entry.get('input_key'):
+                self._keys[entry['input_key']] = analysis_id
+
+            if now >= self._next_sweep:
+                self._sweep_expired(now)
+            while len(self._entries) > self.max_entries:
+                self._evict_oldest('lru')
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                self._evict_oldest('bytes')
+
+    def get(self, analysis_id: str) -> Optional[Dict]:
+        now = time.monotonic()
+        with self._lock:
+            item = self._entries.get(analysis_id)
+            if item is not None and item[2] <= now:
+                self._evict(analysis_id, 'ttl')
+                item = None
+
+            if item is None:
+                self._misses += 1
+                if analysis_id in self._tombstones:
+                    raise AnalysisEvictedError(analysis_id)
+                return None
+
+            self._hits += 1
+            self._entries.move_to_end(analysis_id)
+            stored = item[0]
+            if self._blobs is None:
+                return stored
+            # Take the blobs while the entry holds them; a concurrent eviction may release them next
+            blobs = {ref: self._blobs.compressed(ref) for ref in stored[BLOB_REFS].values()}
+        # Decompress outside the lock
+        return join_entry(stored, lambda ref: decompress(*blobs[ref]))
+
+    def find_by_key(self, input_key: str) -> Optional[str]:
+        with self._lock:
+            analysis_id = self._keys.get(input_key)
+            if analysis_id is None or self._entries[analysis_id][2] <= time.monotonic():
+                return None
+            return analysis_id
+
+    def list(self, limit: int = 50, cursor: Optional[str] = None, jd_hash: Optional[str] = None) -> Dict:
+        with self._lock:
+            rows = [
+                (item[3], key, item[4], item[0].get('result', {}))
+                for key, item in self._entries.items()
+                if not jd_hash or item[4] == jd_hash
+            ]
+        rows.sort(key=lambda row: (row[0], row[1]), reverse=True)
+        if cursor:
+            position = decode_cursor(cursor)
+            rows = [row for row in rows if (row[0], row[1]) < position]
+        rows = rows[:limit]
+
+        items = [
+            _summary(key, created_at, entry_jd_hash, result.get('overall_score'), result.get('label'))
+            for created_at, key, entry_jd_hash, result in rows
+        ]
+        next_cursor = encode_cursor(rows[-1][0], rows[-1][1]) if len(rows) == limit else None
+        return {'items': items, 'next_cursor': next_cursor}
+
+    def iter_results(
+        self,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        jd_hash: Optional[str] = None,
+        batch_size: int = 1000
+    ) -> Iterator[Tuple[str, float, str, str]]:
+        with self._lock:
+            rows = [
+                (key, item[3], item[4], item[0].get('result', {}))
+                for key, item in self._entries.items()
+                if (not jd_hash or item[4] == jd_hash)
+                and (since is None or item[3] >= since)
+                and (until is None or item[3] < until)
+            ]
+        rows.sort(key=lambda row: (row[1], row[0]))
+        for key, created_at, entry_jd_hash, result in rows:
+            yield key, created_at, entry_jd_hash, json.dumps(result)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'backend': 'memory',
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': round(self._hits / lookups, 4) if lookups else 0.0,
+                'evictions': dict(self._evictions),
+                'text_blobs': self._blobs.stats() if self._blobs is not None else None,
+            }
+
+    def _sweep_interval(self) -> float:
+        return max(1.0, self.ttl_seconds / 10)
+
+    def _sweep_expired(self, now: float) -> None:
+        expired = [key for key, item in self._entries.items() if item[2] <= now]
+        for key in expired:
+            self._evict(key, 'ttl')
+        self._next_sweep = now + self._sweep_interval()
+
+    def _evict_oldest(self, reason: str) -> None:
+        self._evict(next(iter(self._entries)), reason)
+
+    def _evict(self, analysis_id: str, reason: str) -> None:
+        self._remove(analysis_id)
+        self._evictions[reason] += 1
+        self._tombstones[analysis_id] = None
+        if len(self._tombstones) > self.max_tombstones:
+            self._tombstones.popitem(last=False)
+
+    def _remove(self, analysis_id: str) -> None:
+        entry, size = self._entries.pop(analysis_id)[:2]
+        self._bytes -= size
+        if self._blobs is not None:
+            for ref in entry[BLOB_REFS].values():
+                self._bytes -= self._blobs.release(ref)
+        if self._keys.get(entry.get('input_key')) == analysis_id:
+            del self._keys[entry['input_key']]
+
+
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS analyses (
+    id TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    jd_hash TEXT NOT NULL,
+    overall_score REAL,
+    label TEXT,
+    input_key TEXT,
+    entry TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_analyses_created ON analyses (created_at, id);
+CREATE INDEX IF NOT EXISTS idx_analyses_jd_hash ON analyses (jd_hash, created_at, id);
+CREATE TABLE IF NOT EXISTS text_blobs (
+    hash TEXT PRIMARY KEY,
+    codec TEXT NOT NULL,
+    raw_size INTEGER NOT NULL,
+    data BLOB NOT NULL
+);
+"""
+
+# Blob hashes this process has committed, remembered to skip recompressing them
+_KNOWN_BLOBS_MAX = 4096
+
+# Columns added after the first release, applied to existing databases
+_SQLITE_MIGRATIONS = [
+    ('input_key', "ALTER TABLE analyses ADD COLUMN input_key TEXT"),
+]
+
+_SQLITE_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_analyses_input_key ON analyses (input_key);
+"""
+
+
+def sqlite_path(database_url: str) -> str:
+    """Extract the file path from a ``sqlite:///`` database URL."""
+    prefix = 'sqlite:///'
+    if not database_url.startswith(prefix):
+        raise ValueError(f"Unsupported database URL (only sqlite is supported): {database_url}")
+    return database_url[len(prefix):]
+
+
+class SQLiteAnalysisStore(AnalysisStore):
+    """
+    Persistent store shared by every worker process.
+
+    The database runs in WAL mode so readers never block the writer. Each
+    thread reuses one connection. Concurrent ``put`` calls are group-committed:
+    whichever caller takes the write lock flushes every pending row in one
+    transaction, and all callers return once their row is durable, or raise
+    the error that failed the transaction holding it.
+
+    Texts are stored once per distinct content in ``text_blobs``, compressed
+    with ``text_codec``; analyses hold their hashes. With no codec, or for
+    rows written before blobs existed, texts are inline in the entry.
+
+    Row and blob totals in ``stats`` scan both tables, so they are cached
+    for ``stats_ttl`` seconds; metrics scrapes read the cached totals.
+    """
+
+    def __init__(self, path: str, text_codec: Optional[str] = 'zlib', stats_ttl: float = 30.0):
+        self.path = path
+        self.text_codec = check_codec(text_codec) if text_codec else None
+        self.stats_ttl = stats_ttl
+        self._totals: Optional[tuple] = None
+        self._totals_at = 0.0
+        self._totals_lock = threading.Lock()
+        self._local = threading.local()
+        self._known_blobs: "OrderedDict[str, None]" = OrderedDict()
+        self._pending: List[Tuple[List[tuple], Future]] = []
+        self._pending_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._transactions = 0
+        self._rows_written = 0
+        self._migrate()
+
+    def _migrate(self) -> None:
+        conn = self._conn()
+        conn.executescript(_SQLITE_SCHEMA)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(analyses)")}
+        for column, statement in _SQLITE_MIGRATIONS:
+            if column not in columns:
+                conn.execute(statement)
+        conn.executescript(_SQLITE_INDEXES)
+        # Close the setup connection so a preloading master never hands one to forked workers
+        self.close()
+
+    def _conn(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _row(self, analysis_id: str, entry: Dict) -> Tuple[tuple, List[tuple]]:
+        """Build the analysis row and the rows of any blobs not yet known to be stored."""
+        result = entry.get('result', {})
+        if self.text_codec is None:
+            stored, texts = entry, {}
+        else:
+            stored, texts = split_entry(entry)
+        row = (
+            analysis_id,
+            time.time(),
+            content_hash(entry.get('jd_text', '')),
+            result.get('overall_score'),
+            result.get('label'),
+            entry.get('input_key'),
+            json.dumps(stored),
+        )
+        return row, sqlite_blob_rows(texts, self.text_codec, self._known_blobs)
+
+    def put(self, analysis_id: str, entry: Dict) -> None:
+        self.put_many([(analysis_id, entry)])
+
+    def put_many(self, items: List[Tuple[str, Dict]]) -> None:
+        """Store several analyses; they are committed together with any pending writes."""
+        rows = [self._row(analysis_id, entry) for analysis_id, entry in items]
+        written: Future = Future()
+        with self._pending_lock:
+            self._pending.append((rows, written))
+        self._flush()
+        # Our rows went out in this caller's transaction or an earlier one; either way it has finished
+        written.result()
+
+    def _flush(self) -> None:
+        with self._write_lock:
+            with self._pending_lock:
+                pending, self._pending = self._pending, []
+            if not pending:
+                # Another caller already committed our rows
+                return
+            rows = [row for batch, _ in pending for row in batch]
+            blobs = [blob for _, row_blobs in rows for blob in row_blobs]
+            try:
+                self._commit([row for row, _ in rows], blobs)
+            except Exception as e:
+                # Every caller whose rows were in the transaction sees the failure
+                for _, written in pending:
+                    written.set_exception(e)
+                return
+            self._transactions += 1
+            self._rows_written += len(rows)
+            for blob in blobs:
+                self._known_blobs[blob[0]] = None
+                if len(self._known_blobs) > _KNOWN_BLOBS_MAX:
+                    self._known_blobs.popitem(last=False)
+            for _, written in pending:
+                written.set_result(None)
+
+    def _commit(self, rows: List[tuple], blobs: List[tuple]) -> None:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                "INSERT OR IGNORE INTO text_blobs (hash, codec, raw_size, data) VALUES (?, ?, ?, ?)",
+                blobs
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO analyses (id, created_at, jd_hash, overall_score, label, input_key, entry) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _fetch_blob(self, ref: str) -> str:
+        codec, data = self._conn().execute(
+            "SELECT codec, data FROM text_blobs WHERE hash = ?", (ref,)
+        ).fetchone()
+        return decompress(data, codec)
+
+    def get(self, analysis_id: str) -> Optional[Dict]:
+        row = self._conn().execute(
+            "SELECT entry FROM analyses WHERE id = ?", (analysis_id,)
+        ).fetchone()
+        if row is None:
+            self._misses += 1
+            return None
+        self._hits += 1
+        return join_entry(json.loads(row[0]), self._fetch_blob)
+
+    def find_by_key(self, input_key: str) -> Optional[str]:
+        row = self._conn().execute(
+            "SELECT id FROM analyses WHERE input_key = ? ORDER BY created_at DESC LIMIT 1", (input_key,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def list(self, limit: int = 50, cursor: Optional[str] = None, jd_hash: Optional[str] = None) -> Dict:
+        clauses, params = [], []
+        if jd_hash:
+            clauses.append("jd_hash = ?")
+            params.append(jd_hash)
+        if cursor:
+            clauses.append("(created_at, id) < (?, ?)")
+            params.extend(decode_cursor(cursor))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        rows = self._conn().execute(
+            f"SELECT id, created_at, jd_hash, overall_score, label FROM analyses {where} "
+            f"ORDER BY created_at DESC, id DESC LIMIT ?",
+            (*params, limit)
+        ).fetchall()
+
+        items = [_summary(*row) for row in rows]
+        next_cursor = encode_cursor(rows[-1][1], rows[-1][0]) if len(rows) == limit else None
+        return {'items': items, 'next_cursor': next_cursor}
+
+    def iter_results(
+        self,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        jd_hash: Optional[str] = None,
+        batch_size: int = 1000
+    ) -> Iterator[Tuple[str, float, str, str]]:
+        clauses, params = [], []
+        if jd_hash:
+            clauses.append("jd_hash = ?")
+            params.append(jd_hash)
+        if since is not None:
+            clauses.append("created_at >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("created_at < ?")
+            params.append(until)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        # A dedicated connection: streaming responses may resume the
+        # iterator on different threads
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        try:
+            cursor = conn.execute(
+                f"SELECT id, created_at, jd_hash, json_extract(entry, '$.result') FROM analyses {where} "
+                f"ORDER BY created_at, id",
+                params
+            )
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            conn.close()
+
+    def _table_totals(self) -> tuple:
+        """Analysis and blob totals, rescanned at most once per ``stats_ttl``."""
+        with self._totals_lock:
+            now = time.monotonic()
+            if self._totals is None or now - self._totals_at >= self.stats_ttl:
+                entries = self._conn().execute("SELECT COUNT(*) FROM analyses").fetchone()[0]
+                blobs = self._conn().execute(
+                    "SELECT COUNT(*), COALESCE(SUM(raw_size), 0), COALESCE(SUM(LENGTH(data)), 0) FROM text_blobs"
+                ).fetchone()
+                self._totals = (entries,) + tuple(blobs)
+                self._totals_at = now
+            return self._totals
+
+    def stats(self) -> Dict:
+        entries, blobs, raw_bytes, stored_bytes = self._table_totals()
+        lookups = self._hits + self._misses
+        return {
+            'backend': 'sqlite',
+            'path': self.path,
+            'entries': entries,
+            'hits': self._hits,
+            'misses': self._misses,
+            'hit_rate': round(self._hits / lookups, 4) if lookups else 0.0,
+            'transactions': self._transactions,
+            'rows_written': self._rows_written,
+            'text_blobs': {
+                'codec': self.text_codec,
+                'blobs': blobs,
+                'raw_bytes': raw_bytes,
+                'stored_bytes': stored_bytes,
+            },
+        }
+
+    def close(self) -> None:
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+def create_store(config) -> AnalysisStore:
+    """Build the analysis store selected by the application settings."""
+    if config.enable_database:
+        return SQLiteAnalysisStore(sqlite_path(config.database_url), text_codec=config.store_text_codec)
+    return MemoryAnalysisStore(
+        max_entries=config.store_max_entries,
+        max_bytes=config.store_max_bytes,
+        ttl_seconds=config.store_ttl_seconds,
+        text_codec=config.store_text_codec
+    )
@@ -0,0 +1,104 @@
+"""
+Process warm-up before serving requests.
+
+Imports the lazily loaded parser and report libraries, compiles the
+engine's regexes and builds report styles by running a tiny analysis and
+render end to end. Under gunicorn with ``preload_app`` this runs once in
+the master, so forked workers share the warmed pages copy-on-write;
+otherwise each worker runs it at startup. The health endpoint reports
+ready only once warm-up has finished.
+"""
+
+import importlib
+import logging
+import threading
+import time
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+# Libraries imported lazily inside the request path
+LAZY_MODULES = (
+    'pdfplumber',
+    'pdfminer.high_level',
+    'docx',
+    'reportlab.platypus',
+    'reportlab.lib.styles',
+)
+
+_WARMUP_RESUME = """JANE DOE
+
+PROFESSIONAL EXPERIENCE
+Data Engineer, 2019 - 2023
+- Built ETL pipelines using Python, SQL and Spark on AWS
+
+EDUCATION
+Bachelor of Science in Computer Science
+"""
+
+_WARMUP_JD = """Data Engineer
+Required: 3+ years of experience with Python and SQL. Bachelor degree.
+Preferred: Docker and Kubernetes are a plus.
+"""
+
+_ready = threading.Event()
+_lock = threading.Lock()
+_timings: Dict[str, float] = {}
+
+
+def is_ready() -> bool:
+    """Whether warm-up has completed in this process."""
+    return _ready.is_set()
+
+
+def timings() -> Dict[str, float]:
+    """Milliseconds spent in each warm-up step."""
+    return dict(_timings)
+
+
+def warm_up() -> Dict[str, float]:
+    """Run warm-up once per process and return the time spent per step."""
+    with _lock:
+        if _ready.is_set():
+            return timings()
+
+        def step(name, func):
+            start = time.perf_counter()
+            try:
+                func()
+            except Exception as e:
+                # A missing optional library must not keep the app from serving
+                logger.warning(f"Warm-up step {name} failed: {str(e)}")
+            _timings[name] = round((time.perf_counter() - start) * 1000, 2)
+
+        for module in LAZY_MODULES:
+            step(f"import:{module}", lambda module=module: importlib.import_module(module))
+        step('build_styles', _build_styles)
+        step('analysis', _run_analysis)
+        step('render_reports', _render_reports)
+
+        _ready.set()
+        logger.info(f"Warm-up finished in {sum(_timings.values()):.0f} ms")
+        return timings()
+
+
+def _build_styles() -> None:
+    from app.pdf_generator import build_styles
+    build_styles()
+
+
+def _run_analysis() -> None:
+    from app.scoring_engine import ScoringEngine
+    # Fills the re module's pattern cache for every regex the engine uses
+    ScoringEngine().analyze(_WARMUP_RESUME, _WARMUP_JD)
+
+
+def _render_reports() -> None:
+    from app.pdf_generator import _render_pdf_report
+    from app.reports import render_markdown_report
+    from app.scoring_engine import ScoringEngine, to_dict
+
+    result = to_dict(ScoringEngine().analyze(_WARMUP_RESUME, _WARMUP_JD))
+    render_markdown_report(result)
+    # Rendered in-process: the batch process pool must not be started before a fork
+    _render_pdf_report(result, 'warmup')
@@ -0,0 +1,380 @@
+"""
+End-to-end load test against a local multi-worker server.
+
+Boots the app under uvicorn with ``--workers`` processes on a free local
+port, then drives it over plain HTTP at increasing concurrency:
+
+    python -m benchmarks.loadtest --workers 4 --concurrency 1,4,16 --duration 20
+
+Each concurrency level reports throughput, p50/p95/p99 latency and error
+rate per operation, and worker RSS is sampled from /proc throughout. The
+per-level summaries form the capacity curve. Everything runs offline; the
+server uses a throwaway SQLite store so any worker can serve any report.
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+from benchmarks.synthetic import make_docx, make_jd, make_pdf, make_resume
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MIX = 'analyze=5,upload=2,report_json=2,report_markdown=1,report_html=1,report_pdf=1'
+OPERATIONS = ('analyze', 'upload', 'report_json', 'report_markdown', 'report_html', 'report_pdf')
+
+# Scoring must actually run, so memoized results are bypassed
+ANALYSIS_SETTINGS = json.dumps({'use_cache': False})
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    """Parse ``op=weight,...`` into a weight per operation."""
+    weights = {}
+    for part in mix.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise ValueError(f"Unknown operation in mix: {name}")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+def percentile(sorted_values: List[float], fraction: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _multipart(fields: Dict[str, str], files: Dict[str, Tuple[str, bytes]]) -> Tuple[bytes, str]:
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode('utf-8')
+        )
+    for name, (filename, content) in files.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+            f'Content-Type: application/octet-stream\r\n\r\n'.encode('utf-8') + content + b'\r\n'
+        )
+    parts.append(f'--{boundary}--\r\n'.encode('utf-8'))
+    return b''.join(parts), f'multipart/form-data; boundary={boundary}'
+
+
+class Server:
+    """A uvicorn server with several workers running in a child process."""
+
+    def __init__(self, workers: int, port: int, env: Optional[Dict[str, str]] = None):
+        self.workers = workers
+        self.port = port
+        self.env = env or {}
+        self.process: Optional[subprocess.Popen] = None
+        self._tmpdir = tempfile.mkdtemp(prefix='ats-loadtest-')
+
+    def start(self, timeout: float = 60) -> None:
+        env = dict(os.environ)
+        env.update({
+            'ENABLE_DATABASE': 'true',
+            'DATABASE_URL': 'sqlite:///' + os.path.join(self._tmpdir, 'analyses.db'),
+            'JOB_QUEUE_PATH': os.path.join(self._tmpdir, 'jobs.db'),
+            'PRERENDER_PDF_REPORTS': 'false',
+            # Every load client shares one address, so the per-client limit would throttle the test itself
+            'CLIENT_RATE_PER_SECOND': '0',
+            'LOG_LEVEL': 'WARNING',
+        })
+        env.update(self.env)
+        self.process = subprocess.Popen(
+            [sys.executable, '-m', 'uvicorn', 'app.main:app', '--host', '127.0.0.1',
+             '--port', str(self.port), '--workers', str(self.workers), '--log-level', 'warning'],
+            cwd=BACKEND_DIR, env=env
+        )
+
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"Server exited with code {self.process.returncode}")
+            try:
+                conn = http.client.HTTPConnection('127.0.0.1', self.port, timeout=2)
+                conn.request('GET', '/api/health')
+                if conn.getresponse().status == 200 and len(self.worker_pids()) >= self.workers:
+                    return
+            except OSError:
+                pass
+            time.sleep(0.2)
+        raise RuntimeError("Server did not become healthy in time")
+
+    def worker_pids(self) -> List[int]:
+        """Pids of the worker processes, read from /proc."""
+        if self.process is None:
+            return []
+        pids = []
+        for entry in os.listdir('/proc'):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f'/proc/{entry}/stat') as f:
+                    # The command name may contain spaces; ppid follows the closing paren
+                    ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+                with open(f'/proc/{entry}/cmdline', 'rb') as f:
+                    cmdline = f.read()
+            except (OSError, ValueError, IndexError):
+                continue
+            if ppid == self.process.pid and b'resource_tracker' not in cmdline:
+                pids.append(int(entry))
+        return sorted(pids)
+
+    def stop(self) -> None:
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        shutil.rmtree(self._tmpdir, ignore_errors=True)
+
+
+def read_rss_kb(pid: int) -> Optional[int]:
+    """Resident set size of a process in KiB, or None if it is gone."""
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+    return None
+
+
+class RSSSampler(threading.Thread):
+    """Samples worker RSS at a fixed interval until stopped."""
+
+    def __init__(self, server: Server, interval: float = 1.0):
+        super().__init__(daemon=True)
+        self.server = server
+        self.interval = interval
+        self.samples: List[Dict] = []
+        self._stopped = threading.Event()
+        self._origin = time.monotonic()
+
+    def run(self) -> None:
+        while not self._stopped.is_set():
+            rss = {pid: read_rss_kb(pid) for pid in self.server.worker_pids()}
+            self.samples.append({
+                't': round(time.monotonic() - self._origin, 2),
+                'rss_kb': {str(pid): value for pid, value in rss.items() if value is not None},
+            })
+            self._stopped.wait(self.interval)
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self.join()
+
+
+class LoadClient:
+    """One simulated client issuing requests over a keep-alive connection."""
+
+    def __init__(self, port: int, corpus: Dict, mix: Dict[str, float], analysis_ids: List[str], seed: int):
+        self.port = port
+        self.corpus = corpus
+        self.operations = list(mix)
+        self.weights = [mix[name] for name in self.operations]
+        self.analysis_ids = analysis_ids
+        self.rng = random.Random(seed)
+        self.conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+
+    def _request(self, method: str, path: str, body: bytes = None, headers: Dict = None) -> Tuple[int, bytes]:
+        try:
+            self.conn.request(method, path, body=body, headers=headers or {})
+            response = self.conn.getresponse()
+            return response.status, response.read()
+        except (OSError, http.client.HTTPException):
+            # Reconnect on the next request; the error still counts
+            self.conn.close()
+            self.conn = http.client.HTTPConnection('127.0.0.1', self.port, timeout=60)
+            return 0, b''
+
+    def _analyze(self, files: Dict = None) -> int:
+        fields = {'jd_text': self.corpus['jd'], 'settings': ANALYSIS_SETTINGS}
+        if not files:
+            fields['resume_text'] = self.rng.choice(self.corpus['resumes'])
+        body, content_type = _multipart(fields, files or {})
+        status, payload = self._request('POST', '/api/analyze', body, {'Content-Type': content_type})
+        if status == 200:
+            self.analysis_ids.append(json.loads(payload)['analysis_id'])
+        return status
+
+    def run_one(self) -> Tuple[str, int, float]:
+        op = self.rng.choices(self.operations, self.weights)[0]
+        if op.startswith('report_') and not self.analysis_ids:
+            op = 'analyze'
+
+        start = time.perf_counter()
+        if op == 'analyze':
+            status = self._analyze()
+        elif op == 'upload':
+            kind = self.rng.choice(('pdf', 'docx'))
+            status = self._analyze({'resume_file': (f'resume.{kind}', self.rng.choice(self.corpus[kind]))})
+        else:
+            analysis_id = self.rng.choice(self.analysis_ids)
+            status, _ = self._request('GET', f"/api/report/{analysis_id}/{op[len('report_'):]}")
+        return op, status, time.perf_counter() - start
+
+
+def run_level(port: int, corpus: Dict, mix: Dict[str, float], concurrency: int,
+              duration: float, analysis_ids: List[str]) -> Dict:
+    """Drive the server with ``concurrency`` clients for ``duration`` seconds."""
+    latencies: Dict[str, List[float]] = {op: [] for op in mix}
+    errors: Dict[str, int] = {op: 0 for op in mix}
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def client_loop(seed: int) -> None:
+        client = LoadClient(port, corpus, mix, analysis_ids, seed)
+        while time.monotonic() < deadline:
+            op, status, elapsed = client.run_one()
+            with lock:
+                latencies.setdefault(op, []).append(elapsed)
+                if not 200 <= status < 400:
+                    errors[op] = errors.get(op, 0) + 1
+        client.conn.close()
+
+    started = time.monotonic()
+    threads = [threading.Thread(target=client_loop, args=(seed,)) for seed in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    operations = {}
+    all_latencies = []
+    for op, values in latencies.items():
+        values.sort()
+        all_latencies.extend(values)
+        operations[op] = _summarize(values, errors.get(op, 0), elapsed)
+    all_latencies.sort()
+
+    return {
+        'concurrency': concurrency,
+        'duration_s': round(elapsed, 2),
+        'overall': _summarize(all_latencies, sum(errors.values()), elapsed),
+        'operations': operations,
+    }
+
+
+def _summarize(sorted_latencies: List[float], error_count: int, elapsed: float) -> Dict:
+    count = len(sorted_latencies)
+
+    def ms(value):
+        return round(value * 1000, 2) if value is not None else None
+
+    return {
+        'requests': count,
+        'throughput_rps': round(count / elapsed, 2) if elapsed else 0.0,
+        'error_rate': round(error_count / count, 4) if count else 0.0,
+        'p50_ms': ms(percentile(sorted_latencies, 0.50)),
+        'p95_ms': ms(percentile(sorted_latencies, 0.95)),
+        'p99_ms': ms(percentile(sorted_latencies, 0.99)),
+    }
+
+
+def build_corpus(resumes: int, seed: int) -> Dict:
+    """Pre-generate the resumes, JD and uploaded files sent during the test."""
+    texts = [make_resume(jobs=3 + i % 5, bullets_per_job=5, skill_density=0.5, seed=seed + i) for i in range(resumes)]
+    files = texts[:min(len(texts), 5)]
+    return {
+        'jd': make_jd(seed=seed),
+        'resumes': texts,
+        'pdf': [make_pdf(text) for text in files],
+        'docx': [make_docx(text) for text in files],
+    }
+
+
+def print_curve(levels: List[Dict]) -> None:
+    print(f"{'conc':>5} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>8} {'peak RSS MiB':>13}")
+    for level in levels:
+        overall = level['overall']
+        print(
+            f"{level['concurrency']:>5} {overall['throughput_rps']:>9.1f} {overall['p50_ms'] or 0:>9.1f} "
+            f"{overall['p95_ms'] or 0:>9.1f} {overall['p99_ms'] or 0:>9.1f} {overall['error_rate']:>8.2%} "
+            f"{level['peak_worker_rss_kb'] / 1024:>13.1f}"
+        )
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.loadtest", description=__doc__.strip().split('\n')[0])
+    parser.add_argument("--workers", type=int, default=2, help="uvicorn worker processes")
+    parser.add_argument("--concurrency", default='1,2,4,8', help="Comma-separated client counts, one level each")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds per concurrency level")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Operation weights (default: {DEFAULT_MIX})")
+    parser.add_argument("--resumes", type=int, default=20, help="Distinct synthetic resumes to send")
+    parser.add_argument("--rss-interval", type=float, default=1.0, help="Seconds between RSS samples")
+    parser.add_argument("--port", type=int, help="Port to bind (default: a free port)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", "-o", help="Write the full results as JSON to this file")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    mix = parse_mix(args.mix)
+    levels = [int(value) for value in args.concurrency.split(',')]
+    corpus = build_corpus(args.resumes, args.seed)
+
+    server = Server(args.workers, args.port or _free_port())
+    print(f"Starting {args.workers} worker(s) on port {server.port}", file=sys.stderr)
+    sampler = RSSSampler(server, args.rss_interval)
+    results = []
+    analysis_ids: List[str] = []
+    try:
+        server.start()
+        sampler.start()
+        for concurrency in levels:
+            print(f"Running concurrency {concurrency} for {args.duration:g}s", file=sys.stderr)
+            sample_start = len(sampler.samples)
+            level = run_level(server.port, corpus, mix, concurrency, args.duration, analysis_ids)
+            window = sampler.samples[sample_start:] or sampler.samples[-1:]
+            level['peak_worker_rss_kb'] = max(
+                (rss for sample in window for rss in sample['rss_kb'].values()), default=0
+            )
+            results.append(level)
+    finally:
+        if sampler.is_alive():
+            sampler.stop()
+        server.stop()
+
+    print_curve(results)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'workers': args.workers,
+                'mix': mix,
+                'levels': results,
+                'rss_samples': sampler.samples,
+            }, f, indent=2)
+        print(f"Results written to {args.output}", file=sys.stderr)
+
+    return 1 if any(level['overall']['error_rate'] > 0 for level in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
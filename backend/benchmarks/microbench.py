@@ -0,0 +1,197 @@
+"""
+Microbenchmarks for the scoring engine, file parsers and report renderers.
+
+Run from the backend directory:
+
+    python -m benchmarks.microbench                 # run and print timings
+    python -m benchmarks.microbench --save          # record a baseline
+    python -m benchmarks.microbench --check         # fail on regressions
+
+Baselines are machine-specific and are written to benchmarks/baselines/
+per document size. A benchmark regresses when its best per-call time is
+more than ``--threshold`` slower than the baseline.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import timeit
+from datetime import datetime
+from typing import Callable, Dict, List, Tuple
+
+from app.file_parser import parse_docx, parse_pdf
+from app.pdf_generator import generate_pdf_report
+from app.reports import render_markdown_report
+from app.scoring_engine import (
+    KeywordExtractor, ResumeParser, ScoringEngine, SectionSegmenter, TextPreprocessor, to_dict
+)
+from benchmarks.synthetic import make_docx, make_jd, make_pdf, make_resume
+
+BASELINE_DIR = os.path.join(os.path.dirname(__file__), 'baselines')
+DEFAULT_THRESHOLD = 0.25
+
+# Document shapes: resume positions, bullets per position, fraction of
+# bullets naming skills, and required/preferred skills in the JD
+SIZES = {
+    'small': {'jobs': 2, 'bullets_per_job': 3, 'skill_density': 0.3, 'must_haves': 5, 'nice_to_haves': 3},
+    'medium': {'jobs': 5, 'bullets_per_job': 6, 'skill_density': 0.5, 'must_haves': 10, 'nice_to_haves': 6},
+    'large': {'jobs': 12, 'bullets_per_job': 10, 'skill_density': 0.8, 'must_haves': 20, 'nice_to_haves': 12},
+}
+
+
+def build_benchmarks(shape: Dict, seed: int = 0) -> List[Tuple[str, Callable[[], object]]]:
+    """Build the named zero-argument callables to time for a document shape."""
+    resume = make_resume(shape['jobs'], shape['bullets_per_job'], shape['skill_density'], seed)
+    jd = make_jd(shape['must_haves'], shape['nice_to_haves'], seed)
+    pdf_bytes = make_pdf(resume)
+    docx_bytes = make_docx(resume)
+
+    engine = ScoringEngine()
+    scores_engine = ScoringEngine(detail_level='scores')
+    sections = SectionSegmenter.segment(resume)
+    must_haves = KeywordExtractor.extract_must_haves(jd)
+    nice_to_haves = KeywordExtractor.extract_nice_to_haves(jd)
+    experiences = ResumeParser.extract_work_experience(resume, sections)
+    education = ResumeParser.extract_education(resume, sections)
+    total_years = ResumeParser.calculate_total_years(experiences)
+    result = engine.analyze(resume, jd, sections=sections)
+    result_dict = to_dict(result)
+
+    return [
+        ('preprocess.preprocess', lambda: TextPreprocessor.preprocess(resume)),
+        ('preprocess.extract_words', lambda: TextPreprocessor.extract_words(resume)),
+        ('preprocess.extract_ngrams', lambda: TextPreprocessor.extract_ngrams(resume)),
+        ('keywords.must_haves', lambda: KeywordExtractor.extract_must_haves(jd)),
+        ('keywords.nice_to_haves', lambda: KeywordExtractor.extract_nice_to_haves(jd)),
+        ('keywords.tech_terms', lambda: KeywordExtractor._extract_tech_terms(resume)),
+        ('parser.segment', lambda: SectionSegmenter.segment(resume)),
+        ('parser.work_experience', lambda: ResumeParser.extract_work_experience(resume, sections)),
+        ('parser.education', lambda: ResumeParser.extract_education(resume, sections)),
+        ('score.keyword_skills', lambda: engine._score_keyword_skills(resume, must_haves, nice_to_haves, sections)),
+        ('score.experience_relevance', lambda: engine._score_experience_relevance(resume, experiences, jd)),
+        ('score.role_match', lambda: engine._score_role_match(resume, experiences, jd)),
+        ('score.seniority_match', lambda: engine._score_seniority_match(total_years, jd)),
+        ('score.education_match', lambda: engine._score_education_match(education, jd)),
+        ('score.tooling_stack_match', lambda: engine._score_tooling_match(resume, jd)),
+        ('score.recency_match', lambda: engine._score_recency_match(experiences)),
+        ('score.red_flags', lambda: engine._detect_red_flags(resume, experiences, must_haves, sections)),
+        ('engine.analyze', lambda: engine.analyze(resume, jd)),
+        ('engine.analyze_scores', lambda: scores_engine.analyze(resume, jd)),
+        ('engine.to_dict', lambda: to_dict(result)),
+        ('file.parse_pdf', lambda: parse_pdf(pdf_bytes)),
+        ('file.parse_docx', lambda: parse_docx(docx_bytes)),
+        ('report.markdown', lambda: render_markdown_report(result_dict)),
+        ('report.pdf', lambda: generate_pdf_report(result_dict, 'benchmark')),
+    ]
+
+
+def measure(func: Callable[[], object], repeat: int) -> Dict:
+    """Time a callable, returning the best and median per-call seconds."""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    per_call = [total / number for total in timer.repeat(repeat=repeat, number=number)]
+    return {
+        'number': number,
+        'min_s': min(per_call),
+        'median_s': statistics.median(per_call),
+    }
+
+
+def run(size: str, repeat: int, name_filter: str = '', seed: int = 0) -> Dict:
+    """Run every benchmark matching ``name_filter`` and return a results document."""
+    results = {}
+    for name, func in build_benchmarks(SIZES[size], seed):
+        if name_filter and name_filter not in name:
+            continue
+        results[name] = measure(func, repeat)
+        print(f"  {name:<30} {results[name]['min_s'] * 1000:10.3f} ms", file=sys.stderr)
+    return {
+        'size': size,
+        'seed': seed,
+        'created_at': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'results': results,
+    }
+
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> List[Dict]:
+    """Compare results against a baseline; each row notes whether it regressed."""
+    rows = []
+    for name, stats in current['results'].items():
+        base = baseline['results'].get(name)
+        if base is None:
+            rows.append({'name': name, 'status': 'new', 'ratio': None})
+            continue
+        ratio = stats['min_s'] / base['min_s'] if base['min_s'] else 1.0
+        if ratio > 1 + threshold:
+            status = 'regressed'
+        elif ratio < 1 / (1 + threshold):
+            status = 'improved'
+        else:
+            status = 'ok'
+        rows.append({'name': name, 'status': status, 'ratio': ratio})
+    return rows
+
+
+def baseline_path(size: str) -> str:
+    return os.path.join(BASELINE_DIR, f"{size}.json")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.microbench", description=__doc__.strip().split('\n')[0])
+    parser.add_argument("--size", choices=sorted(SIZES), default='medium', help="Synthetic document size")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repeats per benchmark")
+    parser.add_argument("--filter", default='', help="Only run benchmarks whose name contains this")
+    parser.add_argument("--seed", type=int, default=0, help="Generator seed")
+    parser.add_argument("--save", action="store_true", help="Save the results as the baseline for this size")
+    parser.add_argument("--check", action="store_true", help="Compare against the baseline and fail on regressions")
+    parser.add_argument("--baseline", help="Baseline file (default: benchmarks/baselines/<size>.json)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed slowdown before a benchmark counts as regressed (0.25 = 25%%)")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    path = args.baseline or baseline_path(args.size)
+
+    baseline = None
+    if args.check:
+        if not os.path.exists(path):
+            print(f"No baseline at {path}; record one with --save", file=sys.stderr)
+            return 2
+        with open(path) as f:
+            baseline = json.load(f)
+        if baseline.get('size') != args.size:
+            print(f"Baseline {path} is for size {baseline.get('size')!r}, not {args.size!r}", file=sys.stderr)
+            return 2
+
+    print(f"Running {args.size} benchmarks (repeat={args.repeat})", file=sys.stderr)
+    current = run(args.size, args.repeat, args.filter, args.seed)
+
+    if args.save:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(current, f, indent=2, sort_keys=True)
+        print(f"Baseline saved to {path}", file=sys.stderr)
+
+    if baseline is None:
+        return 0
+
+    rows = compare(current, baseline, args.threshold)
+    for row in rows:
+        ratio = f"{row['ratio']:.2f}x" if row['ratio'] is not None else '-'
+        print(f"{row['name']:<30} {ratio:>8}  {row['status']}")
+    regressed = [row['name'] for row in rows if row['status'] == 'regressed']
+    if regressed:
+        print(f"{len(regressed)} benchmark(s) regressed by more than {args.threshold:.0%}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""
+Payload benchmark: bytes on the wire and server CPU per analysis response.
+
+Runs the server-side work of POST /api/analyze for several ``fields``
+projections and content codings: scoring at the detail level the
+projection needs, projecting, rendering the JSON response and compressing
+it as the compression middleware would:
+
+    python -m benchmarks.payload --size medium --repeat 20
+    python -m benchmarks.payload --fields "overall_score,label" --fields "categories.*.score"
+
+CPU is process time per request, split into scoring, serialization
+(projection plus JSON rendering) and compression.
+"""
+
+import argparse
+import json
+import sys
+import time
+from typing import Dict, List, Optional
+
+from fastapi.responses import JSONResponse
+
+from app.compression import compress_body, supported_encodings
+from app.projection import narrower_detail_level, parse_fields, project
+from app.scoring_engine import ScoringEngine, SectionSegmenter, to_dict
+from benchmarks.microbench import SIZES
+from benchmarks.synthetic import make_jd, make_resume
+
+DEFAULT_FIELDS = [
+    '',
+    'overall_score,label',
+    'overall_score,label,categories.*.score',
+    'overall_score,label,must_have.term,must_have.matched',
+]
+
+
+def run_scenario(resume: str, jd: str, fields: str, encoding: Optional[str], repeat: int) -> Dict:
+    """Time ``repeat`` requests for one projection and coding; returns per-request figures."""
+    tree = parse_fields(fields)
+    detail_level = narrower_detail_level('full', tree)
+    engine = ScoringEngine(detail_level=detail_level)
+    scoring = serializing = compressing = 0.0
+    body = b''
+    for _ in range(repeat):
+        start = time.process_time()
+        sections = SectionSegmenter.segment(resume)
+        result = to_dict(engine.analyze(resume, jd, sections=sections))
+        scored = time.process_time()
+        body = JSONResponse({'analysis_id': '0' * 32, 'result': project(result, tree)}).body
+        serialized = time.process_time()
+        if encoding is not None:
+            body = compress_body(body, encoding)
+        done = time.process_time()
+        scoring += scored - start
+        serializing += serialized - scored
+        compressing += done - serialized
+    return {
+        'fields': fields or '(all)',
+        'detail_level': detail_level,
+        'encoding': encoding or 'identity',
+        'bytes': len(body),
+        'score_ms': scoring / repeat * 1000,
+        'serialize_ms': serializing / repeat * 1000,
+        'compress_ms': compressing / repeat * 1000,
+        'cpu_ms': (scoring + serializing + compressing) / repeat * 1000,
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.payload", description=__doc__.strip().split('\n')[0])
+    parser.add_argument("--size", choices=sorted(SIZES), default='medium', help="Synthetic document size")
+    parser.add_argument("--repeat", type=int, default=20, help="Requests per scenario")
+    parser.add_argument("--fields", action="append",
+                        help="Projection to measure (repeatable; empty string for the full result)")
+    parser.add_argument("--seed", type=int, default=0, help="Generator seed")
+    parser.add_argument("--output", "-o", help="Write the results as JSON to this file")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    shape = SIZES[args.size]
+    resume = make_resume(shape['jobs'], shape['bullets_per_job'], shape['skill_density'], args.seed)
+    jd = make_jd(shape['must_haves'], shape['nice_to_haves'], args.seed)
+
+    rows: List[Dict] = []
+    for fields in args.fields if args.fields is not None else DEFAULT_FIELDS:
+        for encoding in (None,) + supported_encodings():
+            rows.append(run_scenario(resume, jd, fields, encoding, args.repeat))
+
+    print(f"{'fields':<52} {'detail':<9} {'coding':<9} {'bytes':>8} {'score ms':>9} "
+          f"{'serial ms':>10} {'zip ms':>7} {'cpu ms':>7}")
+    for row in rows:
+        print(f"{row['fields'][:52]:<52} {row['detail_level']:<9} {row['encoding']:<9} {row['bytes']:8d} "
+              f"{row['score_ms']:9.2f} {row['serialize_ms']:10.3f} {row['compress_ms']:7.3f} {row['cpu_ms']:7.2f}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'size': args.size, 'repeat': args.repeat, 'results': rows}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
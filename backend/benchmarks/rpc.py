@@ -0,0 +1,186 @@
+"""
+Ingress benchmark: REST multipart requests vs. the binary scoring ingress.
+
+Boots the app under uvicorn with the binary ingress enabled, then sends the
+same short resumes and JD through each path from local clients, each client
+on its own persistent connection:
+
+    python -m benchmarks.rpc --workers 2 --concurrency 1,4 --requests 200
+    python -m benchmarks.rpc --size small --window 32 --fields "overall_score,label"
+
+Modes are ``rest`` (POST /api/analyze, keep-alive, one request at a time),
+``rpc`` (one frame at a time) and ``rpc-pipelined`` (up to ``--window``
+frames outstanding). Each reports throughput, latency where requests are
+sequential, client CPU per request and bytes on the wire per request.
+"""
+
+import argparse
+import http.client
+import json
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+from app.rpc import HEADER, RPCClient, default_codec, encode_frame
+from benchmarks.loadtest import Server, _free_port, _multipart, percentile
+from benchmarks.microbench import SIZES
+from benchmarks.synthetic import make_jd, make_resume
+
+MODES = ('rest', 'rpc', 'rpc-pipelined')
+
+
+def build_corpus(size: str, resumes: int, seed: int) -> Dict:
+    shape = SIZES[size]
+    return {
+        'jd': make_jd(shape['must_haves'], shape['nice_to_haves'], seed),
+        'resumes': [
+            make_resume(shape['jobs'], shape['bullets_per_job'], shape['skill_density'], seed + n)
+            for n in range(resumes)
+        ],
+    }
+
+
+def _rest_client(port: int, corpus: Dict, settings: Dict, count: int, offset: int, out: Dict) -> None:
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    fields = {'jd_text': corpus['jd'], 'settings': json.dumps({k: v for k, v in settings.items() if k != 'fields'})}
+    if 'fields' in settings:
+        fields['fields'] = settings['fields']
+    for n in range(count):
+        fields['resume_text'] = corpus['resumes'][(offset + n) % len(corpus['resumes'])]
+        start = time.perf_counter()
+        body, content_type = _multipart(fields, {})
+        conn.request('POST', '/api/analyze', body=body, headers={'Content-Type': content_type})
+        response = conn.getresponse()
+        payload = response.read()
+        json.loads(payload)
+        out['latencies'].append(time.perf_counter() - start)
+        out['request_bytes'] += len(body)
+        out['response_bytes'] += len(payload)
+        out['errors'] += response.status != 200
+    conn.close()
+
+
+def _rpc_client(port: int, corpus: Dict, settings: Dict, count: int, offset: int, window: int, out: Dict) -> None:
+    requests = [
+        (corpus['resumes'][(offset + n) % len(corpus['resumes'])], corpus['jd'], settings) for n in range(count)
+    ]
+    codec = default_codec()
+    out['request_bytes'] += sum(len(encode_frame([n, r, j, s], codec)) for n, (r, j, s) in enumerate(requests))
+    with RPCClient(port=port) as client:
+        if window == 1:
+            responses = []
+            for request in requests:
+                start = time.perf_counter()
+                responses.extend(client.call_many([request]))
+                out['latencies'].append(time.perf_counter() - start)
+        else:
+            responses = client.call_many(requests, window=window)
+    for n, response in enumerate(responses):
+        out['response_bytes'] += len(encode_frame([n, response.status, response.body], codec))
+        out['errors'] += response.status != 200
+
+
+def run_level(mode: str, http_port: int, rpc_port: int, corpus: Dict, settings: Dict,
+              concurrency: int, requests: int, window: int) -> Dict:
+    """Send ``requests`` per client from ``concurrency`` clients at once."""
+    outs = [{'latencies': [], 'request_bytes': 0, 'response_bytes': 0, 'errors': 0} for _ in range(concurrency)]
+    threads = []
+    for n, out in enumerate(outs):
+        if mode == 'rest':
+            args = (_rest_client, (http_port, corpus, settings, requests, n * requests, out))
+        else:
+            args = (_rpc_client, (rpc_port, corpus, settings, requests, n * requests,
+                                  window if mode == 'rpc-pipelined' else 1, out))
+        threads.append(threading.Thread(target=args[0], args=args[1]))
+
+    cpu, start = time.process_time(), time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed, cpu = time.perf_counter() - start, time.process_time() - cpu
+
+    total = requests * concurrency
+    latencies = sorted(value for out in outs for value in out['latencies'])
+    p50, p99 = percentile(latencies, 0.5), percentile(latencies, 0.99)
+    return {
+        'mode': mode,
+        'concurrency': concurrency,
+        'requests': total,
+        'throughput_rps': total / elapsed,
+        'p50_ms': p50 * 1000 if p50 is not None else None,
+        'p99_ms': p99 * 1000 if p99 is not None else None,
+        'client_cpu_ms': cpu / total * 1000,
+        'request_bytes': sum(out['request_bytes'] for out in outs) / total,
+        'response_bytes': sum(out['response_bytes'] for out in outs) / total,
+        'errors': sum(out['errors'] for out in outs),
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.rpc", description=__doc__.strip().split('\n')[0])
+    parser.add_argument("--workers", type=int, default=2, help="Server worker processes")
+    parser.add_argument("--concurrency", default="1,4", help="Comma-separated client counts")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per client per level")
+    parser.add_argument("--window", type=int, default=16, help="Outstanding frames per pipelined client")
+    parser.add_argument("--modes", default=",".join(MODES), help=f"Comma-separated subset of {', '.join(MODES)}")
+    parser.add_argument("--size", choices=sorted(SIZES), default='small', help="Synthetic document size")
+    parser.add_argument("--fields", help="Projection applied to every result")
+    parser.add_argument("--seed", type=int, default=0, help="Generator seed")
+    parser.add_argument("--output", "-o", help="Write the results as JSON to this file")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    modes = [mode.strip() for mode in args.modes.split(',') if mode.strip()]
+    for mode in modes:
+        if mode not in MODES:
+            print(f"Unknown mode: {mode}", file=sys.stderr)
+            return 2
+    levels = [int(value) for value in args.concurrency.split(',')]
+    corpus = build_corpus(args.size, 50, args.seed)
+    # Scoring must actually run, so memoized results are bypassed
+    settings: Dict = {'use_cache': False}
+    if args.fields:
+        settings['fields'] = args.fields
+
+    http_port, rpc_port = _free_port(), _free_port()
+    server = Server(args.workers, http_port, env={
+        'RPC_PORT': str(rpc_port),
+        # A pipelined client holds a window of requests; admit them all
+        'ADMISSION_MAX_QUEUED': str(max(levels) * args.window),
+    })
+    print(f"Starting {args.workers} workers (HTTP {http_port}, RPC {rpc_port})", file=sys.stderr)
+    server.start()
+    rows: List[Dict] = []
+    try:
+        # Warm every worker on both paths before measuring
+        for mode in modes:
+            run_level(mode, http_port, rpc_port, corpus, settings, args.workers, 5, args.window)
+        for level in levels:
+            for mode in modes:
+                rows.append(run_level(mode, http_port, rpc_port, corpus, settings, level, args.requests, args.window))
+    finally:
+        server.stop()
+
+    def fmt(value: Optional[float]) -> str:
+        return f"{value:8.2f}" if value is not None else f"{'-':>8}"
+
+    print(f"{'mode':<14} {'clients':>7} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'cli cpu':>8} "
+          f"{'req B':>7} {'resp B':>7} {'errors':>6}")
+    for row in rows:
+        print(f"{row['mode']:<14} {row['concurrency']:7d} {row['throughput_rps']:8.1f} {fmt(row['p50_ms'])} "
+              f"{fmt(row['p99_ms'])} {row['client_cpu_ms']:8.3f} {row['request_bytes']:7.0f} "
+              f"{row['response_bytes']:7.0f} {row['errors']:6d}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'workers': args.workers, 'size': args.size, 'window': args.window,
+                       'frame_header_bytes': HEADER.size, 'results': rows}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
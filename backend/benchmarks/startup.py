@@ -0,0 +1,139 @@
+"""
+Cold-start benchmark: import cost per module and warm-up time.
+
+Each run starts a fresh interpreter with ``-X importtime``, imports the app
+and runs warm-up, so results reflect what a new worker pays:
+
+    python -m benchmarks.startup --repeat 5 --top 15
+    python -m benchmarks.startup --budget-ms 1500     # fail over budget
+
+Reports the median wall time for ``import app.main`` and for warm-up, the
+top-level packages by total import time and the most expensive
+individual modules.
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_PROBE = (
+    "import json, time\n"
+    "start = time.perf_counter()\n"
+    "import app.main\n"
+    "imported = time.perf_counter()\n"
+    "from app.warmup import warm_up\n"
+    "steps = warm_up()\n"
+    "done = time.perf_counter()\n"
+    "print(json.dumps({'import_ms': (imported - start) * 1000, 'warmup_ms': (done - imported) * 1000, 'steps': steps}))\n"
+)
+
+# "import time:  self [us] | cumulative | imported package"
+_IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)$')
+
+
+def parse_importtime(stderr: str) -> List[Dict]:
+    """Parse ``-X importtime`` output into module records in microseconds."""
+    records = []
+    for line in stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            records.append({
+                'module': match.group(4),
+                'self_us': int(match.group(1)),
+                'cumulative_us': int(match.group(2)),
+                # Nesting is encoded as two spaces per level after the first
+                'depth': (len(match.group(3)) - 1) // 2,
+            })
+    return records
+
+
+def run_once() -> Dict:
+    """Import and warm up the app in a fresh interpreter."""
+    env = dict(os.environ, LOG_LEVEL='WARNING')
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', _PROBE],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    timing = json.loads(completed.stdout.strip().splitlines()[-1])
+    timing['modules'] = parse_importtime(completed.stderr)
+    return timing
+
+
+def summarize(runs: List[Dict], top: int) -> Dict:
+    """Median timings across runs, with per-package and per-module import costs."""
+    packages = defaultdict(list)
+    modules = defaultdict(list)
+    for run in runs:
+        per_package = defaultdict(int)
+        for record in run['modules']:
+            modules[record['module']].append(record['self_us'])
+            per_package[record['module'].split('.')[0]] += record['self_us']
+        for package, total in per_package.items():
+            packages[package].append(total)
+
+    def ranked(values: Dict[str, List[int]]) -> List[Dict]:
+        medians = {name: statistics.median(samples) / 1000 for name, samples in values.items()}
+        return [
+            {'name': name, 'ms': round(ms, 2)}
+            for name, ms in sorted(medians.items(), key=lambda item: item[1], reverse=True)[:top]
+        ]
+
+    steps = defaultdict(list)
+    for run in runs:
+        for name, ms in run['steps'].items():
+            steps[name].append(ms)
+
+    return {
+        'runs': len(runs),
+        'import_ms': round(statistics.median(run['import_ms'] for run in runs), 1),
+        'warmup_ms': round(statistics.median(run['warmup_ms'] for run in runs), 1),
+        'warmup_steps': {name: round(statistics.median(values), 1) for name, values in steps.items()},
+        'packages': ranked(packages),
+        'modules': ranked(modules),
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.startup", description=__doc__.strip().split('\n')[0])
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh interpreters to start")
+    parser.add_argument("--top", type=int, default=15, help="Packages and modules to list")
+    parser.add_argument("--budget-ms", type=float, help="Fail if import plus warm-up exceeds this")
+    parser.add_argument("--output", "-o", help="Write the summary as JSON to this file")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    summary = summarize([run_once() for _ in range(args.repeat)], args.top)
+
+    print(f"import app.main: {summary['import_ms']:.1f} ms   warm-up: {summary['warmup_ms']:.1f} ms")
+    for name, ms in summary['warmup_steps'].items():
+        print(f"  {name:<40} {ms:10.1f} ms")
+    print("\nTop-level packages by total import time:")
+    for row in summary['packages']:
+        print(f"  {row['name']:<40} {row['ms']:10.1f} ms")
+    print("\nModules by self import time:")
+    for row in summary['modules']:
+        print(f"  {row['name']:<40} {row['ms']:10.1f} ms")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(summary, f, indent=2)
+
+    total = summary['import_ms'] + summary['warmup_ms']
+    if args.budget_ms is not None and total > args.budget_ms:
+        print(f"\nCold start {total:.0f} ms exceeds budget of {args.budget_ms:.0f} ms", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+"""
+Storage benchmark: bytes per stored analysis with and without text blobs.
+
+Simulates a high-volume requisition pool, many applicants spread over a
+few job descriptions, and stores the same analyses in every backend:
+
+    python -m benchmarks.storage --analyses 2000 --jds 5
+    python -m benchmarks.storage --codecs inline,zlib,lzma --detail-level scores
+
+``inline`` is the store without blobs (each analysis holds its own texts).
+For every configuration the benchmark reports the text bytes and total
+bytes per analysis, for the in-memory store (measured object size) and the
+SQLite store (file size), plus put and get throughput.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+from app.blobs import CODECS
+from app.scoring_engine import ScoringEngine, SectionSegmenter, to_dict
+from app.store import MemoryAnalysisStore, SQLiteAnalysisStore, measure_size
+from benchmarks.synthetic import make_jd, make_resume
+
+INLINE = 'inline'
+
+
+def build_entries(analyses: int, jds: int, detail_level: str, seed: int = 0) -> List[Tuple[str, Dict]]:
+    """Build analysis entries shaped like the API's, ``analyses`` resumes over ``jds`` JDs."""
+    jd_texts = [make_jd(12, 8, seed + n) for n in range(jds)]
+    engine = ScoringEngine(detail_level=detail_level)
+    entries = []
+    for n in range(analyses):
+        resume = make_resume(3 + n % 5, 5, 0.5, seed + n)
+        jd = jd_texts[n % jds]
+        # Scoring every resume would dominate the run; results are reused per JD
+        if n < jds:
+            sections = SectionSegmenter.segment(resume)
+            result = to_dict(engine.analyze(resume, jd, sections=sections))
+            sections = sections.to_list()
+        else:
+            result, sections = entries[n % jds][1]['result'], entries[n % jds][1]['sections']
+        entries.append((f"a{n}", {
+            'result': result,
+            'resume_text': resume,
+            'sections': sections,
+            'jd_text': jd,
+            'settings': {'detail_level': detail_level},
+            'input_key': f"key{n}",
+            'created_at': '2024-01-01T00:00:00',
+        }))
+    return entries
+
+
+def text_bytes(entries: List[Tuple[str, Dict]]) -> int:
+    """UTF-8 bytes of every text as stored inline."""
+    return sum(len(entry[field].encode('utf-8')) for _, entry in entries for field in ('resume_text', 'jd_text'))
+
+
+def _time_gets(store, entries: List[Tuple[str, Dict]], sample: int) -> float:
+    ids = [analysis_id for analysis_id, _ in entries[:sample]]
+    start = time.perf_counter()
+    for analysis_id in ids:
+        store.get(analysis_id)
+    return len(ids) / (time.perf_counter() - start)
+
+
+def bench_memory(entries: List[Tuple[str, Dict]], codec: str, sample: int) -> Dict:
+    store = MemoryAnalysisStore(
+        max_entries=len(entries) + 1, max_bytes=1 << 62, text_codec=None if codec == INLINE else codec
+    )
+    start = time.perf_counter()
+    for analysis_id, entry in entries:
+        store.put(analysis_id, entry)
+    put_rate = len(entries) / (time.perf_counter() - start)
+    stats = store.stats()
+    if stats['text_blobs'] is not None:
+        texts = stats['text_blobs']['stored_bytes']
+    else:
+        texts = sum(measure_size(entry[field]) for _, entry in entries for field in ('resume_text', 'jd_text'))
+    return {
+        'bytes_per_analysis': stats['bytes'] / len(entries),
+        'text_bytes_per_analysis': texts / len(entries),
+        'puts_per_s': put_rate,
+        'gets_per_s': _time_gets(store, entries, sample),
+    }
+
+
+def bench_sqlite(entries: List[Tuple[str, Dict]], codec: str, sample: int, batch: int = 100) -> Dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'analyses.db')
+        store = SQLiteAnalysisStore(path, text_codec=None if codec == INLINE else codec)
+        start = time.perf_counter()
+        for offset in range(0, len(entries), batch):
+            store.put_many(entries[offset:offset + batch])
+        put_rate = len(entries) / (time.perf_counter() - start)
+        get_rate = _time_gets(store, entries, sample)
+
+        conn = store._conn()
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.execute("VACUUM")
+        file_size = os.path.getsize(path)
+        text_size = conn.execute("SELECT COALESCE(SUM(LENGTH(data)), 0) FROM text_blobs").fetchone()[0]
+        if codec == INLINE:
+            text_size = text_bytes(entries)
+        store.close()
+    return {
+        'bytes_per_analysis': file_size / len(entries),
+        'text_bytes_per_analysis': text_size / len(entries),
+        'puts_per_s': put_rate,
+        'gets_per_s': get_rate,
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.storage", description=__doc__.strip().split('\n')[0])
+    parser.add_argument("--analyses", type=int, default=2000, help="Analyses to store")
+    parser.add_argument("--jds", type=int, default=5, help="Distinct job descriptions they are spread over")
+    parser.add_argument("--codecs", default=f"{INLINE},none,zlib,lzma",
+                        help=f"Comma-separated configurations: {INLINE} or one of {', '.join(CODECS)}")
+    parser.add_argument("--detail-level", choices=['scores', 'keywords', 'full'], default='full',
+                        help="Detail level of the stored results")
+    parser.add_argument("--sample", type=int, default=500, help="Analyses read back to time gets")
+    parser.add_argument("--seed", type=int, default=0, help="Generator seed")
+    parser.add_argument("--output", "-o", help="Write the results as JSON to this file")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    codecs = [codec.strip() for codec in args.codecs.split(',') if codec.strip()]
+    print(f"Building {args.analyses} analyses over {args.jds} JDs", file=sys.stderr)
+    entries = build_entries(args.analyses, args.jds, args.detail_level, args.seed)
+
+    results = {}
+    for codec in codecs:
+        results[codec] = {
+            'memory': bench_memory(entries, codec, args.sample),
+            'sqlite': bench_sqlite(entries, codec, args.sample),
+        }
+
+    print(f"{'store':<8} {'texts':<8} {'text B/analysis':>16} {'total B/analysis':>17} {'puts/s':>10} {'gets/s':>10}")
+    for backend in ('memory', 'sqlite'):
+        for codec in codecs:
+            row = results[codec][backend]
+            print(f"{backend:<8} {codec:<8} {row['text_bytes_per_analysis']:16.0f} {row['bytes_per_analysis']:17.0f} "
+                  f"{row['puts_per_s']:10.0f} {row['gets_per_s']:10.0f}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'analyses': args.analyses, 'jds': args.jds, 'detail_level': args.detail_level,
+                       'results': results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+"""
+Synthetic resume and job description generator for benchmarks.
+
+Documents are built from the engine's own tech taxonomy, so the amount of
+matching work scales with the requested size and skill density. Output is
+deterministic for a given seed.
+"""
+
+import io
+import random
+from typing import List
+
+from app.scoring_engine import KeywordExtractor
+
+TAXONOMY = sorted(KeywordExtractor.ALL_TECH)
+
+TITLES = ['Data Engineer', 'Software Engineer', 'Backend Developer', 'Platform Engineer',
+          'Senior Data Engineer', 'Analytics Engineer', 'Lead Software Engineer']
+COMPANIES = ['Acme Corp', 'Globex', 'Initech', 'Umbrella Labs', 'Hooli', 'Stark Industries']
+VERBS = ['Designed', 'Built', 'Optimized', 'Migrated', 'Maintained', 'Led', 'Automated']
+OBJECTS = ['data pipelines', 'reporting services', 'batch jobs', 'streaming consumers',
+           'internal APIs', 'deployment tooling', 'warehouse models']
+FILLER = ['reducing latency by 30%', 'for 20 teams', 'across three regions',
+          'processing 2TB daily', 'with full test coverage', 'ahead of schedule']
+
+
+def _skills(rng: random.Random, density: float, count: int = 3) -> List[str]:
+    """Pick taxonomy terms for a line, or none at all depending on density."""
+    if rng.random() >= density:
+        return []
+    return rng.sample(TAXONOMY, min(count, len(TAXONOMY)))
+
+
+def make_resume(jobs: int = 3, bullets_per_job: int = 5, skill_density: float = 0.5, seed: int = 0) -> str:
+    """
+    Build a resume with ``jobs`` positions of ``bullets_per_job`` bullets.
+
+    ``skill_density`` is the fraction of bullets that mention taxonomy terms.
+    """
+    rng = random.Random(seed)
+    lines = [
+        'JANE CANDIDATE',
+        'jane@example.com | (555) 010-0000',
+        '',
+        'PROFESSIONAL SUMMARY',
+        f"{rng.choice(TITLES)} with {jobs * 2}+ years of experience in "
+        + ', '.join(rng.sample(TAXONOMY, 4)) + '.',
+        '',
+        'PROFESSIONAL EXPERIENCE',
+        '',
+    ]
+
+    end_year = 2024
+    for _ in range(jobs):
+        start_year = end_year - rng.randint(1, 4)
+        lines.append(f"{rng.choice(TITLES)}, {start_year} - {end_year}")
+        lines.append(rng.choice(COMPANIES))
+        for _ in range(bullets_per_job):
+            bullet = f"- {rng.choice(VERBS)} {rng.choice(OBJECTS)} {rng.choice(FILLER)}"
+            skills = _skills(rng, skill_density)
+            if skills:
+                bullet += ' using ' + ', '.join(skills)
+            lines.append(bullet)
+        lines.append('')
+        end_year = start_year
+
+    lines += [
+        'EDUCATION',
+        "Bachelor of Science in Computer Science, 2012",
+        '',
+        'TECHNICAL SKILLS',
+        ', '.join(rng.sample(TAXONOMY, max(1, int(len(TAXONOMY) * skill_density / 2)))),
+    ]
+    return '\n'.join(lines)
+
+
+def make_jd(must_haves: int = 8, nice_to_haves: int = 6, seed: int = 0) -> str:
+    """Build a job description with the given number of required and preferred skills."""
+    rng = random.Random(seed + 1)
+    terms = rng.sample(TAXONOMY, min(must_haves + nice_to_haves, len(TAXONOMY)))
+    required, preferred = terms[:must_haves], terms[must_haves:]
+
+    lines = [
+        f"{rng.choice(TITLES)} - Full-Time",
+        '',
+        'ABOUT THE ROLE',
+        'We are looking for an engineer to build and run our data platform.',
+        '',
+        'REQUIREMENTS',
+        f"- Minimum {rng.randint(2, 8)} years of experience as a software engineer",
+        "- Bachelor's degree in Computer Science or related field",
+    ]
+    lines += [f"- Required: experience with {term}" for term in required]
+    lines += ['', 'NICE TO HAVE']
+    lines += [f"- Preferred: {term} is a plus" for term in preferred]
+    return '\n'.join(lines)
+
+
+def make_pdf(text: str) -> bytes:
+    """Render text into a simple PDF, one line per text line."""
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=letter)
+    _, height = letter
+    y = height - 50
+    for line in text.split('\n'):
+        if y < 50:
+            pdf.showPage()
+            y = height - 50
+        pdf.drawString(50, y, line)
+        y -= 14
+    pdf.save()
+    return buffer.getvalue()
+
+
+def make_docx(text: str) -> bytes:
+    """Render text into a DOCX document, one paragraph per text line."""
+    from docx import Document
+
+    document = Document()
+    for line in text.split('\n'):
+        document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
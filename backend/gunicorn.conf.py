@@ -0,0 +1,40 @@
+"""
+Gunicorn configuration for production.
+
+The app is imported and warmed up once in the master before workers are
+forked, so parser libraries, compiled regexes and report styles are shared
+copy-on-write instead of being rebuilt by every worker.
+
+    gunicorn -c gunicorn.conf.py app.main:app
+"""
+
+import gc
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("API_WORKERS", str(min(4, multiprocessing.cpu_count()))))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = os.getenv("PRELOAD_APP", "true").lower() == "true"
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = 30
+keepalive = 5
+accesslog = "-"
+# Trust X-Forwarded-For only from these addresses (comma-separated). Set it to
+# the platform proxy's address before enabling CLIENT_RATE_PER_SECOND, so the
+# per-client limit sees real clients rather than one shared proxy address;
+# trusting everyone would let any client pick a fresh identity per request.
+forwarded_allow_ips = os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1")
+
+
+def on_starting(server):
+    """Warm up in the master; with preload_app the app module is already imported."""
+    if not preload_app:
+        return
+    from app.warmup import warm_up
+
+    timings = warm_up()
+    server.log.info("Preloaded app, warm-up took %.0f ms", sum(timings.values()))
+    # Move everything allocated so far out of the collector's view, so
+    # collections in workers do not touch (and un-share) those pages
+    gc.freeze()
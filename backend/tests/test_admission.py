@@ -0,0 +1,73 @@
+"""
+Tests for admission control
+"""
+
+import asyncio
+
+import pytest
+
+from app.admission import AdmissionController, AdmissionRejected, TokenBucket
+
+
+class TestTokenBucket:
+    """Test token bucket refill and wait estimates."""
+    
+    def test_burst_then_wait(self):
+        """Test the bucket allows a burst and then reports the wait for a token."""
+        bucket = TokenBucket(rate=2, burst=2, now=0)
+        
+        assert bucket.take(now=0) == 0
+        assert bucket.take(now=0) == 0
+        assert bucket.take(now=0) == pytest.approx(0.5)
+        assert bucket.take(now=0.5) == 0
+
+
+class TestAdmissionController:
+    """Test concurrency limits, queueing and shedding."""
+    
+    def test_sheds_when_queue_is_full(self):
+        """Test requests beyond the concurrent and queued limits get 503 with Retry-After."""
+        controller = AdmissionController(max_concurrent=1, max_queued=1, max_queue_wait=5)
+        release = asyncio.Event()
+        
+        async def hold():
+            async with controller.admit('a'):
+                await release.wait()
+        
+        async def scenario():
+            first = asyncio.ensure_future(hold())
+            await asyncio.sleep(0)
+            queued = asyncio.ensure_future(hold())
+            await asyncio.sleep(0)
+            assert controller.in_flight == 1 and controller.queued == 1
+            
+            with pytest.raises(AdmissionRejected) as excinfo:
+                async with controller.admit('b'):
+                    pass
+            release.set()
+            await asyncio.gather(first, queued)
+            return excinfo.value
+        
+        rejected = asyncio.run(scenario())
+        assert rejected.status_code == 503
+        assert rejected.retry_after >= 1
+        assert controller.admitted == 2
+        assert controller.rejected['queue_full'] == 1
+    
+    def test_rate_limits_per_client(self):
+        """Test a client over its token bucket gets 429 while others are admitted."""
+        controller = AdmissionController(rate_per_client=1, burst_per_client=1)
+        
+        async def scenario():
+            async with controller.admit('a'):
+                pass
+            with pytest.raises(AdmissionRejected) as excinfo:
+                async with controller.admit('a'):
+                    pass
+            async with controller.admit('b'):
+                pass
+            return excinfo.value
+        
+        rejected = asyncio.run(scenario())
+        assert rejected.status_code == 429
+        assert controller.admitted == 2
@@ -0,0 +1,342 @@
+"""
+Tests for the HTTP API
+"""
+
+import asyncio
+import io
+import json
+import threading
+import time
+import zipfile
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main, pdf_generator
+from app.report_cache import ReportCache, report_etag
+
+JD = """Senior Backend Engineer
+Requirements:
+- 5+ years of Python experience
+- Experience with PostgreSQL and AWS
+"""
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """A client sharing one event loop across requests, with on-disk state under tmp_path."""
+    monkeypatch.setattr(main.config, 'job_queue_path', str(tmp_path / 'jobs.db'))
+    monkeypatch.setattr(main.config, 'warmup_on_startup', False)
+    monkeypatch.setattr(main, 'job_queue', None)
+    with TestClient(main.app) as client:
+        yield client
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.01)
+
+
+class TestAdmission:
+    """Test admission control on the analyze endpoint."""
+
+    def test_concurrent_requests_are_queued_then_shed(self, client, monkeypatch):
+        """Test scoring leaves the event loop free to queue one request and shed the next with 503."""
+        controller = main.admission
+        monkeypatch.setattr(controller, '_slots', asyncio.Semaphore(1))
+        monkeypatch.setattr(controller, 'max_concurrent', 1)
+        monkeypatch.setattr(controller, 'max_queued', 1)
+        monkeypatch.setattr(controller, 'max_queue_wait', 30)
+        monkeypatch.setattr(controller, 'rate_per_client', 0)
+        release = threading.Event()
+
+        def slow_analysis(resume_text, jd_text, analysis_settings):
+            release.wait(10)
+            return {'analysis_id': resume_text, 'result': {'overall_score': 50.0}}
+
+        monkeypatch.setattr(main, '_run_analysis', slow_analysis)
+        statuses = {}
+
+        def post(name):
+            statuses[name] = client.post('/api/analyze', data={'resume_text': name, 'jd_text': JD}).status_code
+
+        threads = [threading.Thread(target=post, args=(name,)) for name in ('first', 'second')]
+        try:
+            threads[0].start()
+            _wait_for(lambda: controller.in_flight == 1)
+            threads[1].start()
+            _wait_for(lambda: controller.queued == 1)
+            rejected = client.post('/api/analyze', data={'resume_text': 'third', 'jd_text': JD})
+        finally:
+            release.set()
+            for thread in threads:
+                thread.join(10)
+
+        assert rejected.status_code == 503
+        assert int(rejected.headers['retry-after']) >= 1
+        assert rejected.json()['reason'] == 'queue_full'
+        assert statuses == {'first': 200, 'second': 200}
+
+
+RESUMES = [
+    "Senior Software Engineer\nBuilt Python services on PostgreSQL and AWS for eight years\n"
+    "SKILLS\nPython, PostgreSQL, AWS",
+    "Developer\nWrote Python scripts\nSKILLS\nPython",
+    "Barista\nMade coffee",
+]
+
+
+def _batch(client, resume_texts=(), files=(), **form):
+    data = {'jd_text': JD, 'resume_texts': list(resume_texts), **form}
+    return client.post('/api/analyze/batch', data=data, files=[('resume_files', file) for file in files])
+
+
+class TestBatch:
+    """Test the batch analyze endpoint and its NDJSON stream."""
+
+    def test_stream_yields_records_then_summary(self, client, monkeypatch):
+        """Test one record per resume, in input order with one in flight, followed by the summary."""
+        monkeypatch.setattr(main.config, 'batch_max_in_flight', 1)
+        response = _batch(client, RESUMES, stream='true')
+        assert response.status_code == 200
+        assert response.headers['content-type'].startswith('application/x-ndjson')
+        records = [json.loads(line) for line in response.text.splitlines()]
+
+        assert [record['type'] for record in records] == ['result'] * 3 + ['summary']
+        assert [record['index'] for record in records[:-1]] == [0, 1, 2]
+        summary = records[-1]
+        assert summary['count'] == summary['succeeded'] == 3 and summary['failed'] == 0
+        scores = [record['result']['overall_score'] for record in records[:-1]]
+        assert summary['best']['overall_score'] == max(scores)
+        assert summary['best']['analysis_id'] == records[scores.index(max(scores))]['analysis_id']
+
+    def test_bad_item_becomes_error_record(self, client):
+        """Test an unreadable file yields an error record and the rest of the batch still streams."""
+        response = _batch(client, RESUMES[:1], files=[('resume.xyz', b'not a resume')], stream='true')
+        records = [json.loads(line) for line in response.text.splitlines()]
+
+        errors = [record for record in records if record['type'] == 'error']
+        assert len(errors) == 1
+        assert errors[0]['filename'] == 'resume.xyz' and 'Unsupported file type' in errors[0]['error']
+        assert any(record['type'] == 'result' for record in records)
+        assert records[-1]['type'] == 'summary'
+        assert records[-1]['succeeded'] == 1 and records[-1]['failed'] == 1
+
+    def test_in_flight_bound(self, client, monkeypatch):
+        """Test no more than batch_max_in_flight resumes are scored at once."""
+        monkeypatch.setattr(main.config, 'batch_max_in_flight', 2)
+        lock = threading.Lock()
+        running, peak = [0], [0]
+
+        def tracked_analysis(resume_text, jd_text, analysis_settings):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.05)
+            with lock:
+                running[0] -= 1
+            return {'analysis_id': resume_text, 'result': {'overall_score': 50.0}}
+
+        monkeypatch.setattr(main, '_run_analysis', tracked_analysis)
+        response = _batch(client, [f"resume {n}" for n in range(6)], stream='true')
+        records = [json.loads(line) for line in response.text.splitlines()]
+
+        assert records[-1]['succeeded'] == 6
+        assert peak[0] == 2
+
+    def test_non_streaming_shape(self, client):
+        """Test without stream the records and summary come back as one JSON object."""
+        response = _batch(client, RESUMES[:2])
+        assert response.headers['content-type'] == 'application/json'
+        body = response.json()
+
+        assert set(body) == {'results', 'summary'}
+        assert sorted(record['index'] for record in body['results']) == [0, 1]
+        assert all(record['type'] == 'result' and 'analysis_id' in record for record in body['results'])
+        assert body['summary']['type'] == 'summary' and body['summary']['count'] == 2
+
+
+def _analyze(client, resume_text=RESUMES[0]):
+    response = client.post('/api/analyze', data={'resume_text': resume_text, 'jd_text': JD})
+    assert response.status_code == 200
+    return response.json()['analysis_id']
+
+
+@pytest.fixture
+def report_cache(monkeypatch):
+    cache = ReportCache()
+    monkeypatch.setattr(main, 'report_cache', cache)
+    return cache
+
+
+class TestReports:
+    """Test report validators, the PDF cache and the PDF ZIP batch."""
+
+    def test_etag_revalidation(self, client, report_cache):
+        """Test a matching If-None-Match gets 304 and a stale one the report."""
+        analysis_id = _analyze(client)
+        response = client.get(f'/api/report/{analysis_id}/json')
+        etag = response.headers['etag']
+        assert response.status_code == 200 and response.headers['cache-control'] == 'private, no-cache'
+
+        revalidated = client.get(f'/api/report/{analysis_id}/json', headers={'If-None-Match': etag})
+        assert revalidated.status_code == 304 and revalidated.content == b''
+        assert revalidated.headers['etag'] == etag
+        assert client.get(f'/api/report/{analysis_id}/json', headers={'If-None-Match': '"stale"'}).status_code == 200
+
+    def test_etag_per_content_coding(self, client, report_cache):
+        """Test gzip and identity reports have their own ETags and both revalidate."""
+        analysis_id = _analyze(client)
+        url = f'/api/report/{analysis_id}/json'
+        identity = client.get(url, headers={'Accept-Encoding': 'identity'})
+        gzipped = client.get(url, headers={'Accept-Encoding': 'gzip'})
+        assert gzipped.headers['content-encoding'] == 'gzip'
+        assert gzipped.headers['etag'] == identity.headers['etag'][:-1] + '-gzip"'
+
+        for response, coding in ((identity, 'identity'), (gzipped, 'gzip')):
+            revalidated = client.get(url, headers={'Accept-Encoding': coding, 'If-None-Match': response.headers['etag']})
+            assert revalidated.status_code == 304
+            assert revalidated.headers['etag'] == response.headers['etag']
+
+    def test_pdf_rendered_once(self, client, report_cache, monkeypatch):
+        """Test a PDF is rendered on first request and then served from the report cache."""
+        renders = []
+        render = pdf_generator.render_pdf_report
+        monkeypatch.setattr(
+            pdf_generator, 'render_pdf_report',
+            lambda result, analysis_id: renders.append(analysis_id) or render(result, analysis_id)
+        )
+        analysis_id = _analyze(client)
+        first = client.get(f'/api/report/{analysis_id}/pdf')
+        second = client.get(f'/api/report/{analysis_id}/pdf')
+
+        assert first.status_code == second.status_code == 200
+        assert first.content.startswith(b'%PDF') and second.content == first.content
+        assert renders == [analysis_id]
+        revalidated = client.get(f'/api/report/{analysis_id}/pdf', headers={'If-None-Match': first.headers['etag']})
+        assert revalidated.status_code == 304
+
+    def test_pdf_zip_caches_new_renders(self, client, report_cache):
+        """Test the ZIP holds one PDF per distinct id and caches the ones it had to render."""
+        cached_id, new_id = _analyze(client, RESUMES[0]), _analyze(client, RESUMES[1])
+        cached_pdf = client.get(f'/api/report/{cached_id}/pdf').content
+
+        response = client.post('/api/report/pdf/batch', json={'analysis_ids': [cached_id, new_id, cached_id]})
+        assert response.status_code == 200 and response.headers['content-type'] == 'application/zip'
+        with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+            assert sorted(archive.namelist()) == sorted(f"ats_report_{n}.pdf" for n in (cached_id, new_id))
+            assert archive.read(f"ats_report_{cached_id}.pdf") == cached_pdf
+            new_pdf = archive.read(f"ats_report_{new_id}.pdf")
+        assert new_pdf.startswith(b'%PDF')
+
+        etag = report_etag(new_id, main.analyses.get(new_id), 'pdf')
+        assert report_cache.get((new_id, 'pdf', etag)) == new_pdf
+
+    def test_pdf_zip_rejects_unknown_ids(self, client):
+        """Test a batch naming an unknown analysis is a 404."""
+        response = client.post('/api/report/pdf/batch', json={'analysis_ids': ['missing']})
+        assert response.status_code == 404
+
+
+class TestBatchAdmission:
+    """Test a batch is admitted per resume rather than per request."""
+
+    def test_each_item_takes_a_slot(self, client, monkeypatch):
+        """Test batch items share the worker's slots and items beyond the queue are shed as error records."""
+        controller = main.admission
+        monkeypatch.setattr(controller, '_slots', asyncio.Semaphore(1))
+        monkeypatch.setattr(controller, 'max_concurrent', 1)
+        monkeypatch.setattr(controller, 'max_queued', 1)
+        monkeypatch.setattr(controller, 'max_queue_wait', 30)
+        monkeypatch.setattr(main.config, 'batch_max_in_flight', 3)
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow_analysis(resume_text, jd_text, analysis_settings):
+            started.set()
+            release.wait(10)
+            return {'analysis_id': resume_text, 'result': {'overall_score': 50.0}}
+
+        monkeypatch.setattr(main, '_run_analysis', slow_analysis)
+        responses = []
+        thread = threading.Thread(target=lambda: responses.append(_batch(client, ['a', 'b', 'c'], stream='true')))
+        thread.start()
+        try:
+            assert started.wait(5)
+            _wait_for(lambda: controller.queued == 1)
+            assert controller.in_flight == 1
+        finally:
+            release.set()
+            thread.join(10)
+
+        records = [json.loads(line) for line in responses[0].text.splitlines()]
+        shed = [record for record in records if record['type'] == 'error']
+        assert len(shed) == 1 and shed[0]['reason'] == 'queue_full' and shed[0]['retry_after'] >= 1
+        assert records[-1]['succeeded'] == 2 and records[-1]['failed'] == 1
+
+
+class TestJobs:
+    """Test the async job endpoints."""
+
+    def test_queue_opened_on_first_submit(self, client, tmp_path):
+        """Test startup leaves the job queue unopened until a job is submitted, which then completes."""
+        assert main.job_queue is None and main.worker_pool is None
+        assert not (tmp_path / 'jobs.db').exists()
+        assert client.get('/api/jobs/missing').status_code == 404
+        assert not (tmp_path / 'jobs.db').exists()
+
+        response = client.post('/api/jobs', data={'resume_text': RESUMES[0], 'jd_text': JD})
+        assert response.status_code == 202
+        job_id = response.json()['job_id']
+        _wait_for(lambda: client.get(f'/api/jobs/{job_id}').json()['status'] == 'done')
+        assert client.get(f'/api/jobs/{job_id}').json()['result']['overall_score'] > 0
+
+    def test_events_end_when_job_is_deleted(self, client, monkeypatch):
+        """Test a subscribed job deleted by the retention sweep ends the stream with a gone event."""
+        monkeypatch.setattr(main, 'JOB_EVENT_POLL_INTERVAL', 0.01)
+        release = threading.Event()
+
+        def blocked_job(job):
+            release.wait(10)
+            return {}
+
+        monkeypatch.setattr(main, '_run_job', blocked_job)
+        job_id = client.post('/api/jobs', data={'resume_text': 'resume', 'jd_text': JD}).json()['job_id']
+        _wait_for(lambda: client.get(f'/api/jobs/{job_id}').json()['status'] == 'running')
+        events = []
+        thread = threading.Thread(target=lambda: events.append(client.get(f'/api/jobs/{job_id}/events').text))
+        thread.start()
+        try:
+            time.sleep(0.1)
+            main.job_queue._conn().execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+            thread.join(5)
+        finally:
+            release.set()
+
+        assert events and events[0].startswith('event: running')
+        assert 'event: gone' in events[0]
+
+
+class TestReducedReports:
+    """Test reports of analyses stored at a reduced detail level."""
+
+    def test_reports_are_completed(self, client, report_cache):
+        """Test a report of a scores-only analysis shows the keywords and evidence it did not store."""
+        response = client.post(
+            '/api/analyze', data={'resume_text': RESUMES[0], 'jd_text': JD, 'fields': 'overall_score,label'}
+        )
+        analysis_id = response.json()['analysis_id']
+        stored = main.analyses.get(analysis_id)['result']
+        assert stored['metadata']['detail_level'] == 'scores' and stored['must_have'] == []
+        full_id = _analyze(client, RESUMES[0] + "\n")
+
+        markdown = client.get(f'/api/report/{analysis_id}/markdown').json()['markdown']
+        expected = client.get(f'/api/report/{full_id}/markdown').json()['markdown']
+        section = lambda text: text[text.index('## Keyword Matching'):text.index('Generated:')]
+        assert section(markdown) == section(expected)
+        assert f"{stored['overall_score']}" in markdown
+
+        html = client.get(f'/api/report/{analysis_id}/html').text
+        assert 'Recommendations' in html and 'python' in html.lower()
@@ -0,0 +1,109 @@
+"""
+Tests for offline batch scoring
+"""
+
+import csv
+import io
+import json
+
+import pytest
+
+from app.__main__ import main
+from app.batch import iter_resume_paths, load_jds, run_batch
+
+RESUME = """John Doe
+Senior Software Engineer
+
+EXPERIENCE
+Senior Software Engineer, Acme Corp (2019 - 2024)
+- Built Python microservices with FastAPI and PostgreSQL on AWS
+- Led migration to Kubernetes and Docker
+
+SKILLS
+Python, FastAPI, PostgreSQL, AWS, Docker, Kubernetes
+"""
+
+WEAK_RESUME = """Jane Roe
+
+EXPERIENCE
+Barista, Cafe (2020 - 2024)
+- Made coffee
+"""
+
+JD = """Senior Backend Engineer
+Requirements:
+- 5+ years of Python experience
+- Experience with PostgreSQL and AWS
+Nice to have: Kubernetes, Docker
+"""
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    resumes = tmp_path / 'resumes'
+    (resumes / 'nested').mkdir(parents=True)
+    (resumes / 'strong.txt').write_text(RESUME)
+    (resumes / 'nested' / 'weak.txt').write_text(WEAK_RESUME)
+    (resumes / 'empty.txt').write_text('')
+    (resumes / 'notes.md').write_text(RESUME)
+    jds = tmp_path / 'jds'
+    jds.mkdir()
+    (jds / 'backend.txt').write_text(JD)
+    (jds / 'platform.txt').write_text(JD + "\nTerraform and GCP required\n")
+    return resumes, jds
+
+
+class TestInputs:
+    """Test resume and JD discovery."""
+
+    def test_directories_globs_and_files(self, corpus):
+        """Test directories are walked, globs expanded, unsupported files skipped and duplicates dropped."""
+        resumes, _ = corpus
+        paths = list(iter_resume_paths([str(resumes), str(resumes / '**' / '*.txt'), str(resumes / 'strong.txt')]))
+        assert sorted(p.rsplit('/', 1)[1] for p in paths) == ['empty.txt', 'strong.txt', 'weak.txt']
+
+    def test_jd_directory(self, corpus):
+        """Test a JD directory yields every JD with its path as the name."""
+        _, jds = corpus
+        loaded = load_jds([str(jds)])
+        assert [name.rsplit('/', 1)[1] for name, _ in loaded] == ['backend.txt', 'platform.txt']
+
+
+class TestRunBatch:
+    """Test ranked batch output."""
+
+    def test_ranked_jsonl_with_errors(self, corpus):
+        """Test results are ranked per JD, best first, and failures follow."""
+        resumes, jds = corpus
+        output = io.StringIO()
+        summary = run_batch(iter_resume_paths([str(resumes)]), load_jds([str(jds)]), output)
+        records = [json.loads(line) for line in output.getvalue().splitlines()]
+
+        assert summary['files'] == 3 and summary['failed'] == 1 and summary['analyses'] == 4
+        ranked = [record for record in records if 'rank' in record]
+        assert [(r['jd'].rsplit('/', 1)[1], r['rank'], r['file'].rsplit('/', 1)[1]) for r in ranked] == [
+            ('backend.txt', 1, 'strong.txt'), ('backend.txt', 2, 'weak.txt'),
+            ('platform.txt', 1, 'strong.txt'), ('platform.txt', 2, 'weak.txt'),
+        ]
+        assert records[-1]['file'].endswith('empty.txt') and records[-1]['error']
+
+    def test_top_csv_matches_process_pool(self, corpus):
+        """Test top-N CSV output is the same with one process and with a pool."""
+        resumes, jds = corpus
+        outputs = []
+        for workers in (1, 2):
+            output = io.StringIO()
+            run_batch(iter_resume_paths([str(resumes)]), load_jds([str(jds)]), output,
+                      export_format='csv', top=1, workers=workers, chunk_size=1)
+            outputs.append(output.getvalue())
+        assert outputs[0] == outputs[1]
+        rows = list(csv.DictReader(io.StringIO(outputs[0])))
+        assert [row['rank'] for row in rows] == ['1', '1', '']
+        assert rows[0]['file'].endswith('strong.txt') and 'python' in rows[0]['must_have_matched']
+
+    def test_cli(self, corpus, tmp_path):
+        """Test the score subcommand writes its output file."""
+        resumes, jds = corpus
+        out = tmp_path / 'ranked.jsonl'
+        assert main(['score', '--jd', str(jds / 'backend.txt'), str(resumes), '-j', '1', '-o', str(out)]) == 0
+        assert len(out.read_text().splitlines()) == 3
@@ -0,0 +1,117 @@
+"""
+Tests for sharded batch scoring
+"""
+
+import io
+import threading
+import time
+
+import pytest
+
+from app.batch import iter_resume_paths, run_batch
+from app.cluster import Broker, run_distributed, run_worker
+from tests.test_batch import JD, RESUME, WEAK_RESUME
+
+JDS = [('backend', JD)]
+
+
+def _broker(shard_count, **kwargs):
+    return Broker([[f"/resumes/{n}.txt"] for n in range(shard_count)], JDS, **kwargs)
+
+
+def _scored(shard_id):
+    return [(f"/resumes/{shard_id}.txt", [{'overall_score': float(shard_id)}], None)]
+
+
+@pytest.fixture
+def resumes(tmp_path):
+    for n in range(6):
+        (tmp_path / f"resume{n}.txt").write_text((RESUME if n % 2 else WEAK_RESUME) + f"\nReference {n}\n")
+    (tmp_path / 'empty.txt').write_text('')
+    return list(iter_resume_paths([str(tmp_path)]))
+
+
+class TestBroker:
+    """Test shard leasing, stealing and retries."""
+
+    def test_idle_worker_steals_from_most_loaded(self):
+        """Test a worker with nothing left takes the last leased shard of the busiest worker."""
+        broker = _broker(5)
+        busy = broker.register('busy')['worker_id']
+        idle = broker.register('idle')['worker_id']
+        assert [shard_id for shard_id, _ in broker.lease(busy, 4)] == [0, 1, 2, 3]
+        assert [shard_id for shard_id, _ in broker.lease(idle, 4)] == [4]
+        assert broker.start(idle, 4) and broker.complete(idle, 4, _scored(4))
+        assert [shard_id for shard_id, _ in broker.lease(idle, 4)] == [3]
+        assert broker.start(busy, 0) and not broker.start(busy, 3)
+        assert broker.stats()['steals'] == 1
+
+    def test_failed_shard_is_retried_then_reported(self):
+        """Test a failing shard goes back to the head of the queue until its attempts run out."""
+        broker = _broker(2, max_attempts=2)
+        worker = broker.register('worker')['worker_id']
+        for attempt in range(2):
+            (shard_id, documents), = broker.lease(worker, 1)
+            assert shard_id == 0 and documents[0][2]  # the file does not exist
+            assert broker.start(worker, 0)
+            broker.fail(worker, 0, "out of memory")
+        assert broker.stats()['retries'] == 1
+        (shard_id, _), = broker.lease(worker, 1)
+        broker.start(worker, shard_id)
+        broker.complete(worker, shard_id, _scored(shard_id))
+        outcomes = list(broker.results(poll=0.01))
+        assert outcomes[0] == ('/resumes/0.txt', None, "Shard failed after 2 attempts: out of memory")
+        assert outcomes[1] == _scored(1)[0]
+        assert broker.lease(worker, 1) is None
+
+    def test_silent_worker_shards_are_reassigned(self):
+        """Test shards of a worker that stops heartbeating are taken back, and finished only once."""
+        broker = _broker(2, lease_timeout=0.05)
+        silent = broker.register('silent')['worker_id']
+        broker.lease(silent, 2)
+        broker.start(silent, 0)
+        time.sleep(0.1)
+        rescuer = broker.register('rescuer')['worker_id']
+        assert [shard_id for shard_id, _ in broker.lease(rescuer, 2)] == [0, 1]
+        assert not broker.start(silent, 1)
+        broker.fail(silent, 0, "late failure")
+        assert broker.stats()['retries'] == 1
+        assert broker.complete(silent, 0, _scored(0))
+        assert not broker.start(rescuer, 0)
+        assert not broker.complete(rescuer, 0, _scored(0))
+        assert broker.start(rescuer, 1) and broker.complete(rescuer, 1, _scored(1))
+        assert len(list(broker.results(poll=0.01))) == 2
+
+
+class TestRunDistributed:
+    """Test ranked output of distributed runs."""
+
+    def test_local_workers_match_run_batch(self, resumes):
+        """Test output from local worker processes is the same as a single-process batch run."""
+        expected = io.StringIO()
+        run_batch(resumes, JDS, expected, export_format='csv', top=3)
+        output = io.StringIO()
+        summary = run_distributed(resumes, JDS, output, export_format='csv', top=3, shard_size=2, local_workers=2)
+        assert output.getvalue() == expected.getvalue()
+        assert summary['shards'] == 4 and summary['failed'] == 1
+        assert sum(summary['workers'].values()) == 4
+
+    def test_remote_worker_over_tcp(self, resumes):
+        """Test a worker that connects to the coordinator's address with the shared authkey."""
+        listening = []
+        ready = threading.Event()
+        output = io.StringIO()
+
+        def on_listening(address):
+            listening.append(address)
+            ready.set()
+
+        coordinator = threading.Thread(target=run_distributed, args=(resumes, JDS, output), kwargs={
+            'shard_size': 3, 'authkey': b'secret', 'on_listening': on_listening,
+        })
+        coordinator.start()
+        assert ready.wait(5)
+        assert run_worker(listening[0], b'secret', name='remote', poll=0.01) == 3
+        coordinator.join(10)
+        records = output.getvalue().splitlines()
+        assert len(records) == 7 and '"rank": 1' in records[0]
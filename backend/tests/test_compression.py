@@ -0,0 +1,88 @@
+"""
+Tests for negotiated response compression
+"""
+
+import asyncio
+import gzip
+import zlib
+
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+from fastapi.testclient import TestClient
+
+from app.compression import CompressionMiddleware, negotiate_encoding
+
+
+def _client() -> TestClient:
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=100)
+    
+    @app.get("/small")
+    async def small():
+        return {'ok': True}
+    
+    @app.get("/large")
+    async def large():
+        return {'items': ['python'] * 200}
+    
+    @app.get("/binary")
+    async def binary():
+        return PlainTextResponse("x" * 500, media_type="application/pdf")
+    
+    return TestClient(app)
+
+
+class TestNegotiation:
+    """Test Accept-Encoding negotiation."""
+    
+    def test_gzip_and_quality_values(self):
+        """Test gzip is chosen when acceptable and refused with q=0."""
+        assert negotiate_encoding("gzip, deflate") == 'gzip'
+        assert negotiate_encoding("*") == 'gzip'
+        assert negotiate_encoding("gzip;q=0, identity") is None
+        assert negotiate_encoding("identity") is None
+
+
+class TestCompressionMiddleware:
+    """Test which responses are compressed."""
+    
+    def test_large_json_is_compressed(self):
+        """Test large JSON bodies are gzipped with a matching length and Vary."""
+        response = _client().get("/large", headers={'Accept-Encoding': 'gzip'})
+        
+        assert response.headers['content-encoding'] == 'gzip'
+        assert response.headers['vary'] == 'Accept-Encoding'
+        assert int(response.headers['content-length']) == response.num_bytes_downloaded
+        assert response.json() == {'items': ['python'] * 200}
+    
+    def test_small_binary_and_identity_are_not_compressed(self):
+        """Test small bodies, non-text types and clients without gzip get identity."""
+        client = _client()
+        
+        assert 'content-encoding' not in client.get("/small", headers={'Accept-Encoding': 'gzip'}).headers
+        assert 'content-encoding' not in client.get("/binary", headers={'Accept-Encoding': 'gzip'}).headers
+        assert 'content-encoding' not in client.get("/large", headers={'Accept-Encoding': 'identity'}).headers
+    
+    def test_streamed_chunks_decode_on_arrival(self):
+        """Test each streamed chunk is flushed so it decodes without the rest."""
+        async def ndjson_app(scope, receive, send):
+            await send({'type': 'http.response.start', 'status': 200,
+                        'headers': [(b'content-type', b'application/x-ndjson')]})
+            for n in range(3):
+                await send({'type': 'http.response.body', 'body': f'{{"n": {n}}}\n'.encode(), 'more_body': True})
+            await send({'type': 'http.response.body', 'body': b''})
+        
+        sent = []
+        
+        async def send(message):
+            sent.append(message)
+        
+        scope = {'type': 'http', 'headers': [(b'accept-encoding', b'gzip')]}
+        asyncio.run(CompressionMiddleware(ndjson_app)(scope, None, send))
+        
+        headers = dict(sent[0]['headers'])
+        assert headers[b'content-encoding'] == b'gzip' and b'content-length' not in headers
+        chunks = [message['body'] for message in sent[1:]]
+        decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        assert decoder.decompress(chunks[0]) == b'{"n": 0}\n'
+        assert gzip.decompress(b''.join(chunks)) == b'{"n": 0}\n{"n": 1}\n{"n": 2}\n'
@@ -0,0 +1,120 @@
+"""
+Tests for watch-folder ingestion
+"""
+
+import json
+import os
+import time
+
+import pytest
+
+from app.ingest import INGEST_FILES, Checkpoint, Ingestor, _Inotify
+from tests.test_batch import JD, RESUME, WEAK_RESUME
+
+PLATFORM_JD = JD + "\nTerraform and GCP required\n"
+
+
+def _write(path, text, age=60.0):
+    """Write a file whose last modification was ``age`` seconds ago."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+    then = time.time() - age
+    os.utime(path, (then, then))
+
+
+def _records(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+@pytest.fixture
+def inbox(tmp_path):
+    inbox = tmp_path / 'inbox'
+    _write(inbox / 'strong.txt', RESUME)
+    _write(inbox / 'platform' / 'weak.txt', WEAK_RESUME)
+    _write(inbox / '.strong.txt.partial', RESUME)
+    _write(inbox / 'empty.txt', '')
+    return inbox
+
+
+def _ingestor(tmp_path, inbox, **kwargs):
+    watches = [(str(inbox), [('backend', JD)]), (str(inbox / 'platform'), [('backend', JD), ('platform', PLATFORM_JD)])]
+    kwargs.setdefault('use_inotify', False)
+    return Ingestor(watches, str(tmp_path / 'out.jsonl'), str(tmp_path / 'checkpoint.db'), **kwargs)
+
+
+class TestIngestor:
+    """Test scanning, scoring and checkpointing of watched directories."""
+
+    def test_scores_each_directory_against_its_jds(self, tmp_path, inbox):
+        """Test files are scored against their innermost directory's JDs and failures are recorded."""
+        before = INGEST_FILES.value(status='scored')
+        summary = _ingestor(tmp_path, inbox).run(once=True)
+        assert summary['files'] == 3 and summary['failed'] == 1
+        records = _records(tmp_path / 'out.jsonl')
+        scored = sorted((r['file'].rsplit('/', 1)[1], r['jd']) for r in records if 'result' in r)
+        assert scored == [('strong.txt', 'backend'), ('weak.txt', 'backend'), ('weak.txt', 'platform')]
+        assert [r['file'].rsplit('/', 1)[1] for r in records if 'error' in r] == ['empty.txt']
+        assert INGEST_FILES.value(status='scored') == before + 2
+
+    def test_waits_for_files_to_settle(self, tmp_path):
+        """Test a recently written file is left alone until it has gone unmodified long enough."""
+        inbox = tmp_path / 'inbox'
+        _write(inbox / 'new.txt', RESUME, age=0)
+        ingestor = _ingestor(tmp_path, inbox, settle=30.0)
+        try:
+            ingestor.step()
+            ingestor.step()
+            assert ingestor.backlog == {'settling': 1, 'queued': 0, 'scoring': 0}
+            _write(inbox / 'new.txt', RESUME)
+            ingestor.step()
+            assert ingestor.files == 0
+            ingestor.step()
+            assert ingestor.files == 1
+        finally:
+            ingestor.close()
+
+    def test_restart_neither_loses_nor_repeats(self, tmp_path, inbox):
+        """Test a restart skips scored files, discards uncheckpointed output and rescores changed files."""
+        _ingestor(tmp_path, inbox).run(once=True)
+        output = tmp_path / 'out.jsonl'
+        first = output.read_text()
+        with open(output, 'a') as f:
+            f.write('{"file": "written before a crash"')
+        assert _ingestor(tmp_path, inbox).run(once=True)['files'] == 0
+        assert output.read_text() == first
+
+        _write(inbox / 'strong.txt', RESUME + "\nTerraform\n")
+        _write(inbox / 'later.txt', WEAK_RESUME)
+        assert _ingestor(tmp_path, inbox).run(once=True)['files'] == 2
+        assert len(_records(output)) == len(first.splitlines()) + 2
+
+        checkpoint = Checkpoint(str(tmp_path / 'checkpoint.db'))
+        assert checkpoint.output_offset() == output.stat().st_size
+        assert len(checkpoint.scored()) == 4
+        checkpoint.close()
+
+    def test_process_pool_matches_inline(self, tmp_path, inbox):
+        """Test scoring in a process pool produces the same scores."""
+        outputs = []
+        for workers in (1, 2):
+            run_dir = tmp_path / f"run{workers}"
+            run_dir.mkdir()
+            _ingestor(run_dir, inbox, workers=workers, chunk_size=1).run(once=True)
+            outputs.append(sorted((r['file'], r.get('jd'), r['result']['overall_score'] if 'result' in r else r['error'])
+                                  for r in _records(run_dir / 'out.jsonl')))
+        assert outputs[0] == outputs[1]
+
+
+@pytest.mark.skipif(_Inotify.create() is None, reason="inotify is not available")
+def test_inotify_wakes_on_new_file(tmp_path):
+    """Test a file created in a watched directory ends the wait early."""
+    inotify = _Inotify.create()
+    try:
+        inotify.watch(str(tmp_path))
+        assert inotify.wait(0) is False
+        (tmp_path / 'resume.txt').write_text(RESUME)
+        started = time.monotonic()
+        assert inotify.wait(5) is True
+        assert time.monotonic() - started < 1
+    finally:
+        inotify.close()
@@ -0,0 +1,108 @@
+"""
+Tests for the asynchronous analysis job queue
+"""
+
+import time
+import pytest
+from app.jobs import JobQueue, WorkerPool, JOB_QUEUED, JOB_RUNNING, JOB_DONE, JOB_FAILED
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return JobQueue(str(tmp_path / "jobs.db"))
+
+
+def _wait_for(queue, job_id, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = queue.get(job_id)
+        if job['status'] in (JOB_DONE, JOB_FAILED):
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+
+class TestJobQueue:
+    """Test queue persistence and claiming."""
+    
+    def test_submit_and_claim_in_order(self, queue):
+        """Test jobs are claimed oldest first."""
+        first = queue.submit({'n': 1})
+        second = queue.submit({'n': 2}, resume_file=b"%PDF")
+        
+        assert queue.depth() == 2
+        assert queue.get(second)['queue_position'] == 1
+        
+        job = queue.claim()
+        assert job['id'] == first and job['payload'] == {'n': 1}
+        assert queue.claim()['resume_file'] == b"%PDF"
+        assert queue.claim() is None
+    
+    def test_only_expired_leases_requeued_on_restart(self, tmp_path):
+        """Test reopening the queue leaves live jobs running and requeues ones past their lease."""
+        path = str(tmp_path / "jobs.db")
+        queue = JobQueue(path, lease_seconds=60)
+        job_id = queue.submit({'n': 1})
+        queue.claim()
+        
+        assert JobQueue(path, lease_seconds=60).get(job_id)['status'] == JOB_RUNNING
+        queue._conn().execute("UPDATE jobs SET started_at = ? WHERE id = ?", (time.time() - 120, job_id))
+        reopened = JobQueue(path, lease_seconds=60)
+        assert reopened.get(job_id)['status'] == JOB_QUEUED
+        assert reopened.claim()['id'] == job_id
+    
+    def test_sweep_deletes_old_finished_jobs(self, tmp_path):
+        """Test finished jobs past the retention are deleted and queued or recent ones kept."""
+        queue = JobQueue(str(tmp_path / "jobs.db"), retention_seconds=3600)
+        old_done, old_failed, recent, waiting = (queue.submit({'n': n}) for n in range(4))
+        for _ in range(3):
+            queue.claim()
+        queue.complete(old_done, {'ok': True})
+        queue.fail(old_failed, "boom")
+        queue.complete(recent, {'ok': True})
+        queue._conn().execute(
+            "UPDATE jobs SET finished_at = ? WHERE id IN (?, ?)", (time.time() - 7200, old_done, old_failed)
+        )
+        
+        assert queue.sweep() == {'requeued': 0, 'purged': 2}
+        assert queue.get(old_done) is None and queue.get(old_failed) is None
+        assert queue.get(recent)['status'] == JOB_DONE
+        assert queue.get(waiting)['status'] == JOB_QUEUED
+
+
+class TestWorkerPool:
+    """Test the worker pool drains and scales."""
+    
+    def test_pool_completes_and_fails_jobs(self, queue):
+        """Test handler results and errors are recorded."""
+        def handler(job):
+            if job['payload'].get('boom'):
+                raise ValueError("boom")
+            return {'analysis_id': 'a1', 'result': {'score': job['payload']['n']}}
+        
+        pool = WorkerPool(queue, handler, min_workers=1, max_workers=2, poll_interval=0.05)
+        pool.start()
+        try:
+            ok = queue.submit({'n': 3})
+            bad = queue.submit({'boom': True})
+            pool.notify()
+            
+            assert _wait_for(queue, ok)['result'] == {'score': 3}
+            failed = _wait_for(queue, bad)
+            assert failed['status'] == JOB_FAILED and failed['error'] == "boom"
+        finally:
+            pool.stop()
+    
+    def test_pool_scales_with_depth(self, queue):
+        """Test workers are added up to the maximum as the queue grows."""
+        pool = WorkerPool(queue, lambda job: time.sleep(0.2) or {}, min_workers=0,
+                          max_workers=3, jobs_per_worker=1, poll_interval=0.05)
+        pool.start()
+        try:
+            for n in range(6):
+                queue.submit({'n': n})
+            pool.notify()
+            
+            assert pool.size == 3
+        finally:
+            pool.stop()
@@ -0,0 +1,187 @@
+"""
+Tests for per-JD candidate leaderboards
+"""
+
+import pytest
+
+from app import leaderboard as leaderboard_module
+from app.leaderboard import Leaderboard, LeaderboardStore
+from app.scoring_engine import ScoringEngine, to_dict
+from app.store import MemoryAnalysisStore, content_hash
+
+STRONG = """John Doe
+Senior Software Engineer
+
+EXPERIENCE
+Senior Software Engineer, Acme Corp (2016 - 2024)
+- Built Python microservices with FastAPI and PostgreSQL on AWS
+- Led migration to Kubernetes and Docker
+
+SKILLS
+Python, FastAPI, PostgreSQL, AWS, Docker, Kubernetes
+"""
+
+MIDDLE = """Sam Lee
+
+EXPERIENCE
+Developer, Startup (2021 - 2024)
+- Wrote Python scripts
+
+SKILLS
+Python
+"""
+
+WEAK = """Jane Roe
+
+EXPERIENCE
+Barista, Cafe (2020 - 2024)
+- Made coffee
+"""
+
+JD = """Senior Backend Engineer
+Requirements:
+- 5+ years of Python experience
+- Experience with PostgreSQL and AWS
+Nice to have: Kubernetes, Docker
+"""
+
+SKILLS_ONLY = {'keyword_skills': 1.0, 'experience_relevance': 0.0, 'role_match': 0.0, 'seniority_match': 0.0,
+               'education_match': 0.0, 'tooling_stack_match': 0.0, 'recency_match': 0.0, 'red_flags': 0.0}
+
+
+def _record(store, analysis_id, resume, jd=JD, weights=None, strict_mode=False):
+    engine = ScoringEngine(weights=weights, strict_mode=strict_mode)
+    result = to_dict(engine.analyze(resume, jd))
+    store.analyses.put(analysis_id, {'result': result, 'resume_text': resume, 'jd_text': jd})
+    return store.record(analysis_id, jd, resume, result, engine.weights, engine.strict_mode)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = LeaderboardStore(str(tmp_path / 'boards.db'), MemoryAnalysisStore())
+    yield store
+    store.close()
+
+
+class TestLeaderboard:
+    """Test the in-memory ranking."""
+
+    def test_order_ties_and_moves(self):
+        """Test entries rank best first, ties by id, and a resume's new analysis replaces its entry."""
+        board = Leaderboard('jd', 0)
+        for analysis_id, score in [('b', 50.0), ('a', 50.0), ('c', 90.0), ('d', 10.0)]:
+            board.add(f"resume-{analysis_id}", analysis_id, score, 'label', 0.0)
+        assert [entry['analysis_id'] for entry in board.page()] == ['c', 'a', 'b', 'd']
+        board.add('resume-d', 'd2', 95.0, 'label', 0.0)
+        assert len(board) == 4
+        assert board.rank('d2')['rank'] == 1 and board.rank('c')['rank'] == 2
+        assert board.rank('d') is None and board.rank('missing') is None
+
+    def test_pages_and_score_ranges(self):
+        """Test offset pages and inclusive score ranges."""
+        board = Leaderboard('jd', 0)
+        for n in range(10):
+            board.add(f"resume{n}", f"id{n}", float(n * 10), 'label', 0.0)
+        assert [entry['rank'] for entry in board.page(8, 5)] == [9, 10]
+        entries, total = board.range_page(30.0, 60.0, 1, 2)
+        assert total == 4
+        assert [entry['overall_score'] for entry in entries] == [50.0, 40.0]
+        assert board.range_page(95.0, None)[1] == 0
+
+
+class TestLeaderboardStore:
+    """Test persisted leaderboards."""
+
+    def test_record_and_page(self, store):
+        """Test analyses of one JD share a board ranked by score."""
+        recorded = [_record(store, name, resume) for name, resume in
+                    [('weak', WEAK), ('strong', STRONG), ('middle', MIDDLE)]]
+        jd_hash = recorded[0]['jd_hash']
+        assert jd_hash == content_hash(JD)
+        page = store.page(jd_hash, limit=2)
+        assert page['size'] == page['total'] == 3 and page['next_offset'] == 2
+        assert [entry['analysis_id'] for entry in page['entries']] == ['strong', 'middle']
+        assert store.rank(jd_hash, 'weak')['rank'] == 3
+        assert store.page('unknown') is None
+
+    def test_other_workers_see_new_entries(self, store, tmp_path):
+        """Test a second store on the same file picks up entries added after its first read."""
+        other = LeaderboardStore(str(tmp_path / 'boards.db'), store.analyses)
+        try:
+            jd_hash = _record(store, 'weak', WEAK)['jd_hash']
+            assert other.page(jd_hash)['size'] == 1
+            _record(store, 'strong', STRONG)
+            assert other.rank(jd_hash, 'strong')['rank'] == 1
+        finally:
+            other.close()
+
+    def test_reanalysis_replaces_entry(self, store, tmp_path):
+        """Test analysing the same resume again keeps one entry, for the latest analysis."""
+        other = LeaderboardStore(str(tmp_path / 'boards.db'), store.analyses)
+        try:
+            jd_hash = _record(store, 'strong', STRONG)['jd_hash']
+            _record(store, 'weak', WEAK)
+            assert other.page(jd_hash)['size'] == 2
+            _record(store, 'strong-again', STRONG)
+            for board in (store, other):
+                page = board.page(jd_hash)
+                assert [entry['analysis_id'] for entry in page['entries']] == ['strong-again', 'weak']
+                assert board.rank(jd_hash, 'strong') is None
+        finally:
+            other.close()
+
+    def test_other_settings_are_rescored(self, store):
+        """Test an analysis run with other settings is ranked under the board's settings."""
+        recorded = _record(store, 'strong', STRONG, weights=SKILLS_ONLY)
+        default = to_dict(ScoringEngine().analyze(STRONG, JD))
+        assert recorded['overall_score'] == pytest.approx(default['overall_score'])
+
+    def test_configure_recomputes(self, store):
+        """Test changing a board's settings rescores its entries."""
+        jd_hash = _record(store, 'strong', STRONG)['jd_hash']
+        before = store.rank(jd_hash, 'strong')['overall_score']
+        info = store.configure(jd_hash, weights=SKILLS_ONLY, strict_mode=True)
+        assert info['strict_mode'] is True and info['weights']['keyword_skills'] == 1.0
+        expected = ScoringEngine(weights=SKILLS_ONLY, strict_mode=True).analyze(STRONG, JD).overall_score
+        assert store.rank(jd_hash, 'strong')['overall_score'] == pytest.approx(expected)
+        assert expected != before
+        assert store.configure('unknown') is None
+
+    def test_version_change_recomputes(self, store, monkeypatch):
+        """Test a board scored by another engine version is rescored when read."""
+        jd_hash = _record(store, 'strong', STRONG)['jd_hash']
+        store.page(jd_hash)
+        monkeypatch.setattr(leaderboard_module, 'SCORING_VERSION', 'next')
+        recomputed = []
+        original = store.recompute
+        monkeypatch.setattr(store, 'recompute', lambda *args, **kwargs: (recomputed.append(args), original(*args, **kwargs)))
+        assert store.page(jd_hash)['size'] == 1
+        assert store.info(jd_hash)['version'] == 'next'
+        store.page(jd_hash)
+        assert len(recomputed) == 1
+
+    def test_rebase_to_revised_jd(self, store):
+        """Test a revised JD gets a board with the old entries rescored against it."""
+        _record(store, 'strong', STRONG)
+        _record(store, 'weak', WEAK)
+        revised = JD + "\nTerraform and GCP required\n"
+        info = store.rebase(JD, revised)
+        assert info['jd_hash'] == content_hash(revised)
+        page = store.page(info['jd_hash'])
+        assert [entry['analysis_id'] for entry in page['entries']] == ['strong', 'weak']
+        expected = ScoringEngine().analyze(STRONG, revised).overall_score
+        assert page['entries'][0]['overall_score'] == pytest.approx(expected)
+        assert store.rebase(revised, revised) is None
+
+    def test_recompute_drops_evicted_analyses(self, tmp_path):
+        """Test rescoring reads resumes from the analysis store and drops entries whose analysis is gone."""
+        store = LeaderboardStore(str(tmp_path / 'evicting.db'), MemoryAnalysisStore(max_entries=1))
+        try:
+            jd_hash = _record(store, 'weak', WEAK)['jd_hash']
+            _record(store, 'strong', STRONG)
+            assert store.page(jd_hash)['size'] == 2
+            store.configure(jd_hash, weights=SKILLS_ONLY)
+            page = store.page(jd_hash)
+            assert [entry['analysis_id'] for entry in page['entries']] == ['strong']
+        finally:
+            store.close()
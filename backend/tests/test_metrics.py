@@ -0,0 +1,127 @@
+"""
+Tests for the Prometheus metrics registry
+"""
+
+import asyncio
+
+from app.metrics import REQUEST_SECONDS, REQUESTS_IN_FLIGHT, RequestMetricsMiddleware, Registry, timed_stage, trace_stages
+from app.profiling import profile_call
+from app.scoring_engine import ScoringEngine
+
+
+class TestRegistry:
+    """Test metric types and text exposition."""
+    
+    def test_counter_and_gauge(self):
+        """Test counters and gauges render with labels."""
+        registry = Registry()
+        requests = registry.counter("requests_total", "Requests", ["route"])
+        in_flight = registry.gauge("in_flight", "In flight")
+        
+        requests.inc(route="/a")
+        requests.inc(2, route="/a")
+        in_flight.inc()
+        in_flight.dec()
+        
+        text = registry.render()
+        assert '# TYPE requests_total counter' in text
+        assert 'requests_total{route="/a"} 3' in text
+        assert 'in_flight 0' in text
+    
+    def test_histogram_buckets_are_cumulative(self):
+        """Test histogram buckets, sum and count."""
+        registry = Registry()
+        latency = registry.histogram("latency_seconds", "Latency", ["stage"], buckets=(0.1, 1.0))
+        
+        for value in (0.05, 0.5, 5.0):
+            latency.observe(value, stage="parse")
+        
+        text = registry.render()
+        assert 'latency_seconds_bucket{stage="parse",le="0.1"} 1' in text
+        assert 'latency_seconds_bucket{stage="parse",le="1.0"} 2' in text
+        assert 'latency_seconds_bucket{stage="parse",le="+Inf"} 3' in text
+        assert 'latency_seconds_count{stage="parse"} 3' in text
+        assert latency.count(stage="parse") == 3
+    
+    def test_callback_gauge(self):
+        """Test gauges can be read from a callback at render time."""
+        registry = Registry()
+        registry.gauge("store_size", "Store size", ["unit"], callback=lambda: {('entries',): 7})
+        
+        assert 'store_size{unit="entries"} 7' in registry.render()
+    
+    def test_register_is_idempotent(self):
+        """Test registering a metric name twice returns the first metric."""
+        registry = Registry()
+        first = registry.counter("c", "C")
+        
+        assert registry.counter("c", "C") is first
+
+
+class TestRequestMetrics:
+    """Test the request metrics middleware."""
+    
+    def test_streamed_response_in_flight_until_last_chunk(self):
+        """Test a streamed request is timed and in flight until its final body chunk."""
+        in_flight = []
+        
+        async def stream_app(scope, receive, send):
+            await send({'type': 'http.response.start', 'status': 200, 'headers': []})
+            for n in range(2):
+                await send({'type': 'http.response.body', 'body': b'x', 'more_body': True})
+            await send({'type': 'http.response.body', 'body': b''})
+        
+        async def send(message):
+            in_flight.append(REQUESTS_IN_FLIGHT.value())
+        
+        before = REQUESTS_IN_FLIGHT.value()
+        count = REQUEST_SECONDS.count(route='unmatched', method='GET')
+        scope = {'type': 'http', 'method': 'GET', 'headers': []}
+        asyncio.run(RequestMetricsMiddleware(stream_app)(scope, None, send))
+        
+        assert in_flight == [before + 1] * 4
+        assert REQUESTS_IN_FLIGHT.value() == before
+        assert REQUEST_SECONDS.count(route='unmatched', method='GET') == count + 1
+
+
+class TestProfiling:
+    """Test stage tracing and request profiling."""
+    
+    def test_trace_nests_stages(self):
+        """Test traced stages form a tree in call order."""
+        with trace_stages() as trace:
+            with timed_stage('outer'):
+                with timed_stage('inner'):
+                    pass
+            with timed_stage('second'):
+                pass
+        
+        tree = trace.to_dict()
+        assert [child['stage'] for child in tree['children']] == ['outer', 'second']
+        assert tree['children'][0]['children'][0]['stage'] == 'inner'
+    
+    def test_stages_untraced_outside_context(self):
+        """Test stages run outside a trace are not collected."""
+        with trace_stages() as trace:
+            pass
+        with timed_stage('late'):
+            pass
+        
+        assert trace.to_dict()['children'] == []
+    
+    def test_profile_call_reports_analysis_stages(self):
+        """Test profiling an analysis returns its stage tree and top functions."""
+        engine = ScoringEngine()
+        result, profile = profile_call(
+            engine.analyze,
+            "Software Engineer\nPython developer with 5 years experience",
+            "Required: Python. Nice to have: Docker.",
+            top=5
+        )
+        
+        assert result.overall_score >= 0
+        analyze = profile['stages']['children'][0]
+        assert analyze['stage'] == 'analyze'
+        assert 'score_keyword_skills' in [child['stage'] for child in analyze['children']]
+        assert len(profile['top_functions']) == 5
+        assert profile['top_functions'][0]['cumtime_ms'] >= profile['top_functions'][-1]['cumtime_ms']
@@ -0,0 +1,60 @@
+"""
+Tests for result field projection
+"""
+
+import pytest
+
+from app.projection import narrower_detail_level, parse_fields, project, required_detail_level
+
+
+RESULT = {
+    'overall_score': 72.5,
+    'label': 'STRONG_MATCH',
+    'categories': {
+        'keyword_skills': {'score': 80, 'details': {'matched': 4}, 'evidence': ['Python']},
+        'role_match': {'score': 60, 'details': {}, 'evidence': []},
+    },
+    'must_have': [{'term': 'python', 'matched': True, 'evidence': '...Python...', 'category': 'must-have'}],
+}
+
+
+class TestProjection:
+    """Test parsing and applying ``fields``."""
+    
+    def test_project_paths_and_wildcards(self):
+        """Test dotted paths, wildcards and list elements are projected."""
+        tree = parse_fields("overall_score, categories.*.score, categories.keyword_skills.details, must_have.term")
+        
+        assert project(RESULT, tree) == {
+            'overall_score': 72.5,
+            'categories': {
+                'keyword_skills': {'score': 80, 'details': {'matched': 4}},
+                'role_match': {'score': 60},
+            },
+            'must_have': [{'term': 'python'}],
+        }
+        assert project(RESULT, None) is RESULT
+    
+    def test_invalid_fields(self):
+        """Test unknown top-level fields and empty path segments are rejected."""
+        assert parse_fields("  ") is None
+        with pytest.raises(ValueError):
+            parse_fields("score")
+        with pytest.raises(ValueError):
+            parse_fields("categories..score")
+    
+    @pytest.mark.parametrize('fields, level', [
+        ("overall_score,label,categories.*.score,red_flags", 'scores'),
+        ("must_have.term,must_have.matched", 'keywords'),
+        ("must_have", 'full'),
+        ("categories.role_match", 'full'),
+        ("actions", 'full'),
+    ])
+    def test_required_detail_level(self, fields, level):
+        """Test the narrowest detail level covering the projection is chosen."""
+        assert required_detail_level(parse_fields(fields)) == level
+    
+    def test_never_raises_detail_level(self):
+        """Test a projection only ever lowers the requested detail level."""
+        assert narrower_detail_level('scores', parse_fields("actions")) == 'scores'
+        assert narrower_detail_level('full', None) == 'full'
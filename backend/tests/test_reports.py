@@ -0,0 +1,71 @@
+"""
+Tests for report renderers and report caching
+"""
+
+from pathlib import Path
+from app.scoring_engine import ScoringEngine, to_dict
+from app.reports import iter_html_report, iter_markdown_report, render_markdown_report
+from app.report_cache import (
+    ReportCache,
+    etag_matches,
+    not_modified_since,
+    report_etag,
+    report_last_modified
+)
+
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+SAMPLE_RESULT = to_dict(ScoringEngine().analyze(
+    (FIXTURES_DIR / "sample_resume.txt").read_text(),
+    (FIXTURES_DIR / "sample_jd.txt").read_text()
+))
+
+
+class TestRenderers:
+    """Test Markdown and HTML report rendering."""
+    
+    def test_markdown_streams_in_chunks(self):
+        """Test the Markdown report is produced as several chunks."""
+        chunks = list(iter_markdown_report(SAMPLE_RESULT))
+        
+        assert len(chunks) > 1
+        assert ''.join(chunks) == render_markdown_report(SAMPLE_RESULT)
+        assert chunks[0].startswith("# ATS Resume Match Analysis Report")
+    
+    def test_html_escapes_content(self):
+        """Test user-derived text is escaped in HTML output."""
+        result = dict(SAMPLE_RESULT, red_flags=["<script>alert(1)</script>"])
+        html = ''.join(iter_html_report(result, "id-1"))
+        
+        assert "<script>alert" not in html
+        assert "&lt;script&gt;" in html
+        assert html.rstrip().endswith("</html>")
+
+
+class TestReportCache:
+    """Test rendered report caching and validators."""
+    
+    def test_lru_by_bytes(self):
+        """Test least recently used reports are evicted past the byte budget."""
+        cache = ReportCache(max_bytes=10)
+        cache.put(('a', 'pdf', 'v'), b"12345")
+        cache.put(('b', 'pdf', 'v'), b"12345")
+        cache.get(('a', 'pdf', 'v'))
+        cache.put(('c', 'pdf', 'v'), b"12345")
+        
+        assert cache.get(('a', 'pdf', 'v')) == b"12345"
+        assert cache.get(('b', 'pdf', 'v')) is None
+    
+    def test_validators(self):
+        """Test ETag and Last-Modified comparisons."""
+        entry = {'created_at': '2024-01-02T03:04:05.678901'}
+        etag = report_etag('a', entry, 'pdf')
+        
+        assert etag != report_etag('a', entry, 'html')
+        assert etag_matches(f'"other", {etag}', etag)
+        assert not etag_matches('"other"', etag)
+        
+        last_modified = report_last_modified(entry)
+        assert not_modified_since(last_modified, last_modified)
+        assert not not_modified_since("Mon, 01 Jan 2024 00:00:00 GMT", last_modified)
@@ -0,0 +1,95 @@
+"""
+Tests for the requisition registry and reverse matching
+"""
+
+import pytest
+from app.requisitions import RequisitionRegistry
+from app.scoring_engine import JobFeatures, ResumeFeatures, ScoringEngine
+
+
+DATA_JD = """Data Engineer
+Required: experience with Python, Spark and Airflow
+Minimum 3 years of experience
+Preferred: Kafka is a plus"""
+
+FRONTEND_JD = """Frontend Developer
+Required: experience with React and TypeScript
+Minimum 2 years of experience"""
+
+RESUME = """PROFESSIONAL EXPERIENCE
+Data Engineer, 2018 - 2024
+Acme Corp
+- Built data pipelines in Python and Spark scheduled with Airflow
+- Streamed events through Kafka
+
+SKILLS
+Python, Spark, Airflow, Kafka, SQL"""
+
+
+@pytest.fixture
+def registry(tmp_path):
+    return RequisitionRegistry(str(tmp_path / "requisitions.db"))
+
+
+class TestJobFeatures:
+    """Test precompiled job features."""
+
+    def test_round_trip_matches_fresh_scoring(self):
+        """Test features restored from a dict score the same as the raw JD."""
+        job = JobFeatures.from_dict(DATA_JD, JobFeatures(DATA_JD).to_dict())
+        engine = ScoringEngine(detail_level='scores')
+
+        compiled = engine.analyze(ResumeFeatures(RESUME), job)
+        fresh = engine.analyze(RESUME, DATA_JD)
+
+        assert compiled.overall_score == fresh.overall_score
+        assert {k: v.score for k, v in compiled.categories.items()} == \
+            {k: v.score for k, v in fresh.categories.items()}
+
+
+class TestRequisitionRegistry:
+    """Test storage, indexing and matching."""
+
+    def test_put_get_remove(self, registry):
+        """Test requisitions are stored with compiled features."""
+        req = registry.put(DATA_JD, req_id='data-1')
+
+        assert req['title'] == 'Data Engineer'
+        assert 'spark' in req['features']['must_haves']
+        assert registry.get('data-1')['jd_text'] == DATA_JD
+        assert [r['req_id'] for r in registry.list()] == ['data-1']
+
+        assert registry.remove('data-1') is True
+        assert registry.remove('data-1') is False
+        assert registry.get('data-1') is None
+
+    def test_match_scores_only_overlapping_requisitions(self, registry):
+        """Test requisitions without shared skills are not scored."""
+        registry.put(DATA_JD, req_id='data-1')
+        registry.put(FRONTEND_JD, req_id='frontend-1')
+
+        result = registry.match(RESUME, top_k=5)
+
+        assert result['total_requisitions'] == 2
+        assert result['candidates_scored'] == 1
+        assert result['matches'][0]['req_id'] == 'data-1'
+        assert {'python', 'spark', 'airflow'} <= set(result['matches'][0]['shared_terms'])
+
+    def test_top_k_orders_by_score(self, registry):
+        """Test the best-scoring requisitions are returned first."""
+        registry.put(DATA_JD, req_id='data-1')
+        registry.put("Platform Engineer\nRequired: experience with Kafka and Kubernetes", req_id='platform-1')
+
+        matches = registry.match(RESUME, top_k=1)['matches']
+
+        assert [m['req_id'] for m in matches] == ['data-1']
+
+    def test_index_follows_other_writers(self, registry, tmp_path):
+        """Test a registry sees requisitions written by another instance."""
+        other = RequisitionRegistry(str(tmp_path / "requisitions.db"))
+        assert len(registry) == 0
+
+        other.put(DATA_JD, req_id='data-1')
+
+        assert len(registry) == 1
+        assert registry.match(RESUME)['matches'][0]['req_id'] == 'data-1'
@@ -0,0 +1,105 @@
+"""
+Tests for the binary scoring ingress
+"""
+
+import asyncio
+import socket
+import threading
+import time
+from contextlib import contextmanager
+
+import pytest
+
+from app.rpc import HEADER, JSON, MSGPACK, RPCClient, RPCError, RPCServer, decode_payload, encode_frame, msgpack
+
+
+@contextmanager
+def _serving(handler, **kwargs):
+    """Run an RPCServer on a free port in a background event loop."""
+    loop = asyncio.new_event_loop()
+    server = RPCServer(handler, **kwargs)
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    port = asyncio.run_coroutine_threadsafe(server.start('127.0.0.1', 0), loop).result(5)
+    try:
+        yield port
+    finally:
+        asyncio.run_coroutine_threadsafe(server.close(), loop).result(5)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(5)
+        loop.close()
+
+
+def _echo(resume, jd, settings):
+    if resume == 'fail':
+        raise RPCError(400, "bad resume")
+    if resume == 'slow':
+        time.sleep(0.2)
+    return {'resume': resume, 'jd': jd, 'settings': settings}
+
+
+class TestFraming:
+    """Test frame encoding and decoding."""
+
+    def test_json_round_trip(self):
+        """Test a JSON frame carries its length, codec and payload."""
+        frame = encode_frame([1, 'resume', 'jd', {'strict_mode': True}], JSON)
+        length, codec = HEADER.unpack(frame[:HEADER.size])
+        assert codec == JSON and length == len(frame) - HEADER.size
+        assert decode_payload(frame[HEADER.size:], codec) == [1, 'resume', 'jd', {'strict_mode': True}]
+
+    @pytest.mark.skipif(msgpack is None, reason="msgpack is not installed")
+    def test_msgpack_is_smaller_than_json(self):
+        """Test MessagePack round-trips and beats JSON on a numeric result."""
+        message = [7, 200, {'overall_score': 73.25, 'categories': {'skills': {'score': 81.5, 'weight': 0.35}}}]
+        packed = encode_frame(message, MSGPACK)
+        assert decode_payload(packed[HEADER.size:], MSGPACK) == message
+        assert len(packed) < len(encode_frame(message, JSON))
+
+    def test_invalid_payload_and_codec(self):
+        """Test undecodable payloads and unknown codecs are rejected."""
+        with pytest.raises(RPCError) as e:
+            decode_payload(b'{not json', JSON)
+        assert e.value.status == 400
+        with pytest.raises(RPCError) as e:
+            decode_payload(b'{}', ord('x'))
+        assert e.value.status == 415
+
+
+class TestServer:
+    """Test the server and pipelining client."""
+
+    def test_pipelined_replies_match_requests(self):
+        """Test out-of-order replies are returned in request order."""
+        requests = [('slow', 'jd0', {})] + [(f"r{n}", f"jd{n}", {'n': n}) for n in range(1, 20)]
+        with _serving(_echo, max_in_flight=8) as port, RPCClient(port=port) as client:
+            responses = client.call_many(requests, window=8)
+        assert [response.status for response in responses] == [200] * 20
+        assert [response.body['resume'] for response in responses] == [r for r, _, _ in requests]
+        assert responses[5].body['settings'] == {'n': 5}
+
+    def test_errors_are_per_request(self):
+        """Test a failing request does not affect the rest of the connection."""
+        with _serving(_echo) as port, RPCClient(port=port, codec=JSON) as client:
+            responses = client.call_many([('ok', 'jd', None), ('fail', 'jd', None), (123, 'jd', None)])
+            assert [response.status for response in responses] == [200, 400, 400]
+            assert responses[1].body == {'detail': "bad resume"}
+            assert client.call('again', 'jd')['resume'] == 'again'
+
+    def test_oversized_frame_closes_connection(self):
+        """Test a frame over the limit is answered with 413 and the connection dropped."""
+        with _serving(_echo, max_frame_bytes=64) as port, RPCClient(port=port, codec=JSON) as client:
+            with pytest.raises(RPCError) as e:
+                client.call('x' * 100, 'jd')
+            assert e.value.status == 413
+
+    def test_raw_socket_client(self):
+        """Test the wire format from a client that only uses sockets and JSON."""
+        with _serving(_echo) as port, socket.create_connection(('127.0.0.1', port), timeout=5) as sock:
+            sock.sendall(encode_frame(['a', 'resume', 'jd', {}], JSON) + encode_frame(['b', 'other', 'jd'], JSON))
+            stream = sock.makefile('rb')
+            replies = []
+            for _ in range(2):
+                length, codec = HEADER.unpack(stream.read(HEADER.size))
+                replies.append(decode_payload(stream.read(length), codec))
+        assert sorted((request_id, status) for request_id, status, _ in replies) == [('a', 200), ('b', 200)]
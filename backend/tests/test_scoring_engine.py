@@ -2,13 +2,23 @@
 Tests for the ATS Scoring Engine
 """
 
+import threading
 import pytest
 from pathlib import Path
 from app.scoring_engine import (
     TextPreprocessor,
     KeywordExtractor,
     ResumeParser,
+    SectionIndex,
+    SectionSegmenter,
     ScoringEngine,
+    STAGES,
+    CategoryScore,
+    JobFeatures,
+    ResumeFeatures,
+    StageContext,
+    _get_stage_pool,
+    register_stage,
     to_dict
 )
 
@@ -149,6 +159,45 @@ class TestResumeParser:
         assert isinstance(experiences, list)
 
 
+class TestSectionSegmenter:
+    """Test resume section segmentation."""
+    
+    def test_segment_sample_resume(self):
+        """Test canonical sections are found in the sample resume."""
+        sections = SectionSegmenter.segment(SAMPLE_RESUME)
+        
+        for name in ['summary', 'experience', 'skills', 'education', 'certifications']:
+            assert sections.get(name) is not None
+        
+        education = sections.text(SAMPLE_RESUME, 'education')
+        assert 'Bachelor of Science' in education
+        assert 'AWS Certified' not in education
+    
+    def test_section_at_offset(self):
+        """Test offset lookup returns the enclosing section."""
+        sections = SectionSegmenter.segment(SAMPLE_RESUME)
+        
+        idx = SAMPLE_RESUME.find('Bachelor of Science')
+        assert sections.section_at(idx) == 'education'
+        assert sections.section_at(0) is None
+    
+    def test_title_case_headers(self):
+        """Test title-case headers with trailing colons are recognized."""
+        text = "Work History:\nEngineer 2019 - 2021\nBuilt things\n\nEducation\nMaster of Science"
+        sections = SectionSegmenter.segment(text)
+        
+        assert [s.name for s in sections.sections] == ['experience', 'education']
+    
+    def test_index_round_trip(self):
+        """Test the index survives serialization for storage."""
+        sections = SectionSegmenter.segment(SAMPLE_RESUME)
+        restored = SectionIndex.from_list(sections.to_list())
+        
+        assert restored.to_list() == sections.to_list()
+        assert ResumeParser.extract_education(SAMPLE_RESUME, restored) == \
+            ResumeParser.extract_education(SAMPLE_RESUME)
+
+
 class TestScoringEngine:
     """Test the main scoring engine."""
     
@@ -316,6 +365,115 @@ class TestScoringEngine:
         assert result.label in ['STRONG_MATCH', 'MEDIUM_MATCH', 'WEAK_MATCH']
 
 
+class TestDetailLevels:
+    """Test reduced detail levels and on-demand explanations."""
+    
+    def test_scores_level_matches_full_scores(self):
+        """Test scores-only analysis gives the same scores without evidence."""
+        full = ScoringEngine().analyze(SAMPLE_RESUME, SAMPLE_JD)
+        scores = ScoringEngine(detail_level='scores').analyze(SAMPLE_RESUME, SAMPLE_JD)
+        
+        assert scores.overall_score == full.overall_score
+        assert {k: v.score for k, v in scores.categories.items()} == {k: v.score for k, v in full.categories.items()}
+        assert all(not category.evidence for category in scores.categories.values())
+        assert scores.must_have == []
+        assert scores.actions['gaps'] == []
+        assert scores.metadata['detail_level'] == 'scores'
+    
+    def test_keywords_level_omits_snippets(self):
+        """Test keywords-level analysis reports matches without snippet evidence."""
+        result = ScoringEngine(detail_level='keywords').analyze(SAMPLE_RESUME, SAMPLE_JD)
+        
+        assert result.must_have
+        assert all(kw.evidence == "" for kw in result.must_have)
+
+    def test_stages_skip_evidence_without_changing_scores(self):
+        """Test every category scores the same whether or not evidence is built."""
+        engine = ScoringEngine()
+        context = StageContext(engine, ResumeFeatures.of(SAMPLE_RESUME), JobFeatures.of(SAMPLE_JD))
+
+        for name, stage in STAGES.items():
+            inputs = context.inputs(stage)
+            with_evidence = stage.score(engine, inputs, True)
+            without = stage.score(engine, inputs, False)
+            assert without.score == with_evidence.score, name
+            assert without.evidence == [], name
+
+    def test_explain_matches_full_analysis(self):
+        """Test on-demand explanations equal the evidence of a full analysis."""
+        engine = ScoringEngine()
+        full = to_dict(engine.analyze(SAMPLE_RESUME, SAMPLE_JD))
+        
+        for part in ('keyword_skills', 'seniority_match', 'red_flags'):
+            assert engine.explain(SAMPLE_RESUME, SAMPLE_JD, part) == full['categories'][part]
+        assert engine.explain(SAMPLE_RESUME, SAMPLE_JD, 'keywords')['must_have'] == full['must_have']
+    
+    def test_unknown_detail_level(self):
+        """Test an unknown detail level is rejected."""
+        with pytest.raises(ValueError):
+            ScoringEngine(detail_level='verbose')
+
+
+class TestStagePipeline:
+    """Test category stages: skipping, registration, parallel runs and timings."""
+    
+    def test_zero_weight_stages_are_skipped(self):
+        """Test categories without weight are not scored and do not change the result."""
+        weights = dict(ScoringEngine._default_weights(), role_match=0, education_match=0)
+        full = to_dict(ScoringEngine(weights=weights).analyze(SAMPLE_RESUME, SAMPLE_JD))
+        
+        assert full['metadata']['skipped_categories'] == ['role_match', 'education_match']
+        assert full['categories']['role_match'] == {'score': 0.0, 'details': {'skipped': True}, 'evidence': []}
+        assert 'role_match' not in full['metadata']['stage_timings_ms']
+        assert list(full['categories']) == list(STAGES)
+    
+    def test_registered_stage_joins_overall_score(self, monkeypatch):
+        """Test a new category is scored from shared artifacts once it has a weight."""
+        monkeypatch.setattr('app.scoring_engine.STAGES', dict(STAGES))
+        register_stage(
+            'section_count', ('sections',),
+            lambda engine, a, evidence: CategoryScore(score=100.0, details={'sections': len(a['sections'])})
+        )
+        weights = dict(ScoringEngine._default_weights(), section_count=0.5)
+        
+        with_stage = ScoringEngine(weights=weights).analyze(SAMPLE_RESUME, SAMPLE_JD)
+        without = ScoringEngine().analyze(SAMPLE_RESUME, SAMPLE_JD)
+        
+        assert with_stage.categories['section_count'].details['sections'] > 0
+        assert with_stage.overall_score == pytest.approx(without.overall_score + 50, abs=0.11)
+    
+    def test_parallel_stages_match_sequential(self):
+        """Test running stages on threads gives the same result with timings."""
+        sequential = to_dict(ScoringEngine().analyze(SAMPLE_RESUME, SAMPLE_JD))
+        parallel = to_dict(ScoringEngine(stage_workers=4).analyze(SAMPLE_RESUME, SAMPLE_JD))
+        
+        assert parallel['categories'] == sequential['categories']
+        assert parallel['overall_score'] == sequential['overall_score']
+        timings = parallel['metadata']['stage_timings_ms']
+        assert set(STAGES) <= set(timings) and {'experiences', 'actions'} <= set(timings)
+    
+    def test_engines_of_other_sizes_share_stage_pools_safely(self):
+        """Test engines with different stage_workers run concurrently without shutting down each other's pool."""
+        sequential = ScoringEngine().analyze(SAMPLE_RESUME, SAMPLE_JD).overall_score
+        scores, errors = [], []
+        
+        def analyze(workers):
+            try:
+                scores.append(ScoringEngine(stage_workers=workers).analyze(SAMPLE_RESUME, SAMPLE_JD).overall_score)
+            except Exception as e:
+                errors.append(e)
+        
+        threads = [threading.Thread(target=analyze, args=(workers,)) for workers in (2, 3, 5, 7) * 4]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert errors == []
+        assert scores == [sequential] * len(threads)
+        assert _get_stage_pool(3) is _get_stage_pool(3)
+
+
 class TestIntegration:
     """Integration tests with real sample data."""
     
@@ -0,0 +1,360 @@
+"""
+Tests for analysis storage backends
+"""
+
+import csv
+import io
+import json
+import sqlite3
+import threading
+import time
+import pytest
+from app.__main__ import main
+from app.blobs import check_codec, compress, decompress, split_entry
+from app.export import KEYWORD_COLUMNS, RESULT_COLUMNS, iter_export, result_row
+from app.memo import ResultCache, analysis_key
+from app.store import (
+    AnalysisEvictedError,
+    MemoryAnalysisStore,
+    SQLiteAnalysisStore,
+    content_hash,
+    measure_size,
+    sqlite_path
+)
+
+
+def _entry(n: int = 0, text: str = "resume", jd: str = "jd") -> dict:
+    return {'result': {'overall_score': n, 'label': 'WEAK_MATCH'}, 'resume_text': text, 'jd_text': jd}
+
+
+class TestMemoryAnalysisStore:
+    """Test bounded in-memory store."""
+    
+    def test_put_and_get(self):
+        """Test stored entries are returned and counted as hits."""
+        store = MemoryAnalysisStore()
+        store.put('a', _entry(1))
+        
+        assert store.get('a')['result']['overall_score'] == 1
+        assert store.get('missing') is None
+        stats = store.stats()
+        assert stats['hits'] == 1 and stats['misses'] == 1
+        assert stats['bytes'] == measure_size(_entry(1))
+    
+    def test_lru_eviction_by_count(self):
+        """Test least recently used entry is evicted first."""
+        store = MemoryAnalysisStore(max_entries=2)
+        store.put('a', _entry())
+        store.put('b', _entry())
+        store.get('a')
+        store.put('c', _entry())
+        
+        assert store.get('a') is not None
+        with pytest.raises(AnalysisEvictedError):
+            store.get('b')
+        assert store.stats()['evictions']['lru'] == 1
+    
+    def test_eviction_by_bytes(self):
+        """Test the byte budget is enforced with measured sizes."""
+        big = _entry(text="x" * 10000)
+        store = MemoryAnalysisStore(max_bytes=measure_size(big) * 2 + 100)
+        for key in ['a', 'b', 'c']:
+            store.put(key, _entry(text="x" * 10000))
+        
+        stats = store.stats()
+        assert stats['entries'] == 2
+        assert stats['bytes'] <= store.max_bytes
+        assert stats['evictions']['bytes'] == 1
+    
+    def test_ttl_expiry(self):
+        """Test entries expire after their TTL."""
+        store = MemoryAnalysisStore(ttl_seconds=0.05)
+        store.put('a', _entry())
+        time.sleep(0.1)
+        
+        with pytest.raises(AnalysisEvictedError):
+            store.get('a')
+        assert store.stats()['evictions']['ttl'] == 1
+
+
+class TestSQLiteAnalysisStore:
+    """Test persistent SQLite store."""
+    
+    def test_shared_between_instances(self, tmp_path):
+        """Test an analysis written by one worker is readable by another."""
+        path = str(tmp_path / "analyses.db")
+        writer = SQLiteAnalysisStore(path)
+        reader = SQLiteAnalysisStore(path)
+        writer.put('a', _entry(42))
+        
+        assert reader.get('a')['result']['overall_score'] == 42
+        assert reader.get('missing') is None
+    
+    def test_paginated_listing(self, tmp_path):
+        """Test keyset pagination walks every row newest first."""
+        store = SQLiteAnalysisStore(str(tmp_path / "analyses.db"))
+        for n in range(7):
+            store.put(f"id{n}", _entry(n, jd="Data Engineer" if n % 2 else "Analyst"))
+        
+        seen, cursor = [], None
+        while True:
+            page = store.list(limit=3, cursor=cursor)
+            seen.extend(item['analysis_id'] for item in page['items'])
+            cursor = page['next_cursor']
+            if cursor is None:
+                break
+        assert seen == [f"id{n}" for n in reversed(range(7))]
+        
+        engineer = store.list(limit=10, jd_hash=content_hash("  data   ENGINEER "))
+        assert [item['overall_score'] for item in engineer['items']] == [5, 3, 1]
+    
+    def test_concurrent_puts_are_group_committed(self, tmp_path):
+        """Test concurrent writers all land, in no more transactions than rows."""
+        store = SQLiteAnalysisStore(str(tmp_path / "analyses.db"))
+        threads = [threading.Thread(target=store.put, args=(f"id{n}", _entry(n))) for n in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        stats = store.stats()
+        assert stats['entries'] == 20
+        assert stats['rows_written'] == 20
+        assert stats['transactions'] <= 20
+    
+    def test_failed_group_commit_reaches_every_caller(self, tmp_path, monkeypatch):
+        """Test every caller whose rows were in a failed transaction gets its error."""
+        store = SQLiteAnalysisStore(str(tmp_path / "analyses.db"))
+        release = threading.Event()
+        commits = []
+        commit = store._commit
+        
+        def commit_then_fail(rows, blobs):
+            commits.append(len(rows))
+            if len(commits) == 1:
+                # Hold the write lock until the next two callers are pending behind it
+                release.wait(5)
+                return commit(rows, blobs)
+            raise sqlite3.OperationalError("disk I/O error")
+        
+        monkeypatch.setattr(store, '_commit', commit_then_fail)
+        errors = {}
+        
+        def put(analysis_id):
+            try:
+                store.put(analysis_id, _entry())
+            except sqlite3.OperationalError as e:
+                errors[analysis_id] = str(e)
+        
+        threads = [threading.Thread(target=put, args=('a',))]
+        threads[0].start()
+        while not commits:
+            time.sleep(0.001)
+        threads += [threading.Thread(target=put, args=(analysis_id,)) for analysis_id in ('b', 'c')]
+        for thread in threads[1:]:
+            thread.start()
+        while len(store._pending) < 2:
+            time.sleep(0.001)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        
+        assert commits == [1, 2]
+        assert errors == {'b': "disk I/O error", 'c': "disk I/O error"}
+        assert store.get('a') is not None and store.get('b') is None
+    
+    def test_table_totals_are_cached(self, tmp_path):
+        """Test stats rescans the tables only once its totals are older than stats_ttl."""
+        store = SQLiteAnalysisStore(str(tmp_path / "analyses.db"), stats_ttl=3600)
+        store.put('a', _entry(1))
+        assert store.stats()['entries'] == 1
+        store.put('b', _entry(2))
+        assert store.stats()['entries'] == 1
+        assert store.stats()['rows_written'] == 2
+        store.stats_ttl = 0
+        assert store.stats()['entries'] == 2
+    
+    def test_sqlite_path(self):
+        """Test database URLs are mapped to file paths."""
+        assert sqlite_path("sqlite:///./ats_analyzer.db") == "./ats_analyzer.db"
+        with pytest.raises(ValueError):
+            sqlite_path("postgresql://localhost/ats")
+
+
+class TestTextBlobs:
+    """Test deduplicated, compressed storage of texts."""
+    
+    @pytest.mark.parametrize('codec', ['none', 'zlib', 'lzma'])
+    def test_codec_round_trip(self, codec):
+        """Test every codec restores the exact text."""
+        text = "Résumé\r\n  Python, SQL " * 50
+        assert decompress(compress(text, codec), codec) == text
+        with pytest.raises(ValueError):
+            check_codec('snappy')
+    
+    def test_memory_store_shares_texts(self):
+        """Test a JD shared by several analyses is held and counted once."""
+        jd = "Data Engineer " * 200
+        store = MemoryAnalysisStore(text_codec='zlib')
+        for n in range(3):
+            store.put(f"id{n}", _entry(n, text=f"resume {n}", jd=jd))
+        
+        assert store.get('id1') == _entry(1, text="resume 1", jd=jd)
+        blobs = store.stats()['text_blobs']
+        assert blobs['blobs'] == 4 and blobs['references'] == 6
+        assert blobs['stored_bytes'] < blobs['raw_bytes']
+    
+    def test_memory_store_releases_texts(self):
+        """Test evicting the last analysis using a text frees it."""
+        store = MemoryAnalysisStore(max_entries=1, text_codec='zlib')
+        store.put('a', _entry(text="first", jd="shared"))
+        store.put('b', _entry(text="second", jd="shared"))
+        
+        stats = store.stats()
+        assert stats['text_blobs']['blobs'] == 2
+        assert stats['bytes'] == measure_size(split_entry(_entry(text="second", jd="shared"))[0]) \
+            + stats['text_blobs']['stored_bytes']
+    
+    def test_memory_get_survives_concurrent_eviction(self, monkeypatch):
+        """Test a read whose entry is evicted by another thread mid-read still returns its texts."""
+        from app import store as store_module
+        store = MemoryAnalysisStore(max_entries=1, text_codec='zlib')
+        store.put('a', _entry(text="first", jd="only a"))
+        reading, evicted = threading.Event(), threading.Event()
+        join_entry = store_module.join_entry
+        
+        def paused_join(stored, fetch):
+            # The store lock is released here; let the writer evict 'a' before texts are resolved
+            reading.set()
+            evicted.wait(5)
+            return join_entry(stored, fetch)
+        
+        monkeypatch.setattr(store_module, 'join_entry', paused_join)
+        results = []
+        reader = threading.Thread(target=lambda: results.append(store.get('a')))
+        reader.start()
+        assert reading.wait(5)
+        store.put('b', _entry(text="second", jd="only b"))
+        assert store.stats()['text_blobs']['blobs'] == 2
+        evicted.set()
+        reader.join(5)
+        assert results == [_entry(text="first", jd="only a")]
+    
+    def test_sqlite_store_shares_texts(self, tmp_path):
+        """Test SQLite analyses reference one stored copy of a shared JD."""
+        path = str(tmp_path / "analyses.db")
+        store = SQLiteAnalysisStore(path, text_codec='zlib')
+        store.put_many([(f"id{n}", _entry(n, text=f"resume {n}", jd="Data Engineer")) for n in range(3)])
+        
+        assert SQLiteAnalysisStore(path).get('id2') == _entry(2, text="resume 2", jd="Data Engineer")
+        assert store.stats()['text_blobs']['blobs'] == 4
+    
+    def test_sqlite_reads_inline_rows(self, tmp_path):
+        """Test rows written without blobs are still readable."""
+        path = str(tmp_path / "analyses.db")
+        SQLiteAnalysisStore(path, text_codec=None).put('old', _entry(7))
+        
+        assert SQLiteAnalysisStore(path).get('old') == _entry(7)
+
+
+class TestResultCache:
+    """Test memoization of identical inputs."""
+    
+    def test_key_normalization(self):
+        """Test keys ignore line endings but not settings or case."""
+        weights = {'keyword_skills': 1.0}
+        key = analysis_key("Python\r\nSQL  \n", "JD", weights, False)
+        
+        assert key == analysis_key("Python\nSQL", "JD\n", weights, False)
+        assert key != analysis_key("PYTHON\nSQL", "JD", weights, False)
+        assert key != analysis_key("Python\nSQL", "JD", weights, True)
+        assert key != analysis_key("Python\nSQL", "JD", {'keyword_skills': 0.5}, False)
+    
+    def test_lookup_hits_and_misses(self):
+        """Test stored inputs are found and the hit ratio is tracked."""
+        store = MemoryAnalysisStore()
+        cache = ResultCache(store)
+        entry = dict(_entry(7), input_key='k1')
+        store.put('a', entry)
+        
+        assert cache.lookup('k1') == ('a', entry)
+        assert cache.lookup('k2') is None
+        assert cache.stats()['hit_ratio'] == 0.5
+        assert ResultCache(store, enabled=False).lookup('k1') is None
+    
+    def test_evicted_entries_are_not_returned(self):
+        """Test keys of evicted analyses stop matching."""
+        store = MemoryAnalysisStore(max_entries=1)
+        store.put('a', dict(_entry(), input_key='k1'))
+        store.put('b', dict(_entry(), input_key='k2'))
+        
+        assert ResultCache(store).lookup('k1') is None
+    
+    def test_sqlite_lookup(self, tmp_path):
+        """Test keys are indexed in the SQLite store."""
+        store = SQLiteAnalysisStore(str(tmp_path / "analyses.db"))
+        store.put('a', dict(_entry(3), input_key='k1'))
+        
+        assert ResultCache(store).lookup('k1')[0] == 'a'
+
+
+class TestExport:
+    """Test streaming export of stored analyses."""
+    
+    def _store(self, tmp_path):
+        store = SQLiteAnalysisStore(str(tmp_path / "analyses.db"))
+        for n in range(3):
+            entry = _entry(n, jd="Data Engineer" if n else "Analyst")
+            entry['result'].update(
+                categories={'keyword_skills': {'score': 50.0}},
+                must_have=[{'term': 'python', 'matched': True}, {'term': 'spark', 'matched': False}],
+                nice_to_have=[],
+                red_flags=['gap']
+            )
+            store.put(f"id{n}", entry)
+        return store
+    
+    def test_jsonl_export(self, tmp_path):
+        """Test each analysis becomes one JSON line with its result."""
+        store = self._store(tmp_path)
+        lines = ''.join(iter_export(store, 'jsonl')).splitlines()
+        
+        records = [json.loads(line) for line in lines]
+        assert [r['analysis_id'] for r in records] == ['id0', 'id1', 'id2']
+        assert records[0]['result']['red_flags'] == ['gap']
+    
+    def test_csv_export_filtered_by_jd(self, tmp_path):
+        """Test CSV rows are flattened and filtered by JD hash."""
+        store = self._store(tmp_path)
+        text = ''.join(iter_export(store, 'csv', jd_hash=content_hash("data engineer")))
+        
+        rows = list(csv.DictReader(io.StringIO(text)))
+        assert [row['analysis_id'] for row in rows] == ['id1', 'id2']
+        assert rows[0]['must_have_matched'] == 'python'
+        assert rows[0]['must_have_missing'] == 'spark'
+        assert rows[0]['keyword_skills_score'] == '50.0'
+        assert rows[0]['detail_level'] == 'full'
+    
+    def test_reduced_results_have_null_keyword_columns(self):
+        """Test a 'scores' result exports its detail level and None for keywords it never computed."""
+        full = {'must_have': [], 'nice_to_have': [], 'metadata': {'detail_level': 'full'}}
+        reduced = {'must_have': [], 'nice_to_have': [], 'metadata': {'detail_level': 'scores'}}
+        keyword_columns = [RESULT_COLUMNS.index(column) for column in KEYWORD_COLUMNS]
+        
+        row = result_row(reduced)
+        assert row[RESULT_COLUMNS.index('detail_level')] == 'scores'
+        assert [row[index] for index in keyword_columns] == [None] * 4
+        assert [result_row(full)[index] for index in keyword_columns] == [''] * 4
+    
+    def test_cli_rejects_missing_database_and_bad_dates(self, tmp_path, capsys):
+        """Test the export command exits 2 with a message instead of exporting nothing or crashing."""
+        missing = tmp_path / "missing.db"
+        assert main(['export', '--database-url', f'sqlite:///{missing}']) == 2
+        assert not missing.exists()
+        
+        self._store(tmp_path).close()
+        url = f'sqlite:///{tmp_path / "analyses.db"}'
+        assert main(['export', '--database-url', url, '--since', 'yesterday']) == 2
+        assert capsys.readouterr().err.startswith('error: ')
+        assert main(['export', '--database-url', url, '-o', str(tmp_path / 'out.jsonl')]) == 0
+        assert len((tmp_path / 'out.jsonl').read_text().splitlines()) == 3
@@ -0,0 +1,25 @@
+"""
+Tests for process warm-up
+"""
+
+import sys
+
+from app import warmup
+
+
+class TestWarmup:
+    """Test warm-up imports libraries and marks the process ready."""
+    
+    def test_warm_up_sets_ready(self):
+        """Test warm-up imports lazy modules and records step timings."""
+        timings = warmup.warm_up()
+        
+        assert warmup.is_ready()
+        assert 'analysis' in timings
+        assert 'reportlab.platypus' in sys.modules
+    
+    def test_warm_up_runs_once(self):
+        """Test a second warm-up returns the recorded timings without rerunning."""
+        first = warmup.warm_up()
+        
+        assert warmup.warm_up() == first